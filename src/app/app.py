@@ -13,6 +13,7 @@ from dotenv import load_dotenv
 import flet as ft
 
 # Local imports - Config
+from utils.config import ALERT_LOCATION_RADIUS_KM, OBSERVATION_COMPACT_INTERVAL
 from services.ui.theme_handler import ThemeHandler
 from services.settings_service import SettingsService
 
@@ -23,6 +24,17 @@ from services.location.location_toggle_service import LocationToggleService
 from services.ui.theme_toggle_service import ThemeToggleService
 from services.ui.translation_service import TranslationService
 from services.alerts.weather_alerts_service import WeatherAlertsService
+from services.alerts.alert_monitor import AlertMonitor
+from services.location.location_manager_service import LocationManagerService
+from services.location.gazetteer import Gazetteer
+from services.location.spatial_index import ReverseGeocoder
+from services.location.autocomplete_service import AutocompleteService
+from services.location.geocoder import Geocoder
+from services.location.candidate_ranking import CandidateRanker, TemperaturePreviewService
+from services.data.observation_store import ObservationStore
+from services.data.chart_series import ChartSeriesCache
+from services.maps.map_data_service import MapDataService
+from services.maps.tile_cache import TileCache
 
 # Local imports - State and Layout
 from core.state_manager import StateManager
@@ -64,15 +76,24 @@ class MeteoApp:
         self.initial_theme_mode = theme_mode
         
         # Core services (initialized early)
-        self.api_service = ApiService()
         self.geolocation_service = GeolocationService()
         
+        # Services shared through the page session (initialized in main method)
+        self.api_service: ApiService = None
+        self.observation_store: ObservationStore = None
+        self.reverse_geocoder: ReverseGeocoder = None
+        self.geocoder: Geocoder = None
+        self.tile_cache: TileCache = None
+        
         # Services (initialized in main method)
         self.state_manager: StateManager = None
         self.location_toggle_service: LocationToggleService = None
         self.theme_toggle_service: ThemeToggleService = None
         self.translation_service: TranslationService = None
         self.weather_alerts_service: WeatherAlertsService = None
+        self.location_manager_service: LocationManagerService = None
+        self.alert_monitor: AlertMonitor = None
+        self._compaction_task = None
         
         # UI Components
         self.weather_view_instance: WeatherView = None
@@ -121,6 +142,9 @@ class MeteoApp:
         self.page.session.set('main_app', self)
         self.page.session.set('settings_service', self.settings_service)
         
+        # Shared data and geocoding services, one instance per session
+        self._initialize_shared_services()
+        
         # Initialize translation service with page session
         self.translation_service = TranslationService(self.page.session)
         self.page.session.set('translation_service', self.translation_service)
@@ -145,6 +169,18 @@ class MeteoApp:
         # Store weather alerts service in session for global access
         self.page.session.set('weather_alerts_service', self.weather_alerts_service)
         
+        # Shared saved-locations registry (also feeds the spatial index used by reverse geocoding)
+        self.location_manager_service = LocationManagerService(reverse_geocoder=self.reverse_geocoder)
+        self.page.session.set('location_manager_service', self.location_manager_service)
+        
+        # Background alert checks for all saved locations
+        self.alert_monitor = AlertMonitor(
+            alerts_service=self.weather_alerts_service,
+            location_manager=self.location_manager_service,
+            api_service=self.api_service,
+            observation_store=self.observation_store
+        )
+        
         # Initialize weather view
         self.weather_view_instance = WeatherView(self.page, self.api_service)
         
@@ -153,7 +189,8 @@ class MeteoApp:
             page=self.page,
             geolocation_service=self.geolocation_service,
             state_manager=self.state_manager,
-            update_weather_callback=self.update_weather_with_coordinates
+            update_weather_callback=self.update_weather_with_coordinates,
+            reverse_geocoder=self.reverse_geocoder
         )
         
         self.theme_toggle_service = ThemeToggleService(
@@ -176,6 +213,40 @@ class MeteoApp:
         # Initialize layout manager
         self.layout_manager = LayoutManager(self.page)
 
+    def _initialize_shared_services(self) -> None:
+        """Create the data and geocoding services shared by all components of this session."""
+        try:
+            self.observation_store = ObservationStore.open_default()
+        except Exception as e:
+            logger.warning(f"Observation store unavailable: {e}")
+            self.observation_store = None
+        self.page.session.set('observation_store', self.observation_store)
+        
+        gazetteer = Gazetteer.load_default()
+        autocomplete_service = AutocompleteService(gazetteer)
+        self.reverse_geocoder = ReverseGeocoder(gazetteer)
+        self.geocoder = Geocoder(
+            gazetteer=gazetteer,
+            reverse_geocoder=self.reverse_geocoder,
+            autocomplete=autocomplete_service
+        )
+        self.page.session.set('gazetteer', gazetteer)
+        self.page.session.set('reverse_geocoder', self.reverse_geocoder)
+        self.page.session.set('autocomplete_service', autocomplete_service)
+        self.page.session.set('geocoder', self.geocoder)
+        self.page.session.set('candidate_ranker', CandidateRanker(gazetteer=gazetteer))
+        self.page.session.set('temperature_preview_service', TemperaturePreviewService())
+        self.page.session.set('chart_series_cache', ChartSeriesCache())
+        
+        self.tile_cache = TileCache()
+        self.page.session.set('map_data_service', MapDataService(api_key=os.getenv("API_KEY"), tile_cache=self.tile_cache))
+        
+        self.api_service = ApiService(
+            page=self.page,
+            observation_store=self.observation_store,
+            geocoder=self.geocoder
+        )
+
     def _register_event_handlers(self) -> None:
         """Register all event handlers."""
         logger.info("Registering event handlers")
@@ -216,11 +287,26 @@ class MeteoApp:
                         'unit_system': current_unit
                     }
                     self.settings_service.update_settings(final_settings, auto_save=True)
-                    logger.info("Final settings saved successfully")
+                
+                # Flush the write-behind queue so no coalesced change is lost
+                if self.settings_service:
+                    if self.settings_service.flush():
+                        logger.info("Final settings saved successfully")
+                    else:
+                        logger.warning("Final settings flush failed")
                 
                 if self.weather_view_instance:
                     self.weather_view_instance.cleanup()
                 
+                # Stop the background alert checks before the alerts service goes away
+                if self.alert_monitor:
+                    self.alert_monitor.stop()
+                
+                # Stop the periodic observation store compaction
+                if self._compaction_task is not None:
+                    self._compaction_task.cancel()
+                    self._compaction_task = None
+                
                 # Cleanup weather alerts service
                 if self.weather_alerts_service:
                     self.weather_alerts_service.cleanup()
@@ -567,6 +653,52 @@ class MeteoApp:
             logger.info("Theme service initialized successfully")
         except Exception as e:
             logger.warning(f"Failed to initialize theme service: {e}")
+        
+        # Start the background alert monitor for saved locations
+        try:
+            self.alert_monitor.start()
+            logger.info("Alert monitor started")
+        except Exception as e:
+            logger.warning(f"Failed to start alert monitor: {e}")
+        
+        # Drop the map tiles that expired since the last run
+        self.page.run_task(self._purge_map_tiles)
+        
+        # Replace the bundled gazetteer sample with the complete dataset
+        self.page.run_task(self._install_gazetteer)
+        
+        # Keep the observation archive bounded: compact it now and every OBSERVATION_COMPACT_INTERVAL
+        if self.observation_store and self._compaction_task is None:
+            self._compaction_task = self.page.run_task(self._compact_observations)
+
+    async def _purge_map_tiles(self) -> None:
+        """Delete expired tiles from the disk cache, off the event loop."""
+        try:
+            removed = await asyncio.to_thread(self.tile_cache.purge_expired)
+            logger.info(f"Removed {removed} expired map tiles")
+        except Exception as e:
+            logger.warning(f"Failed to purge the map tile cache: {e}")
+
+    async def _install_gazetteer(self) -> None:
+        """Download the complete offline gazetteer on first run, off the event loop."""
+        gazetteer = self.page.session.get('gazetteer')
+        if gazetteer is None or gazetteer.is_complete:
+            return
+        try:
+            if await asyncio.to_thread(gazetteer.install_complete):
+                logger.info(f"Complete gazetteer installed: {len(gazetteer)} places")
+        except Exception as e:
+            logger.warning(f"Complete gazetteer unavailable, keeping the bundled sample: {e}")
+
+    async def _compact_observations(self) -> None:
+        """Apply the observation store retention periodically, off the event loop."""
+        while True:
+            try:
+                removed = await asyncio.to_thread(self.observation_store.compact)
+                logger.info(f"Removed {removed} superseded or expired observation rows")
+            except Exception as e:
+                logger.warning(f"Failed to compact the observation store: {e}")
+            await asyncio.sleep(OBSERVATION_COMPACT_INTERVAL)
 
     async def build_layout(self) -> None:
         """Build and display the application layout."""
@@ -775,7 +907,7 @@ class MeteoApp:
                         weather_data = self.weather_view_instance.current_weather_data
                         if weather_data:
                             await self.weather_alerts_service.check_real_weather_conditions(
-                                weather_data, self.api_service
+                                weather_data, self.api_service, location=self.get_alert_location(weather_data)
                             )
                             logger.info("Weather alerts checked successfully")
                 except Exception as e:
@@ -787,6 +919,23 @@ class MeteoApp:
             logger.error(f"Error updating weather data for {city}: {e}")
             return False
 
+    def get_alert_location(self, weather_data: dict) -> str:
+        """
+        Name the alerts of a forecast payload are stored under.
+        
+        A saved location near the forecast point keeps its saved name, the one
+        AlertMonitor uses, so the two paths update the same alerts.
+        """
+        city = (weather_data or {}).get('city') or {}
+        coord = city.get('coord') or {}
+        if self.location_manager_service and coord.get('lat') is not None and coord.get('lon') is not None:
+            saved = self.location_manager_service.get_location_near(
+                coord['lat'], coord['lon'], ALERT_LOCATION_RADIUS_KM
+            )
+            if saved and saved.get('name'):
+                return saved['name']
+        return city.get('name')
+
     async def update_weather_with_coordinates(self, lat: float, lon: float, language: str, unit: str):
         """Update weather data using coordinates."""
         logging.info(f"Updating weather with coordinates: lat={lat}, lon={lon}, language={language}, unit={unit}")
@@ -822,7 +971,7 @@ class MeteoApp:
                     weather_data = self.weather_view_instance.current_weather_data
                     if weather_data:
                         await self.weather_alerts_service.check_real_weather_conditions(
-                            weather_data, self.api_service
+                            weather_data, self.api_service, location=self.get_alert_location(weather_data)
                         )
                         logger.info("Weather alerts checked successfully")
             except Exception as e:
@@ -28,6 +28,7 @@ class StateManager:
             "using_location": False,
             "current_lat": None,
             "current_lon": None,
+            "current_saved_location": None,
             "theme_mode": page.theme_mode,
             "using_theme": page.theme_mode == ft.ThemeMode.DARK,
         }
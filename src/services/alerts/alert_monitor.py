@@ -0,0 +1,156 @@
+"""
+Alert Monitor for MeteoApp.
+Checks the alert rules for all saved locations in the background.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from services.alerts.alert_rules import ForecastSeries
+from services.alerts.weather_alerts_service import WeatherAlert, WeatherAlertsService
+from services.data.observation_store import ObservationStore
+from utils.config import (
+    ALERT_MONITOR_INTERVAL,
+    ALERT_MONITOR_START_DELAY,
+    ALERT_MONITOR_API_BUDGET,
+    ALERT_MONITOR_FORECAST_MAX_AGE
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AlertMonitor:
+    """
+    Background monitor of the weather alerts of the saved locations.
+
+    Every ``interval`` seconds each saved location (favorites first) is
+    checked once, and the checks are spread evenly over the interval so
+    that network and CPU use stay flat instead of peaking. A location is
+    evaluated on the forecast already stored by ``ObservationStore`` when
+    it is recent enough; otherwise a new forecast is requested, at most
+    ``api_budget`` times per hour (a token bucket). Locations that do not
+    get a request are skipped until the next round. New alerts go through
+    ``WeatherAlertsService.process_alerts``, so they reach the callbacks
+    registered with ``register_notification_callback``.
+    """
+
+    def __init__(self, alerts_service: WeatherAlertsService, location_manager, api_service,
+                 interval: float = ALERT_MONITOR_INTERVAL, api_budget: int = ALERT_MONITOR_API_BUDGET,
+                 forecast_max_age: float = ALERT_MONITOR_FORECAST_MAX_AGE,
+                 observation_store: Optional[ObservationStore] = None):
+        self.alerts_service = alerts_service
+        self.location_manager = location_manager
+        self.api_service = api_service
+        self.interval = interval
+        self.api_budget = api_budget
+        self.forecast_max_age = forecast_max_age
+        self._observation_store = observation_store
+
+        self._tokens = float(api_budget)
+        self._tokens_time = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self.api_calls = 0
+        self.checks = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, start_delay: float = ALERT_MONITOR_START_DELAY) -> asyncio.Task:
+        """Start monitoring in the background (must be called from the event loop)."""
+        if not self.is_running:
+            self._task = asyncio.ensure_future(self.run(start_delay))
+        return self._task
+
+    def stop(self):
+        """Stop monitoring."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def run(self, start_delay: float = 0):
+        """Check the saved locations round after round until cancelled."""
+        await asyncio.sleep(start_delay)
+        while True:
+            locations = self._get_locations()
+            if not locations:
+                await asyncio.sleep(self.interval)
+                continue
+
+            spacing = self.interval / len(locations)
+            for location in locations:
+                started = time.monotonic()
+                try:
+                    await self.check_location(location)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error checking alerts for {location.get('name')}: {e}")
+                await asyncio.sleep(max(0.0, spacing - (time.monotonic() - started)))
+
+    def _get_locations(self) -> List[Dict[str, Any]]:
+        """Saved locations to check, favorites first (they get the API budget first)."""
+        favorites = self.location_manager.get_favorite_locations()
+        favorite_ids = {location['id'] for location in favorites}
+        others = [location for location in self.location_manager.get_all_locations()
+                  if location['id'] not in favorite_ids]
+        return [location for location in favorites + others
+                if location.get('lat') is not None and location.get('lon') is not None]
+
+    def _get_observation_store(self) -> Optional[ObservationStore]:
+        if self._observation_store is None:
+            try:
+                self._observation_store = ObservationStore.open_default()
+            except Exception as e:
+                logger.error(f"Observation store unavailable: {e}")
+        return self._observation_store
+
+    def _take_token(self) -> bool:
+        """Spend one request of the hourly budget, if any is left."""
+        now = time.monotonic()
+        self._tokens = min(float(self.api_budget),
+                           self._tokens + (now - self._tokens_time) * self.api_budget / 3600.0)
+        self._tokens_time = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+    async def _get_series(self, location: Dict[str, Any]) -> Optional[ForecastSeries]:
+        """Forecast of a location: stored if recent enough, fetched if the budget allows."""
+        store = self._get_observation_store()
+        if store is not None:
+            rows = await asyncio.to_thread(store.get_forecast,
+                                           ObservationStore.location_key(location['lat'], location['lon']),
+                                           self.forecast_max_age)
+            if rows:
+                return ForecastSeries.from_observations(rows)
+
+        if not self._take_token():
+            logger.debug(f"Alert monitor: no API budget left for {location.get('name')}")
+            return None
+
+        # Always metric, whatever the display units: the rules work in °C and km/h
+        self.api_calls += 1
+        result = await asyncio.to_thread(self.api_service.get_weather_data,
+                                         lat=location['lat'], lon=location['lon'], unit="metric")
+        if not result.get('success') or not result.get('data'):
+            logger.warning(f"Alert monitor: forecast unavailable for {location.get('name')}")
+            return None
+        return ForecastSeries.from_forecast(result['data'], "metric")
+
+    async def check_location(self, location: Dict[str, Any]) -> List[WeatherAlert]:
+        """
+        Evaluate the alert rules for one saved location.
+
+        Returns:
+            The new alerts (duplicates of active alerts excluded)
+        """
+        series = await self._get_series(location)
+        if series is None or not len(series):
+            return []
+        self.checks += 1
+        alerts = self.alerts_service.evaluate_series(series, location=location.get('name'))
+        return await self.alerts_service.process_alerts(alerts)
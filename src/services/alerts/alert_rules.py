@@ -0,0 +1,319 @@
+"""
+Alert Rules for MeteoApp.
+Evaluates the alert thresholds over a whole forecast series at once.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from services.alerts.weather_alerts_service import AlertSeverity, AlertType, normalize_temperature_unit
+
+logger = logging.getLogger(__name__)
+
+# Wind speed of the API in km/h: m/s for metric and standard, mph for imperial
+WIND_TO_KMH = {"celsius": 3.6, "fahrenheit": 1.609344, "kelvin": 3.6}
+
+DEFAULT_STEP_HOURS = 3.0  # spacing of the /forecast series
+MIN_VISIBILITY = 1000.0   # metres: always poor below this
+
+SeverityBands = Tuple[Tuple[float, AlertSeverity], ...]
+
+TEMPERATURE_BANDS: SeverityBands = (
+    (0.0, AlertSeverity.LOW), (5.0, AlertSeverity.MODERATE),
+    (10.0, AlertSeverity.HIGH), (15.0, AlertSeverity.EXTREME)
+)
+WIND_BANDS: SeverityBands = (
+    (0.0, AlertSeverity.LOW), (10.0, AlertSeverity.MODERATE),
+    (20.0, AlertSeverity.HIGH), (40.0, AlertSeverity.EXTREME)
+)
+PRECIPITATION_BANDS: SeverityBands = (
+    (0.0, AlertSeverity.LOW), (5.0, AlertSeverity.MODERATE),
+    (15.0, AlertSeverity.HIGH), (30.0, AlertSeverity.EXTREME)
+)
+
+# Alert type -> (series field, fires above the threshold, threshold included, severity bands).
+# Bands are (minimum excess over the threshold, severity); None keeps the configured severity.
+RULE_SPECS: Dict[AlertType, Tuple[str, bool, bool, Optional[SeverityBands]]] = {
+    AlertType.TEMPERATURE_HIGH: ("temperature", True, False, TEMPERATURE_BANDS),
+    AlertType.TEMPERATURE_LOW: ("temperature", False, False, TEMPERATURE_BANDS),
+    AlertType.WIND_STRONG: ("wind", True, False, WIND_BANDS),
+    AlertType.RAIN_HEAVY: ("precipitation", True, False, PRECIPITATION_BANDS),
+    AlertType.UV_HIGH: ("uv", True, False, None),
+    AlertType.AIR_QUALITY_POOR: ("visibility", False, False, None),
+    AlertType.STORM: ("storm", True, True, ((0.0, AlertSeverity.EXTREME),)),
+    AlertType.HUMIDITY_HIGH: ("humidity", True, False, None),
+    AlertType.PRESSURE_LOW: ("pressure", False, False, None)
+}
+
+
+def _to_celsius(value: float, unit: str) -> float:
+    if unit == "fahrenheit":
+        return (value - 32) * 5 / 9
+    if unit == "kelvin":
+        return value - 273.15
+    return value
+
+
+@dataclass
+class ForecastSeries:
+    """
+    Weather quantities of a forecast as parallel series, one entry per step.
+
+    Values are in the units of the alert thresholds (°C, km/h, mm/h,
+    metres, %, hPa); missing values are NaN. ``storm`` is 1 for the steps
+    with a thunderstorm condition and 0 otherwise.
+    """
+    times: List[datetime]
+    values: Dict[str, List[float]]
+    step_hours: float = DEFAULT_STEP_HOURS
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @classmethod
+    def from_forecast(cls, data: Dict[str, Any], unit: str = "celsius") -> "ForecastSeries":
+        """
+        Build the series from a ``/forecast`` payload (``list`` of steps) or
+        from a single current-weather observation.
+
+        Args:
+            data: API response
+            unit: Temperature unit of the response ("celsius" or "metric", ...)
+        """
+        unit = normalize_temperature_unit(unit)
+        steps = data.get("list") if isinstance(data.get("list"), list) else [data]
+        steps = [step for step in steps if isinstance(step, dict)]
+        nan = float("nan")
+
+        times = [datetime.fromtimestamp(step["dt"]) if "dt" in step else datetime.now() for step in steps]
+        step_hours = DEFAULT_STEP_HOURS
+        if len(times) > 1:
+            step_hours = max(1.0, (times[1] - times[0]).total_seconds() / 3600)
+
+        def number(value: Any) -> float:
+            return float(value) if isinstance(value, (int, float)) else nan
+
+        def precipitation(step: Dict[str, Any]) -> float:
+            total = 0.0
+            for kind in ("rain", "snow"):
+                amounts = step.get(kind) or {}
+                if "1h" in amounts:
+                    total += number(amounts["1h"])
+                elif "3h" in amounts:
+                    total += number(amounts["3h"]) / step_hours
+            return total
+
+        wind_factor = WIND_TO_KMH.get(unit, 3.6)
+        values = {
+            "temperature": [_to_celsius(number(step.get("main", {}).get("temp")), unit) for step in steps],
+            "wind": [number(step.get("wind", {}).get("speed")) * wind_factor for step in steps],
+            "precipitation": [precipitation(step) for step in steps],
+            "visibility": [number(step.get("visibility")) for step in steps],
+            "humidity": [number(step.get("main", {}).get("humidity")) for step in steps],
+            "pressure": [number(step.get("main", {}).get("pressure")) for step in steps],
+            "storm": [1.0 if any(200 <= condition.get("id", 0) < 300 for condition in step.get("weather", []))
+                      else 0.0 for step in steps],
+            "uv": [number(step.get("uvi", step.get("uv_index"))) for step in steps]
+        }
+        return cls(times, values, step_hours)
+
+    @classmethod
+    def from_observations(cls, rows: List[Dict[str, Any]]) -> "ForecastSeries":
+        """Build the series from the rows of ``ObservationStore.get_forecast`` (metric units)."""
+        nan = float("nan")
+        times = [datetime.fromtimestamp(row["ts"]) for row in rows]
+        step_hours = DEFAULT_STEP_HOURS
+        if len(times) > 1:
+            step_hours = max(1.0, (times[1] - times[0]).total_seconds() / 3600)
+
+        def column(name: str, factor: float = 1.0) -> List[float]:
+            return [row[name] * factor if row.get(name) is not None else nan for row in rows]
+
+        values = {
+            "temperature": column("temperature"),
+            "wind": column("wind_speed", 3.6),
+            "precipitation": column("precipitation", 1.0 / step_hours),
+            "visibility": column("visibility"),
+            "humidity": column("humidity"),
+            "pressure": column("pressure"),
+            "storm": [1.0 if 200 <= (row.get("weather_id") or 0) < 300 else 0.0 for row in rows],
+            "uv": [nan] * len(rows)
+        }
+        return cls(times, values, step_hours)
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """A threshold on one series field, compiled from the alert settings."""
+    alert_type: AlertType
+    field: str
+    threshold: float
+    above: bool
+    inclusive: bool
+    severity: AlertSeverity
+    bands: Optional[SeverityBands] = None
+
+    def severity_for(self, excess: float) -> AlertSeverity:
+        """Severity of a window from its peak excess over the threshold."""
+        if not self.bands:
+            return self.severity
+        severity = self.bands[0][1]
+        for minimum, band_severity in self.bands:
+            if excess >= minimum:
+                severity = band_severity
+        return severity
+
+
+@dataclass
+class AlertWindow:
+    """Consecutive forecast steps that break the same rule."""
+    rule: AlertRule
+    start_index: int
+    end_index: int  # exclusive
+    onset: datetime
+    end: datetime
+    peak_time: datetime
+    peak_value: float
+    severity: AlertSeverity
+
+    @property
+    def alert_type(self) -> AlertType:
+        return self.rule.alert_type
+
+    @property
+    def duration(self) -> timedelta:
+        return self.end - self.onset
+
+    @property
+    def is_current(self) -> bool:
+        """The window includes the first step of the series (conditions now)."""
+        return self.start_index == 0
+
+
+def compile_rules(alert_thresholds: Dict[AlertType, Dict[str, Any]],
+                  enabled_alerts: Iterable[AlertType]) -> List[AlertRule]:
+    """Turn the enabled alert settings into rules."""
+    enabled = set(enabled_alerts)
+    rules = []
+    for alert_type, config in alert_thresholds.items():
+        spec = RULE_SPECS.get(alert_type)
+        if spec is None or alert_type not in enabled:
+            continue
+        field_name, above, inclusive, bands = spec
+        threshold = float(config.get('threshold', 0.0))
+        severity = config.get('severity', AlertSeverity.MODERATE)
+        if not isinstance(severity, AlertSeverity):
+            severity = AlertSeverity(severity)
+
+        if alert_type == AlertType.AIR_QUALITY_POOR:
+            # The forecast has no AQI: visibility stands in for it (pseudo AQI = 200 - visibility / 50)
+            threshold = max(MIN_VISIBILITY, (200.0 - threshold) * 50.0)
+            bands = ((0.0, AlertSeverity.MODERATE), (threshold - 500.0, AlertSeverity.HIGH))
+        rules.append(AlertRule(alert_type, field_name, threshold, above, inclusive, severity, bands))
+    return rules
+
+
+class AlertRuleEngine:
+    """
+    Evaluates compiled alert rules over a forecast series.
+
+    All rules are checked against all steps in one pass: the series of the
+    rules are stacked into a matrix, compared with the threshold column,
+    and the runs of consecutive breaking steps become alert windows with
+    their onset, end, peak and duration. Without NumPy the same windows are
+    found with plain loops.
+    """
+
+    def __init__(self, rules: Sequence[AlertRule]):
+        self.rules = list(rules)
+        if np is not None and self.rules:
+            self._thresholds = np.array([rule.threshold for rule in self.rules], dtype=np.float64)[:, None]
+            self._signs = np.array([1.0 if rule.above else -1.0 for rule in self.rules])[:, None]
+            self._inclusive = np.array([rule.inclusive for rule in self.rules])[:, None]
+
+    def for_types(self, alert_types) -> "AlertRuleEngine":
+        """Engine with only the rules of the given alert types."""
+        return AlertRuleEngine([rule for rule in self.rules if rule.alert_type in alert_types])
+
+    def evaluate(self, series: ForecastSeries) -> List[AlertWindow]:
+        """Alert windows of the series, ordered by onset."""
+        if not self.rules or not len(series):
+            return []
+        if np is not None:
+            spans = self._find_windows_numpy(series)
+        else:
+            spans = self._find_windows_python(series)
+
+        windows = []
+        for rule_index, start, end, peak_index in spans:
+            rule = self.rules[rule_index]
+            peak_value = series.values[rule.field][peak_index]
+            excess = (peak_value - rule.threshold) if rule.above else (rule.threshold - peak_value)
+            windows.append(AlertWindow(
+                rule=rule,
+                start_index=start,
+                end_index=end,
+                onset=series.times[start],
+                end=series.times[end - 1] + timedelta(hours=series.step_hours),
+                peak_time=series.times[peak_index],
+                peak_value=peak_value,
+                severity=rule.severity_for(excess)
+            ))
+        windows.sort(key=lambda window: (window.onset, window.rule.alert_type.value))
+        return windows
+
+    def _find_windows_numpy(self, series: ForecastSeries) -> List[Tuple[int, int, int, int]]:
+        steps = len(series)
+        values = np.array([series.values[rule.field] for rule in self.rules], dtype=np.float64)
+        excess = self._signs * (values - self._thresholds)
+        excess = np.where(np.isnan(excess), -np.inf, excess)
+        breaking = np.where(self._inclusive, excess >= 0, excess > 0)
+
+        # Run boundaries: +1 where a run starts, -1 right after it ends
+        padded = np.zeros((len(self.rules), steps + 2), dtype=np.int8)
+        padded[:, 1:-1] = breaking
+        edges = np.diff(padded, axis=1)
+        rule_index, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)  # row-major order pairs them with the starts
+        if not len(starts):
+            return []
+
+        # Peak of every run at once: gather the runs end to end and reduce each segment
+        lengths = ends - starts
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+        run_values = excess[np.repeat(rule_index, lengths), positions]
+        peaks = np.maximum.reduceat(run_values, offsets)
+        run_ids = np.repeat(np.arange(len(starts)), lengths)
+        at_peak = np.flatnonzero(run_values == peaks[run_ids])
+        _, first = np.unique(run_ids[at_peak], return_index=True)
+        peak_positions = positions[at_peak[first]]
+
+        return list(zip(rule_index.tolist(), starts.tolist(), ends.tolist(), peak_positions.tolist()))
+
+    def _find_windows_python(self, series: ForecastSeries) -> List[Tuple[int, int, int, int]]:
+        spans = []
+        for rule_index, rule in enumerate(self.rules):
+            start = None
+            peak = None
+            values = series.values[rule.field]
+            for step in range(len(series) + 1):
+                value = values[step] if step < len(series) else float("nan")
+                excess = (value - rule.threshold) if rule.above else (rule.threshold - value)
+                breaking = excess >= 0 if rule.inclusive else excess > 0  # False for NaN
+                if breaking:
+                    if start is None:
+                        start, peak = step, step
+                    elif excess > ((values[peak] - rule.threshold) if rule.above else (rule.threshold - values[peak])):
+                        peak = step
+                elif start is not None:
+                    spans.append((rule_index, start, step, peak))
+                    start = None
+        return spans
@@ -0,0 +1,298 @@
+"""
+Alert Store for MeteoApp.
+Keeps the weather alerts indexed, expires them lazily and persists them.
+"""
+
+import heapq
+import itertools
+import logging
+import re
+import threading
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.alerts.weather_alerts_service import AlertSeverity, AlertType, WeatherAlert
+from utils.config import ALERT_HISTORY_SIZE, ALERT_WINDOW_BUCKET
+
+logger = logging.getLogger(__name__)
+
+AlertKey = Tuple[str, str, int]  # (location, alert type, window)
+SEVERITY_ORDER = list(AlertSeverity)
+
+
+class AlertStore:
+    """
+    Store of the weather alerts, indexed for the checks done on every update.
+
+    - Alerts are keyed by (location, type, window), where the window is the
+      onset rounded down to ``ALERT_WINDOW_BUCKET`` seconds: telling whether
+      an alert is already known is one dictionary lookup.
+    - A min-heap on ``expires_at`` expires alerts lazily: only the entries
+      that are due are popped, nothing is rescanned. Entries left behind by
+      an alert whose expiry moved are skipped when popped.
+    - Alerts and a bounded history of the raised alerts (for statistics)
+      are saved through ``LocalStorageService`` and survive restarts.
+
+    Acknowledged alerts stay in the index until they expire, so the same
+    conditions do not raise them again.
+    """
+
+    FILENAME = "weather_alerts.json"
+
+    def __init__(self, storage_service=None, history_size: int = ALERT_HISTORY_SIZE,
+                 window_bucket: int = ALERT_WINDOW_BUCKET):
+        self._storage = storage_service
+        self.window_bucket = window_bucket
+        self._alerts: Dict[str, WeatherAlert] = {}   # id -> alert, acknowledged included
+        self._by_key: Dict[AlertKey, str] = {}        # key -> id
+        self._keys: Dict[str, AlertKey] = {}          # id -> key
+        self._expiry: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self._history: deque = deque(maxlen=history_size)
+        self._lock = threading.RLock()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Keys and persistence
+    # ------------------------------------------------------------------
+
+    def key(self, alert: WeatherAlert) -> AlertKey:
+        """Dedup key of an alert: (location, type, onset window)."""
+        window = int(alert.onset.timestamp()) // self.window_bucket
+        return (alert.location or "", alert.alert_type.value, window)
+
+    def _make_id(self, alert: WeatherAlert, key: AlertKey) -> str:
+        """Id derived from the key, so it is unique by construction."""
+        location, alert_type, window = key
+        parts = [alert_type]
+        if "forecast" in alert.id:
+            parts.append("forecast")  # marks forecast alerts (see _update_active_alerts_language)
+        if location:
+            parts.append(re.sub(r"\W+", "_", location.lower()))
+        parts.append(str(window * self.window_bucket))
+        return "_".join(parts)
+
+    def _get_storage(self):
+        if self._storage is None:
+            from services.data.local_storage_service import LocalStorageService
+            self._storage = LocalStorageService()
+        return self._storage
+
+    def _load(self):
+        try:
+            storage = self._get_storage()
+            data = storage.load_json(storage.get_data_path(self.FILENAME), {})
+        except Exception as e:
+            logger.error(f"Error loading stored alerts: {e}")
+            return
+
+        now = datetime.now()
+        for item in data.get('alerts', []):
+            try:
+                alert = WeatherAlert.from_dict(item)
+            except (KeyError, ValueError, TypeError) as e:
+                logger.warning(f"Skipping invalid stored alert: {e}")
+                continue
+            if alert.expires_at > now:
+                self._index(alert, self.key(alert))
+        self._history.extend(data.get('history', []))
+        logger.info(f"Loaded {len(self._alerts)} stored alerts")
+
+    def save(self) -> bool:
+        """Write alerts and history to storage."""
+        with self._lock:
+            data = {
+                'alerts': [alert.to_dict() for alert in self._alerts.values()],
+                'history': list(self._history),
+                'updated': datetime.now().isoformat()
+            }
+        try:
+            storage = self._get_storage()
+            return storage.save_json(data, storage.get_data_path(self.FILENAME))
+        except Exception as e:
+            logger.error(f"Error saving alerts: {e}")
+            return False
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _index(self, alert: WeatherAlert, key: AlertKey):
+        self._alerts[alert.id] = alert
+        self._by_key[key] = alert.id
+        self._keys[alert.id] = key
+        heapq.heappush(self._expiry, (alert.expires_at.timestamp(), next(self._counter), alert.id))
+
+    def _unindex(self, alert_id: str):
+        self._alerts.pop(alert_id, None)
+        key = self._keys.pop(alert_id, None)
+        if key is not None and self._by_key.get(key) == alert_id:
+            del self._by_key[key]
+
+    def purge_expired(self, now: Optional[datetime] = None) -> int:
+        """Drop the alerts whose expiry is due; returns how many were dropped."""
+        now_ts = (now or datetime.now()).timestamp()
+        removed = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now_ts:
+                expires, _, alert_id = heapq.heappop(self._expiry)
+                alert = self._alerts.get(alert_id)
+                if alert is None or alert.expires_at.timestamp() != expires:
+                    continue  # already removed, or its expiry was extended
+                self._unindex(alert_id)
+                removed += 1
+        if removed:
+            self.save()
+        return removed
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def add(self, alert: WeatherAlert) -> bool:
+        """
+        Add an alert unless one with the same key is already stored.
+
+        A duplicate does not replace the stored alert, but extends its
+        expiry (and peak) when the new one lasts longer or is stronger.
+
+        Returns:
+            True if the alert is new (and should be notified)
+        """
+        self.purge_expired()
+        with self._lock:
+            key = self.key(alert)
+            existing_id = self._by_key.get(key)
+            if existing_id is not None:
+                existing = self._alerts[existing_id]
+                if alert.expires_at > existing.expires_at:
+                    existing.expires_at = alert.expires_at
+                    heapq.heappush(self._expiry, (existing.expires_at.timestamp(), next(self._counter), existing_id))
+                if SEVERITY_ORDER.index(alert.severity) > SEVERITY_ORDER.index(existing.severity):
+                    existing.severity, existing.value, existing.peak_at = alert.severity, alert.value, alert.peak_at
+                return False
+
+            self._insert(alert, key)
+        self.save()
+        return True
+
+    def _insert(self, alert: WeatherAlert, key: AlertKey):
+        alert.id = self._make_id(alert, key)
+        self._index(alert, key)
+        self._history.append({
+            'id': alert.id,
+            'type': alert.alert_type.value,
+            'severity': alert.severity.value,
+            'location': alert.location,
+            'created_at': alert.created_at.isoformat()
+        })
+
+    def replace(self, location: Optional[str], alert_type: AlertType,
+                alerts: List[WeatherAlert]) -> List[WeatherAlert]:
+        """
+        Replace the alerts of one type and location with a new evaluation.
+
+        Stored alerts without a match among ``alerts`` are dropped; the
+        matching ones keep their id and acknowledgement and take the new
+        severity, values, texts and expiry.
+
+        Returns:
+            The alerts that were not stored before
+        """
+        self.purge_expired()
+        added = []
+        with self._lock:
+            new_alerts = {self.key(alert): alert for alert in alerts}
+            for alert_id, key in list(self._keys.items()):
+                if key[:2] == (location or "", alert_type.value) and key not in new_alerts:
+                    self._unindex(alert_id)
+
+            for key, alert in new_alerts.items():
+                existing_id = self._by_key.get(key)
+                if existing_id is None:
+                    self._insert(alert, key)
+                    added.append(alert)
+                    continue
+                existing = self._alerts[existing_id]
+                existing.severity, existing.value, existing.threshold = alert.severity, alert.value, alert.threshold
+                existing.title, existing.message, existing.peak_at = alert.title, alert.message, alert.peak_at
+                if existing.expires_at != alert.expires_at:
+                    existing.expires_at = alert.expires_at
+                    heapq.heappush(self._expiry, (existing.expires_at.timestamp(), next(self._counter), existing_id))
+        self.save()
+        return added
+
+    def contains(self, alert: WeatherAlert) -> bool:
+        """Whether an alert with the same key is stored (acknowledged or not)."""
+        self.purge_expired()
+        with self._lock:
+            return self.key(alert) in self._by_key
+
+    def get(self, alert_id: str) -> Optional[WeatherAlert]:
+        return self._alerts.get(alert_id)
+
+    def get_active(self) -> List[WeatherAlert]:
+        """Unexpired, unacknowledged alerts in the order they were raised."""
+        self.purge_expired()
+        with self._lock:
+            return [alert for alert in self._alerts.values() if not alert.acknowledged]
+
+    def acknowledge(self, alert_id: str) -> bool:
+        with self._lock:
+            alert = self._alerts.get(alert_id)
+            if alert is None or alert.acknowledged:
+                return False
+            alert.acknowledged = True
+        self.save()
+        return True
+
+    def acknowledge_all(self) -> int:
+        with self._lock:
+            pending = [alert for alert in self._alerts.values() if not alert.acknowledged]
+            for alert in pending:
+                alert.acknowledged = True
+        if pending:
+            self.save()
+        return len(pending)
+
+    def get_history(self) -> List[Dict[str, Any]]:
+        """Summaries of the most recently raised alerts, oldest first."""
+        with self._lock:
+            return list(self._history)
+
+    def get_statistics(self, days: int = 7) -> Dict[str, Any]:
+        """
+        Alert counts for the dialog.
+
+        Returns:
+            ``active``: active alerts by severity, ``recent``: alerts raised in
+            the last ``days`` days by severity, ``recent_total`` and
+            ``by_type`` (recent alerts by type)
+        """
+        active = Counter(alert.severity for alert in self.get_active())
+        since = (datetime.now() - timedelta(days=days)).isoformat()
+        with self._lock:
+            recent = [item for item in self._history if item.get('created_at', '') >= since]
+        recent_by_severity = Counter(item.get('severity') for item in recent)
+        return {
+            'active': {severity: active.get(severity, 0) for severity in AlertSeverity},
+            'recent': {severity: recent_by_severity.get(severity.value, 0) for severity in AlertSeverity},
+            'recent_total': len(recent),
+            'by_type': dict(Counter(item.get('type') for item in recent))
+        }
+
+    def clear(self):
+        """Remove every alert (the history is kept)."""
+        with self._lock:
+            self._alerts.clear()
+            self._by_key.clear()
+            self._keys.clear()
+            self._expiry.clear()
+        self.save()
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def __iter__(self):
+        return iter(list(self._alerts.values()))
@@ -0,0 +1,161 @@
+"""
+Notification Dispatcher for MeteoApp.
+Delivers alert notifications with rate limits, aggregation and quiet hours.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, time as dt_time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.alerts.weather_alerts_service import AlertSeverity, WeatherAlert
+from utils.config import ALERT_NOTIFY_WINDOW
+
+logger = logging.getLogger(__name__)
+
+NotificationHandler = Callable[[List[WeatherAlert]], Optional[Awaitable[None]]]
+
+
+def _parse_time(value: str) -> Optional[dt_time]:
+    try:
+        hours, minutes = value.split(":")
+        return dt_time(int(hours), int(minutes))
+    except (AttributeError, ValueError):
+        return None
+
+
+def in_quiet_hours(settings: Dict[str, Any], now: Optional[datetime] = None) -> bool:
+    """
+    Whether ``now`` falls in the quiet hours of the notification settings.
+
+    The range may wrap around midnight ("22:00" to "07:00").
+    """
+    if not settings or not settings.get("quiet_hours"):
+        return False
+    start = _parse_time(settings.get("quiet_start", ""))
+    end = _parse_time(settings.get("quiet_end", ""))
+    if start is None or end is None or start == end:
+        return False
+    current = (now or datetime.now()).time()
+    if start < end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+@dataclass
+class NotificationChannel:
+    """A way of notifying the user, with its own delivery policy."""
+    name: str
+    handler: NotificationHandler
+    min_interval: float = 0.0     # seconds between two deliveries
+    aggregate: bool = True        # collect alerts for ALERT_NOTIFY_WINDOW before delivering
+    quiet_hours: bool = True      # only extreme alerts during quiet hours
+    pending: List[WeatherAlert] = field(default_factory=list)
+    last_sent: float = float("-inf")
+    flush_task: Optional[asyncio.Task] = None
+
+
+class NotificationDispatcher:
+    """
+    Dispatcher of alert notifications over several channels.
+
+    Alerts of one burst (a storm front raising wind, rain and storm alerts
+    for several locations) are collected for ``window`` seconds and handed
+    to each aggregating channel as one batch, so a channel shows a single
+    summary instead of one message per alert. A channel never delivers
+    more often than its ``min_interval``: alerts arriving in between are
+    added to the next batch. During the quiet hours of the notification
+    settings, channels that respect them only receive extreme alerts.
+    Channels are served concurrently, and each delivery runs as its own
+    task so a slow handler does not hold up the others.
+    """
+
+    def __init__(self, window: float = ALERT_NOTIFY_WINDOW,
+                 settings_provider: Optional[Callable[[], Dict[str, Any]]] = None):
+        self.window = window
+        self.settings_provider = settings_provider
+        self.channels: Dict[str, NotificationChannel] = {}
+        self.delivered = 0
+        self.suppressed = 0
+
+    def add_channel(self, name: str, handler: NotificationHandler, min_interval: float = 0.0,
+                    aggregate: bool = True, quiet_hours: bool = True) -> NotificationChannel:
+        """Register (or replace) a channel."""
+        channel = NotificationChannel(name, handler, min_interval, aggregate, quiet_hours)
+        self.channels[name] = channel
+        return channel
+
+    def _get_settings(self) -> Dict[str, Any]:
+        if self.settings_provider is None:
+            return {}
+        try:
+            return self.settings_provider() or {}
+        except Exception as e:
+            logger.error(f"Error reading notification settings: {e}")
+            return {}
+
+    async def dispatch(self, alerts: List[WeatherAlert]):
+        """Hand new alerts to every channel."""
+        if not alerts:
+            return
+        immediate = []
+        for channel in self.channels.values():
+            channel.pending.extend(alerts)
+            if channel.aggregate or time.monotonic() - channel.last_sent < channel.min_interval:
+                self._schedule_flush(channel)
+            else:
+                immediate.append(self._flush(channel))
+        if immediate:
+            await asyncio.gather(*immediate)
+
+    def _schedule_flush(self, channel: NotificationChannel):
+        if channel.flush_task is not None and not channel.flush_task.done():
+            return  # the scheduled flush will take the new alerts too
+        delay = max(self.window if channel.aggregate else 0.0,
+                    channel.last_sent + channel.min_interval - time.monotonic())
+        channel.flush_task = asyncio.ensure_future(self._flush_later(channel, delay))
+
+    async def _flush_later(self, channel: NotificationChannel, delay: float):
+        await asyncio.sleep(delay)
+        channel.flush_task = None
+        await self._flush(channel)
+
+    async def _flush(self, channel: NotificationChannel):
+        """Deliver the pending alerts of a channel as one batch."""
+        batch, channel.pending = channel.pending, []
+        if channel.quiet_hours and in_quiet_hours(self._get_settings()):
+            kept = [alert for alert in batch if alert.severity == AlertSeverity.EXTREME]
+            self.suppressed += len(batch) - len(kept)
+            if len(kept) < len(batch):
+                logger.info(f"Quiet hours: {len(batch) - len(kept)} notifications held back on {channel.name}")
+            batch = kept
+        if not batch:
+            return
+
+        channel.last_sent = time.monotonic()
+        try:
+            result = channel.handler(batch)
+            if asyncio.iscoroutine(result):
+                await result
+            self.delivered += len(batch)
+        except Exception as e:
+            logger.error(f"Error in notification channel {channel.name}: {e}")
+
+    async def flush_all(self):
+        """Deliver everything pending now, ignoring windows and rate limits."""
+        for channel in self.channels.values():
+            if channel.flush_task is not None:
+                channel.flush_task.cancel()
+                channel.flush_task = None
+        await asyncio.gather(*(self._flush(channel) for channel in self.channels.values()
+                               if channel.pending))
+
+    def cancel(self):
+        """Drop pending notifications and scheduled flushes."""
+        for channel in self.channels.values():
+            if channel.flush_task is not None:
+                channel.flush_task.cancel()
+                channel.flush_task = None
+            channel.pending.clear()
@@ -5,11 +5,13 @@ Handles weather alerts, notifications, and alert management.
 
 import logging
 import asyncio
+import itertools
 from datetime import datetime, timedelta
 from typing import Dict, List, Callable, Any
 from enum import Enum
 import flet as ft
 from translations import translation_manager  # Import translation system
+from utils.config import ALERT_NOTIFY_MIN_INTERVAL
 
 logger = logging.getLogger(__name__)
 
@@ -34,13 +36,27 @@ class AlertType(Enum):
     HUMIDITY_HIGH = "humidity_high"
     PRESSURE_LOW = "pressure_low"
 
+# Temperature unit of each API unit system (the app uses either name)
+TEMPERATURE_UNITS = {
+    "metric": "celsius",
+    "imperial": "fahrenheit",
+    "standard": "kelvin"
+}
+
+def normalize_temperature_unit(unit: str) -> str:
+    """Map "metric"/"imperial"/"standard" to "celsius"/"fahrenheit"/"kelvin" (other names unchanged)."""
+    return TEMPERATURE_UNITS.get(unit, unit)
+
+_alert_sequence = itertools.count()  # keeps ids unique within the same second
+
 class WeatherAlert:
     """Represents a weather alert."""
     
     def __init__(self, alert_type: AlertType, severity: AlertSeverity, 
                  title: str, message: str, value: float = None, 
                  threshold: float = None, unit: str = None,
-                 expires_at: datetime = None):
+                 expires_at: datetime = None, onset: datetime = None,
+                 peak_at: datetime = None, location: str = None):
         self.alert_type = alert_type
         self.severity = severity
         self.title = title
@@ -50,7 +66,10 @@ class WeatherAlert:
         self.unit = unit
         self.created_at = datetime.now()
         self.expires_at = expires_at or (datetime.now() + timedelta(hours=6))
-        self.id = f"{alert_type.value}_{int(self.created_at.timestamp())}"
+        self.onset = onset or self.created_at  # when the conditions start (forecast alerts)
+        self.peak_at = peak_at or self.onset
+        self.location = location  # saved location the alert is for (None: the displayed one)
+        self.id = f"{alert_type.value}_{int(self.created_at.timestamp())}_{next(_alert_sequence)}"
         self.acknowledged = False
 
     def to_dict(self) -> Dict[str, Any]:
@@ -66,6 +85,9 @@ class WeatherAlert:
             'unit': self.unit,
             'created_at': self.created_at.isoformat(),
             'expires_at': self.expires_at.isoformat(),
+            'onset': self.onset.isoformat(),
+            'peak_at': self.peak_at.isoformat(),
+            'location': self.location,
             'acknowledged': self.acknowledged
         }
 
@@ -80,13 +102,23 @@ class WeatherAlert:
             value=data.get('value'),
             threshold=data.get('threshold'),
             unit=data.get('unit'),
-            expires_at=datetime.fromisoformat(data['expires_at'])
+            expires_at=datetime.fromisoformat(data['expires_at']),
+            onset=datetime.fromisoformat(data['onset']) if data.get('onset') else None,
+            peak_at=datetime.fromisoformat(data['peak_at']) if data.get('peak_at') else None,
+            location=data.get('location')
         )
         alert.id = data['id']
         alert.created_at = datetime.fromisoformat(data['created_at'])
+        if not data.get('onset'):
+            alert.onset = alert.peak_at = alert.created_at
         alert.acknowledged = data.get('acknowledged', False)
         return alert
 
+    @property
+    def duration(self) -> timedelta:
+        """How long the conditions are expected to last."""
+        return max(timedelta(0), self.expires_at - self.onset)
+
     def is_active(self) -> bool:
         """Check if alert is still active."""
         return datetime.now() < self.expires_at and not self.acknowledged
@@ -94,22 +126,38 @@ class WeatherAlert:
 class WeatherAlertsService:
     """Service for managing weather alerts and notifications."""
     
-    def __init__(self, page: ft.Page, settings_service=None, translation_service=None, language: str = "en", temp_unit: str = "celsius"):
+    def __init__(self, page: ft.Page, settings_service=None, translation_service=None, language: str = "en", temp_unit: str = "celsius",
+                 alert_store=None, notification_dispatcher=None):
         self.page = page
         self.settings_service = settings_service
         self.translation_service = translation_service
         self.language = language
-        self.temp_unit = temp_unit  # "celsius", "fahrenheit", "kelvin"
+        self.temp_unit = normalize_temperature_unit(temp_unit)  # "celsius", "fahrenheit", "kelvin"
         
         # Alert configuration
         self.alert_thresholds = self._load_default_thresholds()
         self.enabled_alerts = set()
-        # Alert storage
-        self.active_alerts: Dict[str, WeatherAlert] = {}
+        self._rule_engine = None  # compiled lazily from the thresholds
+        self._last_series: Dict[str, Any] = {}  # location -> (series, forecast_only) last evaluated
+        # Alert storage (indexed, persisted)
+        if alert_store is None:
+            from services.alerts.alert_store import AlertStore
+            alert_store = AlertStore()
+        self.alert_store = alert_store
         
         # Notification callbacks
         self.notification_callbacks: List[Callable] = []
         
+        # Notification delivery (aggregation, rate limits, quiet hours)
+        if notification_dispatcher is None:
+            from services.alerts.notification_dispatcher import NotificationDispatcher
+            notification_dispatcher = NotificationDispatcher(settings_provider=self.get_notification_settings)
+        self.notification_dispatcher = notification_dispatcher
+        self.notification_dispatcher.add_channel("callbacks", self._run_notification_callbacks,
+                                                 aggregate=False, quiet_hours=False)
+        self.notification_dispatcher.add_channel("page", self._show_page_notification,
+                                                 min_interval=ALERT_NOTIFY_MIN_INTERVAL)
+        
         # Load user preferences
         self._load_alert_preferences()
         
@@ -118,7 +166,7 @@ class WeatherAlertsService:
     def update_language_and_units(self, language: str, temp_unit: str):
         """Update language and temperature unit settings."""
         self.language = language
-        self.temp_unit = temp_unit
+        self.temp_unit = normalize_temperature_unit(temp_unit)
         
         # Update existing active alerts with new language
         self._update_active_alerts_language()
@@ -126,7 +174,7 @@ class WeatherAlertsService:
     def _update_active_alerts_language(self):
         """Update the title and message of existing active alerts with current language."""
         updated_count = 0
-        for alert in self.active_alerts.values():
+        for alert in self.alert_store:
             try:
                 # Check if this is a forecast alert from the ID
                 is_forecast = "forecast" in alert.id
@@ -134,6 +182,8 @@ class WeatherAlertsService:
                 # Update title with current language
                 old_title = alert.title
                 alert.title = self._get_alert_title(alert.alert_type, is_forecast)
+                if alert.location:
+                    alert.title = f"{alert.title} - {alert.location}"
                 
                 # Update message with current language if we have the value
                 if alert.value is not None:
@@ -149,6 +199,7 @@ class WeatherAlertsService:
                 continue
         
         if updated_count > 0:
+            self.alert_store.save()
             logger.info(f"Updated language for {updated_count} active alerts")
 
     def _convert_temperature_to_celsius(self, temp: float, from_unit: str) -> float:
@@ -249,6 +300,7 @@ class WeatherAlertsService:
         # Update the enabled status in thresholds config
         for alert_type in self.alert_thresholds:
             self.alert_thresholds[alert_type]['enabled'] = alert_type in self.enabled_alerts
+        self._invalidate_rules()
         
         # Save preferences to ensure they persist
         self.save_alert_preferences()
@@ -294,14 +346,8 @@ class WeatherAlertsService:
                 forecast_alerts = await self._check_forecast_conditions(forecast_data)
                 new_alerts.extend(forecast_alerts)
             
-            # Add new alerts to active list
-            for alert in new_alerts:
-                if not self._is_duplicate_alert(alert):
-                    self.active_alerts[alert.id] = alert
-                    await self._trigger_notification(alert)
-            
-            # Clean expired alerts
-            self._clean_expired_alerts()
+            # Add new alerts to the store and notify them
+            await self.process_alerts(new_alerts)
             
             logger.info(f"Generated {len(new_alerts)} new weather alerts")
             
@@ -347,30 +393,11 @@ class WeatherAlertsService:
 
     async def _check_forecast_conditions(self, forecast_data: Dict[str, Any]) -> List[WeatherAlert]:
         """Check forecast conditions for upcoming alerts."""
-        alerts = []
-        
         try:
-            # Check next 24 hours for significant weather events
-            if 'hourly' in forecast_data:
-                hourly_data = forecast_data['hourly'][:24]  # Next 24 hours
-                
-                for hour_data in hourly_data:
-                    # Check for storm conditions
-                    if 'weather_condition' in hour_data:
-                        condition = hour_data['weather_condition'].lower()
-                        if any(word in condition for word in ['storm', 'thunder', 'severe']):
-                            alerts.extend(self._check_storm_alerts(hour_data))
-                    
-                    # Check for heavy precipitation forecast
-                    if 'precipitation' in hour_data:
-                        precip = hour_data['precipitation']
-                        if precip > self.alert_thresholds[AlertType.RAIN_HEAVY]['threshold']:
-                            alerts.extend(self._check_precipitation_alerts(precip, is_forecast=True))
-                            
+            return self._evaluate_forecast(forecast_data, forecast_only=True)
         except Exception as e:
             logger.error(f"Error checking forecast conditions: {e}")
-        
-        return alerts
+            return []
 
     def _check_temperature_alerts(self, temperature: float) -> List[WeatherAlert]:
         """Check for temperature-based alerts."""
@@ -641,44 +668,70 @@ class WeatherAlertsService:
         
         return message if message != key else f"Weather alert: {alert_type.value}"
 
-    def _is_duplicate_alert(self, new_alert: WeatherAlert) -> bool:
-        """Check if this alert is a duplicate of an existing active alert."""
-        for existing_alert in self.active_alerts.values():
-            if (existing_alert.alert_type == new_alert.alert_type and 
-                existing_alert.is_active() and
-                (datetime.now() - existing_alert.created_at).total_seconds() < 3600):  # Within 1 hour
-                return True
-        return False
-
-    def _clean_expired_alerts(self):
-        """Remove expired alerts from active list."""
-        expired_ids = [alert_id for alert_id, alert in self.active_alerts.items() if not alert.is_active()]
-        for alert_id in expired_ids:
-            del self.active_alerts[alert_id]
+    def get_notification_settings(self) -> Dict[str, Any]:
+        """Notification settings saved by the push notifications dialog."""
+        if not self.settings_service:
+            return {}
+        return self.settings_service.get_setting('notification_settings', {}) or {}
 
     async def _trigger_notification(self, alert: WeatherAlert):
         """Trigger notification for an alert."""
+        await self.notify([alert])
+
+    async def notify(self, alerts: List[WeatherAlert]):
+        """Hand new alerts to the notification dispatcher."""
         try:
-            # Call registered callbacks
-            for callback in self.notification_callbacks:
-                try:
-                    if asyncio.iscoroutinefunction(callback):
-                        await callback(alert)
-                    else:
-                        callback(alert)
-                except Exception as e:
-                    logger.error(f"Error in notification callback: {e}")
-            
-            # Show system notification if page is available
-            if self.page:
-                await self._show_page_notification(alert)
-                
+            await self.notification_dispatcher.dispatch(alerts)
         except Exception as e:
             logger.error(f"Error triggering notification: {e}")
 
-    async def _show_page_notification(self, alert: WeatherAlert):
-        """Show notification in the page."""
+    async def _run_notification_callbacks(self, alerts: List[WeatherAlert]):
+        """Call the registered callbacks for each alert, concurrently."""
+        async def run(callback, alert):
+            try:
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(alert)
+                else:
+                    callback(alert)
+            except Exception as e:
+                logger.error(f"Error in notification callback: {e}")
+
+        await asyncio.gather(*(run(callback, alert)
+                               for alert in alerts
+                               for callback in list(self.notification_callbacks)))
+
+    def _get_summary_title(self, alerts: List[WeatherAlert]) -> str:
+        """Title of a notification covering several alerts ("3 alerts for Roma")."""
+        locations = {alert.location for alert in alerts}
+        if len(locations) == 1 and None not in locations:
+            key, params = "alert_summary_location", {'count': len(alerts), 'location': locations.pop()}
+        else:
+            key, params = "alert_summary", {'count': len(alerts)}
+        try:
+            text = translation_manager.get_translation("weather", "alert_messages", key, self.language)
+            if text != key:
+                return text.format(**params)
+        except Exception as e:
+            logger.debug(f"Translation error for {key}: {e}")
+        return f"{len(alerts)} weather alerts"
+
+    def _get_summary_message(self, alerts: List[WeatherAlert]) -> str:
+        """One line per location with the alert titles, strongest first."""
+        by_location: Dict[str, List[WeatherAlert]] = {}
+        for alert in sorted(alerts, key=lambda a: list(AlertSeverity).index(a.severity), reverse=True):
+            by_location.setdefault(alert.location or "", []).append(alert)
+        lines = []
+        for location, location_alerts in by_location.items():
+            titles = ", ".join(alert.title.replace(f" - {location}", "") if location else alert.title
+                               for alert in location_alerts)
+            lines.append(f"{location}: {titles}" if location and len(by_location) > 1 else titles)
+        return "\n".join(lines)
+
+    async def _show_page_notification(self, alerts: List[WeatherAlert]):
+        """Show one notification in the page for a batch of alerts."""
         try:
+            if not alerts or not self.get_notification_settings().get('severe_alerts', True):
+                return
             if hasattr(self.page, 'show_snack_bar'):
                 # Get severity color
                 color_map = {
@@ -687,24 +740,29 @@ class WeatherAlertsService:
                     AlertSeverity.HIGH: ft.Colors.RED,
                     AlertSeverity.EXTREME: ft.Colors.PURPLE
                 }
+                severity = max((alert.severity for alert in alerts), key=list(AlertSeverity).index)
+                if len(alerts) == 1:
+                    title, message = alerts[0].title, alerts[0].message
+                else:
+                    title, message = self._get_summary_title(alerts), self._get_summary_message(alerts)
                 
                 snack_bar = ft.SnackBar(
                     content=ft.Row(
                         controls=[
                             ft.Icon(
                                 ft.Icons.WARNING_ROUNDED,
-                                color=color_map.get(alert.severity, ft.Colors.ORANGE),
+                                color=color_map.get(severity, ft.Colors.ORANGE),
                                 size=20
                             ),
                             ft.Column(
                                 controls=[
                                     ft.Text(
-                                        alert.title,
+                                        title,
                                         weight=ft.FontWeight.BOLD,
                                         size=14
                                     ),
                                     ft.Text(
-                                        alert.message,
+                                        message,
                                         size=12
                                     )
                                 ],
@@ -714,8 +772,8 @@ class WeatherAlertsService:
                         ],
                         spacing=10
                     ),
-                    bgcolor=ft.Colors.with_opacity(0.9, color_map.get(alert.severity, ft.Colors.ORANGE)),
-                    duration=8000 if alert.severity in [AlertSeverity.HIGH, AlertSeverity.EXTREME] else 5000
+                    bgcolor=ft.Colors.with_opacity(0.9, color_map.get(severity, ft.Colors.ORANGE)),
+                    duration=8000 if severity in [AlertSeverity.HIGH, AlertSeverity.EXTREME] else 5000
                 )
                 
                 self.page.show_snack_bar(snack_bar)
@@ -723,15 +781,22 @@ class WeatherAlertsService:
         except Exception as e:
             logger.error(f"Error showing page notification: {e}")
 
+    @property
+    def active_alerts(self) -> Dict[str, WeatherAlert]:
+        """Active alerts by ID (read-only view of the alert store)."""
+        return {alert.id: alert for alert in self.alert_store.get_active()}
+
     def get_active_alerts(self) -> List[WeatherAlert]:
         """Get all currently active alerts."""
-        self._clean_expired_alerts()
-        return list(self.active_alerts.values())
+        return self.alert_store.get_active()
+
+    def get_alert_statistics(self, days: int = 7) -> Dict[str, Any]:
+        """Counts of active and recently raised alerts (see AlertStore.get_statistics)."""
+        return self.alert_store.get_statistics(days)
 
     def acknowledge_alert(self, alert_id: str) -> bool:
         """Acknowledge an alert by ID."""
-        if alert_id in self.active_alerts:
-            self.active_alerts[alert_id].acknowledged = True
+        if self.alert_store.acknowledge(alert_id):
             logger.info(f"Alert acknowledged: {alert_id}")
             return True
         return False
@@ -747,7 +812,9 @@ class WeatherAlertsService:
                 else:
                     self.enabled_alerts.discard(alert_type)
             
+            self._invalidate_rules()
             self.save_alert_preferences()
+            self.reevaluate_alert_type(alert_type)
             logger.info(f"Updated threshold for {alert_type.value}: {threshold}")
 
     def toggle_alert_type(self, alert_type: AlertType, enabled: bool):
@@ -760,7 +827,9 @@ class WeatherAlertsService:
         if alert_type in self.alert_thresholds:
             self.alert_thresholds[alert_type]['enabled'] = enabled
         
+        self._invalidate_rules()
         self.save_alert_preferences()
+        self.reevaluate_alert_type(alert_type)
         logger.info(f"Alert type {alert_type.value} {'enabled' if enabled else 'disabled'}")
 
     def get_alert_settings(self) -> Dict[str, Any]:
@@ -773,182 +842,35 @@ class WeatherAlertsService:
     def cleanup(self):
         """Cleanup service resources."""
         self.notification_callbacks.clear()
-        self.active_alerts.clear()
+        self.notification_dispatcher.cancel()
+        self.alert_store.save()
         logger.info("Weather Alerts Service cleaned up")
 
-    async def check_real_weather_conditions(self, weather_data: Dict[str, Any], api_service=None) -> List[WeatherAlert]:
+    async def check_real_weather_conditions(self, weather_data: Dict[str, Any], api_service=None,
+                                            location: str = None) -> List[WeatherAlert]:
         """
         Check real weather data from API and generate alerts.
         
+        The whole forecast series is evaluated, so besides the conditions
+        of the first step this also raises the alerts expected in the next
+        five days, each with its onset, peak and duration.
+        
         Args:
-            weather_data: Weather data from OpenWeatherMap API
-            api_service: API service instance for extracting data
+            weather_data: Weather data from OpenWeatherMap API (forecast or current weather)
+            api_service: Unused, kept for compatibility with existing callers
+            location: Name of the location the data belongs to; for a saved location
+                this is the name AlertMonitor uses, so both share the same alerts
             
         Returns:
             List of generated alerts
         """
-        if not weather_data or not api_service:
-            logger.warning("No weather data or API service provided")
+        if not weather_data:
+            logger.warning("No weather data provided")
             return []
         
-        new_alerts = []
-        
         try:
-            # Extract real weather values using API service methods
-            current_temp = api_service.get_current_temperature(weather_data)
-            wind_speed = api_service.get_wind_speed(weather_data)
-            humidity = api_service.get_humidity(weather_data)
-            pressure = api_service.get_pressure(weather_data)
-            visibility = api_service.get_visibility(weather_data)
-            
-            # Extract precipitation data
-            precipitation = 0.0
-            try:
-                if 'list' in weather_data and len(weather_data['list']) > 0:
-                    first_item = weather_data['list'][0]
-                    if 'rain' in first_item and '3h' in first_item['rain']:
-                        precipitation = first_item['rain']['3h']
-                    elif 'snow' in first_item and '3h' in first_item['snow']:
-                        precipitation = first_item['snow']['3h']
-            except (KeyError, TypeError):
-                pass
-            
-            logger.info(f"Real weather data - Temp: {current_temp}°C, Wind: {wind_speed} km/h, "
-                       f"Humidity: {humidity}%, Pressure: {pressure} hPa, "
-                       f"Visibility: {visibility}m, Precipitation: {precipitation}mm")
-            
-            # Debug: Show thresholds and enabled alerts
-            logger.info(f"Enabled alerts: {[alert.value for alert in self.enabled_alerts]}")
-            for alert_type in [AlertType.TEMPERATURE_HIGH, AlertType.TEMPERATURE_LOW, AlertType.WIND_STRONG, AlertType.RAIN_HEAVY]:
-                if alert_type in self.alert_thresholds:
-                    threshold = self.alert_thresholds[alert_type]['threshold']
-                    enabled = alert_type in self.enabled_alerts
-                    logger.info(f"{alert_type.value}: threshold={threshold}, enabled={enabled}")
-            
-            # Check temperature alerts (convert API temperature from Celsius to current unit, then back to Celsius for comparison)
-            if current_temp is not None:
-                logger.info(f"Checking temperature alerts for {current_temp}°C")
-                
-                # current_temp from API is in Celsius, convert for threshold comparison
-                temp_celsius = current_temp  # API returns Celsius
-                
-                if AlertType.TEMPERATURE_HIGH in self.enabled_alerts:
-                    threshold = self.alert_thresholds[AlertType.TEMPERATURE_HIGH]['threshold']
-                    logger.info(f"Temperature HIGH check: {temp_celsius} > {threshold} = {temp_celsius > threshold}")
-                    if temp_celsius > threshold:
-                        severity = self._get_temperature_severity(temp_celsius, threshold)
-                        title = self._get_alert_title(AlertType.TEMPERATURE_HIGH)
-                        message = self._get_alert_message(AlertType.TEMPERATURE_HIGH, temp_celsius)
-                        
-                        alert = WeatherAlert(
-                            alert_type=AlertType.TEMPERATURE_HIGH,
-                            severity=severity,
-                            title=title,
-                            message=message,
-                            value=temp_celsius,
-                            threshold=threshold,
-                            unit=self._get_temperature_unit_symbol()
-                        )
-                        new_alerts.append(alert)
-                        logger.info(f"Generated HIGH temperature alert: {temp_celsius}°C > {threshold}°C")
-                
-                if AlertType.TEMPERATURE_LOW in self.enabled_alerts:
-                    threshold = self.alert_thresholds[AlertType.TEMPERATURE_LOW]['threshold']
-                    logger.info(f"Temperature LOW check: {temp_celsius} < {threshold} = {temp_celsius < threshold}")
-                    if temp_celsius < threshold:
-                        severity = self._get_cold_severity(temp_celsius, threshold)
-                        title = self._get_alert_title(AlertType.TEMPERATURE_LOW)
-                        message = self._get_alert_message(AlertType.TEMPERATURE_LOW, temp_celsius)
-                        
-                        alert = WeatherAlert(
-                            alert_type=AlertType.TEMPERATURE_LOW,
-                            severity=severity,
-                            title=title,
-                            message=message,
-                            value=temp_celsius,
-                            threshold=threshold,
-                            unit=self._get_temperature_unit_symbol()
-                        )
-                        new_alerts.append(alert)
-                        logger.info(f"Generated LOW temperature alert: {temp_celsius}°C < {threshold}°C")
-            
-            # Check wind alerts
-            if wind_speed is not None and AlertType.WIND_STRONG in self.enabled_alerts:
-                threshold = self.alert_thresholds[AlertType.WIND_STRONG]['threshold']
-                logger.info(f"Wind check: {wind_speed} > {threshold} = {wind_speed > threshold}")
-                if wind_speed > threshold:
-                    severity = self._get_wind_severity(wind_speed, threshold)
-                    title = self._get_alert_title(AlertType.WIND_STRONG)
-                    message = self._get_alert_message(AlertType.WIND_STRONG, wind_speed)
-                    
-                    alert = WeatherAlert(
-                        alert_type=AlertType.WIND_STRONG,
-                        severity=severity,
-                        title=title,
-                        message=message,
-                        value=wind_speed,
-                        threshold=threshold,
-                        unit="km/h"
-                    )
-                    new_alerts.append(alert)
-                    logger.info(f"Generated wind alert: {wind_speed} km/h > {threshold} km/h")
-            
-            # Check precipitation alerts
-            if precipitation > 0 and AlertType.RAIN_HEAVY in self.enabled_alerts:
-                threshold = self.alert_thresholds[AlertType.RAIN_HEAVY]['threshold']
-                logger.info(f"Precipitation check: {precipitation} > {threshold} = {precipitation > threshold}")
-                if precipitation > threshold:
-                    severity = self._get_precipitation_severity(precipitation, threshold)
-                    title = self._get_alert_title(AlertType.RAIN_HEAVY)
-                    message = self._get_alert_message(AlertType.RAIN_HEAVY, precipitation)
-                    
-                    alert = WeatherAlert(
-                        alert_type=AlertType.RAIN_HEAVY,
-                        severity=severity,
-                        title=title,
-                        message=message,
-                        value=precipitation,
-                        threshold=threshold,
-                        unit="mm"
-                    )
-                    new_alerts.append(alert)
-                    logger.info(f"Generated precipitation alert: {precipitation}mm > {threshold}mm")
-            
-            # Check visibility alerts (poor air quality approximation)
-            if visibility is not None and AlertType.AIR_QUALITY_POOR in self.enabled_alerts:
-                # Convert visibility to a pseudo AQI (lower visibility = higher AQI)
-                pseudo_aqi = max(0, 200 - (visibility / 50))  # Rough approximation
-                threshold = self.alert_thresholds[AlertType.AIR_QUALITY_POOR]['threshold']
-                
-                logger.info(f"Visibility check: visibility={visibility}m, pseudo_aqi={pseudo_aqi}, threshold={threshold}")
-                logger.info(f"Visibility conditions: pseudo_aqi > threshold = {pseudo_aqi > threshold}, visibility < 1000 = {visibility < 1000}")
-                
-                if pseudo_aqi > threshold or visibility < 1000:  # Less than 1km visibility
-                    severity = AlertSeverity.MODERATE if visibility > 500 else AlertSeverity.HIGH
-                    title = self._get_alert_title(AlertType.AIR_QUALITY_POOR)
-                    message = self._get_alert_message(AlertType.AIR_QUALITY_POOR, visibility)
-                    
-                    alert = WeatherAlert(
-                        alert_type=AlertType.AIR_QUALITY_POOR,
-                        severity=severity,
-                        title=title,
-                        message=message,
-                        value=visibility,
-                        threshold=1000,
-                        unit="m"
-                    )
-                    new_alerts.append(alert)
-                    logger.info(f"Generated visibility/air quality alert: visibility={visibility}m")
-            
-            # Add alerts to active alerts
-            logger.info(f"Total new alerts generated: {len(new_alerts)}")
-            for alert in new_alerts:
-                if not self._is_duplicate_alert(alert):
-                    self.active_alerts[alert.id] = alert
-                    await self._trigger_notification(alert)
-            
-            # Clean expired alerts
-            self._clean_expired_alerts()
+            new_alerts = self._evaluate_forecast(weather_data, location=location)
+            await self.process_alerts(new_alerts)
             
             logger.info(f"Generated {len(new_alerts)} alerts from real weather data")
             return new_alerts
@@ -958,53 +880,109 @@ class WeatherAlertsService:
             import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
             return []
-    
-    def _get_temperature_severity(self, temp: float, threshold: float) -> AlertSeverity:
-        """Determine severity based on how much temperature exceeds threshold."""
-        excess = temp - threshold
-        if excess < 5:
-            return AlertSeverity.LOW
-        elif excess < 10:
-            return AlertSeverity.MODERATE
-        elif excess < 15:
-            return AlertSeverity.HIGH
-        else:
-            return AlertSeverity.EXTREME
-    
-    def _get_cold_severity(self, temp: float, threshold: float) -> AlertSeverity:
-        """Determine severity based on how much temperature is below threshold."""
-        deficit = threshold - temp
-        if deficit < 5:
-            return AlertSeverity.LOW
-        elif deficit < 10:
-            return AlertSeverity.MODERATE
-        elif deficit < 15:
-            return AlertSeverity.HIGH
-        else:
-            return AlertSeverity.EXTREME
-    
-    def _get_wind_severity(self, wind: float, threshold: float) -> AlertSeverity:
-        """Determine severity based on wind speed."""
-        excess = wind - threshold
-        if excess < 10:
-            return AlertSeverity.LOW
-        elif excess < 20:
-            return AlertSeverity.MODERATE
-        elif excess < 40:
-            return AlertSeverity.HIGH
-        else:
-            return AlertSeverity.EXTREME
-    
-    def _get_precipitation_severity(self, precip: float, threshold: float) -> AlertSeverity:
-        """Determine severity based on precipitation amount."""
-        excess = precip - threshold
-        if excess < 5:
-            return AlertSeverity.LOW
-        elif excess < 15:
-            return AlertSeverity.MODERATE
-        elif excess < 30:
-            return AlertSeverity.HIGH
-        else:
-            return AlertSeverity.EXTREME
 
+    @property
+    def rule_engine(self):
+        """Alert rules compiled from the current thresholds (rebuilt when settings change)."""
+        if self._rule_engine is None:
+            from services.alerts.alert_rules import AlertRuleEngine, compile_rules
+            self._rule_engine = AlertRuleEngine(compile_rules(self.alert_thresholds, self.enabled_alerts))
+        return self._rule_engine
+
+    def _invalidate_rules(self):
+        self._rule_engine = None
 
+    async def process_alerts(self, alerts: List[WeatherAlert]) -> List[WeatherAlert]:
+        """
+        Add new alerts to the active list and notify the registered callbacks.
+        
+        Returns:
+            The alerts that were not duplicates of an active one
+        """
+        added = [alert for alert in alerts if self.alert_store.add(alert)]
+        if added:
+            await self.notify(added)
+        return added
+
+    def evaluate_series(self, series, location: str = None, forecast_only: bool = False) -> List[WeatherAlert]:
+        """
+        Run the rule engine over a forecast series and turn each window into an alert.
+        
+        Args:
+            series: ForecastSeries to evaluate
+            location: Name of the saved location the series belongs to
+            forecast_only: Skip the windows that are already in progress
+        """
+        self._last_series[location] = (series, forecast_only)
+        return self._alerts_from_series(self.rule_engine, series, location, forecast_only)
+
+    def _alerts_from_series(self, engine, series, location: str, forecast_only: bool) -> List[WeatherAlert]:
+        windows = engine.evaluate(series)
+        if forecast_only:
+            windows = [window for window in windows if not window.is_current]
+        logger.debug(f"Evaluated {len(engine.rules)} alert rules over {len(series)} steps: "
+                     f"{len(windows)} windows")
+        return [self._alert_from_window(window, location) for window in windows]
+
+    def reevaluate_alert_type(self, alert_type: AlertType) -> List[WeatherAlert]:
+        """
+        Re-run the rule of one alert type on the last series evaluated for each location.
+        
+        Used when its threshold or switch changes: the alerts of that type are
+        replaced in the store at once, without fetching new data. The alerts
+        this adds are not notified, since the user is the one changing the settings.
+        
+        Returns:
+            The alerts that were added
+        """
+        engine = self.rule_engine.for_types({alert_type})
+        added = []
+        for location, (series, forecast_only) in list(self._last_series.items()):
+            alerts = self._alerts_from_series(engine, series, location, forecast_only)
+            added.extend(self.alert_store.replace(location, alert_type, alerts))
+        return added
+
+    def _evaluate_forecast(self, weather_data: Dict[str, Any], forecast_only: bool = False,
+                           location: str = None) -> List[WeatherAlert]:
+        """Evaluate an API payload in the current unit system."""
+        from services.alerts.alert_rules import ForecastSeries
+        
+        series = ForecastSeries.from_forecast(weather_data, self.temp_unit)
+        return self.evaluate_series(series, location=location, forecast_only=forecast_only)
+
+    def _alert_from_window(self, window, location: str = None) -> WeatherAlert:
+        """Build the alert of a rule window (current conditions or forecast)."""
+        alert_type = window.alert_type
+        is_forecast = not window.is_current
+        
+        if alert_type in [AlertType.TEMPERATURE_HIGH, AlertType.TEMPERATURE_LOW]:
+            unit = self._get_temperature_unit_symbol()
+        else:
+            unit = {
+                AlertType.WIND_STRONG: "km/h",
+                AlertType.RAIN_HEAVY: "mm/h",
+                AlertType.UV_HIGH: "UV",
+                AlertType.AIR_QUALITY_POOR: "m",
+                AlertType.HUMIDITY_HIGH: "%",
+                AlertType.PRESSURE_LOW: "hPa"
+            }.get(alert_type)
+        
+        alert = WeatherAlert(
+            alert_type=alert_type,
+            severity=window.severity,
+            title=self._get_alert_title(alert_type, is_forecast),
+            message=self._get_alert_message(alert_type, window.peak_value, is_forecast),
+            value=window.peak_value,  # Temperatures in Celsius
+            threshold=window.rule.threshold,
+            unit=unit,
+            expires_at=max(window.end, datetime.now() + timedelta(hours=1)),
+            onset=window.onset,
+            peak_at=window.peak_time,
+            location=location
+        )
+        if is_forecast:
+            # "forecast" in the id marks forecast alerts (see _update_active_alerts_language)
+            alert.id = f"{alert_type.value}_forecast_{int(window.onset.timestamp())}"
+        if location:
+            alert.title = f"{alert.title} - {location}"
+        return alert
@@ -5,6 +5,7 @@ Handles all API calls to the OpenWeatherMap API.
 
 import os
 import logging
+import time
 import requests
 from datetime import datetime, timedelta
 from typing import Dict, Any, Tuple, List, Optional
@@ -15,17 +16,18 @@ import asyncio
 from utils.config import (
     API_BASE_URL,
     API_WEATHER_ENDPOINT,
-    API_GEO_ENDPOINT,
-    API_REVERSE_GEO_ENDPOINT,
     API_AIR_POLLUTION_ENDPOINT
 )
+from services.data.observation_store import ObservationStore
+from services.location.geocoder import Geocoder
 
 class ApiService:
     """
     Service for making API calls to the OpenWeatherMap API.
     """
     
-    def __init__(self, page=None, city=None, language="en", unit="metric"):
+    def __init__(self, page=None, city=None, language="en", unit="metric",
+                 observation_store: Optional[ObservationStore] = None, geocoder: Optional[Geocoder] = None):
         load_dotenv()
         self._api_key = os.getenv("API_KEY")
         if not self._api_key:
@@ -36,6 +38,10 @@ class ApiService:
         self.city = city
         self.language = language
         self.unit = unit
+        
+        # Shared services; when not given they are taken from the page session
+        self.observation_store = observation_store
+        self.geocoder = geocoder
 
     def _normalize_city_name(self, city: str) -> str:
         if city:
@@ -43,10 +49,61 @@ class ApiService:
             city = unicodedata.normalize("NFKD", city)
         return city
     
+    def _get_session_service(self, name: str):
+        """Return a service registered in the page session, if any."""
+        try:
+            if self.page and self.page.session:
+                return self.page.session.get(name)
+        except Exception:
+            pass
+        return None
+
+    def _get_observation_store(self) -> Optional[ObservationStore]:
+        """Return the shared time-series store, or None if the app did not open one."""
+        if self.observation_store is None:
+            self.observation_store = self._get_session_service('observation_store')
+        return self.observation_store
+
+    def _record_forecast(self, data: Dict[str, Any], unit: str) -> None:
+        """Append a forecast payload to the local history (never raises)."""
+        store = self._get_observation_store()
+        if store is None:
+            return
+        try:
+            store.record_forecast(data, unit)
+        except Exception as e:
+            logging.error(f"Error recording forecast history: {e}")
+
+    def _record_air_pollution(self, lat: float, lon: float, data: Dict[str, Any]) -> None:
+        """Append an air-pollution payload to the local history (never raises)."""
+        store = self._get_observation_store()
+        if store is None:
+            return
+        try:
+            store.record_air_pollution(lat, lon, data)
+        except Exception as e:
+            logging.error(f"Error recording air pollution history: {e}")
+
     def get_weather_data(self, city: str = None, lat: float = None, lon: float = None, 
                         language: str = "en", unit: str = "metric") -> Dict[str, Any]:
         """
         Get weather forecast data for a city or coordinates.
+        Every successful response is stamped with its download time (``fetched_at``)
+        and recorded in the local observation store.
+        
+        Returns:
+            Same structure as ``_fetch_weather_data``.
+        """
+        result = self._fetch_weather_data(city=city, lat=lat, lon=lon, language=language, unit=unit)
+        if result.get('success') and result.get('data'):
+            result['data']['fetched_at'] = time.time()
+            self._record_forecast(result['data'], unit)
+        return result
+
+    def _fetch_weather_data(self, city: str = None, lat: float = None, lon: float = None, 
+                            language: str = "en", unit: str = "metric") -> Dict[str, Any]:
+        """
+        Get weather forecast data for a city or coordinates.
         Attempts first with coordinates, then with city name if coordinates are not available.
         
         Returns:
@@ -199,10 +256,20 @@ class ApiService:
                 }
             }
     
+    def _get_geocoder(self) -> Geocoder:
+        """Return the shared geocoding façade (cache, gazetteer, API)."""
+        if self.geocoder is None:
+            self.geocoder = self._get_session_service('geocoder') or Geocoder(self._api_key)
+        return self.geocoder
+
     def get_city_info(self, city: str) -> List[Dict[str, Any]]:
         """
         Get geographic information for a city.
         
+        Served by the shared geocoding façade: cached results and exact
+        offline gazetteer matches avoid the API; if the API cannot be
+        reached, the closest local matches are returned instead.
+        
         Args:
             city: City name
             
@@ -210,16 +277,24 @@ class ApiService:
             List of dictionaries containing city information
         """
         try:
-            url = f"{API_BASE_URL}{API_GEO_ENDPOINT}"
-            params = {"q": city, "limit": 5, "appid": self._api_key}
-            
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._get_geocoder().forward(city, limit=5)
+        except Exception as e:
             logging.error(f"Error fetching city information: {e}")
             return []
     
+    def _reverse_geocode(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        """
+        Resolve coordinates to a place through the shared geocoding façade.
+        
+        Positions close to an already resolved one, or to a known gazetteer
+        place, are answered without network.
+        """
+        try:
+            return self._get_geocoder().reverse(lat, lon)
+        except Exception as e:
+            logging.error(f"Error in reverse geocoding: {e}")
+            return None
+
     def get_city_by_coordinates(self, lat: float, lon: float, language: str = "en") -> str:
         """
         Get city name from coordinates using reverse geocoding.
@@ -232,20 +307,8 @@ class ApiService:
         Returns:
             City name
         """
-        try:
-            url = f"{API_BASE_URL}{API_REVERSE_GEO_ENDPOINT}"
-            params = {"lat": lat, "lon": lon, "limit": 1, "appid": self._api_key}
-            
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data and len(data) > 0:
-                return data[0].get("name", "Current Location")
-            return "Current Location"
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Error in reverse geocoding: {e}")
-            return "Current Location"
+        place = self._reverse_geocode(lat, lon)
+        return place.get("name", "Current Location") if place else "Current Location"
     
     def get_location_by_coordinates(self, lat: float, lon: float, language: str = "en") -> dict:
         """
@@ -259,39 +322,22 @@ class ApiService:
         Returns:
             Dictionary with location information
         """
-        try:
-            url = f"{API_BASE_URL}{API_REVERSE_GEO_ENDPOINT}"
-            params = {"lat": lat, "lon": lon, "limit": 1, "appid": self._api_key}
-            
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data and len(data) > 0:
-                location_data = data[0]
-                return {
-                    "name": location_data.get("name", "Unknown"),
-                    "state": location_data.get("state", ""),
-                    "country": location_data.get("country", ""),
-                    "lat": location_data.get("lat", lat),
-                    "lon": location_data.get("lon", lon)
-                }
-            return {
-                "name": "Current Location",
-                "state": "",
-                "country": "",
-                "lat": lat,
-                "lon": lon
-            }
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Error in reverse geocoding: {e}")
+        place = self._reverse_geocode(lat, lon)
+        if place:
             return {
-                "name": "Current Location",
-                "state": "",
-                "country": "",
-                "lat": lat,
-                "lon": lon
+                "name": place.get("name", "Unknown"),
+                "state": place.get("state", ""),
+                "country": place.get("country", ""),
+                "lat": place.get("lat", lat),
+                "lon": place.get("lon", lon)
             }
+        return {
+            "name": "Current Location",
+            "state": "",
+            "country": "",
+            "lat": lat,
+            "lon": lon
+        }
     
     def get_current_temperature(self, data: Dict[str, Any]) -> Optional[int]:
         """Extract current temperature from weather data"""
@@ -637,6 +683,7 @@ class ApiService:
             response.raise_for_status()
             
             data = response.json()
+            self._record_air_pollution(lat, lon, data)
             # Process the data to extract useful information
             if "list" in data and len(data["list"]) > 0:
                 # Get the first forecast item (current or nearest time)
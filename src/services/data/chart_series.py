@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Serie precalcolate per i grafici di MeteoApp.
+
+Temperature, precipitazioni e inquinanti vengono ricavati dal payload una
+sola volta per previsione e unità: i grafici leggono array e statistiche
+già pronti invece di ripercorrere il payload a ogni build.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+import logging
+
+from utils.config import CHART_SERIES_CACHE_SIZE, CHART_PIXELS_PER_POINT, CHART_MIN_POINTS
+from utils.responsive_utils import DeviceType, ResponsiveHelper
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+SIGNIFICANT_PRECIPITATION = 0.1  # mm: sotto questa soglia lo step è considerato asciutto
+PRECIPITATION_STEPS = 24  # step della previsione mostrati dal grafico precipitazioni
+POLLUTANT_KEYS = ("co", "no", "no2", "o3", "so2", "pm2_5", "pm10", "nh3")
+
+
+def _amount(item: Dict[str, Any], key: str) -> float:
+    """Millimetri di pioggia o neve di uno step (OpenWeatherMap usa 3h, a volte 1h)."""
+    block = item.get(key) or {}
+    return float(block.get('3h', block.get('1h', 0)) or 0)
+
+
+def _estimate_probability(item: Dict[str, Any]) -> float:
+    """Probabilità (%) stimata dalla condizione quando manca ``pop``."""
+    weather_main = (item.get('weather') or [{}])[0].get('main', '').lower()
+    if 'rain' in weather_main or 'drizzle' in weather_main:
+        return 80
+    if 'snow' in weather_main:
+        return 90
+    if 'cloud' in weather_main:
+        return 30
+    return 10
+
+
+# Larghezza tipica di un grafico quando la pagina non la riporta
+DEFAULT_CHART_WIDTH = {
+    DeviceType.MOBILE: 360,
+    DeviceType.TABLET: 700,
+    DeviceType.DESKTOP: 1000,
+    DeviceType.LARGE_DESKTOP: 1400,
+}
+
+
+def chart_point_budget(page=None, width: Optional[float] = None) -> int:
+    """
+    Numero di punti da disegnare per un grafico largo ``width`` pixel.
+
+    Più punti di quanti pixel ci siano non si vedono ma viaggiano comunque
+    sul websocket: si tiene un punto ogni ``CHART_PIXELS_PER_POINT`` pixel.
+    Senza larghezza si usa quella tipica del tipo di dispositivo, con la
+    stessa classificazione di ``ResponsiveHelper.get_optimal_chart_height``.
+    """
+    if width is None:
+        width = getattr(page, 'width', None) if page is not None else None
+    if not width:
+        device_type = ResponsiveHelper.get_device_type_smart(page) if page is not None else DeviceType.DESKTOP
+        width = DEFAULT_CHART_WIDTH.get(device_type, 1000)
+    return max(CHART_MIN_POINTS, int(width // CHART_PIXELS_PER_POINT))
+
+
+def _bucket_bounds(count: int, buckets: int) -> List[Tuple[int, int]]:
+    """Divide ``count`` elementi in ``buckets`` intervalli contigui [inizio, fine)."""
+    edges = [round(i * count / buckets) for i in range(buckets + 1)]
+    return [(edges[i], edges[i + 1]) for i in range(buckets) if edges[i + 1] > edges[i]]
+
+
+def minmax_indices(y: Sequence[float], threshold: int) -> List[int]:
+    """
+    Indici del minimo e del massimo di ogni bucket, in ordine.
+
+    Nessun picco va perso: adatto a grandezze in cui conta il valore
+    estremo (precipitazioni, raffiche).
+    """
+    count = len(y)
+    if threshold >= count or threshold < 2:
+        return list(range(count))
+
+    indices = set()
+    values = np.asarray(y, dtype=np.float64) if np is not None else y
+    for start, end in _bucket_bounds(count, threshold // 2):
+        if np is not None:
+            chunk = values[start:end]
+            indices.add(start + int(np.argmin(chunk)))
+            indices.add(start + int(np.argmax(chunk)))
+        else:
+            indices.add(min(range(start, end), key=values.__getitem__))
+            indices.add(max(range(start, end), key=values.__getitem__))
+    return sorted(indices)
+
+
+def forecast_identity(forecast: Dict[str, Any]) -> Hashable:
+    """
+    Identità di un download di previsione: località, primo orario e momento del download.
+
+    Il momento è ``fetched_at``, impostato da ``ApiService.get_weather_data``;
+    per i payload che non lo hanno si usa l'oggetto stesso (``id``), condiviso
+    da tutti i grafici che mostrano lo stesso download.
+    """
+    items = forecast.get('list') or []
+    city = forecast.get('city') or {}
+    coord = city.get('coord') or {}
+    return (
+        city.get('id') or (coord.get('lat'), coord.get('lon')),
+        items[0].get('dt') if items else None,
+        forecast.get('fetched_at') or id(forecast)
+    )
+
+
+@dataclass(frozen=True)
+class TemperatureSeries:
+    """Minime e massime giornaliere con la scala dell'asse Y."""
+    days: Tuple[str, ...]        # chiavi dei giorni ("monday", ...) per le traduzioni
+    temp_min: Tuple[float, ...]
+    temp_max: Tuple[float, ...]
+    y_min: int
+    y_max: int
+    y_step: int = 5
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @classmethod
+    def from_lists(cls, days, temp_min, temp_max, y_step: int = 5) -> "TemperatureSeries":
+        """Serie da liste già calcolate; la scala arrotonda al multiplo di ``y_step``."""
+        all_temps = list(temp_min) + list(temp_max)
+        if not all_temps:
+            y_min, y_max = 0, 10
+        else:
+            y_min = math.floor((min(all_temps) - y_step) / y_step) * y_step
+            y_max = math.ceil((max(all_temps) + y_step) / y_step) * y_step
+            if y_max <= y_min:
+                y_max = y_min + y_step * 2
+        return cls(tuple(days), tuple(temp_min), tuple(temp_max), int(y_min), int(y_max), y_step)
+
+    @classmethod
+    def from_forecast(cls, forecast: Dict[str, Any], days: int = 5) -> "TemperatureSeries":
+        """Raggruppa gli step per giorno e ne prende minima e massima."""
+        daily: Dict[str, Tuple[float, float]] = {}
+        for item in forecast.get('list') or []:
+            try:
+                day_key = item['dt_txt'][:10]
+                low, high = item['main']['temp_min'], item['main']['temp_max']
+            except (KeyError, TypeError):
+                continue
+            if day_key in daily:
+                current_low, current_high = daily[day_key]
+                daily[day_key] = (min(current_low, low), max(current_high, high))
+            else:
+                daily[day_key] = (low, high)
+
+        selected = sorted(daily.items())[:days]
+        day_names = [datetime.strptime(day_key, "%Y-%m-%d").strftime("%A").lower() for day_key, _ in selected]
+        return cls.from_lists(day_names,
+                              [low for _, (low, _) in selected],
+                              [high for _, (_, high) in selected])
+
+    def level_of_detail(self, target: int) -> "TemperatureSeries":
+        """
+        Serie ridotta a circa ``target`` punti (se ne ha di più).
+
+        Ogni punto copre un gruppo di giorni consecutivi con la minima più
+        bassa e la massima più alta del gruppo (min/max per bucket), così la
+        banda delle temperature non si restringe.
+        """
+        if len(self) <= target or target <= 0:
+            return self
+        bounds = _bucket_bounds(len(self), target)
+        days = [self.days[first] for first, _ in bounds]
+        temp_min = [min(self.temp_min[first:last]) for first, last in bounds]
+        temp_max = [max(self.temp_max[first:last]) for first, last in bounds]
+        return TemperatureSeries.from_lists(days, temp_min, temp_max, self.y_step)
+
+
+@dataclass(frozen=True)
+class PrecipitationSeries:
+    """Precipitazioni dei prossimi step con le statistiche del riepilogo."""
+    times: Tuple[int, ...]             # timestamp Unix
+    precipitation: Tuple[float, ...]   # mm (pioggia + neve)
+    rain: Tuple[float, ...]            # mm
+    snow: Tuple[float, ...]            # mm
+    probability: Tuple[float, ...]     # %
+    total: float
+    peak: float
+    peak_time: int                     # timestamp del picco (0 se non piove)
+    rainy_steps: int
+    has_rain: bool
+    has_snow: bool
+    significant: Tuple[int, ...]       # indici degli step sopra SIGNIFICANT_PRECIPITATION
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def has_significant(self) -> bool:
+        return bool(self.significant)
+
+    @classmethod
+    def from_forecast(cls, forecast: Dict[str, Any], steps: int = PRECIPITATION_STEPS) -> "PrecipitationSeries":
+        """Estrae pioggia, neve e probabilità dei primi ``steps`` step."""
+        items = (forecast.get('list') or [])[:steps]
+        return cls.from_arrays(
+            [item.get('dt', 0) for item in items],
+            [_amount(item, 'rain') for item in items],
+            [_amount(item, 'snow') for item in items],
+            [item['pop'] * 100 if 'pop' in item else _estimate_probability(item) for item in items]
+        )
+
+    @classmethod
+    def from_arrays(cls, times, rain, snow, probability) -> "PrecipitationSeries":
+        """Serie e statistiche da array paralleli, in un solo passaggio."""
+        amounts, significant = [], []
+        total = peak = 0.0
+        peak_time = 0
+        for index, (timestamp, rain_mm, snow_mm) in enumerate(zip(times, rain, snow)):
+            precipitation = rain_mm + snow_mm
+            amounts.append(precipitation)
+            total += precipitation
+            if precipitation > peak:
+                peak, peak_time = precipitation, timestamp
+            if precipitation > SIGNIFICANT_PRECIPITATION:
+                significant.append(index)
+
+        return cls(tuple(times), tuple(amounts), tuple(rain), tuple(snow), tuple(probability),
+                   total, peak, peak_time, len(significant),
+                   any(value > 0 for value in rain), any(value > 0 for value in snow), tuple(significant))
+
+    def level_of_detail(self, target: int) -> "PrecipitationSeries":
+        """
+        Serie ridotta a circa ``target`` punti (se ne ha di più).
+
+        I punti sono scelti con min/max per bucket, così nessun picco va perso;
+        totale, picco e ore di pioggia restano quelli dell'intera serie.
+        """
+        if len(self) <= target:
+            return self
+
+        keep = minmax_indices(self.precipitation, target)
+        precipitation = tuple(self.precipitation[i] for i in keep)
+        return replace(
+            self,
+            times=tuple(self.times[i] for i in keep),
+            precipitation=precipitation,
+            rain=tuple(self.rain[i] for i in keep),
+            snow=tuple(self.snow[i] for i in keep),
+            probability=tuple(self.probability[i] for i in keep),
+            significant=tuple(i for i, value in enumerate(precipitation) if value > SIGNIFICANT_PRECIPITATION)
+        )
+
+
+@dataclass(frozen=True)
+class PollutionSeries:
+    """Concentrazioni degli inquinanti (μg/m³) con il massimo dell'asse Y."""
+    keys: Tuple[str, ...]
+    values: Tuple[float, ...]
+    max_y: float
+
+    @classmethod
+    def from_components(cls, components: Dict[str, Any]) -> "PollutionSeries":
+        values = tuple(float(components.get(key, 0.0) or 0.0) for key in POLLUTANT_KEYS)
+        max_val = max(values) if values else 0.0
+        if max_val == 0.0:
+            raw_max_y = 50.0
+        else:
+            raw_max_y = max(max_val * 1.2, max_val + 10.0, 20.0)
+
+        if raw_max_y <= 50:
+            max_y = math.ceil(raw_max_y / 10) * 10
+        elif raw_max_y <= 200:
+            max_y = math.ceil(raw_max_y / 20) * 20
+        else:
+            max_y = math.ceil(raw_max_y / 50) * 50
+        return cls(POLLUTANT_KEYS, values, max(max_y, 10.0))
+
+
+class ChartSeriesCache:
+    """
+    Cache LRU delle serie dei grafici, condivisa da tutti i componenti
+    tramite la sessione della pagina (``chart_series_cache``).
+
+    La chiave è (tipo di serie, identità della previsione, unità): una
+    ricostruzione per cambio di tema o lingua, o un nuovo componente creato
+    sulla stessa previsione, riusano le serie già calcolate.
+    """
+
+    def __init__(self, max_size: int = CHART_SERIES_CACHE_SIZE):
+        self.max_size = max_size
+        self._cache: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+        value = factory()
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return value
+
+    def temperature(self, forecast: Dict[str, Any], unit: str, days: int = 5) -> TemperatureSeries:
+        """Minime e massime giornaliere della previsione (nell'unità del payload)."""
+        return self._get(("temperature", forecast_identity(forecast), unit, days),
+                         lambda: TemperatureSeries.from_forecast(forecast, days))
+
+    def precipitation(self, forecast: Dict[str, Any], unit: str,
+                      steps: int = PRECIPITATION_STEPS) -> PrecipitationSeries:
+        """Precipitazioni e statistiche dei prossimi step della previsione."""
+        return self._get(("precipitation", forecast_identity(forecast), unit, steps),
+                         lambda: PrecipitationSeries.from_forecast(forecast, steps))
+
+    def pollution(self, components: Dict[str, Any]) -> PollutionSeries:
+        """Serie degli inquinanti per il grafico a barre."""
+        identity = tuple((key, components.get(key)) for key in POLLUTANT_KEYS)
+        return self._get(("pollution", identity), lambda: PollutionSeries.from_components(components))
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
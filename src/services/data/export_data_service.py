@@ -2,180 +2,502 @@
 
 import json
 import csv
+import math
 import os
+import sys
+import time
+import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-import pandas as pd
+from typing import Dict, List, Optional, Iterable, Iterator, Any
+
+from services.data.observation_store import ObservationStore
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 1000  # righe scritte per blocco
+COLUMNAR_ROW_GROUP_SIZE = 50000  # righe per row group Parquet
+
+# Tipi delle colonne numeriche nell'export colonnare (NaN per i valori mancanti)
+COLUMNAR_FLOAT_FIELDS = (
+    "temperature", "humidity", "pressure", "wind_speed", "wind_direction",
+    "precipitation", "visibility", "cloud_coverage",
+)
+# Colonne testuali ridondanti rispetto al timestamp, omesse nel formato colonnare
+COLUMNAR_SKIPPED_FIELDS = ("date", "time")
+
+
+def get_peak_rss_mb() -> Optional[float]:
+    """Picco di memoria residente del processo in MB (None se non disponibile)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss è in byte su macOS e in kilobyte su Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+@dataclass
+class ExportResult:
+    """Risultato di un'esportazione in streaming."""
+    filepath: str
+    format: str
+    rows: int
+    elapsed: float
+    peak_rss_mb: Optional[float] = None
+    
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else float(self.rows)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "filepath": self.filepath,
+            "format": self.format,
+            "rows": self.rows,
+            "elapsed": round(self.elapsed, 3),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+            "peak_rss_mb": round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+        }
+
+
+class _RunningStats:
+    """Statistiche incrementali (Welford) per una colonna numerica."""
+    
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+    
+    @property
+    def std(self) -> Optional[float]:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else None
 
 
 class ExportDataService:
     """Servizio per esportare i dati meteorologici in vari formati."""
     
-    def __init__(self, storage_path: str = "storage/data/weather_data.json"):
+    def __init__(self, storage_path: str = "storage/data/weather_data.json",
+                 observation_store: Optional[ObservationStore] = None):
         self.storage_path = storage_path
         self.export_dir = "storage/exports"
+        self.observation_store = observation_store
         self._ensure_export_directory()
     
+    def _get_observation_store(self) -> ObservationStore:
+        """Restituisce l'archivio delle serie storiche (aperto al primo uso se non fornito)."""
+        if self.observation_store is None:
+            self.observation_store = ObservationStore.open_default()
+        return self.observation_store
+    
     def _ensure_export_directory(self):
         """Assicura che la directory di export esista."""
         os.makedirs(self.export_dir, exist_ok=True)
     
-    def _generate_sample_data(self, days: int = 7) -> List[Dict]:
-        """Genera dati di esempio per testing."""
-        import random
-        
-        data = []
-        base_date = datetime.now() - timedelta(days=days)
-        
-        for i in range(days * 24):  # Dati orari
-            current_time = base_date + timedelta(hours=i)
-            
-            # Simula dati meteorologici realistici
-            base_temp = 20 + 10 * random.random()  # 20-30°C
-            humidity = 40 + 40 * random.random()   # 40-80%
-            pressure = 1000 + 20 * random.random() # 1000-1020 hPa
-            wind_speed = 5 + 15 * random.random()  # 5-20 km/h
-            precipitation = random.random() * 5 if random.random() > 0.7 else 0  # 30% chance di pioggia
-            
-            data.append({
-                "timestamp": current_time.isoformat(),
-                "date": current_time.strftime("%Y-%m-%d"),
-                "time": current_time.strftime("%H:%M"),
-                "temperature": round(base_temp, 1),
-                "humidity": round(humidity, 1),
-                "pressure": round(pressure, 1),
-                "wind_speed": round(wind_speed, 1),
-                "wind_direction": random.randint(0, 360),
-                "precipitation": round(precipitation, 2),
-                "visibility": round(8 + 7 * random.random(), 1),  # 8-15 km
-                "uv_index": max(0, round(5 + 6 * random.random())),  # 0-11
-                "cloud_coverage": round(random.random() * 100, 1)  # 0-100%
-            })
-        
-        return data
-    
-    def export_to_csv(self, data: List[Dict], filename: str = None, selected_fields: List[str] = None) -> str:
-        """Esporta i dati in formato CSV."""
+    def _build_filepath(self, filename: Optional[str], prefix: str, extension: str) -> str:
         if not filename:
-            filename = f"weather_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        
-        filepath = os.path.join(self.export_dir, filename)
-        
-        # Filtra i campi se specificato
-        if selected_fields and data:
-            filtered_data = []
-            for record in data:
-                filtered_record = {field: record.get(field, '') for field in selected_fields if field in record}
-                filtered_data.append(filtered_record)
-            data = filtered_data
+            filename = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+            # Evita di sovrascrivere export avviati nello stesso secondo
+            base, counter = filename[:-len(extension) - 1], 1
+            while os.path.exists(os.path.join(self.export_dir, filename)):
+                filename = f"{base}_{counter}.{extension}"
+                counter += 1
+        return os.path.join(self.export_dir, filename)
+    
+    @staticmethod
+    def _select_fields(rows: Iterable[Dict], selected_fields: Optional[List[str]]) -> Iterator[Dict]:
+        """Filtra i campi di ogni record senza materializzare la sequenza."""
+        if not selected_fields:
+            yield from rows
+            return
+        for record in rows:
+            yield {field: record.get(field, '') for field in selected_fields if field in record}
+    
+    @staticmethod
+    def _chunked(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+        chunk = []
+        for record in rows:
+            chunk.append(record)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    @staticmethod
+    def _discard_partial(filepath: str):
+        """Rimuove un file di export incompleto (errore o annullamento)."""
+        try:
+            if os.path.exists(filepath):
+                os.remove(filepath)
+        except OSError as e:
+            logger.warning(f"Impossibile rimuovere l'export incompleto {filepath}: {e}")
+    
+    def _finish(self, filepath: str, export_format: str, rows: int, started: float) -> ExportResult:
+        result = ExportResult(
+            filepath=filepath,
+            format=export_format,
+            rows=rows,
+            elapsed=time.perf_counter() - started,
+            peak_rss_mb=get_peak_rss_mb()
+        )
+        logger.info(f"Esportazione {export_format} completata: {result.to_dict()}")
+        return result
+    
+    def stream_to_csv(self, rows: Iterable[Dict], filename: str = None, selected_fields: List[str] = None,
+                      chunk_size: int = EXPORT_CHUNK_SIZE) -> ExportResult:
+        """Esporta in CSV scrivendo i record a blocchi, con memoria costante."""
+        filepath = self._build_filepath(filename, "weather_data", "csv")
+        started = time.perf_counter()
+        count = 0
         
         try:
             with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-                if data:
-                    fieldnames = data[0].keys()
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(data)
+                writer = None
+                for chunk in self._chunked(self._select_fields(rows, selected_fields), chunk_size):
+                    if writer is None:
+                        writer = csv.DictWriter(csvfile, fieldnames=list(chunk[0].keys()), extrasaction='ignore')
+                        writer.writeheader()
+                    writer.writerows(chunk)
+                    count += len(chunk)
             
-            return filepath
+            return self._finish(filepath, "csv", count, started)
         except Exception as e:
+            self._discard_partial(filepath)
             raise Exception(f"Errore nell'esportazione CSV: {e}")
     
-    def export_to_excel(self, data: List[Dict], filename: str = None, selected_fields: List[str] = None) -> str:
-        """Esporta i dati in formato Excel."""
-        if not filename:
-            filename = f"weather_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    def stream_to_json(self, rows: Iterable[Dict], filename: str = None, selected_fields: List[str] = None,
+                       json_lines: bool = False) -> ExportResult:
+        """Esporta in JSON (array incrementale) o JSON Lines, con memoria costante.
         
-        filepath = os.path.join(self.export_dir, filename)
+        Il formato array mantiene la struttura ``export_timestamp`` /
+        ``total_records`` / ``data``; ``total_records`` è scritto in coda
+        perché il numero di righe è noto solo alla fine.
+        """
+        filepath = self._build_filepath(filename, "weather_data", "jsonl" if json_lines else "json")
+        started = time.perf_counter()
+        count = 0
         
         try:
-            df = pd.DataFrame(data)
-            
-            # Filtra le colonne se specificato
-            if selected_fields:
-                available_fields = [field for field in selected_fields if field in df.columns]
-                df = df[available_fields]
-            
-            # Salva con pandas
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Weather Data', index=False)
-                
-                # Aggiungi un foglio con statistiche
-                if not df.empty:
-                    stats_df = df.describe()
-                    stats_df.to_excel(writer, sheet_name='Statistics')
+            with open(filepath, 'w', encoding='utf-8') as jsonfile:
+                records = self._select_fields(rows, selected_fields)
+                if json_lines:
+                    for record in records:
+                        jsonfile.write(json.dumps(record, ensure_ascii=False))
+                        jsonfile.write("\n")
+                        count += 1
+                else:
+                    jsonfile.write('{"export_timestamp": ')
+                    jsonfile.write(json.dumps(datetime.now().isoformat()))
+                    jsonfile.write(', "data": [')
+                    for record in records:
+                        jsonfile.write(",\n  " if count else "\n  ")
+                        jsonfile.write(json.dumps(record, ensure_ascii=False))
+                        count += 1
+                    jsonfile.write(f"\n], \"total_records\": {count}}}\n")
             
-            return filepath
+            return self._finish(filepath, "jsonl" if json_lines else "json", count, started)
         except Exception as e:
-            raise Exception(f"Errore nell'esportazione Excel: {e}")
+            self._discard_partial(filepath)
+            raise Exception(f"Errore nell'esportazione JSON: {e}")
     
-    def export_to_json(self, data: List[Dict], filename: str = None, selected_fields: List[str] = None) -> str:
-        """Esporta i dati in formato JSON."""
-        if not filename:
-            filename = f"weather_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    def stream_to_excel(self, rows: Iterable[Dict], filename: str = None,
+                        selected_fields: List[str] = None) -> ExportResult:
+        """Esporta in Excel con un workbook openpyxl in modalità write-only.
         
-        filepath = os.path.join(self.export_dir, filename)
+        Il foglio ``Statistics`` è calcolato in modo incrementale (count, mean,
+        std, min, max) durante la scrittura.
+        """
+        from openpyxl import Workbook
         
-        # Filtra i campi se specificato
-        if selected_fields and data:
-            filtered_data = []
-            for record in data:
-                filtered_record = {field: record.get(field, '') for field in selected_fields if field in record}
-                filtered_data.append(filtered_record)
-            data = filtered_data
+        filepath = self._build_filepath(filename, "weather_data", "xlsx")
+        started = time.perf_counter()
+        count = 0
         
         try:
-            export_data = {
-                "export_timestamp": datetime.now().isoformat(),
-                "total_records": len(data),
-                "data": data
-            }
+            workbook = Workbook(write_only=True)
+            data_sheet = workbook.create_sheet('Weather Data')
+            fieldnames = None
+            stats: Dict[str, _RunningStats] = {}
             
-            with open(filepath, 'w', encoding='utf-8') as jsonfile:
-                json.dump(export_data, jsonfile, ensure_ascii=False, indent=2)
+            for record in self._select_fields(rows, selected_fields):
+                if fieldnames is None:
+                    fieldnames = list(record.keys())
+                    data_sheet.append(fieldnames)
+                values = [record.get(field) for field in fieldnames]
+                data_sheet.append(values)
+                for field, value in zip(fieldnames, values):
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        stats.setdefault(field, _RunningStats()).add(value)
+                count += 1
+            
+            # Aggiungi un foglio con statistiche
+            if stats:
+                stats_sheet = workbook.create_sheet('Statistics')
+                columns = list(stats.keys())
+                stats_sheet.append([""] + columns)
+                stats_sheet.append(["count"] + [stats[c].count for c in columns])
+                stats_sheet.append(["mean"] + [stats[c].mean for c in columns])
+                stats_sheet.append(["std"] + [stats[c].std for c in columns])
+                stats_sheet.append(["min"] + [stats[c].min for c in columns])
+                stats_sheet.append(["max"] + [stats[c].max for c in columns])
             
-            return filepath
+            workbook.save(filepath)
+            return self._finish(filepath, "excel", count, started)
         except Exception as e:
-            raise Exception(f"Errore nell'esportazione JSON: {e}")
+            self._discard_partial(filepath)
+            raise Exception(f"Errore nell'esportazione Excel: {e}")
     
-    def export_to_pdf(self, data: List[Dict], filename: str = None) -> str:
-        """Esporta i dati in formato PDF (report)."""
-        if not filename:
-            filename = f"weather_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        
-        filepath = os.path.join(self.export_dir, filename)
+    def stream_to_pdf(self, rows: Iterable[Dict], filename: str = None) -> ExportResult:
+        """Esporta il report testuale tenendo in memoria solo i primi 10 record."""
+        filepath = self._build_filepath(filename, "weather_report", "pdf").replace('.pdf', '.txt')
+        started = time.perf_counter()
+        count = 0
+        sample = []
+        temperatures = _RunningStats()
         
         try:
+            for record in rows:
+                if len(sample) < 10:
+                    sample.append(record)
+                if record.get('temperature') is not None:
+                    temperatures.add(record['temperature'])
+                count += 1
+            
             # Per ora crea un file di testo che simula un PDF
             # In futuro si può usare reportlab o matplotlib per PDF veri
-            with open(filepath.replace('.pdf', '.txt'), 'w', encoding='utf-8') as txtfile:
+            with open(filepath, 'w', encoding='utf-8') as txtfile:
                 txtfile.write("WEATHER DATA REPORT\n")
                 txtfile.write("=" * 50 + "\n\n")
                 txtfile.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                txtfile.write(f"Total Records: {len(data)}\n\n")
+                txtfile.write(f"Total Records: {count}\n\n")
                 
-                if data:
+                if count:
                     # Statistiche di base
-                    temperatures = [d.get('temperature', 0) for d in data if d.get('temperature')]
-                    if temperatures:
-                        txtfile.write(f"Temperature Range: {min(temperatures):.1f}°C - {max(temperatures):.1f}°C\n")
-                        txtfile.write(f"Average Temperature: {sum(temperatures)/len(temperatures):.1f}°C\n\n")
+                    if temperatures.count:
+                        txtfile.write(f"Temperature Range: {temperatures.min:.1f}°C - {temperatures.max:.1f}°C\n")
+                        txtfile.write(f"Average Temperature: {temperatures.mean:.1f}°C\n\n")
                     
                     # Prime 10 righe di dati
                     txtfile.write("SAMPLE DATA (First 10 records):\n")
                     txtfile.write("-" * 50 + "\n")
-                    for i, record in enumerate(data[:10]):
+                    for i, record in enumerate(sample):
                         txtfile.write(f"Record {i+1}:\n")
                         for key, value in record.items():
                             txtfile.write(f"  {key}: {value}\n")
                         txtfile.write("\n")
             
-            return filepath.replace('.pdf', '.txt')
+            return self._finish(filepath, "pdf", count, started)
         except Exception as e:
+            self._discard_partial(filepath)
             raise Exception(f"Errore nell'esportazione PDF: {e}")
     
-    def get_export_data(self, period: str = "week", data_types: List[str] = None) -> List[Dict]:
-        """Ottiene i dati da esportare in base al periodo selezionato."""
+    @staticmethod
+    def _columnar_value(field: str, value):
+        """Converte un valore del record nel tipo della colonna colonnare."""
+        if field == "timestamp":
+            return int(datetime.fromisoformat(value).timestamp()) if value else None
+        if field in COLUMNAR_FLOAT_FIELDS:
+            return float(value) if value not in (None, '') else math.nan
+        return "" if value is None else str(value)
+    
+    def _iter_columnar_chunks(self, rows: Iterable[Dict], selected_fields: Optional[List[str]],
+                              chunk_size: int) -> Iterator[Dict[str, list]]:
+        """Trasforma il flusso di record in blocchi colonna -> valori tipizzati."""
+        fieldnames = None
+        for chunk in self._chunked(self._select_fields(rows, selected_fields), chunk_size):
+            if fieldnames is None:
+                fieldnames = [f for f in chunk[0].keys() if f not in COLUMNAR_SKIPPED_FIELDS]
+            yield {
+                field: [self._columnar_value(field, record.get(field)) for record in chunk]
+                for field in fieldnames
+            }
+    
+    def stream_to_parquet(self, rows: Iterable[Dict], filename: str = None,
+                          selected_fields: List[str] = None) -> ExportResult:
+        """Esporta in Parquet (richiede pyarrow), un row group per blocco.
+        
+        Tipi: ``timestamp[s]`` per il tempo, ``float32`` per le grandezze
+        misurate e stringhe dictionary-encoded per le colonne testuali.
+        """
+        if pq is None:
+            raise Exception("Esportazione Parquet non disponibile: pyarrow non installato")
+        
+        filepath = self._build_filepath(filename, "weather_data", "parquet")
+        started = time.perf_counter()
+        count = 0
+        writer = None
+        
+        try:
+            for columns in self._iter_columnar_chunks(rows, selected_fields, COLUMNAR_ROW_GROUP_SIZE):
+                arrays = {}
+                for field, values in columns.items():
+                    if field == "timestamp":
+                        arrays[field] = pa.array(values, type=pa.timestamp("s"))
+                    elif field in COLUMNAR_FLOAT_FIELDS:
+                        arrays[field] = pa.array(values, type=pa.float32())
+                    else:
+                        arrays[field] = pa.array(values, type=pa.string()).dictionary_encode()
+                table = pa.table(arrays)
+                if writer is None:
+                    writer = pq.ParquetWriter(filepath, table.schema, compression="zstd")
+                writer.write_table(table)
+                count += table.num_rows
+            
+            if writer is None:
+                # Nessun record: scrive comunque un file valido con lo schema minimo
+                pq.write_table(pa.table({"timestamp": pa.array([], type=pa.timestamp("s"))}), filepath)
+            else:
+                writer.close()
+            return self._finish(filepath, "parquet", count, started)
+        except Exception as e:
+            if writer is not None:
+                writer.close()
+            self._discard_partial(filepath)
+            raise Exception(f"Errore nell'esportazione Parquet: {e}")
+    
+    def stream_to_npz(self, rows: Iterable[Dict], filename: str = None,
+                      selected_fields: List[str] = None) -> ExportResult:
+        """Esporta un bundle NumPy ``.npz`` colonnare (fallback senza pyarrow).
+        
+        Ogni colonna è un array tipizzato: ``datetime64[s]`` per il tempo,
+        ``float32`` per le grandezze misurate; le colonne testuali sono salvate
+        come codici ``int32`` più un array ``<nome>_labels``. I valori vengono
+        accumulati in blocchi tipizzati compatti, non come dict Python.
+        """
+        if np is None:
+            raise Exception("Esportazione NumPy non disponibile: numpy non installato")
+        
+        filepath = self._build_filepath(filename, "weather_data", "npz")
+        started = time.perf_counter()
+        count = 0
+        
+        try:
+            blocks: Dict[str, list] = {}
+            labels: Dict[str, Dict[str, int]] = {}
+            for columns in self._iter_columnar_chunks(rows, selected_fields, EXPORT_CHUNK_SIZE):
+                for field, values in columns.items():
+                    if field == "timestamp":
+                        block = np.array(values, dtype="int64").astype("datetime64[s]")
+                    elif field in COLUMNAR_FLOAT_FIELDS:
+                        block = np.array(values, dtype=np.float32)
+                    else:
+                        codes = labels.setdefault(field, {})
+                        block = np.array([codes.setdefault(v, len(codes)) for v in values], dtype=np.int32)
+                    blocks.setdefault(field, []).append(block)
+                count += len(next(iter(columns.values()), []))
+            
+            arrays = {field: np.concatenate(parts) for field, parts in blocks.items()}
+            for field, codes in labels.items():
+                arrays[f"{field}_labels"] = np.array(list(codes.keys()))
+            
+            with open(filepath, 'wb') as npzfile:
+                np.savez_compressed(npzfile, **arrays)
+            return self._finish(filepath, "npz", count, started)
+        except Exception as e:
+            self._discard_partial(filepath)
+            raise Exception(f"Errore nell'esportazione NumPy: {e}")
+    
+    @staticmethod
+    def get_columnar_format() -> Optional[str]:
+        """Formato colonnare disponibile: "parquet", "npz" o None."""
+        if pq is not None:
+            return "parquet"
+        if np is not None:
+            return "npz"
+        return None
+    
+    def stream_export(self, export_format: str, rows: Iterable[Dict], filename: str = None,
+                      selected_fields: List[str] = None) -> ExportResult:
+        """Esporta un flusso di record nel formato richiesto."""
+        if export_format == "csv":
+            return self.stream_to_csv(rows, filename, selected_fields)
+        if export_format == "json":
+            return self.stream_to_json(rows, filename, selected_fields)
+        if export_format == "jsonl":
+            return self.stream_to_json(rows, filename, selected_fields, json_lines=True)
+        if export_format == "excel":
+            return self.stream_to_excel(rows, filename, selected_fields)
+        if export_format == "pdf":
+            return self.stream_to_pdf(self._select_fields(rows, selected_fields), filename)
+        if export_format == "columnar":
+            export_format = self.get_columnar_format() or export_format
+        if export_format == "parquet":
+            return self.stream_to_parquet(rows, filename, selected_fields)
+        if export_format == "npz":
+            return self.stream_to_npz(rows, filename, selected_fields)
+        raise ValueError(f"Formato di esportazione non supportato: {export_format}")
+    
+    def export_to_csv(self, data: List[Dict], filename: str = None, selected_fields: List[str] = None) -> str:
+        """Esporta i dati in formato CSV."""
+        return self.stream_to_csv(data, filename, selected_fields).filepath
+    
+    def export_to_excel(self, data: List[Dict], filename: str = None, selected_fields: List[str] = None) -> str:
+        """Esporta i dati in formato Excel."""
+        return self.stream_to_excel(data, filename, selected_fields).filepath
+    
+    def export_to_json(self, data: List[Dict], filename: str = None, selected_fields: List[str] = None) -> str:
+        """Esporta i dati in formato JSON."""
+        return self.stream_to_json(data, filename, selected_fields).filepath
+    
+    def export_to_pdf(self, data: List[Dict], filename: str = None) -> str:
+        """Esporta i dati in formato PDF (report)."""
+        return self.stream_to_pdf(data, filename).filepath
+    
+    def _observation_to_record(self, observation: Dict, location_name: str = "") -> Dict:
+        """Converte una riga dell'archivio nel formato record di esportazione."""
+        moment = datetime.fromtimestamp(observation["ts"])
+        
+        def rounded(key, digits=1, factor=1.0):
+            value = observation.get(key)
+            return round(value * factor, digits) if value is not None else None
+        
+        return {
+            "timestamp": moment.isoformat(),
+            "date": moment.strftime("%Y-%m-%d"),
+            "time": moment.strftime("%H:%M"),
+            "location": location_name,
+            "temperature": rounded("temperature"),
+            "humidity": rounded("humidity"),
+            "pressure": rounded("pressure"),
+            "wind_speed": rounded("wind_speed", factor=3.6),  # m/s -> km/h
+            "wind_direction": rounded("wind_direction", 0),
+            "precipitation": rounded("precipitation", 2),
+            "visibility": rounded("visibility", factor=0.001),  # m -> km
+            "cloud_coverage": rounded("cloud_coverage"),
+        }
+    
+    @staticmethod
+    def _period_bounds(period: str):
+        """Intervallo (inizio, fine) da esportare per un periodo."""
         
         # Determina il numero di giorni in base al periodo
         days_mapping = {
@@ -186,40 +508,107 @@ class ExportDataService:
         }
         
         days = days_mapping.get(period, 7)
+        end = datetime.now() + timedelta(days=6)  # include l'orizzonte di previsione
+        start = datetime.now() - timedelta(days=days)
+        return start, end
+    
+    def _resolve_export_locations(self, location: Optional[str]) -> List[tuple]:
+        """Coppie (chiave, nome) delle località da esportare."""
+        store = self._get_observation_store()
+        known_locations = store.get_locations()
+        if location == "*":
+            return [(loc["key"], loc["name"] or loc["key"]) for loc in known_locations]
+        
+        location = location or store.get_latest_location()
+        if not location:
+            return []
+        name = next(
+            (loc["name"] for loc in known_locations if loc["key"] == location or loc["name"] == location),
+            location
+        )
+        return [(location, name)]
+    
+    def estimate_export_rows(self, period: str = "week", location: Optional[str] = None,
+                             resolution: Optional[str] = None) -> int:
+        """Stima il numero di record di un'esportazione (per le barre di avanzamento)."""
+        store = self._get_observation_store()
+        start, end = self._period_bounds(period)
+        return sum(
+            store.estimate_rows(location_key, start, end, resolution)
+            for location_key, _ in self._resolve_export_locations(location)
+        )
+    
+    def iter_export_data(self, period: str = "week", data_types: List[str] = None,
+                         location: Optional[str] = None, resolution: Optional[str] = None) -> Iterator[Dict]:
+        """Genera i record da esportare leggendo l'archivio in streaming.
         
-        # Per ora genera dati di esempio
-        # In futuro dovrebbe leggere da un database o file di dati reali
-        all_data = self._generate_sample_data(days)
+        I dati provengono dall'archivio delle serie storiche alimentato da ogni
+        fetch delle previsioni.
         
-        # Filtra per tipi di dati se specificato
-        if data_types:
-            filtered_data = []
-            for record in all_data:
-                filtered_record = {"timestamp": record["timestamp"], "date": record["date"], "time": record["time"]}
+        Args:
+            period: "week", "month", "year" o "custom"
+            data_types: tipi di dato da includere (temperature, humidity, ...)
+            location: chiave ``lat,lon`` o nome della località, ``"*"`` per
+                tutte le località; di default l'ultima località registrata
+            resolution: downsampling opzionale ("hour", "3h", "6h", "day")
+        """
+        
+        store = self._get_observation_store()
+        targets = self._resolve_export_locations(location)
+        start, end = self._period_bounds(period)
+        
+        for location_key, location_name in targets:
+            for observation in store.iter_range(location_key, start, end, resolution):
+                record = self._observation_to_record(observation, location_name)
                 
-                if "temperature" in data_types:
-                    filtered_record["temperature"] = record["temperature"]
-                if "humidity" in data_types:
-                    filtered_record["humidity"] = record["humidity"]
-                if "precipitation" in data_types:
-                    filtered_record["precipitation"] = record["precipitation"]
-                if "wind" in data_types:
-                    filtered_record["wind_speed"] = record["wind_speed"]
-                    filtered_record["wind_direction"] = record["wind_direction"]
-                if "pressure" in data_types:
-                    filtered_record["pressure"] = record["pressure"]
+                # Filtra per tipi di dati se specificato
+                if data_types:
+                    filtered_record = {"timestamp": record["timestamp"], "date": record["date"], "time": record["time"]}
+                    if location == "*":
+                        filtered_record["location"] = record["location"]
+                    
+                    if "temperature" in data_types:
+                        filtered_record["temperature"] = record["temperature"]
+                    if "humidity" in data_types:
+                        filtered_record["humidity"] = record["humidity"]
+                    if "precipitation" in data_types:
+                        filtered_record["precipitation"] = record["precipitation"]
+                    if "wind" in data_types:
+                        filtered_record["wind_speed"] = record["wind_speed"]
+                        filtered_record["wind_direction"] = record["wind_direction"]
+                    if "pressure" in data_types:
+                        filtered_record["pressure"] = record["pressure"]
+                    
+                    record = filtered_record
                 
-                filtered_data.append(filtered_record)
-            
-            return filtered_data
-        
-        return all_data
+                yield record
+    
+    def get_export_data(self, period: str = "week", data_types: List[str] = None,
+                        location: Optional[str] = None, resolution: Optional[str] = None) -> List[Dict]:
+        """Ottiene i dati da esportare in base al periodo selezionato (vedi ``iter_export_data``)."""
+        return list(self.iter_export_data(period, data_types, location, resolution))
+    
+    def export_period(self, export_format: str, period: str = "week", data_types: List[str] = None,
+                      location: Optional[str] = None, resolution: Optional[str] = None,
+                      filename: str = None) -> ExportResult:
+        """Esporta un periodo dall'archivio direttamente sul file, senza materializzarlo."""
+        rows = self.iter_export_data(period, data_types, location, resolution)
+        return self.stream_export(export_format, rows, filename)
     
     def get_available_formats(self) -> List[Dict]:
         """Ottiene la lista dei formati di esportazione disponibili."""
-        return [
+        formats = [
             {"value": "csv", "name": "CSV", "description": "File di valori separati da virgola"},
             {"value": "excel", "name": "Excel (.xlsx)", "description": "Foglio di calcolo Excel"},
             {"value": "json", "name": "JSON", "description": "JavaScript Object Notation"},
             {"value": "pdf", "name": "PDF Report", "description": "Report in formato PDF"},
         ]
+        
+        columnar_format = self.get_columnar_format()
+        if columnar_format == "parquet":
+            formats.append({"value": "parquet", "name": "Parquet",
+                            "description": "Formato colonnare tipizzato (pandas/Arrow)"})
+        elif columnar_format == "npz":
+            formats.append({"value": "npz", "name": "NumPy (.npz)",
+                            "description": "Bundle colonnare NumPy tipizzato"})
+        return formats
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Iterator, Callable
+import logging
+
+from services.data.export_data_service import ExportDataService, ExportResult
+
+logger = logging.getLogger(__name__)
+
+EXPORT_JOB_EVENT = "export_job_event"
+PROGRESS_EVENT_INTERVAL = 0.25  # secondi minimi tra due eventi di avanzamento
+FANOUT_QUEUE_SIZE = 8           # blocchi in attesa per ogni writer di un gruppo
+FANOUT_CHUNK_SIZE = 500         # righe per blocco passate ai writer
+
+
+class ExportCancelled(Exception):
+    """Sollevata nel writer quando il job viene annullato."""
+
+
+@dataclass
+class ExportJob:
+    """Un'esportazione accodata nel runner."""
+    job_id: int
+    export_format: str
+    period: str = "week"
+    data_types: Optional[List[str]] = None
+    location: Optional[str] = None
+    resolution: Optional[str] = None
+    filename: Optional[str] = None
+    status: str = "queued"  # queued, running, completed, failed, cancelled
+    rows: int = 0
+    total: Optional[int] = None
+    result: Optional[ExportResult] = None
+    error: Optional[str] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def scan_key(self) -> tuple:
+        """Job con la stessa chiave possono condividere una sola lettura dei dati."""
+        return (self.period, tuple(self.data_types or ()), self.location, self.resolution)
+
+    @property
+    def progress(self) -> Optional[float]:
+        if self.status == "completed":
+            return 1.0
+        if not self.total:
+            return None
+        return min(1.0, self.rows / self.total)
+
+    def to_event(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "format": self.export_format,
+            "status": self.status,
+            "rows": self.rows,
+            "total": self.total,
+            "progress": self.progress,
+            "result": self.result.to_dict() if self.result else None,
+            "error": self.error,
+        }
+
+
+class ExportJobService:
+    """Esegue le esportazioni in un thread di background.
+
+    I job vengono accodati e processati da un worker; i job in coda con lo
+    stesso periodo/dati/località vengono raggruppati e alimentati da un'unica
+    lettura dell'archivio, che distribuisce i blocchi di righe a un writer per
+    formato. Gli eventi di avanzamento sono inoltrati tramite
+    ``StateManager.notify_all(EXPORT_JOB_EVENT, ...)`` sul loop della pagina.
+    """
+
+    def __init__(self, page=None, state_manager=None, export_service: ExportDataService = None):
+        self.page = page
+        self.state_manager = state_manager
+        if export_service is None:
+            # L'archivio delle serie storiche è condiviso tramite la sessione della pagina
+            store = page.session.get('observation_store') if page and page.session else None
+            export_service = ExportDataService(observation_store=store)
+        self.export_service = export_service
+        self._jobs: Dict[int, ExportJob] = {}
+        self._pending: List[ExportJob] = []
+        self._condition = threading.Condition()
+        self._ids = itertools.count(1)
+        self._worker: Optional[threading.Thread] = None
+        self._stopped = False
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    # ------------------------------------------------------------------
+    # API pubblica
+    # ------------------------------------------------------------------
+
+    def submit(self, export_format: str, period: str = "week", data_types: List[str] = None,
+               location: Optional[str] = None, resolution: Optional[str] = None,
+               filename: Optional[str] = None) -> int:
+        """Accoda un'esportazione e restituisce l'id del job."""
+        job = ExportJob(
+            job_id=next(self._ids),
+            export_format=export_format,
+            period=period,
+            data_types=list(data_types) if data_types else None,
+            location=location,
+            resolution=resolution,
+            filename=filename
+        )
+        with self._condition:
+            self._jobs[job.job_id] = job
+            self._pending.append(job)
+            self._ensure_worker()
+            self._condition.notify()
+        self._emit(job)
+        return job.job_id
+
+    def submit_many(self, export_formats: List[str], **kwargs) -> List[int]:
+        """Accoda più formati sugli stessi dati; verranno serviti da un'unica lettura."""
+        with self._condition:
+            # Tiene il worker fermo finché tutti i job del gruppo sono in coda
+            return [self.submit(export_format, **kwargs) for export_format in export_formats]
+
+    def cancel(self, job_id: int) -> bool:
+        """Annulla un job in coda o in esecuzione."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in ("completed", "failed", "cancelled"):
+                return False
+            job.cancel_event.set()
+            if job in self._pending:
+                self._pending.remove(job)
+                job.status = "cancelled"
+                self._emit(job)
+        return True
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Stato corrente di un job."""
+        job = self._jobs.get(job_id)
+        return job.to_event() if job else None
+
+    def get_jobs(self) -> List[Dict[str, Any]]:
+        """Stato di tutti i job noti."""
+        return [job.to_event() for job in self._jobs.values()]
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """Registra un callback sincrono per gli eventi dei job (oltre allo StateManager)."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def shutdown(self, cancel_running: bool = True):
+        """Ferma il worker, annullando facoltativamente i job in corso."""
+        with self._condition:
+            self._stopped = True
+            if cancel_running:
+                for job in self._jobs.values():
+                    job.cancel_event.set()
+            self._condition.notify_all()
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._stopped = False
+            self._worker = threading.Thread(target=self._run, name="ExportJobWorker", daemon=True)
+            self._worker.start()
+
+    def _next_group(self) -> Optional[List[ExportJob]]:
+        """Preleva il prossimo job e tutti quelli in coda con la stessa chiave di lettura."""
+        with self._condition:
+            while not self._pending and not self._stopped:
+                self._condition.wait()
+            if self._stopped:
+                return None
+            first = self._pending.pop(0)
+            group = [first] + [job for job in self._pending if job.scan_key == first.scan_key]
+            for job in group[1:]:
+                self._pending.remove(job)
+            return group
+
+    def _run(self):
+        while True:
+            group = self._next_group()
+            if group is None:
+                return
+            try:
+                self._run_group(group)
+            except Exception as e:
+                logger.error(f"Errore nel gruppo di esportazione: {e}")
+
+    def _run_group(self, group: List[ExportJob]):
+        first = group[0]
+        try:
+            total = self.export_service.estimate_export_rows(first.period, first.location, first.resolution)
+        except Exception:
+            total = None
+        for job in group:
+            job.status = "running"
+            job.total = total
+            self._emit(job)
+
+        rows = self.export_service.iter_export_data(first.period, first.data_types, first.location, first.resolution)
+        if len(group) == 1:
+            self._run_writer(first, self._track(first, rows))
+            return
+        self._run_fanout(group, rows)
+
+    def _track(self, job: ExportJob, rows) -> Iterator[Dict]:
+        """Conta le righe, emette l'avanzamento e interrompe il writer se annullato."""
+        last_emit = time.monotonic()
+        for record in rows:
+            if job.cancel_event.is_set():
+                raise ExportCancelled()
+            job.rows += 1
+            now = time.monotonic()
+            if now - last_emit >= PROGRESS_EVENT_INTERVAL:
+                last_emit = now
+                self._emit(job)
+            yield record
+
+    def _run_writer(self, job: ExportJob, rows: Iterator[Dict]):
+        try:
+            job.result = self.export_service.stream_export(job.export_format, rows, job.filename)
+            job.status = "completed"
+        except ExportCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            if job.cancel_event.is_set():
+                job.status = "cancelled"
+            else:
+                job.status = "failed"
+                job.error = str(e)
+                logger.error(f"Export job {job.job_id} fallito: {e}")
+        self._emit(job)
+
+    def _run_fanout(self, group: List[ExportJob], rows: Iterator[Dict]):
+        """Una sola lettura dei dati distribuita a un writer per job."""
+        done = object()
+        queues = {job.job_id: queue.Queue(maxsize=FANOUT_QUEUE_SIZE) for job in group}
+
+        def consume(job: ExportJob) -> Iterator[Dict]:
+            source = queues[job.job_id]
+            while True:
+                chunk = source.get()
+                if chunk is done:
+                    return
+                yield from chunk
+
+        writers = []
+        for job in group:
+            thread = threading.Thread(
+                target=self._run_writer, args=(job, self._track(job, consume(job))),
+                name=f"ExportWriter-{job.job_id}", daemon=True
+            )
+            thread.start()
+            writers.append((job, thread))
+
+        def put(job: ExportJob, item) -> bool:
+            """Consegna un blocco al writer; False se il writer non lo accetta più."""
+            while True:
+                if job.status != "running":
+                    return False
+                try:
+                    queues[job.job_id].put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+
+        active = list(group)
+        chunk = []
+        for record in rows:
+            chunk.append(record)
+            if len(chunk) >= FANOUT_CHUNK_SIZE:
+                active = [job for job in active if put(job, chunk)]
+                chunk = []
+                if not active:
+                    break
+        if chunk:
+            active = [job for job in active if put(job, chunk)]
+        for job in active:
+            put(job, done)
+        if hasattr(rows, "close"):
+            rows.close()
+
+        for job, thread in writers:
+            thread.join()
+
+    # ------------------------------------------------------------------
+    # Eventi
+    # ------------------------------------------------------------------
+
+    def _emit(self, job: ExportJob):
+        event = job.to_event()
+        for callback in list(self._listeners):
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Errore nel listener dei job di esportazione: {e}")
+
+        if self.state_manager is None:
+            return
+        try:
+            if self.page is not None and hasattr(self.page, "run_task"):
+                # Gli observer girano sul loop della pagina, non nel worker
+                self.page.run_task(self.state_manager.notify_all, EXPORT_JOB_EVENT, event)
+        except Exception as e:
+            logger.debug(f"Impossibile inoltrare l'evento di esportazione: {e}")
@@ -2,16 +2,27 @@
 
 import json
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
 
+from services.data.sqlite_storage_backend import SQLiteStorageBackend
+
 logger = logging.getLogger(__name__)
 
 
 class LocalStorageService:
-    """Servizio per gestire la persistenza dei dati in cartelle locali del progetto."""
+    """Servizio per gestire la persistenza dei dati in cartelle locali del progetto.
+    
+    Con ``backend="sqlite"`` (default) i documenti della cartella ``storage/data``
+    vengono conservati in un database SQLite in modalità WAL; i file JSON
+    esistenti vengono migrati alla prima apertura. Se il database non è
+    disponibile si ricade sui file JSON.
+    """
     
-    def __init__(self, project_root: str = None):
+    DATABASE_FILENAME = "storage.db"
+    _backends: Dict[str, SQLiteStorageBackend] = {}
+    
+    def __init__(self, project_root: str = None, backend: str = "sqlite"):
         # Usa la directory del progetto corrente se non specificata
         if project_root is None:
             # Trova la root del progetto (dove si trova src/)
@@ -29,7 +40,46 @@ class LocalStorageService:
         # Crea le directory se non esistono
         self._ensure_directories()
         
-        logger.info(f"LocalStorageService inizializzato - Root: {self.project_root}")
+        # Backend SQLite condiviso tra le istanze che puntano alla stessa root
+        self.sqlite: Optional[SQLiteStorageBackend] = None
+        if backend == "sqlite":
+            self.sqlite = self._open_sqlite_backend()
+        
+        logger.info(f"LocalStorageService inizializzato - Root: {self.project_root}, "
+                    f"backend: {'sqlite' if self.sqlite else 'json'}")
+    
+    def _open_sqlite_backend(self) -> Optional[SQLiteStorageBackend]:
+        """Apre (o riusa) il database SQLite ed esegue la migrazione una tantum."""
+        db_path = self.data_dir / self.DATABASE_FILENAME
+        key = str(db_path.resolve())
+        backend = LocalStorageService._backends.get(key)
+        if backend is not None:
+            return backend
+        
+        try:
+            backend = SQLiteStorageBackend(db_path)
+            migrated = backend.migrate_json_directory(self.data_dir)
+            if migrated:
+                logger.info(f"Migrati {migrated} file JSON in {db_path}")
+            LocalStorageService._backends[key] = backend
+            return backend
+        except Exception as e:
+            logger.error(f"Impossibile aprire il database {db_path}, uso file JSON: {e}")
+            return None
+    
+    @property
+    def supports_rows(self) -> bool:
+        """True se è attivo il backend SQLite con operazioni a livello di riga."""
+        return self.sqlite is not None
+    
+    def _document_name(self, filepath: Path) -> Optional[str]:
+        """Nome del documento nel database per un file di ``data_dir``, altrimenti None."""
+        if self.sqlite is None:
+            return None
+        filepath = Path(filepath)
+        if filepath.suffix != ".json" or filepath.parent.resolve() != self.data_dir.resolve():
+            return None
+        return filepath.name
     
     def _ensure_directories(self):
         """Assicura che tutte le directory necessarie esistano."""
@@ -52,6 +102,16 @@ class LocalStorageService:
     
     def save_json(self, data: Dict[str, Any], filepath: Path) -> bool:
         """Salva dati in formato JSON."""
+        document = self._document_name(filepath)
+        if document is not None:
+            try:
+                self.sqlite.save_document(document, data)
+                logger.debug(f"Documento salvato nel database: {document}")
+                return True
+            except Exception as e:
+                logger.error(f"Errore nel salvare il documento {document}: {e}")
+                return False
+        
         try:
             # Assicura che la directory esista
             filepath.parent.mkdir(parents=True, exist_ok=True)
@@ -68,6 +128,18 @@ class LocalStorageService:
     
     def load_json(self, filepath: Path, default: Dict[str, Any] = None) -> Dict[str, Any]:
         """Carica dati da un file JSON."""
+        document = self._document_name(filepath)
+        if document is not None:
+            try:
+                data = self.sqlite.load_document(document)
+                if data is not None:
+                    return data
+                logger.debug(f"Documento non trovato: {document}, usando default")
+                return default or {}
+            except Exception as e:
+                logger.error(f"Errore nel caricare il documento {document}: {e}")
+                return default or {}
+        
         try:
             if filepath.exists():
                 with open(filepath, 'r', encoding='utf-8') as f:
@@ -84,6 +156,14 @@ class LocalStorageService:
     
     def delete_file(self, filepath: Path) -> bool:
         """Elimina un file."""
+        document = self._document_name(filepath)
+        if document is not None:
+            try:
+                return self.sqlite.delete_document(document)
+            except Exception as e:
+                logger.error(f"Errore nell'eliminare il documento {document}: {e}")
+                return False
+        
         try:
             if filepath.exists():
                 filepath.unlink()
@@ -111,6 +191,8 @@ class LocalStorageService:
             "data_dir": str(self.data_dir),
             "cache_dir": str(self.cache_dir),
             "settings_dir": str(self.settings_dir),
+            "backend": "sqlite" if self.sqlite else "json",
+            "database": str(self.sqlite.db_path) if self.sqlite else None,
             "data_exists": self.data_dir.exists(),
             "cache_exists": self.cache_dir.exists(),
             "settings_exists": self.settings_dir.exists()
@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+import logging
+
+from utils.config import OBSERVATION_RETENTION_DAYS, OBSERVATION_RUNS_KEEP_DAYS
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+STREAM_BATCH_SIZE = 1000  # righe lette per blocco nelle query in streaming
+
+# Colonne numeriche salvate per ogni step di previsione (unità metriche)
+OBSERVATION_FIELDS = (
+    "temperature",     # °C
+    "feels_like",      # °C
+    "humidity",        # %
+    "pressure",        # hPa
+    "wind_speed",      # m/s
+    "wind_direction",  # gradi
+    "wind_gust",       # m/s
+    "cloud_coverage",  # %
+    "visibility",      # metri
+    "pop",             # probabilità di precipitazione 0-1
+    "precipitation",   # mm nelle 3 ore (pioggia + neve)
+    "weather_id",      # codice condizione OpenWeatherMap
+)
+
+AIR_QUALITY_FIELDS = ("aqi", "co", "no", "no2", "o3", "so2", "pm2_5", "pm10", "nh3")
+
+# Risoluzioni di downsampling accettate da query_range()
+RESOLUTIONS = {
+    "hour": 3600,
+    "3h": 3 * 3600,
+    "6h": 6 * 3600,
+    "day": SECONDS_PER_DAY,
+}
+
+
+def _to_metric_temperature(value: Optional[float], unit: str) -> Optional[float]:
+    if value is None:
+        return None
+    if unit == "imperial":
+        return (value - 32.0) * 5.0 / 9.0
+    if unit == "standard":
+        return value - 273.15
+    return value
+
+
+def _to_metric_speed(value: Optional[float], unit: str) -> Optional[float]:
+    if value is None:
+        return None
+    if unit == "imperial":
+        return value * 0.44704  # mph -> m/s
+    return value
+
+
+class ObservationStore:
+    """Archivio locale delle serie storiche meteo, alimentato da ogni fetch.
+
+    I dati sono salvati in SQLite con una tabella ``WITHOUT ROWID`` ordinata per
+    (località, giorno, timestamp): ogni giorno di ogni località è una partizione
+    contigua su disco, e il catalogo ``partitions`` ne tiene gli aggregati
+    giornalieri. Le query su settimana/mese/anno sono quindi range scan sulla
+    chiave primaria, e l'anno a risoluzione giornaliera legge solo il catalogo.
+
+    L'archivio è append-only: ogni fetch aggiunge una nuova run, con
+    ``fetched_at`` nella chiave primaria, e le run precedenti restano salvate.
+    Letture, aggregati e previsioni usano la run più recente di ogni step;
+    ``query_runs`` restituisce invece tutte le run, ad esempio per confrontare
+    una previsione con quelle successive. ``compact`` tiene l'archivio
+    limitato: scarta le run superate degli step passati e le partizioni più
+    vecchie della retention.
+    """
+
+    DEFAULT_FILENAME = "observations.db"
+    RECORD_MIN_INTERVAL = 600  # secondi tra due registrazioni identiche
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        self._location_ids: Dict[str, int] = {}
+        self._last_recorded: Dict[Tuple[str, str], Tuple[Any, float]] = {}
+        logger.debug(f"ObservationStore aperto: {self.db_path}")
+
+    @classmethod
+    def open_default(cls) -> "ObservationStore":
+        """Apre l'archivio dell'applicazione in ``storage/data``."""
+        from services.data.local_storage_service import LocalStorageService
+        storage = LocalStorageService()
+        return cls(storage.get_data_path(cls.DEFAULT_FILENAME))
+
+    def _create_schema(self):
+        obs_columns = ",\n".join(f"{field} REAL" for field in OBSERVATION_FIELDS)
+        aq_columns = ",\n".join(f"{field} REAL" for field in AIR_QUALITY_FIELDS)
+        with self._lock:
+            self._conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS locations (
+                    id INTEGER PRIMARY KEY,
+                    key TEXT NOT NULL UNIQUE,
+                    name TEXT,
+                    country TEXT,
+                    lat REAL,
+                    lon REAL
+                );
+                CREATE TABLE IF NOT EXISTS observations (
+                    location_id INTEGER NOT NULL,
+                    day INTEGER NOT NULL,
+                    ts INTEGER NOT NULL,
+                    fetched_at INTEGER NOT NULL,
+                    {obs_columns},
+                    PRIMARY KEY (location_id, day, ts, fetched_at)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS air_quality (
+                    location_id INTEGER NOT NULL,
+                    day INTEGER NOT NULL,
+                    ts INTEGER NOT NULL,
+                    fetched_at INTEGER NOT NULL,
+                    {aq_columns},
+                    PRIMARY KEY (location_id, day, ts, fetched_at)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS partitions (
+                    location_id INTEGER NOT NULL,
+                    day INTEGER NOT NULL,
+                    rows INTEGER NOT NULL,
+                    temp_min REAL,
+                    temp_max REAL,
+                    temp_avg REAL,
+                    humidity_avg REAL,
+                    pressure_avg REAL,
+                    wind_speed_avg REAL,
+                    wind_speed_max REAL,
+                    precipitation_sum REAL,
+                    PRIMARY KEY (location_id, day)
+                ) WITHOUT ROWID;
+            """)
+
+    # ------------------------------------------------------------------
+    # Località
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def location_key(lat: float, lon: float) -> str:
+        """Chiave di località: coordinate arrotondate a ~1 km."""
+        return f"{float(lat):.2f},{float(lon):.2f}"
+
+    def _get_location_id(self, lat: float, lon: float, name: str = None, country: str = None) -> int:
+        key = self.location_key(lat, lon)
+        location_id = self._location_ids.get(key)
+        if location_id is not None:
+            if name:
+                self._conn.execute(
+                    "UPDATE locations SET name = ?, country = ? WHERE id = ? AND (name IS NULL OR name = '')",
+                    (name, country, location_id)
+                )
+            return location_id
+
+        self._conn.execute(
+            "INSERT INTO locations(key, name, country, lat, lon) VALUES(?, ?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET name = COALESCE(NULLIF(excluded.name, ''), locations.name), "
+            "country = COALESCE(NULLIF(excluded.country, ''), locations.country)",
+            (key, name or "", country or "", float(lat), float(lon))
+        )
+        row = self._conn.execute("SELECT id FROM locations WHERE key = ?", (key,)).fetchone()
+        self._location_ids[key] = row["id"]
+        return row["id"]
+
+    def _find_location_id(self, location: str) -> Optional[int]:
+        """Risolve una chiave ``lat,lon`` o un nome di località in un id."""
+        if location in self._location_ids:
+            return self._location_ids[location]
+        row = self._conn.execute(
+            "SELECT id FROM locations WHERE key = ? OR name = ? COLLATE NOCASE ORDER BY id LIMIT 1",
+            (location, location)
+        ).fetchone()
+        return row["id"] if row else None
+
+    def get_locations(self) -> List[Dict[str, Any]]:
+        """Elenca le località presenti nell'archivio."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, name, country, lat, lon FROM locations ORDER BY name"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_latest_location(self) -> Optional[str]:
+        """Chiave della località registrata più di recente."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT l.key FROM observations o JOIN locations l ON l.id = o.location_id "
+                "ORDER BY o.fetched_at DESC LIMIT 1"
+            ).fetchone()
+        return row["key"] if row else None
+
+    # ------------------------------------------------------------------
+    # Scrittura
+    # ------------------------------------------------------------------
+
+    def _should_record(self, kind: str, key: str, signature: Any) -> bool:
+        now = time.monotonic()
+        previous = self._last_recorded.get((kind, key))
+        if previous and previous[0] == signature and now - previous[1] < self.RECORD_MIN_INTERVAL:
+            return False
+        self._last_recorded[(kind, key)] = (signature, now)
+        return True
+
+    def record_forecast(self, payload: Dict[str, Any], unit: str = "metric") -> int:
+        """Registra la risposta di ``/data/2.5/forecast``.
+
+        Args:
+            payload: risposta JSON dell'API
+            unit: sistema di unità della richiesta (i valori vengono salvati in metrico)
+
+        Returns:
+            int: numero di step registrati
+        """
+        items = payload.get("list") or []
+        city = payload.get("city") or {}
+        coord = city.get("coord") or {}
+        if not items or coord.get("lat") is None or coord.get("lon") is None:
+            return 0
+
+        key = self.location_key(coord["lat"], coord["lon"])
+        if not self._should_record("forecast", key, (items[0].get("dt"), items[-1].get("dt"), unit)):
+            return 0
+
+        fetched_at = int(time.time())
+        rows = []
+        for item in items:
+            ts = item.get("dt")
+            if ts is None:
+                continue
+            main = item.get("main", {})
+            wind = item.get("wind", {})
+            weather = item.get("weather") or [{}]
+            rain = (item.get("rain") or {}).get("3h", 0) or 0
+            snow = (item.get("snow") or {}).get("3h", 0) or 0
+            rows.append((
+                int(ts),
+                _to_metric_temperature(main.get("temp"), unit),
+                _to_metric_temperature(main.get("feels_like"), unit),
+                main.get("humidity"),
+                main.get("pressure"),
+                _to_metric_speed(wind.get("speed"), unit),
+                wind.get("deg"),
+                _to_metric_speed(wind.get("gust"), unit),
+                (item.get("clouds") or {}).get("all"),
+                item.get("visibility"),
+                item.get("pop"),
+                rain + snow,
+                weather[0].get("id"),
+            ))
+        if not rows:
+            return 0
+
+        columns = ", ".join(OBSERVATION_FIELDS)
+        placeholders = ", ".join("?" for _ in OBSERVATION_FIELDS)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                location_id = self._get_location_id(coord["lat"], coord["lon"], city.get("name"), city.get("country"))
+                # fetched_at fa parte della chiave: la nuova run si aggiunge a quelle precedenti
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO observations(location_id, day, ts, fetched_at, {columns}) "
+                    f"VALUES(?, ?, ?, ?, {placeholders})",
+                    [(location_id, row[0] // SECONDS_PER_DAY, row[0], fetched_at) + row[1:] for row in rows]
+                )
+                self._refresh_partitions(location_id, {row[0] // SECONDS_PER_DAY for row in rows})
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.debug(f"ObservationStore: registrati {len(rows)} step per {key}")
+        return len(rows)
+
+    def record_air_pollution(self, lat: float, lon: float, payload: Dict[str, Any]) -> int:
+        """Registra la risposta di ``/data/2.5/air_pollution``."""
+        items = payload.get("list") or []
+        if not items or lat is None or lon is None:
+            return 0
+
+        key = self.location_key(lat, lon)
+        if not self._should_record("air", key, (items[0].get("dt"), len(items))):
+            return 0
+
+        fetched_at = int(time.time())
+        rows = []
+        for item in items:
+            ts = item.get("dt")
+            if ts is None:
+                continue
+            components = item.get("components", {})
+            values = [item.get("main", {}).get("aqi")] + [components.get(f) for f in AIR_QUALITY_FIELDS[1:]]
+            rows.append((int(ts), *values))
+        if not rows:
+            return 0
+
+        columns = ", ".join(AIR_QUALITY_FIELDS)
+        placeholders = ", ".join("?" for _ in AIR_QUALITY_FIELDS)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                location_id = self._get_location_id(lat, lon)
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO air_quality(location_id, day, ts, fetched_at, {columns}) "
+                    f"VALUES(?, ?, ?, ?, {placeholders})",
+                    [(location_id, row[0] // SECONDS_PER_DAY, row[0], fetched_at) + row[1:] for row in rows]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def _refresh_partitions(self, location_id: int, days: set):
+        """Ricalcola il catalogo/aggregati dei giorni toccati da una scrittura."""
+        for day in days:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO partitions(location_id, day, rows, temp_min, temp_max, temp_avg, "
+                "humidity_avg, pressure_avg, wind_speed_avg, wind_speed_max, precipitation_sum) "
+                "SELECT location_id, day, COUNT(*), MIN(temperature), MAX(temperature), AVG(temperature), "
+                "AVG(humidity), AVG(pressure), AVG(wind_speed), MAX(wind_speed), SUM(precipitation) "
+                f"FROM {self._latest_runs('observations', 'temperature, humidity, pressure, wind_speed, precipitation')} "
+                "GROUP BY location_id, day",
+                (location_id, day, day)
+            )
+
+    # ------------------------------------------------------------------
+    # Lettura
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _latest_runs(table: str, columns: str) -> str:
+        """Sottoquery con la run più recente di ogni step di una località.
+
+        Parametri: ``location_id``, primo e ultimo giorno. Sfrutta le colonne
+        "bare" di SQLite: con ``MAX(fetched_at)`` le altre colonne vengono
+        dalla stessa riga, e il GROUP BY segue l'ordine della chiave primaria.
+        """
+        return (
+            f"(SELECT location_id, day, ts, MAX(fetched_at) AS fetched_at, {columns} FROM {table} "
+            "WHERE location_id = ? AND day BETWEEN ? AND ? GROUP BY location_id, day, ts)"
+        )
+
+    @staticmethod
+    def _to_epoch(value) -> int:
+        if isinstance(value, datetime):
+            if value.tzinfo is None:
+                return int(value.timestamp())
+            return int(value.astimezone(timezone.utc).timestamp())
+        return int(value)
+
+    def iter_range(self, location: str, start, end, resolution: Optional[str] = None,
+                   fields: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Itera sulle osservazioni di una località tra ``start`` (incluso) e ``end`` (escluso).
+
+        Args:
+            location: chiave ``lat,lon`` o nome della località
+            start, end: datetime o epoch in secondi
+            resolution: None per i dati nativi, oppure una chiave di ``RESOLUTIONS``
+                (o un numero di secondi) per il downsampling a medie per bucket
+            fields: sottoinsieme di ``OBSERVATION_FIELDS`` da restituire
+
+        Yields:
+            dict con ``ts`` (epoch) e i campi richiesti
+        """
+        fields = [f for f in (fields or OBSERVATION_FIELDS) if f in OBSERVATION_FIELDS]
+        start_ts, end_ts = self._to_epoch(start), self._to_epoch(end)
+        bucket = RESOLUTIONS.get(resolution, resolution) if resolution else None
+
+        with self._lock:
+            location_id = self._find_location_id(location)
+        if location_id is None:
+            return
+
+        day_range = (start_ts // SECONDS_PER_DAY, end_ts // SECONDS_PER_DAY)
+        if bucket == SECONDS_PER_DAY:
+            yield from self._iter_daily(location_id, day_range, fields)
+            return
+
+        if bucket:
+            select = ", ".join(
+                f"SUM({f}) AS {f}" if f == "precipitation" else f"AVG({f}) AS {f}" for f in fields
+            )
+            sql = (
+                f"SELECT (ts / {int(bucket)}) * {int(bucket)} AS ts, {select} "
+                f"FROM {self._latest_runs('observations', ', '.join(fields))} "
+                f"WHERE ts >= ? AND ts < ? GROUP BY ts / {int(bucket)} ORDER BY ts"
+            )
+        else:
+            sql = (
+                f"SELECT ts, {', '.join(fields)} FROM {self._latest_runs('observations', ', '.join(fields))} "
+                "WHERE ts >= ? AND ts < ? ORDER BY day, ts"
+            )
+
+        yield from self._stream(sql, (location_id, *day_range, start_ts, end_ts))
+
+    def _stream(self, sql: str, params: tuple, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+        """Esegue una SELECT su una connessione di sola lettura dedicata.
+
+        Le righe vengono lette a blocchi con ``fetchmany``, quindi la memoria
+        resta costante anche su range di un anno; grazie al WAL la lettura non
+        blocca le scritture concorrenti.
+        """
+        reader = sqlite3.connect(f"file:{self.db_path.as_posix()}?mode=ro", uri=True, check_same_thread=False)
+        reader.row_factory = sqlite3.Row
+        try:
+            cursor = reader.execute(sql, params)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                for row in batch:
+                    yield dict(row)
+        finally:
+            reader.close()
+
+    def _iter_daily(self, location_id: int, day_range: Tuple[int, int],
+                    fields: List[str]) -> Iterator[Dict[str, Any]]:
+        """Downsampling giornaliero servito dal catalogo delle partizioni."""
+        daily_columns = {
+            "temperature": "temp_avg",
+            "humidity": "humidity_avg",
+            "pressure": "pressure_avg",
+            "wind_speed": "wind_speed_avg",
+            "precipitation": "precipitation_sum",
+        }
+        selected = [f for f in fields if f in daily_columns]
+        select = ", ".join(f"{daily_columns[f]} AS {f}" for f in selected)
+        extra = ", temp_min, temp_max, wind_speed_max" if "temperature" in fields or "wind_speed" in fields else ""
+        sql = (
+            f"SELECT day * {SECONDS_PER_DAY} AS ts{', ' + select if select else ''}{extra} FROM partitions "
+            "WHERE location_id = ? AND day BETWEEN ? AND ? ORDER BY day"
+        )
+        yield from self._stream(sql, (location_id, *day_range))
+
+    def query_range(self, location: str, start, end, resolution: Optional[str] = None,
+                    fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Come ``iter_range`` ma restituisce una lista."""
+        return list(self.iter_range(location, start, end, resolution, fields))
+
+    def query_runs(self, location: str, start, end,
+                   fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Tutte le run salvate per gli step tra ``start`` e ``end``.
+
+        Degli step più vecchi di ``OBSERVATION_RUNS_KEEP_DAYS`` resta solo
+        l'ultima run (vedi ``compact``).
+
+        Returns:
+            righe con ``ts``, ``fetched_at`` e i campi richiesti, ordinate per step e run
+        """
+        fields = [f for f in (fields or OBSERVATION_FIELDS) if f in OBSERVATION_FIELDS]
+        start_ts, end_ts = self._to_epoch(start), self._to_epoch(end)
+        with self._lock:
+            location_id = self._find_location_id(location)
+            if location_id is None:
+                return []
+            rows = self._conn.execute(
+                f"SELECT ts, fetched_at, {', '.join(fields)} FROM observations "
+                "WHERE location_id = ? AND day BETWEEN ? AND ? AND ts >= ? AND ts < ? ORDER BY day, ts, fetched_at",
+                (location_id, start_ts // SECONDS_PER_DAY, end_ts // SECONDS_PER_DAY, start_ts, end_ts)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def query_air_quality(self, location: str, start, end) -> List[Dict[str, Any]]:
+        """Restituisce le rilevazioni di qualità dell'aria nell'intervallo."""
+        start_ts, end_ts = self._to_epoch(start), self._to_epoch(end)
+        with self._lock:
+            location_id = self._find_location_id(location)
+            if location_id is None:
+                return []
+            rows = self._conn.execute(
+                f"SELECT ts, {', '.join(AIR_QUALITY_FIELDS)} "
+                f"FROM {self._latest_runs('air_quality', ', '.join(AIR_QUALITY_FIELDS))} "
+                "WHERE ts >= ? AND ts < ? ORDER BY day, ts",
+                (location_id, start_ts // SECONDS_PER_DAY, end_ts // SECONDS_PER_DAY, start_ts, end_ts)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_forecast(self, location: str, max_age: Optional[float] = None,
+                     horizon: int = 5 * SECONDS_PER_DAY) -> List[Dict[str, Any]]:
+        """Ultima previsione salvata di una località, dallo step in corso in avanti.
+
+        Args:
+            location: chiave ``lat,lon`` o nome della località
+            max_age: secondi oltre i quali la previsione è troppo vecchia (lista vuota)
+            horizon: secondi di previsione da restituire
+
+        Returns:
+            righe con ``ts``, ``fetched_at`` e ``OBSERVATION_FIELDS`` (unità metriche)
+        """
+        now = int(time.time())
+        start_ts, end_ts = now - 3 * 3600, now + horizon  # lo step di 3 ore in corso è ancora valido
+        with self._lock:
+            location_id = self._find_location_id(location)
+            if location_id is None:
+                return []
+            rows = self._conn.execute(
+                f"SELECT ts, fetched_at, {', '.join(OBSERVATION_FIELDS)} "
+                f"FROM {self._latest_runs('observations', ', '.join(OBSERVATION_FIELDS))} "
+                "WHERE ts >= ? AND ts < ? ORDER BY day, ts",
+                (location_id, start_ts // SECONDS_PER_DAY, end_ts // SECONDS_PER_DAY, start_ts, end_ts)
+            ).fetchall()
+        if not rows:
+            return []
+        if max_age is not None and now - max(row["fetched_at"] for row in rows) > max_age:
+            return []
+        return [dict(row) for row in rows]
+
+    def estimate_rows(self, location: str, start, end, resolution: Optional[str] = None) -> int:
+        """Stima le righe di un range dal catalogo delle partizioni, senza leggere i dati."""
+        start_ts, end_ts = self._to_epoch(start), self._to_epoch(end)
+        day_range = (start_ts // SECONDS_PER_DAY, end_ts // SECONDS_PER_DAY)
+        bucket = RESOLUTIONS.get(resolution, resolution) if resolution else None
+        with self._lock:
+            location_id = self._find_location_id(location)
+            if location_id is None:
+                return 0
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS days, COALESCE(SUM(rows), 0) AS rows FROM partitions "
+                "WHERE location_id = ? AND day BETWEEN ? AND ?",
+                (location_id, *day_range)
+            ).fetchone()
+        if bucket:
+            return min(row["rows"], row["days"] * max(1, SECONDS_PER_DAY // int(bucket)))
+        return row["rows"]
+
+    def get_partitions(self, location: str) -> List[Dict[str, Any]]:
+        """Catalogo delle partizioni giornaliere di una località."""
+        with self._lock:
+            location_id = self._find_location_id(location)
+            if location_id is None:
+                return []
+            rows = self._conn.execute(
+                "SELECT * FROM partitions WHERE location_id = ? ORDER BY day", (location_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def drop_before(self, before) -> int:
+        """Elimina le partizioni precedenti a ``before`` (retention).
+
+        Returns:
+            int: numero di osservazioni rimosse
+        """
+        day = self._to_epoch(before) // SECONDS_PER_DAY
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                removed = self._conn.execute("DELETE FROM observations WHERE day < ?", (day,)).rowcount
+                self._conn.execute("DELETE FROM air_quality WHERE day < ?", (day,))
+                self._conn.execute("DELETE FROM partitions WHERE day < ?", (day,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return removed
+
+    def compact(self, retention_days: float = OBSERVATION_RETENTION_DAYS,
+                runs_keep_days: float = OBSERVATION_RUNS_KEEP_DAYS, now: Optional[float] = None) -> int:
+        """Applica la retention e scarta le run superate degli step passati.
+
+        Le partizioni più vecchie di ``retention_days`` vengono eliminate con
+        ``drop_before``. Degli step passati da più di ``runs_keep_days`` resta
+        solo la run più recente: gli aggregati del catalogo non cambiano, perché
+        usano già quella.
+
+        Returns:
+            int: numero di righe rimosse
+        """
+        now = time.time() if now is None else now
+        removed = self.drop_before(now - retention_days * SECONDS_PER_DAY)
+        cutoff = int(now - runs_keep_days * SECONDS_PER_DAY)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for table in ("observations", "air_quality"):
+                    # La run più nuova dello stesso step è sulla stessa chiave primaria
+                    removed += self._conn.execute(
+                        f"DELETE FROM {table} WHERE day <= ? AND ts < ? AND EXISTS ("
+                        f"SELECT 1 FROM {table} AS newer WHERE newer.location_id = {table}.location_id "
+                        f"AND newer.day = {table}.day AND newer.ts = {table}.ts "
+                        f"AND newer.fetched_at > {table}.fetched_at)",
+                        (cutoff // SECONDS_PER_DAY, cutoff)
+                    ).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.debug(f"ObservationStore: {removed} righe rimosse dalla compattazione")
+        return removed
+
+    def close(self):
+        """Chiude la connessione al database."""
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception as e:
+                logger.error(f"Errore nella chiusura di {self.db_path}: {e}")
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+
+import json
+import sqlite3
+import threading
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_location_name(name: str) -> str:
+    """Normalizza un nome di località per ricerche e indici (casefold, senza accenti)."""
+    if not name:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+class SQLiteStorageBackend:
+    """Motore di storage SQLite (WAL) usato da LocalStorageService.
+
+    Conserva i documenti JSON in una tabella chiave/valore e le località salvate
+    in una tabella dedicata, così che le modifiche a una singola località siano
+    un upsert di riga invece della riscrittura dell'intero file.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,
+            isolation_level=None  # gestiamo le transazioni esplicitamente
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._configure_connection()
+        self._create_schema()
+        logger.debug(f"SQLiteStorageBackend aperto: {self.db_path}")
+
+    def _configure_connection(self):
+        """Imposta WAL e pragma adatti a un database locale a singolo processo."""
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+
+    def _create_schema(self):
+        """Crea tabelle e indici se non esistono."""
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                CREATE TABLE IF NOT EXISTS documents (
+                    name TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    updated TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS locations (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    name_norm TEXT NOT NULL,
+                    country TEXT DEFAULT '',
+                    lat REAL,
+                    lon REAL,
+                    favorite INTEGER NOT NULL DEFAULT 0,
+                    added_date TEXT,
+                    position INTEGER NOT NULL DEFAULT 0,
+                    extra TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_locations_name_norm ON locations(name_norm);
+                CREATE INDEX IF NOT EXISTS idx_locations_favorite ON locations(favorite);
+                CREATE INDEX IF NOT EXISTS idx_locations_position ON locations(position);
+                CREATE TABLE IF NOT EXISTS geocode_cache (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    fetched REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                ) WITHOUT ROWID;
+            """)
+            if self.get_meta("schema_version") is None:
+                self.set_meta("schema_version", str(self.SCHEMA_VERSION))
+
+    # ------------------------------------------------------------------
+    # Metadati
+    # ------------------------------------------------------------------
+
+    def get_meta(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Legge un valore dalla tabella meta."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def set_meta(self, key: str, value: Optional[str]):
+        """Scrive un valore nella tabella meta."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meta(key, value) VALUES(?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+
+    # ------------------------------------------------------------------
+    # Documenti JSON
+    # ------------------------------------------------------------------
+
+    def save_document(self, name: str, data: Dict[str, Any]):
+        """Salva un documento JSON con un singolo upsert."""
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO documents(name, body, updated) VALUES(?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET body = excluded.body, updated = excluded.updated",
+                (name, body, datetime.now().isoformat())
+            )
+
+    def load_document(self, name: str) -> Optional[Dict[str, Any]]:
+        """Carica un documento JSON, None se non esiste."""
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM documents WHERE name = ?", (name,)).fetchone()
+        return json.loads(row["body"]) if row else None
+
+    def delete_document(self, name: str) -> bool:
+        """Elimina un documento JSON."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM documents WHERE name = ?", (name,))
+        return cursor.rowcount > 0
+
+    def document_exists(self, name: str) -> bool:
+        """Verifica se un documento esiste."""
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM documents WHERE name = ?", (name,)).fetchone()
+        return row is not None
+
+    def list_documents(self) -> List[str]:
+        """Restituisce i nomi di tutti i documenti."""
+        with self._lock:
+            rows = self._conn.execute("SELECT name FROM documents ORDER BY name").fetchall()
+        return [row["name"] for row in rows]
+
+    # ------------------------------------------------------------------
+    # Località
+    # ------------------------------------------------------------------
+
+    _LOCATION_COLUMNS = ("id", "name", "country", "lat", "lon", "favorite", "added_date")
+
+    def _location_to_row(self, location: Dict[str, Any], position: int) -> tuple:
+        extra = {k: v for k, v in location.items() if k not in self._LOCATION_COLUMNS}
+        return (
+            location["id"],
+            location.get("name", ""),
+            normalize_location_name(location.get("name", "")),
+            location.get("country", ""),
+            location.get("lat"),
+            location.get("lon"),
+            1 if location.get("favorite", False) else 0,
+            location.get("added_date"),
+            position,
+            json.dumps(extra, ensure_ascii=False, separators=(",", ":")) if extra else None,
+        )
+
+    @staticmethod
+    def _row_to_location(row: sqlite3.Row) -> Dict[str, Any]:
+        location = {
+            "id": row["id"],
+            "name": row["name"],
+            "country": row["country"] or "",
+            "lat": row["lat"],
+            "lon": row["lon"],
+            "favorite": bool(row["favorite"]),
+            "added_date": row["added_date"],
+        }
+        if row["extra"]:
+            location.update(json.loads(row["extra"]))
+        return location
+
+    def _next_position(self) -> int:
+        row = self._conn.execute("SELECT COALESCE(MAX(position), -1) + 1 AS pos FROM locations").fetchone()
+        return row["pos"]
+
+    def upsert_location(self, location: Dict[str, Any]):
+        """Inserisce o aggiorna una singola località mantenendone la posizione."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT position FROM locations WHERE id = ?", (location["id"],)
+            ).fetchone()
+            position = row["position"] if row else self._next_position()
+            self._conn.execute(
+                "INSERT INTO locations(id, name, name_norm, country, lat, lon, favorite, added_date, position, extra) "
+                "VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET name = excluded.name, name_norm = excluded.name_norm, "
+                "country = excluded.country, lat = excluded.lat, lon = excluded.lon, "
+                "favorite = excluded.favorite, added_date = excluded.added_date, extra = excluded.extra",
+                self._location_to_row(location, position)
+            )
+
+    def set_location_favorite(self, location_id: str, favorite: bool) -> bool:
+        """Aggiorna solo il flag preferito di una località."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE locations SET favorite = ? WHERE id = ?", (1 if favorite else 0, location_id)
+            )
+        return cursor.rowcount > 0
+
+    def delete_location(self, location_id: str) -> bool:
+        """Elimina una località per ID."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM locations WHERE id = ?", (location_id,))
+        return cursor.rowcount > 0
+
+    def replace_locations(self, locations: Iterable[Dict[str, Any]]):
+        """Sostituisce tutte le località in un'unica transazione."""
+        rows = [self._location_to_row(loc, i) for i, loc in enumerate(locations)]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM locations")
+                self._conn.executemany(
+                    "INSERT INTO locations(id, name, name_norm, country, lat, lon, favorite, added_date, position, extra) "
+                    "VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get_location(self, location_id: str) -> Optional[Dict[str, Any]]:
+        """Lookup indicizzato per ID."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM locations WHERE id = ?", (location_id,)).fetchone()
+        return self._row_to_location(row) if row else None
+
+    def get_all_locations(self) -> List[Dict[str, Any]]:
+        """Restituisce tutte le località nell'ordine di inserimento."""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM locations ORDER BY position").fetchall()
+        return [self._row_to_location(row) for row in rows]
+
+    def get_favorite_locations(self) -> List[Dict[str, Any]]:
+        """Lookup indicizzato delle località preferite."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM locations WHERE favorite = 1 ORDER BY position"
+            ).fetchall()
+        return [self._row_to_location(row) for row in rows]
+
+    def find_locations_by_name(self, name: str, prefix: bool = True) -> List[Dict[str, Any]]:
+        """Lookup indicizzato per nome normalizzato (esatto o per prefisso)."""
+        norm = normalize_location_name(name)
+        with self._lock:
+            if prefix:
+                # Il range su name_norm usa l'indice, a differenza di LIKE
+                rows = self._conn.execute(
+                    "SELECT * FROM locations WHERE name_norm >= ? AND name_norm < ? ORDER BY position",
+                    (norm, norm + "\U0010ffff")
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM locations WHERE name_norm = ? ORDER BY position", (norm,)
+                ).fetchall()
+        return [self._row_to_location(row) for row in rows]
+
+    def count_locations(self) -> int:
+        """Numero di località salvate."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) AS n FROM locations").fetchone()["n"]
+
+    # ------------------------------------------------------------------
+    # Cache del geocoding
+    # ------------------------------------------------------------------
+
+    def load_geocode_cache(self, kind: str, fetched_after: float = 0) -> List[tuple]:
+        """Voci della cache di geocoding non scadute: (key, data, fetched)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, body, fetched FROM geocode_cache WHERE kind = ? AND fetched >= ?",
+                (kind, fetched_after)
+            ).fetchall()
+        return [(row["key"], json.loads(row["body"]), row["fetched"]) for row in rows]
+
+    def save_geocode_result(self, kind: str, key: str, data: Any, fetched: float):
+        """Salva (o sostituisce) un risultato di geocoding."""
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO geocode_cache(kind, key, body, fetched) VALUES(?, ?, ?, ?) "
+                "ON CONFLICT(kind, key) DO UPDATE SET body = excluded.body, fetched = excluded.fetched",
+                (kind, key, body, fetched)
+            )
+
+    def purge_geocode_cache(self, kind: str, fetched_before: float) -> int:
+        """Elimina le voci scadute di un tipo di cache."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM geocode_cache WHERE kind = ? AND fetched < ?", (kind, fetched_before)
+            )
+        return cursor.rowcount
+
+    # ------------------------------------------------------------------
+    # Migrazione e chiusura
+    # ------------------------------------------------------------------
+
+    def migrate_json_directory(self, data_dir: Path) -> int:
+        """Importa una sola volta i file ``*.json`` esistenti nel database.
+
+        I file ``saved_locations.json`` vengono scomposti in righe della tabella
+        ``locations``; gli altri vengono importati come documenti. I file
+        originali restano su disco come backup.
+
+        Returns:
+            int: numero di file importati
+        """
+        if self.get_meta("json_migrated"):
+            return 0
+
+        imported = 0
+        for json_file in sorted(Path(data_dir).glob("*.json")):
+            try:
+                with open(json_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.error(f"Migrazione: impossibile leggere {json_file}: {e}")
+                continue
+
+            if json_file.name == "saved_locations.json" and isinstance(data, dict) and "locations" in data:
+                self.replace_locations(data.get("locations") or [])
+                self.set_meta("last_selected_location", data.get("last_selected_location"))
+                self.set_meta("locations_initialized", "1")
+            else:
+                self.save_document(json_file.name, data)
+            imported += 1
+            logger.info(f"Migrazione: importato {json_file.name}")
+
+        self.set_meta("json_migrated", datetime.now().isoformat())
+        return imported
+
+    def close(self):
+        """Chiude la connessione al database."""
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception as e:
+                logger.error(f"Errore nella chiusura del database {self.db_path}: {e}")
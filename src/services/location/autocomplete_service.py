@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+import math
+import threading
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+import logging
+
+from services.location.gazetteer import Gazetteer, search_key, haversine_km
+from utils.config import AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_MIN_CHARS
+
+logger = logging.getLogger(__name__)
+
+CANDIDATE_POOL = 40          # candidati valutati prima del ranking
+PREFIX_SCAN_LIMIT = 200      # luoghi più popolosi considerati per ogni prefisso
+FUZZY_MIN_CHARS = 4          # sotto questa lunghezza la ricerca fuzzy non è affidabile
+LEARNED_MAX_PLACES = 2000    # risultati di geocoding ricordati per l'autocompletamento
+DISTANCE_WEIGHT = 1.5        # peso della distanza rispetto a log10(popolazione)
+EXACT_MATCH_BONUS = 2.0
+
+
+@dataclass
+class CitySuggestion:
+    """Un suggerimento mostrato sotto la barra di ricerca."""
+    name: str
+    country: str
+    state: str = ""
+    lat: float = 0.0
+    lon: float = 0.0
+    population: int = 0
+    distance_km: Optional[float] = None
+    score: float = 0.0
+
+    @property
+    def query(self) -> str:
+        """Query da passare all'API meteo (nome e codice paese)."""
+        return f"{self.name},{self.country}" if self.country else self.name
+
+    @property
+    def label(self) -> str:
+        return ", ".join(part for part in (self.name, self.state, self.country) if part)
+
+
+class AutocompleteService:
+    """Suggerimenti di città calcolati localmente ad ogni tasto.
+
+    Combina l'indice per prefisso del gazetteer offline con i risultati di
+    geocoding già ottenuti dall'API (``remember``), e ordina i candidati per
+    popolazione e distanza dalla posizione corrente. Non effettua chiamate di
+    rete: il debounce e l'eventuale ricerca remota restano alla UI.
+    """
+
+    def __init__(self, gazetteer: Gazetteer = None):
+        self.gazetteer = gazetteer or Gazetteer.load_default()
+        self._learned: List[Dict[str, Any]] = []
+        self._learned_keys: List[Tuple[str, int]] = []  # (chiave normalizzata, indice) ordinati
+        self._learned_ids: Dict[Tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def warm_up(self):
+        """Prepara gli indici costosi così che il primo tasto resti veloce."""
+        self.gazetteer.prepare_fuzzy_index()
+
+    # ------------------------------------------------------------------
+    # Risultati di geocoding ricordati
+    # ------------------------------------------------------------------
+
+    def remember(self, places: Iterable[Dict[str, Any]]):
+        """Aggiunge risultati di geocoding (formato ``/geo/1.0/direct``) all'indice."""
+        with self._lock:
+            for place in places or []:
+                key = search_key(place.get("name", ""))
+                if not key:
+                    continue
+                identity = (key, place.get("country", ""), round(float(place.get("lat", 0)), 2),
+                            round(float(place.get("lon", 0)), 2))
+                if identity in self._learned_ids:
+                    continue
+                if len(self._learned) >= LEARNED_MAX_PLACES:
+                    # Indice pieno: si ricostruisce tenendo la seconda metà (i più recenti)
+                    kept = self._learned[LEARNED_MAX_PLACES // 2:]
+                    self._learned, self._learned_keys, self._learned_ids = [], [], {}
+                    for old in kept:
+                        self._add_learned(old)
+                self._add_learned(place)
+
+    def _add_learned(self, place: Dict[str, Any]):
+        key = search_key(place.get("name", ""))
+        index = len(self._learned)
+        self._learned.append(place)
+        self._learned_ids[(key, place.get("country", ""), round(float(place.get("lat", 0)), 2),
+                           round(float(place.get("lon", 0)), 2))] = index
+        insort(self._learned_keys, (key, index))
+
+    def _learned_with_prefix(self, prefix: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            result = []
+            index = bisect_left(self._learned_keys, (prefix,))
+            while index < len(self._learned_keys) and self._learned_keys[index][0].startswith(prefix):
+                result.append(self._learned[self._learned_keys[index][1]])
+                index += 1
+                if len(result) >= CANDIDATE_POOL:
+                    break
+            return result
+
+    # ------------------------------------------------------------------
+    # Suggerimenti
+    # ------------------------------------------------------------------
+
+    def suggest(self, query: str, origin: Optional[Tuple[float, float]] = None,
+                limit: int = AUTOCOMPLETE_LIMIT) -> List[CitySuggestion]:
+        """Migliori ``limit`` città per il testo digitato finora."""
+        key = search_key((query or "").split(",")[0])
+        if len(key) < AUTOCOMPLETE_MIN_CHARS:
+            return []
+
+        places = [self.gazetteer.get_place(place_id) for place_id in
+                  self.gazetteer.prefix_ids(query, CANDIDATE_POOL, max_candidates=PREFIX_SCAN_LIMIT)]
+        places.extend(self._learned_with_prefix(key))
+        if not places and len(key) >= FUZZY_MIN_CHARS:
+            places = [self.gazetteer.get_place(place_id) for place_id in self.gazetteer.fuzzy_ids(query, limit)]
+
+        suggestions: Dict[Tuple[str, str], CitySuggestion] = {}
+        for place in places:
+            suggestion = self._score(place, key, origin)
+            identity = (search_key(suggestion.name), suggestion.country)
+            current = suggestions.get(identity)
+            if current is None or suggestion.score > current.score:
+                suggestions[identity] = suggestion
+
+        return sorted(suggestions.values(), key=lambda s: -s.score)[:limit]
+
+    @staticmethod
+    def _score(place: Dict[str, Any], key: str, origin: Optional[Tuple[float, float]]) -> CitySuggestion:
+        lat, lon = float(place.get("lat", 0)), float(place.get("lon", 0))
+        population = int(place.get("population", 0) or 0)
+        score = math.log10(population + 10)
+        if search_key(place.get("name", "")) == key:
+            score += EXACT_MATCH_BONUS
+
+        distance = None
+        if origin is not None and origin[0] is not None and origin[1] is not None:
+            distance = haversine_km(origin[0], origin[1], lat, lon)
+            score -= DISTANCE_WEIGHT * math.log10(1 + distance / 100)
+
+        return CitySuggestion(
+            name=place.get("name", ""),
+            country=place.get("country", ""),
+            state=place.get("state", "") or "",
+            lat=lat,
+            lon=lon,
+            population=population,
+            distance_km=distance,
+            score=score
+        )
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+import asyncio
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Any, Tuple
+import logging
+
+import requests
+from dotenv import load_dotenv
+
+from services.location.gazetteer import Gazetteer, search_key, haversine_km
+from services.location.geocoding_service import LocationCandidate
+from utils.config import (
+    API_BASE_URL,
+    API_CURRENT_WEATHER_ENDPOINT,
+    PREVIEW_CANDIDATES,
+    PREVIEW_TTL,
+    PREVIEW_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+SELECTIONS_FILENAME = "location_selections.json"
+MAX_REMEMBERED_SELECTIONS = 500
+GAZETTEER_MATCH_KM = 25          # distanza entro cui un luogo del gazetteer è lo stesso candidato
+DISTANCE_WEIGHT = 1.5            # stessi pesi dell'autocompletamento
+COUNTRY_MATCH_BONUS = 3.0
+STATE_MATCH_BONUS = 2.0
+SELECTION_WEIGHT = 1.5           # per log2(1 + scelte precedenti)
+MAX_PREVIEWS_KEPT = 200
+
+
+class CandidateRanker:
+    """Ordina i candidati del geocoding prima di mostrarli all'utente.
+
+    Il punteggio combina popolazione (dal candidato o dal gazetteer
+    offline), distanza dalla posizione corrente, corrispondenza con la
+    regione e il paese digitati e le scelte fatte in passato per lo stesso
+    luogo. ``relevance_score`` diventa la quota percentuale del punteggio
+    (softmax), così che il primo candidato spicchi solo se è davvero
+    preferibile agli altri.
+    """
+
+    def __init__(self, storage_service=None, gazetteer: Gazetteer = None):
+        self._storage = storage_service
+        self._gazetteer = gazetteer
+        self._selections: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def candidate_key(candidate: LocationCandidate) -> str:
+        """Identità di un luogo: nome normalizzato, paese e coordinate a ~1 km."""
+        return f"{search_key(candidate.name)}|{candidate.country_code.upper()}|{candidate.lat:.2f},{candidate.lon:.2f}"
+
+    # ------------------------------------------------------------------
+    # Scelte precedenti
+    # ------------------------------------------------------------------
+
+    def _get_storage(self):
+        if self._storage is None:
+            from services.data.local_storage_service import LocalStorageService
+            self._storage = LocalStorageService()
+        return self._storage
+
+    def _get_selections(self) -> Dict[str, int]:
+        with self._lock:
+            if self._selections is None:
+                try:
+                    storage = self._get_storage()
+                    self._selections = dict(storage.load_json(storage.get_data_path(SELECTIONS_FILENAME), {}))
+                except Exception as e:
+                    logger.error(f"Impossibile caricare le scelte delle località: {e}")
+                    self._selections = {}
+            return self._selections
+
+    def record_selection(self, candidate: LocationCandidate):
+        """Registra la scelta dell'utente, che peserà nelle ricerche successive."""
+        selections = self._get_selections()
+        with self._lock:
+            key = self.candidate_key(candidate)
+            selections[key] = selections.pop(key, 0) + 1
+            while len(selections) > MAX_REMEMBERED_SELECTIONS:
+                # I dict mantengono l'ordine di inserimento: si scarta la scelta meno recente
+                del selections[next(iter(selections))]
+            snapshot = dict(selections)
+        try:
+            storage = self._get_storage()
+            storage.save_json(snapshot, storage.get_data_path(SELECTIONS_FILENAME))
+        except Exception as e:
+            logger.error(f"Impossibile salvare le scelte delle località: {e}")
+
+    # ------------------------------------------------------------------
+    # Ranking
+    # ------------------------------------------------------------------
+
+    def _population(self, candidate: LocationCandidate) -> int:
+        """Popolazione del candidato, o del luogo corrispondente nel gazetteer."""
+        if candidate.population:
+            return candidate.population
+        try:
+            if self._gazetteer is None:
+                self._gazetteer = Gazetteer.load_default()
+            query = f"{candidate.name},{candidate.country_code}" if candidate.country_code else candidate.name
+            best = None
+            for place_id in self._gazetteer.lookup_ids(query, limit=10):
+                distance = haversine_km(candidate.lat, candidate.lon, *self._gazetteer.get_coordinates(place_id))
+                if distance <= GAZETTEER_MATCH_KM and (best is None or distance < best[0]):
+                    best = (distance, place_id)
+            return self._gazetteer.get_population(best[1]) if best else 0
+        except Exception as e:
+            logger.debug(f"Popolazione non disponibile per {candidate.name}: {e}")
+            return 0
+
+    @staticmethod
+    def _matches(value: str, *targets: str) -> bool:
+        key = search_key(value)
+        return bool(key) and any(search_key(target).startswith(key) for target in targets if target)
+
+    def score(self, candidate: LocationCandidate, state: str = "", country: str = "",
+              origin: Optional[Tuple[float, float]] = None) -> float:
+        """Punteggio (logaritmico) di un candidato: più alto è meglio."""
+        population = self._population(candidate)
+        if population and not candidate.population:
+            candidate.population = population
+        score = math.log10(population + 10)
+
+        if origin is not None and origin[0] is not None and origin[1] is not None:
+            distance = haversine_km(origin[0], origin[1], candidate.lat, candidate.lon)
+            score -= DISTANCE_WEIGHT * math.log10(1 + distance / 100)
+        if country and self._matches(country, candidate.country_code, candidate.country):
+            score += COUNTRY_MATCH_BONUS
+        if state and self._matches(state, candidate.state):
+            score += STATE_MATCH_BONUS
+
+        chosen = self._get_selections().get(self.candidate_key(candidate), 0)
+        if chosen:
+            score += SELECTION_WEIGHT * math.log2(1 + chosen)
+        return score
+
+    def rank(self, candidates: List[LocationCandidate], state: str = "", country: str = "",
+             origin: Optional[Tuple[float, float]] = None) -> List[LocationCandidate]:
+        """Candidati ordinati per punteggio, con ``relevance_score`` in percentuale."""
+        if not candidates:
+            return []
+        scored = [(self.score(candidate, state, country, origin), index, candidate)
+                  for index, candidate in enumerate(candidates)]
+        # A parità di punteggio resta l'ordine dell'API
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        top = scored[0][0]
+        weights = [math.exp(item[0] - top) for item in scored]
+        total = sum(weights)
+        for weight, (_, _, candidate) in zip(weights, scored):
+            candidate.relevance_score = 100 * weight / total
+        return [candidate for _, _, candidate in scored]
+
+
+class TemperaturePreviewService:
+    """Temperatura attuale, in forma compatta, per i candidati in cima alla lista.
+
+    Usa l'endpoint ``/data/2.5/weather`` (una sola osservazione, molto più
+    leggero della previsione completa) con una sessione HTTP condivisa. Le
+    richieste per più candidati partono insieme e i risultati restano in
+    memoria per ``PREVIEW_TTL`` secondi.
+    """
+
+    def __init__(self, api_key: Optional[str] = None):
+        load_dotenv()
+        self.api_key = api_key or os.getenv("API_KEY") or os.getenv("OPENWEATHER_API_KEY")
+        self._session = requests.Session()
+        self._cache: Dict[Tuple[str, str], Tuple[Dict[str, Any], float]] = {}
+        self._lock = threading.Lock()
+
+    def get_preview(self, lat: float, lon: float, unit: str = "metric") -> Optional[Dict[str, Any]]:
+        """Temperatura e icona attuali (``temp``, ``icon``), o None se non disponibili."""
+        key = (f"{lat:.2f},{lon:.2f}", unit)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.time() - entry[1] < PREVIEW_TTL:
+                return entry[0]
+
+        try:
+            response = self._session.get(
+                f"{API_BASE_URL}{API_CURRENT_WEATHER_ENDPOINT}",
+                params={"lat": lat, "lon": lon, "units": unit, "appid": self.api_key},
+                timeout=PREVIEW_TIMEOUT
+            )
+            response.raise_for_status()
+            data = response.json()
+            preview = {
+                "temp": round(data["main"]["temp"]),
+                "icon": (data.get("weather") or [{}])[0].get("icon", "")
+            }
+        except (requests.exceptions.RequestException, KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Anteprima meteo non disponibile per {lat}, {lon}: {e}")
+            return None
+
+        with self._lock:
+            self._cache[key] = (preview, time.time())
+            if len(self._cache) > MAX_PREVIEWS_KEPT:
+                oldest = min(self._cache, key=lambda k: self._cache[k][1])
+                del self._cache[oldest]
+        return preview
+
+    async def get_previews(self, candidates: List[LocationCandidate], unit: str = "metric",
+                           limit: int = PREVIEW_CANDIDATES) -> List[Optional[Dict[str, Any]]]:
+        """Anteprime per i primi ``limit`` candidati, richieste in parallelo."""
+        return await asyncio.gather(*(
+            asyncio.to_thread(self.get_preview, candidate.lat, candidate.lon, unit)
+            for candidate in candidates[:limit]
+        ))
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+
+import gzip
+import heapq
+import math
+import re
+import tempfile
+import threading
+import zipfile
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+import logging
+
+import requests
+
+from services.data.sqlite_storage_backend import normalize_location_name
+from utils.config import GAZETTEER_DOWNLOAD_URL, GAZETTEER_ADMIN1_URL, GAZETTEER_DOWNLOAD_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_GAZETTEER = Path(__file__).resolve().parents[2] / "assets" / "gazetteer" / "cities.tsv"
+USER_GAZETTEER_FILENAME = "gazetteer.tsv.gz"  # dataset completo generato con build_gazetteer()
+FUZZY_MIN_SCORE = 0.5
+MAX_ALTERNATE_NAMES = 8
+PREFIX_CACHE_MAX_LENGTH = 2   # i prefissi più corti coprono molte chiavi: risultati memorizzati
+EARTH_RADIUS_KM = 6371.0088
+
+_install_lock = threading.Lock()  # una sola sessione scarica il dataset completo
+
+
+def search_key(text: str) -> str:
+    """Chiave di ricerca: nome normalizzato senza punteggiatura."""
+    return " ".join(re.findall(r"\w+", normalize_location_name(text)))
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distanza ortodromica in chilometri tra due coordinate."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Gazetteer:
+    """Gazetteer offline per la ricerca delle città senza chiamate di rete.
+
+    I luoghi sono conservati in colonne compatte (liste e ``array``) e
+    indicizzati da un array ordinato di chiavi normalizzate (nome e nomi
+    alternativi), interrogato con ricerca binaria per match esatti e per
+    prefisso. L'indice a trigrammi per la ricerca fuzzy viene costruito solo
+    alla prima richiesta.
+
+    I risultati hanno lo stesso formato di ``/geo/1.0/direct`` (name, lat,
+    lon, country, state) più ``population``.
+
+    Al primo avvio è disponibile solo il campione incluso negli asset:
+    ``install_complete`` scarica il dataset completo e lo carica al posto del
+    campione (``reload``), incrementando ``revision``.
+    """
+
+    def __init__(self, source: Optional[Path] = None):
+        self.source = Path(source) if source else BUNDLED_GAZETTEER
+        # Il campione incluso negli asset contiene solo le città principali
+        self.is_complete = self.source != BUNDLED_GAZETTEER
+        self._names: List[str] = []
+        self._countries: List[str] = []
+        self._states: List[str] = []
+        self._lats = array("d")
+        self._lons = array("d")
+        self._populations = array("q")
+        self._keys: List[str] = []            # chiavi ordinate
+        self._key_places: List[Tuple[int, ...]] = []  # luoghi per chiave
+        self._trigram_index: Optional[Dict[str, array]] = None
+        self._trigram_counts: Optional[array] = None
+        self._prefix_cache: Dict[Tuple[str, int], List[int]] = {}
+        self._lock = threading.Lock()
+        self.revision = 0  # incrementata da ogni reload: gli ID dei luoghi cambiano
+        self._load(self.source)
+
+    @classmethod
+    def load_default(cls) -> "Gazetteer":
+        """Carica il dataset completo in ``storage/data`` se presente,
+        altrimenti quello ridotto incluso negli asset."""
+        source = None
+        try:
+            from services.data.local_storage_service import LocalStorageService
+            user_file = LocalStorageService().get_data_path(USER_GAZETTEER_FILENAME)
+            if user_file.exists():
+                source = user_file
+        except Exception as e:
+            logger.warning(f"Gazetteer utente non disponibile: {e}")
+        return cls(source)
+
+    @staticmethod
+    def user_gazetteer_path() -> Path:
+        """Percorso del dataset completo in ``storage/data``."""
+        from services.data.local_storage_service import LocalStorageService
+        return LocalStorageService().get_data_path(USER_GAZETTEER_FILENAME)
+
+    def reload(self, source: Path):
+        """Sostituisce i luoghi con quelli di ``source`` mantenendo l'istanza.
+
+        Il nuovo dataset viene caricato a parte e scambiato sotto il lock, così
+        che i servizi che condividono l'istanza vedano subito il nuovo dataset.
+        """
+        fresh = Gazetteer(source)
+        state = {name: value for name, value in vars(fresh).items() if name not in ("_lock", "revision")}
+        with self._lock:
+            vars(self).update(state)
+            self.revision += 1
+
+    def install_complete(self) -> bool:
+        """Scarica il dataset completo se manca, lo carica e ne prepara gli indici.
+
+        Operazione bloccante, da eseguire fuori dal loop della UI.
+
+        Returns:
+            bool: True se il gazetteer è ora completo
+        """
+        if self.is_complete:
+            return True
+        destination = self.user_gazetteer_path()
+        with _install_lock:
+            if not destination.exists():
+                download_gazetteer(destination)
+        self.reload(destination)
+        self.prepare_fuzzy_index()
+        return self.is_complete
+
+    # ------------------------------------------------------------------
+    # Caricamento
+    # ------------------------------------------------------------------
+
+    def _load(self, path: Path):
+        if not path.exists():
+            logger.warning(f"Gazetteer non trovato: {path}")
+            return
+        opener = gzip.open if path.suffix == ".gz" else open
+        entries: Dict[str, set] = {}
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) < 6:
+                    continue
+                try:
+                    lat, lon, population = float(parts[3]), float(parts[4]), int(parts[5] or 0)
+                except ValueError:
+                    continue
+                place_id = len(self._names)
+                self._names.append(parts[0])
+                self._countries.append(parts[1])
+                self._states.append(parts[2])
+                self._lats.append(lat)
+                self._lons.append(lon)
+                self._populations.append(population)
+                alternates = parts[6].split("|") if len(parts) > 6 and parts[6] else []
+                for name in [parts[0]] + alternates:
+                    key = search_key(name)
+                    if key:
+                        entries.setdefault(key, set()).add(place_id)
+
+        self._keys = sorted(entries)
+        # Per ogni chiave i luoghi sono già ordinati per popolazione decrescente
+        self._key_places = [
+            tuple(sorted(entries[key], key=lambda i: -self._populations[i])) for key in self._keys
+        ]
+        logger.info(f"Gazetteer caricato: {len(self._names)} luoghi, {len(self._keys)} chiavi ({path.name})")
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    # ------------------------------------------------------------------
+    # Accesso ai luoghi
+    # ------------------------------------------------------------------
+
+    def get_place(self, place_id: int) -> Dict[str, Any]:
+        """Luogo nel formato della risposta di geocoding di OpenWeatherMap."""
+        return {
+            "name": self._names[place_id],
+            "lat": self._lats[place_id],
+            "lon": self._lons[place_id],
+            "country": self._countries[place_id],
+            "state": self._states[place_id],
+            "population": self._populations[place_id],
+        }
+
+    def get_population(self, place_id: int) -> int:
+        return self._populations[place_id]
+
+    def get_coordinates(self, place_id: int) -> Tuple[float, float]:
+        return self._lats[place_id], self._lons[place_id]
+
+    # ------------------------------------------------------------------
+    # Ricerca
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _parse_query(query: str) -> Tuple[str, List[str]]:
+        """Separa "città,stato,paese" nella chiave della città e nei qualificatori."""
+        parts = [search_key(part) for part in (query or "").split(",")]
+        parts = [part for part in parts if part]
+        if not parts:
+            return "", []
+        return parts[0], parts[1:]
+
+    def _matches_qualifiers(self, place_id: int, qualifiers: List[str]) -> bool:
+        country = self._countries[place_id].casefold()
+        state = search_key(self._states[place_id])
+        for qualifier in qualifiers:
+            if qualifier == country or (state and state.startswith(qualifier)):
+                continue
+            return False
+        return True
+
+    def _filter(self, place_ids: Iterable[int], qualifiers: List[str], limit: int) -> List[int]:
+        result = []
+        for place_id in place_ids:
+            if place_id in result or not self._matches_qualifiers(place_id, qualifiers):
+                continue
+            result.append(place_id)
+            if len(result) >= limit:
+                break
+        return result
+
+    def _exact_ids(self, key: str) -> Tuple[int, ...]:
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return self._key_places[index]
+        return ()
+
+    def _prefix_ids(self, prefix: str, max_results: Optional[int] = None) -> List[int]:
+        """Luoghi con una chiave che inizia per ``prefix``, per popolazione decrescente."""
+        cache_key = (prefix, max_results or 0)
+        if len(prefix) <= PREFIX_CACHE_MAX_LENGTH and cache_key in self._prefix_cache:
+            return self._prefix_cache[cache_key]
+
+        ids = set()
+        index = bisect_left(self._keys, prefix)
+        while index < len(self._keys) and self._keys[index].startswith(prefix):
+            ids.update(self._key_places[index])
+            index += 1
+        if max_results is not None and len(ids) > max_results:
+            result = heapq.nlargest(max_results, ids, key=self._populations.__getitem__)
+        else:
+            result = sorted(ids, key=lambda i: -self._populations[i])
+
+        if len(prefix) <= PREFIX_CACHE_MAX_LENGTH:
+            self._prefix_cache[cache_key] = result
+        return result
+
+    def lookup_ids(self, query: str, limit: int = 5) -> List[int]:
+        """ID dei luoghi il cui nome coincide con la query (match esatto normalizzato)."""
+        key, qualifiers = self._parse_query(query)
+        if not key:
+            return []
+        return self._filter(self._exact_ids(key), qualifiers, limit)
+
+    def prefix_ids(self, query: str, limit: int = 10, max_candidates: Optional[int] = None) -> List[int]:
+        """ID dei luoghi il cui nome inizia per la query: prima i match esatti.
+
+        ``max_candidates`` limita i luoghi considerati ai più popolosi, così che
+        i prefissi molto corti restino economici.
+        """
+        key, qualifiers = self._parse_query(query)
+        if not key:
+            return []
+        exact = self._exact_ids(key)
+        return self._filter(list(exact) + self._prefix_ids(key, max_candidates), qualifiers, limit)
+
+    def fuzzy_ids(self, query: str, limit: int = 5, min_score: float = FUZZY_MIN_SCORE) -> List[int]:
+        """ID dei luoghi con nome simile (coefficiente di Dice sui trigrammi)."""
+        key, qualifiers = self._parse_query(query)
+        if not key or not self._keys:
+            return []
+        index, counts = self._get_trigram_index()
+        query_trigrams = _trigrams(key)
+        shared = Counter()
+        for trigram in query_trigrams:
+            postings = index.get(trigram)
+            if postings is not None:
+                shared.update(postings)
+
+        scored = []
+        for key_id, common in shared.items():
+            score = 2.0 * common / (len(query_trigrams) + counts[key_id])
+            if score >= min_score:
+                scored.append((score, key_id))
+        scored.sort(key=lambda item: (-item[0], -self._populations[self._key_places[item[1]][0]]))
+
+        return self._filter(
+            (place_id for _, key_id in scored for place_id in self._key_places[key_id]),
+            qualifiers, limit
+        )
+
+    def prepare_fuzzy_index(self):
+        """Costruisce subito l'indice a trigrammi (da chiamare fuori dal loop della UI)."""
+        self._get_trigram_index()
+
+    def _get_trigram_index(self) -> Tuple[Dict[str, array], array]:
+        with self._lock:
+            if self._trigram_index is None:
+                postings: Dict[str, array] = {}
+                counts = array("H")
+                for key_id, key in enumerate(self._keys):
+                    trigrams = _trigrams(key)
+                    counts.append(len(trigrams))
+                    for trigram in trigrams:
+                        postings.setdefault(trigram, array("I")).append(key_id)
+                self._trigram_index = postings
+                self._trigram_counts = counts
+            return self._trigram_index, self._trigram_counts
+
+    def lookup(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Match esatti normalizzati (vedi ``covers`` per sapere se sono tutti)."""
+        return [self.get_place(place_id) for place_id in self.lookup_ids(query, limit)]
+
+    def covers(self, query: str) -> bool:
+        """Se i match esatti di ``lookup`` possono sostituire la chiamata all'API.
+
+        Vale con il dataset completo, oppure quando la query indica anche lo
+        stato o il paese: con il solo campione incluso negli asset un nome
+        senza qualificatori può corrispondere ad altre città omonime.
+        """
+        if self.is_complete:
+            return True
+        _, qualifiers = self._parse_query(query)
+        return bool(qualifiers)
+
+    def search(self, query: str, limit: int = 5, fuzzy: bool = True) -> List[Dict[str, Any]]:
+        """Ricerca tollerante: prefisso e, se non basta, similarità per trigrammi."""
+        place_ids = self.prefix_ids(query, limit)
+        if fuzzy and len(place_ids) < limit:
+            for place_id in self.fuzzy_ids(query, limit):
+                if place_id not in place_ids:
+                    place_ids.append(place_id)
+                    if len(place_ids) >= limit:
+                        break
+        return [self.get_place(place_id) for place_id in place_ids]
+
+
+def build_gazetteer(source: Path, destination: Path, min_population: int = 15000,
+                    admin1_codes: Optional[Path] = None) -> int:
+    """Converte un dump GeoNames (es. ``cities15000.txt``) nel formato compatto.
+
+    Tiene il nome, al più ``MAX_ALTERNATE_NAMES`` nomi alternativi distinti,
+    il paese, lo stato (se ``admin1CodesASCII.txt`` è fornito), le coordinate
+    arrotondate a 4 decimali e la popolazione. Il risultato va salvato in
+    ``storage/data/gazetteer.tsv.gz`` per essere usato al posto del dataset
+    incluso.
+
+    Returns:
+        int: numero di luoghi scritti
+    """
+    states: Dict[str, str] = {}
+    if admin1_codes:
+        with open(admin1_codes, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) >= 2:
+                    states[parts[0]] = parts[1]
+
+    written = 0
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    with open(source, "r", encoding="utf-8") as src, \
+            gzip.open(destination, "wt", encoding="utf-8", compresslevel=9) as dst:
+        dst.write("# name\tcountry\tstate\tlat\tlon\tpopulation\talternate_names\n")
+        for line in src:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) < 15:
+                continue
+            try:
+                population = int(parts[14] or 0)
+            except ValueError:
+                continue
+            if population < min_population:
+                continue
+
+            name, country = parts[1], parts[8]
+            seen = {search_key(name)}
+            alternates = []
+            for alternate in [parts[2]] + parts[3].split(","):
+                key = search_key(alternate)
+                if key and key not in seen and len(key) <= 40:
+                    seen.add(key)
+                    alternates.append(alternate)
+                    if len(alternates) >= MAX_ALTERNATE_NAMES:
+                        break
+
+            dst.write("\t".join((
+                name, country, states.get(f"{country}.{parts[10]}", ""),
+                f"{float(parts[4]):.4f}", f"{float(parts[5]):.4f}", str(population),
+                "|".join(alternates)
+            )) + "\n")
+            written += 1
+
+    logger.info(f"Gazetteer generato: {written} luoghi in {destination}")
+    return written
+
+
+def download_gazetteer(destination: Path, url: str = GAZETTEER_DOWNLOAD_URL,
+                       admin1_url: Optional[str] = GAZETTEER_ADMIN1_URL,
+                       timeout: float = GAZETTEER_DOWNLOAD_TIMEOUT) -> int:
+    """Scarica il dump GeoNames e lo converte con ``build_gazetteer``.
+
+    Il file viene scritto accanto a ``destination`` e rinominato solo a
+    conversione finita, così che un download interrotto non lasci un
+    dataset parziale. I nomi degli stati sono facoltativi: se il download di
+    ``admin1_url`` fallisce il dataset viene generato senza.
+
+    Returns:
+        int: numero di luoghi scritti
+    """
+    destination = Path(destination)
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = Path(tmp) / "cities.zip"
+        response = requests.get(url, timeout=timeout)
+        response.raise_for_status()
+        archive.write_bytes(response.content)
+        with zipfile.ZipFile(archive) as zf:
+            member = next(name for name in zf.namelist() if name.endswith(".txt"))
+            source = Path(zf.extract(member, tmp))
+
+        admin1_codes = None
+        if admin1_url:
+            try:
+                response = requests.get(admin1_url, timeout=timeout)
+                response.raise_for_status()
+                admin1_codes = Path(tmp) / "admin1CodesASCII.txt"
+                admin1_codes.write_bytes(response.content)
+            except requests.RequestException as e:
+                logger.warning(f"Nomi degli stati non disponibili: {e}")
+
+        partial = destination.with_name(destination.name + ".part")
+        written = build_gazetteer(source, partial, admin1_codes=admin1_codes)
+        partial.replace(destination)
+    return written
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Any, Tuple
+import logging
+
+import requests
+from dotenv import load_dotenv
+
+from services.location.gazetteer import Gazetteer, haversine_km, search_key
+from services.location.spatial_index import ReverseGeocoder
+from utils.config import (
+    API_BASE_URL,
+    API_GEO_ENDPOINT,
+    API_REVERSE_GEO_ENDPOINT,
+    GEOCODE_CACHE_TTL_DAYS,
+    GEOCODE_NEGATIVE_TTL_DAYS,
+    GEOCODE_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+API_RESULT_LIMIT = 5                  # risultati chiesti all'API, indipendentemente dal limite richiesto
+CACHE_FILENAME = "geocode_cache.json"  # usato solo senza backend SQLite
+OFFLINE_REVERSE_RADIUS_KM = 50
+DUPLICATE_PLACE_KM = 20               # luoghi locali e dell'API più vicini di così sono lo stesso luogo
+
+
+class Geocoder:
+    """Punto unico per il geocoding diretto e inverso.
+
+    Ogni query viene normalizzata (casefold, NFKD, senza punteggiatura) e
+    cercata nel gazetteer offline; se questo non basta a rispondere (vedi
+    ``Gazetteer.covers``) i suoi risultati vengono uniti a quelli della cache
+    persistente o dell'API ``/geo/1.0``, chiamata tramite un'unica sessione
+    HTTP condivisa.
+    I risultati dell'API restano in cache per ``GEOCODE_CACHE_TTL_DAYS``
+    (le coordinate dei luoghi non cambiano), quelli vuoti per
+    ``GEOCODE_NEGATIVE_TTL_DAYS``.
+
+    L'applicazione ne crea uno per sessione (``page.session``), insieme al
+    gazetteer, all'indice di reverse geocoding e all'autocompletamento che
+    riceve i risultati dell'API.
+    """
+
+    FORWARD = "forward"
+    REVERSE = "reverse"
+
+    def __init__(self, api_key: Optional[str] = None, storage_service=None,
+                 gazetteer: Optional[Gazetteer] = None, reverse_geocoder: Optional[ReverseGeocoder] = None,
+                 autocomplete=None):
+        load_dotenv()
+        self.api_key = api_key or os.getenv("API_KEY") or os.getenv("OPENWEATHER_API_KEY")
+        self.gazetteer = gazetteer or Gazetteer.load_default()
+        self.reverse_geocoder = reverse_geocoder or ReverseGeocoder(self.gazetteer)
+        self.autocomplete = autocomplete  # AutocompleteService da aggiornare con i risultati dell'API
+        self._session = requests.Session()
+        self._lock = threading.RLock()
+        self._cache: Dict[str, Dict[str, Tuple[Any, float]]] = {self.FORWARD: {}, self.REVERSE: {}}
+        self._storage = storage_service
+        self._load_cache()
+
+    # ------------------------------------------------------------------
+    # Chiavi di cache
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Chiave di una query "città,stato,paese": ogni parte normalizzata."""
+        parts = [search_key(part) for part in (query or "").split(",")]
+        return ",".join(part for part in parts if part)
+
+    @staticmethod
+    def coordinate_key(lat: float, lon: float) -> str:
+        """Chiave di una posizione, arrotondata a circa 100 m."""
+        return f"{float(lat):.3f},{float(lon):.3f}"
+
+    # ------------------------------------------------------------------
+    # Persistenza
+    # ------------------------------------------------------------------
+
+    def _get_storage(self):
+        if self._storage is None:
+            from services.data.local_storage_service import LocalStorageService
+            self._storage = LocalStorageService()
+        return self._storage
+
+    @staticmethod
+    def _ttl(data: Any) -> float:
+        days = GEOCODE_CACHE_TTL_DAYS if data else GEOCODE_NEGATIVE_TTL_DAYS
+        return days * SECONDS_PER_DAY
+
+    def _load_cache(self):
+        """Carica le voci non scadute e rimuove quelle vecchie."""
+        try:
+            storage = self._get_storage()
+            oldest = time.time() - GEOCODE_CACHE_TTL_DAYS * SECONDS_PER_DAY
+            if storage.supports_rows:
+                for kind in (self.FORWARD, self.REVERSE):
+                    storage.sqlite.purge_geocode_cache(kind, oldest)
+                    entries = storage.sqlite.load_geocode_cache(kind, oldest)
+                    self._cache[kind] = {key: (data, fetched) for key, data, fetched in entries}
+            else:
+                stored = storage.load_json(storage.cache_dir / CACHE_FILENAME, {})
+                for kind in (self.FORWARD, self.REVERSE):
+                    self._cache[kind] = {
+                        key: (entry[0], entry[1]) for key, entry in stored.get(kind, {}).items()
+                        if entry[1] >= oldest
+                    }
+        except Exception as e:
+            logger.error(f"Impossibile caricare la cache del geocoding: {e}")
+            return
+
+        # Le posizioni già risolte tornano disponibili all'indice spaziale
+        for key, (place, _) in self._cache[self.REVERSE].items():
+            if place:
+                lat, lon = (float(value) for value in key.split(","))
+                self.reverse_geocoder.remember(lat, lon, place)
+        logger.info(f"Cache geocoding: {len(self._cache[self.FORWARD])} ricerche, "
+                    f"{len(self._cache[self.REVERSE])} posizioni")
+
+    def _cache_get(self, kind: str, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._cache[kind].get(key)
+        if entry is None:
+            return False, None
+        data, fetched = entry
+        if time.time() - fetched > self._ttl(data):
+            return False, None
+        return True, data
+
+    def _cache_put(self, kind: str, key: str, data: Any):
+        fetched = time.time()
+        with self._lock:
+            self._cache[kind][key] = (data, fetched)
+        try:
+            storage = self._get_storage()
+            if storage.supports_rows:
+                storage.sqlite.save_geocode_result(kind, key, data, fetched)
+            else:
+                with self._lock:
+                    snapshot = {k: {key: list(entry) for key, entry in entries.items()}
+                                for k, entries in self._cache.items()}
+                storage.save_json(snapshot, storage.cache_dir / CACHE_FILENAME)
+        except Exception as e:
+            logger.error(f"Impossibile salvare la cache del geocoding: {e}")
+
+    def clear_cache(self):
+        """Svuota la cache in memoria e su disco."""
+        with self._lock:
+            for entries in self._cache.values():
+                entries.clear()
+        try:
+            storage = self._get_storage()
+            if storage.supports_rows:
+                for kind in (self.FORWARD, self.REVERSE):
+                    storage.sqlite.purge_geocode_cache(kind, float("inf"))
+            else:
+                storage.delete_file(storage.cache_dir / CACHE_FILENAME)
+        except Exception as e:
+            logger.error(f"Impossibile svuotare la cache del geocoding: {e}")
+
+    # ------------------------------------------------------------------
+    # Geocoding diretto
+    # ------------------------------------------------------------------
+
+    def forward(self, query: str, limit: int = API_RESULT_LIMIT, raise_errors: bool = False,
+                cache_misses: bool = True) -> List[Dict[str, Any]]:
+        """Luoghi per una query "città[,stato][,paese]" nel formato di ``/geo/1.0/direct``.
+
+        Args:
+            query: testo cercato
+            limit: numero massimo di risultati
+            raise_errors: rilancia gli errori di rete se non ci sono alternative locali
+            cache_misses: memorizza anche le risposte vuote (da evitare per i
+                prefissi digitati durante l'autocompletamento)
+
+        Returns:
+            Lista di luoghi (vuota se nessun risultato)
+        """
+        key = self.normalize_query(query)
+        if not key:
+            return []
+
+        gazetteer = self.gazetteer
+        local = gazetteer.lookup(query, limit=limit)
+        if local and gazetteer.covers(query):
+            return local
+
+        hit, cached = self._cache_get(self.FORWARD, key)
+        if hit:
+            return self._merge_places(local, cached, limit)
+
+        try:
+            response = self._session.get(
+                f"{API_BASE_URL}{API_GEO_ENDPOINT}",
+                params={"q": query, "limit": max(limit, API_RESULT_LIMIT), "appid": self.api_key},
+                timeout=GEOCODE_TIMEOUT
+            )
+            response.raise_for_status()
+            data = response.json() or []
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Errore nel geocoding di '{query}': {e}")
+            # Offline: i luoghi locali più simili, senza metterli in cache
+            suggestions = local or gazetteer.search(query, limit=limit)
+            if suggestions or not raise_errors:
+                return suggestions
+            raise
+
+        places = [
+            {key_name: item.get(key_name) for key_name in ("name", "lat", "lon", "country", "state")
+             if item.get(key_name) is not None}
+            for item in data
+        ]
+        if places or cache_misses:
+            self._cache_put(self.FORWARD, key, places)
+        self._remember_for_autocomplete(places)
+        return self._merge_places(local, places, limit)
+
+    @staticmethod
+    def _merge_places(local: List[Dict[str, Any]], remote: List[Dict[str, Any]],
+                      limit: int) -> List[Dict[str, Any]]:
+        """Luoghi del gazetteer seguiti da quelli dell'API che non li duplicano."""
+        merged = list(local)
+        for place in remote:
+            duplicate = any(
+                other.get("country") == place.get("country")
+                and haversine_km(other["lat"], other["lon"], place["lat"], place["lon"]) <= DUPLICATE_PLACE_KM
+                for other in local
+            )
+            if not duplicate:
+                merged.append(dict(place))
+        return merged[:limit]
+
+    async def forward_async(self, query: str, limit: int = API_RESULT_LIMIT,
+                            raise_errors: bool = False, cache_misses: bool = True) -> List[Dict[str, Any]]:
+        """Come ``forward``, eseguito in un thread per non bloccare il loop."""
+        import asyncio
+        return await asyncio.to_thread(self.forward, query, limit, raise_errors, cache_misses)
+
+    def _remember_for_autocomplete(self, places: List[Dict[str, Any]]):
+        if not places or self.autocomplete is None:
+            return
+        try:
+            self.autocomplete.remember(places)
+        except Exception as e:
+            logger.debug(f"Autocompletamento non aggiornato: {e}")
+
+    # ------------------------------------------------------------------
+    # Geocoding inverso
+    # ------------------------------------------------------------------
+
+    def reverse(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        """Luogo per le coordinate (name, state, country, lat, lon), o None."""
+        geocoder = self.reverse_geocoder
+        try:
+            local = geocoder.resolve(lat, lon)
+        except Exception as e:
+            logger.error(f"Reverse geocoding locale non riuscito: {e}")
+            local = None
+        if local is not None:
+            return local
+
+        key = self.coordinate_key(lat, lon)
+        hit, cached = self._cache_get(self.REVERSE, key)
+        if hit:
+            return dict(cached) if cached else None
+
+        try:
+            response = self._session.get(
+                f"{API_BASE_URL}{API_REVERSE_GEO_ENDPOINT}",
+                params={"lat": lat, "lon": lon, "limit": 1, "appid": self.api_key},
+                timeout=GEOCODE_TIMEOUT
+            )
+            response.raise_for_status()
+            data = response.json() or []
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Errore nel reverse geocoding: {e}")
+            return geocoder.nearest_place(lat, lon, max_km=OFFLINE_REVERSE_RADIUS_KM)
+
+        place = None
+        if data:
+            place = {
+                "name": data[0].get("name", "Unknown"),
+                "state": data[0].get("state", ""),
+                "country": data[0].get("country", ""),
+                "lat": data[0].get("lat", lat),
+                "lon": data[0].get("lon", lon)
+            }
+            geocoder.remember(lat, lon, place)
+        self._cache_put(self.REVERSE, key, place)
+        return place
+
+    async def reverse_async(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        """Come ``reverse``, eseguito in un thread per non bloccare il loop."""
+        import asyncio
+        return await asyncio.to_thread(self.reverse, lat, lon)
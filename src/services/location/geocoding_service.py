@@ -3,10 +3,11 @@
 import os
 from typing import List, Dict, Optional
 import logging
-import aiohttp
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
+from services.location.geocoder import Geocoder
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,7 +36,7 @@ class LocationCandidate:
 class GeocodingService:
     """Servizio di geocoding professionale con API esterne."""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, geocoder: Optional[Geocoder] = None):
         # Trova il file .env nella cartella src
         current_dir = os.path.dirname(os.path.abspath(__file__))
         src_dir = os.path.join(current_dir, '..', '..')
@@ -46,11 +47,19 @@ class GeocodingService:
         
         # Prova entrambi i nomi di variabile
         self.api_key = api_key or os.getenv("OPENWEATHER_API_KEY") or os.getenv("API_KEY")
-        self.base_url = "https://api.openweathermap.org/geo/1.0"
         logger.info(f"GeocodingService inizializzato con API OpenWeatherMap - API Key: {'✅ Presente' if self.api_key else '❌ Mancante'}")
         logger.info(f"File .env caricato da: {env_path}")
         if not self.api_key:
             logger.error("ATTENZIONE: Chiave API OpenWeatherMap non trovata nelle variabili d'ambiente!")
+        
+        # Geocoder della sessione; se non fornito ne viene creato uno al primo uso
+        self.geocoder = geocoder
+    
+    def get_geocoder(self) -> Geocoder:
+        """Geocoder condiviso della sessione, creato al primo uso se non fornito."""
+        if self.geocoder is None:
+            self.geocoder = Geocoder(self.api_key)
+        return self.geocoder
     
     async def search_by_structured_input(self, city: str, state: str = "", country: str = "") -> List[LocationCandidate]:
         """Cerca località usando input strutturato (città, stato, paese)."""
@@ -73,23 +82,10 @@ class GeocodingService:
             return []
     
     async def _geocode_query(self, query: str, limit: int = 5) -> List[LocationCandidate]:
-        """Esegue geocoding tramite API OpenWeatherMap."""
-        url = f"{self.base_url}/direct"
-        params = {
-            "q": query,
-            "limit": limit,
-            "appid": self.api_key
-        }
-        
+        """Esegue geocoding tramite il geocoder condiviso (cache, gazetteer, API)."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_geocoding_response(data)
-                    else:
-                        logger.error(f"API Error: {response.status}")
-                        return []
+            data = await self.get_geocoder().forward_async(query, limit)
+            return self._parse_geocoding_response(data)
         except Exception as ex:
             logger.error(f"Errore nell'API geocoding: {ex}")
             return []
@@ -116,7 +112,8 @@ class GeocodingService:
                     country_code=country,
                     state=state,
                     lat=lat,
-                    lon=lon
+                    lon=lon,
+                    population=int(item.get("population", 0) or 0)
                 )
                 
                 candidates.append(candidate)
@@ -156,25 +153,13 @@ class GeocodingService:
         return -90 <= lat <= 90 and -180 <= lon <= 180
     
     async def reverse_geocode(self, lat: float, lon: float) -> Optional[LocationCandidate]:
-        """Geocoding inverso: da coordinate a località."""
-        url = f"{self.base_url}/reverse"
-        params = {
-            "lat": lat,
-            "lon": lon,
-            "limit": 1,
-            "appid": self.api_key
-        }
-        
+        """Geocoding inverso: da coordinate a località (prima in locale, poi via API)."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        candidates = self._parse_geocoding_response(data)
-                        return candidates[0] if candidates else None
-                    else:
-                        logger.error(f"Reverse geocoding error: {response.status}")
-                        return None
+            place = await self.get_geocoder().reverse_async(lat, lon)
         except Exception as ex:
             logger.error(f"Errore nel reverse geocoding: {ex}")
             return None
+        if not place:
+            return None
+        candidates = self._parse_geocoding_response([place])
+        return candidates[0] if candidates else None
@@ -4,16 +4,84 @@ Handles all geolocation functionality.
 """
 
 import flet as ft
+import asyncio
 import threading
 import time
 import logging
+from dataclasses import dataclass
 from typing import Callable, Optional, Tuple
 
-from utils.config import GEO_ACCURACY, GEO_DISTANCE_FILTER, GEO_UPDATE_INTERVAL
+from services.location.gazetteer import haversine_km
+from utils.config import (
+    GEO_ACCURACY,
+    GEO_DISTANCE_FILTER,
+    GEO_REFRESH_MIN_INTERVAL,
+    GEO_DATA_MAX_AGE,
+    GEO_HYSTERESIS_RATIO
+)
+
+
+@dataclass
+class LocationRefreshPolicy:
+    """
+    Decides when a new position is worth a weather refresh.
+
+    The anchor is the position of the last refresh. A new position triggers
+    a refresh only once it is ``distance_m`` away from the anchor; when the
+    data is older than ``max_age`` a shorter move (``distance_m`` times
+    ``hysteresis_ratio``) is enough. GPS jitter around a single threshold
+    therefore never causes back-to-back refreshes, and refreshes are spaced
+    at least ``min_interval`` seconds apart.
+    """
+    distance_m: float = GEO_DISTANCE_FILTER
+    min_interval: float = GEO_REFRESH_MIN_INTERVAL
+    max_age: float = GEO_DATA_MAX_AGE
+    hysteresis_ratio: float = GEO_HYSTERESIS_RATIO
+    anchor_lat: Optional[float] = None
+    anchor_lon: Optional[float] = None
+    anchor_time: float = 0.0
+
+    def mark(self, lat: float, lon: float, now: Optional[float] = None) -> None:
+        """Record that the weather was refreshed for this position"""
+        self.anchor_lat, self.anchor_lon = lat, lon
+        self.anchor_time = time.monotonic() if now is None else now
+
+    def reset(self) -> None:
+        """Forget the last refresh, so the next position always counts"""
+        self.anchor_lat = self.anchor_lon = None
+        self.anchor_time = 0.0
+
+    def distance_moved(self, lat: float, lon: float) -> float:
+        """Meters between the position and the anchor"""
+        if self.anchor_lat is None or self.anchor_lon is None:
+            return float("inf")
+        return haversine_km(self.anchor_lat, self.anchor_lon, lat, lon) * 1000
+
+    def should_refresh(self, lat: float, lon: float, now: Optional[float] = None) -> bool:
+        """Check if the position is far enough from the anchor"""
+        now = time.monotonic() if now is None else now
+        threshold = self.distance_m
+        if now - self.anchor_time >= self.max_age:
+            threshold *= self.hysteresis_ratio
+        return self.distance_moved(lat, lon) >= threshold
+
+    def wait_time(self, now: Optional[float] = None) -> float:
+        """Seconds to wait before the next refresh is allowed"""
+        if self.anchor_lat is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.min_interval - (now - self.anchor_time))
+
 
 class GeolocationService:
     """
     Service for handling geolocation functionality.
+
+    Position updates are event driven: the Geolocator only reports moves
+    larger than its distance filter, and each report goes through a
+    ``LocationRefreshPolicy`` before the location callback runs. A
+    stationary device does no work at all, and at most one callback runs at
+    a time; positions received meanwhile are coalesced into the latest one.
     """
     
     def __init__(self):
@@ -22,8 +90,12 @@ class GeolocationService:
         self._is_tracking = False
         self._current_lat = None
         self._current_lon = None
-        self._update_thread = None
-        self._stop_thread = False
+        self._page: Optional[ft.Page] = None
+        self._policy = LocationRefreshPolicy()
+        self._lock = threading.Lock()
+        self._dispatching = False
+        self._pending = False
+        self._deferred_check = None
     
     @property
     def is_tracking(self) -> bool:
@@ -39,6 +111,11 @@ class GeolocationService:
     def has_coordinates(self) -> bool:
         """Check if coordinates are available"""
         return self._current_lat is not None and self._current_lon is not None
+
+    @property
+    def refresh_policy(self) -> LocationRefreshPolicy:
+        """Policy deciding which position changes trigger the callback"""
+        return self._policy
     
     async def get_current_location(self, page: ft.Page) -> Tuple[Optional[float], Optional[float]]:
         """
@@ -94,22 +171,11 @@ class GeolocationService:
             True if tracking started successfully, False otherwise
         """
         try:
+            self._page = page
             self._location_callback = on_location_change
             
-            # Define position change handler
-            def handle_position_change(e):
-                if e.latitude and e.longitude:
-                    # Store coordinates
-                    self._current_lat = e.latitude
-                    self._current_lon = e.longitude
-                    
-                    # Update UI
-                    try:
-                        page.update()
-                    except Exception as e:
-                        logging.error(f"Error updating UI: {e}")
-            
-            # Create geolocator
+            # Create geolocator. The platform filter uses the lower hysteresis
+            # threshold, so moves that only count for old data still arrive.
             self._geolocator = ft.Geolocator(
                 location_settings=ft.GeolocatorSettings(
                     accuracy=(
@@ -117,9 +183,9 @@ class GeolocationService:
                         if GEO_ACCURACY == "high" 
                         else ft.GeolocatorPositionAccuracy.REDUCED
                     ),
-                    distance_filter=GEO_DISTANCE_FILTER
+                    distance_filter=int(GEO_DISTANCE_FILTER * GEO_HYSTERESIS_RATIO)
                 ),
-                on_position_change=handle_position_change,
+                on_position_change=self._handle_position_change,
                 on_error=lambda e: logging.error(f"Geolocation error: {e.data}"),
             )
             
@@ -128,7 +194,6 @@ class GeolocationService:
             page.update()
             
             # Request permission with timeout
-            import asyncio
             try:
                 permission = await asyncio.wait_for(
                     self._geolocator.request_permission_async(), 
@@ -158,12 +223,6 @@ class GeolocationService:
                 logging.error(f"Error starting position watcher: {e}")
                 return False
             
-            # Start update thread
-            self._stop_thread = False
-            self._update_thread = threading.Thread(target=self._update_ui_thread, args=(page,))
-            self._update_thread.daemon = True
-            self._update_thread.start()
-            
             return True
         except Exception as e:
             logging.error(f"Error starting location tracking: {e}")
@@ -175,30 +234,76 @@ class GeolocationService:
             if self._geolocator and self._is_tracking:
                 await self._geolocator.stop_position_watcher_async()
                 self._is_tracking = False
-            
-            # Stop update thread
-            self._stop_thread = True
-            if self._update_thread and self._update_thread.is_alive():
-                self._update_thread.join(1)  # Wait max 1 second
+            self._cancel_deferred_check()
         except Exception as e:
             logging.error(f"Error stopping location tracking: {e}")
     
     def set_location_callback(self, callback: Optional[Callable]) -> None:
         """Set or clear the location change callback"""
         self._location_callback = callback
-    
-    def _update_ui_thread(self, page: ft.Page) -> None:
-        """Thread that periodically updates the UI with new coordinates"""
-        while not self._stop_thread:
-            if self._current_lat and self._current_lon and self._location_callback:
-                try:
-                    # Get current coordinates
-                    lat, lon = self._current_lat, self._current_lon
-                    
-                    # Update UI asynchronously
-                    page.invoke_async(lambda: self._location_callback(lat, lon))
-                except Exception as e:
-                    logging.error(f"Error updating UI from thread: {e}")
-            
-            # Wait before next check
-            time.sleep(GEO_UPDATE_INTERVAL)
+        if callback is None:
+            self._cancel_deferred_check()
+
+    def mark_refreshed(self, lat: float, lon: float) -> None:
+        """Record a weather refresh for these coordinates, made by any caller"""
+        with self._lock:
+            self._policy.mark(lat, lon)
+
+    def _handle_position_change(self, e) -> None:
+        """Store the new position and pass it through the refresh policy"""
+        if e.latitude is None or e.longitude is None:
+            return
+        self._current_lat = e.latitude
+        self._current_lon = e.longitude
+        self._evaluate_position()
+
+    def _evaluate_position(self) -> None:
+        """Dispatch the latest position to the callback if the policy allows it"""
+        page, callback = self._page, self._location_callback
+        if page is None or callback is None or not self.has_coordinates:
+            return
+
+        with self._lock:
+            if self._dispatching:
+                # A refresh is running: the latest position is checked when it ends
+                self._pending = True
+                return
+            lat, lon = self._current_lat, self._current_lon
+            if not self._policy.should_refresh(lat, lon):
+                return
+            delay = self._policy.wait_time()
+            if delay > 0:
+                if self._deferred_check is None:
+                    self._deferred_check = page.run_task(self._check_later, delay)
+                return
+            self._policy.mark(lat, lon)
+            self._dispatching = True
+
+        logging.info(f"Position moved, refreshing for {lat}, {lon}")
+        page.run_task(self._dispatch, callback, lat, lon)
+
+    async def _dispatch(self, callback: Callable, lat: float, lon: float) -> None:
+        try:
+            result = callback(lat, lon)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logging.error(f"Error in location callback: {e}")
+        finally:
+            with self._lock:
+                self._dispatching = False
+                pending, self._pending = self._pending, False
+            if pending:
+                self._evaluate_position()
+
+    async def _check_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        with self._lock:
+            self._deferred_check = None
+        self._evaluate_position()
+
+    def _cancel_deferred_check(self) -> None:
+        with self._lock:
+            future, self._deferred_check = self._deferred_check, None
+        if future is not None:
+            future.cancel()
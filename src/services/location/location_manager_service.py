@@ -1,24 +1,42 @@
 #!/usr/bin/env python3
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Tuple
+from bisect import bisect_left, insort
 from datetime import datetime
+import re
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from services.data.local_storage_service import LocalStorageService
+from services.data.sqlite_storage_backend import normalize_location_name
+from services.location.spatial_index import ReverseGeocoder
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class LocationManagerService:
-    """Servizio per gestire le località salvate dall'utente."""
+    """Servizio per gestire le località salvate dall'utente.
+
+    Oltre alla lista ``locations`` (ordine di inserimento) mantiene in memoria
+    degli indici aggiornati in modo incrementale: ID → località, insieme dei
+    preferiti, indice ordinato dei prefissi dei nomi normalizzati per la
+    ricerca e l'ordine di visualizzazione (preferiti, poi alfabetico).
+    """
     
-    def __init__(self):
+    def __init__(self, reverse_geocoder: Optional[ReverseGeocoder] = None):
+        # Indice spaziale delle località salvate, condiviso con il reverse geocoding
+        self.reverse_geocoder = reverse_geocoder or ReverseGeocoder()
         self.storage_service = LocalStorageService()
         self.storage_path = self.storage_service.get_data_path("saved_locations.json")
         self.locations = []
         self.last_selected_location = None
+        self._by_id: Dict[str, Dict] = {}
+        self._favorite_ids: Set[str] = set()
+        self._order: List[Tuple] = []               # chiavi di ordinamento ordinate
+        self._order_keys: Dict[str, Tuple] = {}
+        self._name_index: List[Tuple[str, str]] = []  # (token normalizzato, id) ordinati
+        self._name_tokens: Dict[str, List[str]] = {}
         self.load_locations()
         
         logger.info(f"LocationManagerService inizializzato - File: {self.storage_path}")
@@ -26,7 +44,10 @@ class LocationManagerService:
     def load_locations(self) -> List[Dict]:
         """Carica le località salvate dal file."""
         try:
-            data = self.storage_service.load_json(self.storage_path, {})
+            if self.storage_service.supports_rows:
+                data = self._load_rows()
+            else:
+                data = self.storage_service.load_json(self.storage_path, {})
             
             if "locations" in data:
                 self.locations = data["locations"]
@@ -68,17 +89,145 @@ class LocationManagerService:
                 self.last_selected_location = "roma_it"
                 self.save_locations()
                 
+            self._rebuild_index()
             logger.info(f"Caricate {len(self.locations)} località")
             return self.locations
             
         except Exception as e:
             logger.error(f"Errore nel caricare le località: {e}")
             self.locations = []
+            self._rebuild_index()
             return []
     
+    # ------------------------------------------------------------------
+    # Indici in memoria
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _name_key(name: str) -> str:
+        """Nome normalizzato senza punteggiatura, usato per ordinamento e duplicati."""
+        return " ".join(re.findall(r"\w+", normalize_location_name(name)))
+    
+    @staticmethod
+    def _name_terms(location: Dict) -> List[str]:
+        """Token normalizzati indicizzati per una località (nome e paese)."""
+        norm = normalize_location_name(f"{location.get('name', '')} {location.get('country', '')}")
+        return sorted(set(re.findall(r"\w+", norm)))
+    
+    @classmethod
+    def _sort_key(cls, location: Dict) -> Tuple:
+        """Ordine di visualizzazione: preferiti prima, poi per nome."""
+        return (
+            not location.get('favorite', False),
+            cls._name_key(location.get('name', '')),
+            location['id']
+        )
+    
+    def _index_location(self, location: Dict):
+        location_id = location['id']
+        self._by_id[location_id] = location
+        if location.get('favorite', False):
+            self._favorite_ids.add(location_id)
+        key = self._sort_key(location)
+        self._order_keys[location_id] = key
+        insort(self._order, key)
+        terms = self._name_terms(location)
+        self._name_tokens[location_id] = terms
+        for term in terms:
+            insort(self._name_index, (term, location_id))
+        self.reverse_geocoder.add_saved_location(location)
+    
+    def _unindex_location(self, location_id: str):
+        self._by_id.pop(location_id, None)
+        self._favorite_ids.discard(location_id)
+        key = self._order_keys.pop(location_id, None)
+        if key is not None:
+            self._remove_sorted(self._order, key)
+        for term in self._name_tokens.pop(location_id, []):
+            self._remove_sorted(self._name_index, (term, location_id))
+        self.reverse_geocoder.remove_saved_location(location_id)
+    
+    @staticmethod
+    def _remove_sorted(items: List, item):
+        index = bisect_left(items, item)
+        if index < len(items) and items[index] == item:
+            del items[index]
+    
+    def _rebuild_index(self):
+        """Ricostruisce tutti gli indici dalla lista delle località."""
+        self._by_id = {loc['id']: loc for loc in self.locations}
+        self._favorite_ids = {loc['id'] for loc in self.locations if loc.get('favorite', False)}
+        self._order_keys = {loc['id']: self._sort_key(loc) for loc in self.locations}
+        self._order = sorted(self._order_keys.values())
+        self._name_tokens = {loc['id']: self._name_terms(loc) for loc in self.locations}
+        self._name_index = sorted(
+            (term, location_id)
+            for location_id, terms in self._name_tokens.items()
+            for term in terms
+        )
+        self.reverse_geocoder.set_saved_locations(self.locations)
+    
+    def _ids_with_prefix(self, prefix: str) -> Set[str]:
+        """ID delle località con almeno un token che inizia per ``prefix``."""
+        ids = set()
+        index = bisect_left(self._name_index, (prefix,))
+        while index < len(self._name_index) and self._name_index[index][0].startswith(prefix):
+            ids.add(self._name_index[index][1])
+            index += 1
+        return ids
+    
+    def _generate_location_id(self, name: str) -> str:
+        """ID leggibile derivato dal nome, reso unico tramite l'indice per ID."""
+        base_id = re.sub(r"\W+", "_", normalize_location_name(name)).strip("_") or "location"
+        location_id = base_id
+        suffix = 2
+        while location_id in self._by_id:
+            location_id = f"{base_id}_{suffix}"
+            suffix += 1
+        return location_id
+    
+    def _load_rows(self) -> Dict:
+        """Legge le località dal database, nello stesso formato del file JSON."""
+        db = self.storage_service.sqlite
+        if not db.get_meta("locations_initialized"):
+            return {}
+        return {
+            "locations": db.get_all_locations(),
+            "last_selected_location": db.get_meta("last_selected_location")
+        }
+    
+    def _save_location_row(self, location: Dict) -> bool:
+        """Persiste una singola località (upsert di riga se disponibile)."""
+        if not self.storage_service.supports_rows:
+            return self.save_locations()
+        try:
+            self.storage_service.sqlite.upsert_location(location)
+            return True
+        except Exception as e:
+            logger.error(f"Errore nel salvataggio della località {location.get('id')}: {e}")
+            return False
+    
+    def _save_last_selected(self) -> bool:
+        """Persiste solo l'ultima località selezionata."""
+        if not self.storage_service.supports_rows:
+            return self.save_locations()
+        try:
+            self.storage_service.sqlite.set_meta("last_selected_location", self.last_selected_location)
+            return True
+        except Exception as e:
+            logger.error(f"Errore nel salvataggio della località selezionata: {e}")
+            return False
+    
     def save_locations(self) -> bool:
-        """Salva le località nel file."""
+        """Salva tutte le località (riscrittura completa)."""
         try:
+            if self.storage_service.supports_rows:
+                db = self.storage_service.sqlite
+                db.replace_locations(self.locations)
+                db.set_meta("last_selected_location", self.last_selected_location)
+                db.set_meta("locations_initialized", "1")
+                return True
+            
             data = {
                 "locations": self.locations,
                 "last_selected_location": self.last_selected_location,
@@ -95,14 +244,15 @@ class LocationManagerService:
                     custom_layout: Dict = None) -> bool:
         """Aggiunge una nuova località."""
         try:
-            # Genera un ID unico
-            location_id = f"{name.lower().replace(' ', '_').replace(',', '').replace('.', '')}"
-            
-            # Controlla se esiste già
-            if any(loc['id'] == location_id for loc in self.locations):
+            # Controlla se esiste già una località con lo stesso nome normalizzato
+            name_key = self._name_key(name)
+            if any(self._order_keys[loc['id']][1] == name_key for loc in self.search_locations(name)):
                 logger.warning(f"Località {name} già esistente")
                 return False
             
+            # Genera un ID unico
+            location_id = self._generate_location_id(name)
+            
             # Layout di default se non specificato
             if custom_layout is None:
                 custom_layout = {
@@ -124,8 +274,9 @@ class LocationManagerService:
             }
             
             self.locations.append(new_location)
+            self._index_location(new_location)
             logger.info(f"Aggiunta località: {name}")
-            return self.save_locations()
+            return self._save_location_row(new_location)
             
         except Exception as e:
             logger.error(f"Errore nell'aggiunta della località: {e}")
@@ -134,17 +285,22 @@ class LocationManagerService:
     def remove_location(self, location_id: str) -> bool:
         """Rimuove una località."""
         try:
-            initial_count = len(self.locations)
-            self.locations = [loc for loc in self.locations if loc['id'] != location_id]
+            location = self._by_id.get(location_id)
+            if location is None:
+                return False
+            
+            self.locations.remove(location)
+            self._unindex_location(location_id)
             
             # Se la località rimossa era l'ultima selezionata, seleziona la prima disponibile
             if self.last_selected_location == location_id:
                 self.last_selected_location = self.locations[0]["id"] if self.locations else None
             
-            if len(self.locations) < initial_count:
-                logger.info(f"Rimossa località: {location_id}")
+            logger.info(f"Rimossa località: {location_id}")
+            if not self.storage_service.supports_rows:
                 return self.save_locations()
-            return False
+            self.storage_service.sqlite.delete_location(location_id)
+            return self._save_last_selected()
             
         except Exception as e:
             logger.error(f"Errore nella rimozione della località: {e}")
@@ -153,12 +309,24 @@ class LocationManagerService:
     def toggle_favorite(self, location_id: str) -> bool:
         """Alterna lo stato di preferito di una località."""
         try:
-            for location in self.locations:
-                if location['id'] == location_id:
-                    location['favorite'] = not location.get('favorite', False)
-                    logger.info(f"Toggle favorite per {location_id}: {location['favorite']}")
-                    return self.save_locations()
-            return False
+            location = self._by_id.get(location_id)
+            if location is None:
+                return False
+            
+            # Riposiziona la località nell'ordine di visualizzazione
+            self._remove_sorted(self._order, self._order_keys[location_id])
+            location['favorite'] = not location.get('favorite', False)
+            if location['favorite']:
+                self._favorite_ids.add(location_id)
+            else:
+                self._favorite_ids.discard(location_id)
+            self._order_keys[location_id] = self._sort_key(location)
+            insort(self._order, self._order_keys[location_id])
+            
+            logger.info(f"Toggle favorite per {location_id}: {location['favorite']}")
+            if not self.storage_service.supports_rows:
+                return self.save_locations()
+            return self.storage_service.sqlite.set_location_favorite(location_id, location['favorite'])
         except Exception as e:
             logger.error(f"Errore nel toggle favorite: {e}")
             return False
@@ -166,10 +334,10 @@ class LocationManagerService:
     def select_location(self, location_id: str) -> bool:
         """Seleziona una località come attiva (ultima selezionata)."""
         try:
-            if any(loc['id'] == location_id for loc in self.locations):
+            if location_id in self._by_id:
                 self.last_selected_location = location_id
                 logger.info(f"Selezionata località: {location_id}")
-                return self.save_locations()
+                return self._save_last_selected()
             return False
         except Exception as e:
             logger.error(f"Errore nella selezione della località: {e}")
@@ -178,22 +346,19 @@ class LocationManagerService:
     def update_location_layout(self, location_id: str, layout_config: Dict) -> bool:
         """Aggiorna il layout personalizzato di una località."""
         try:
-            for location in self.locations:
-                if location['id'] == location_id:
-                    location['custom_layout'] = layout_config
-                    logger.info(f"Aggiornato layout per {location_id}")
-                    return self.save_locations()
-            return False
+            location = self._by_id.get(location_id)
+            if location is None:
+                return False
+            location['custom_layout'] = layout_config
+            logger.info(f"Aggiornato layout per {location_id}")
+            return self._save_location_row(location)
         except Exception as e:
             logger.error(f"Errore nell'aggiornamento layout: {e}")
             return False
     
     def get_location_by_id(self, location_id: str) -> Optional[Dict]:
         """Ottiene una località per ID."""
-        for location in self.locations:
-            if location['id'] == location_id:
-                return location
-        return None
+        return self._by_id.get(location_id)
     
     def get_selected_location(self) -> Optional[Dict]:
         """Ottiene l'ultima località selezionata."""
@@ -204,20 +369,44 @@ class LocationManagerService:
         return None
     
     def get_favorite_locations(self) -> List[Dict]:
-        """Ottiene tutte le località marcate come preferite."""
-        return [loc for loc in self.locations if loc.get('favorite', False)]
+        """Ottiene tutte le località marcate come preferite (in ordine alfabetico)."""
+        # I preferiti occupano sempre la testa dell'ordine di visualizzazione
+        return [self._by_id[key[-1]] for key in self._order[:len(self._favorite_ids)]]
+    
+    def get_location_near(self, lat: float, lon: float, max_km: Optional[float] = None) -> Optional[Dict]:
+        """Località salvata entro ``max_km`` dalle coordinate (indice spaziale, senza rete)."""
+        geocoder = self.reverse_geocoder
+        if max_km is None:
+            return geocoder.saved_location_at(lat, lon)
+        return geocoder.saved_location_at(lat, lon, max_km)
     
     def get_all_locations(self) -> List[Dict]:
         """Ottiene tutte le località."""
         return self.locations.copy()
     
+    def get_sorted_locations(self) -> List[Dict]:
+        """Località nell'ordine di visualizzazione: selezionata, preferiti, poi per nome."""
+        selected_id = self.last_selected_location if self.last_selected_location in self._by_id else None
+        ordered = [self._by_id[selected_id]] if selected_id else []
+        ordered.extend(self._by_id[key[-1]] for key in self._order if key[-1] != selected_id)
+        return ordered
+    
     def search_locations(self, query: str) -> List[Dict]:
-        """Cerca località per nome."""
-        query_lower = query.lower()
-        return [
-            loc for loc in self.locations 
-            if query_lower in loc['name'].lower() or query_lower in loc.get('country', '').lower()
-        ]
+        """Cerca località per prefisso delle parole del nome o del paese.
+
+        Ogni parola della query deve essere il prefisso di una parola della
+        località; il confronto ignora maiuscole, accenti e punteggiatura.
+        """
+        terms = re.findall(r"\w+", normalize_location_name(query))
+        if not terms:
+            return []
+        
+        matches = self._ids_with_prefix(terms[0])
+        for term in terms[1:]:
+            if not matches:
+                break
+            matches &= self._ids_with_prefix(term)
+        return [self._by_id[location_id] for location_id in sorted(matches, key=self._order_keys.get)]
     
     def get_storage_info(self) -> Dict:
         """Ottiene informazioni sui file di storage."""
@@ -226,7 +415,9 @@ class LocationManagerService:
             "locations_file": str(self.storage_path),
             "locations_count": len(self.locations),
             "last_selected": self.last_selected_location,
-            "file_exists": self.storage_path.exists()
+            "file_exists": (self.storage_service.sqlite.db_path.exists()
+                            if self.storage_service.supports_rows
+                            else self.storage_path.exists())
         })
         return storage_info
     
@@ -235,6 +426,7 @@ class LocationManagerService:
         try:
             self.locations = []
             self.last_selected_location = None
+            self._rebuild_index()
             logger.info("Tutte le località sono state rimosse")
             return self.save_locations()
         except Exception as e:
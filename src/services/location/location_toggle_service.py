@@ -8,6 +8,7 @@ import flet as ft
 from typing import Callable, Awaitable
 
 from services.location.geolocation_service import GeolocationService
+from services.location.spatial_index import ReverseGeocoder
 from core.state_manager import StateManager
 
 class LocationToggleService:
@@ -23,7 +24,8 @@ class LocationToggleService:
         page: ft.Page, 
         geolocation_service: GeolocationService,
         state_manager: StateManager,
-        update_weather_callback: Callable[..., Awaitable[None]]
+        update_weather_callback: Callable[..., Awaitable[None]],
+        reverse_geocoder: ReverseGeocoder = None
     ):
         """
         Inizializza il servizio di location toggle.
@@ -33,11 +35,13 @@ class LocationToggleService:
             geolocation_service: Servizio di geolocalizzazione
             state_manager: Gestore dello stato
             update_weather_callback: Callback per aggiornare il meteo con coordinate
+            reverse_geocoder: Indice delle località salvate (quello della sessione)
         """
         self.page = page
         self.geolocation_service = geolocation_service
         self.state_manager = state_manager
         self.update_weather_callback = update_weather_callback
+        self.reverse_geocoder = reverse_geocoder or ReverseGeocoder()
         
     async def handle_location_toggle(self, e: ft.ControlEvent) -> None:
         """
@@ -93,9 +97,12 @@ class LocationToggleService:
             lon: Longitudine
         """
         try:
+            # Località salvata in cui si trova l'utente (indice spaziale locale)
+            saved_location = self.reverse_geocoder.saved_location_at(lat, lon)
             await self.state_manager.update_state({
                 "current_lat": lat,
-                "current_lon": lon
+                "current_lon": lon,
+                "current_saved_location": saved_location["id"] if saved_location else None
             })
             
             # Aggiorna il meteo solo se stiamo usando la posizione
@@ -116,6 +123,8 @@ class LocationToggleService:
         language = self.state_manager.get_state("language")
         unit = self.state_manager.get_state("unit")
         
+        # Le prossime posizioni vengono confrontate con questa
+        self.geolocation_service.mark_refreshed(lat, lon)
         await self.update_weather_callback(lat, lon, language, unit)
         logging.info(f"Meteo aggiornato con coordinate: {lat}, {lon}")
 
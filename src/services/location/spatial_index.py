@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Iterable, Tuple, Hashable
+import logging
+
+from services.location.gazetteer import Gazetteer, haversine_km
+from utils.config import REVERSE_GEOCODE_REUSE_KM, SAVED_LOCATION_RADIUS_KM, REVERSE_PLACE_RADIUS_KM
+
+logger = logging.getLogger(__name__)
+
+KM_PER_DEGREE_LAT = 111.2
+GRID_CELL_DEGREES = 0.25        # circa 28 km di latitudine per cella
+MAX_REMEMBERED_RESULTS = 500    # risultati di reverse geocoding dell'API conservati
+
+
+class GridSpatialIndex:
+    """Indice spaziale a griglia regolare (stile geohash) per ricerche di prossimità.
+
+    Ogni punto è assegnato alla cella ``(floor(lat/d), floor(lon/d))``; una
+    ricerca entro ``max_km`` visita solo le celle del riquadro che contiene il
+    cerchio di ricerca e calcola la distanza esatta (Haversine) sui punti
+    trovati.
+    """
+
+    def __init__(self, cell_degrees: float = GRID_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self._cells: Dict[Tuple[int, int], Dict[Hashable, Tuple[float, float]]] = {}
+        self._points: Dict[Hashable, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def add(self, item_id: Hashable, lat: float, lon: float):
+        """Inserisce o sposta un punto."""
+        self.remove(item_id)
+        self._points[item_id] = (lat, lon)
+        self._cells.setdefault(self._cell(lat, lon), {})[item_id] = (lat, lon)
+
+    def remove(self, item_id: Hashable) -> bool:
+        point = self._points.pop(item_id, None)
+        if point is None:
+            return False
+        cell = self._cell(*point)
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.pop(item_id, None)
+            if not bucket:
+                del self._cells[cell]
+        return True
+
+    def clear(self):
+        self._cells.clear()
+        self._points.clear()
+
+    def within(self, lat: float, lon: float, max_km: float) -> List[Tuple[float, Hashable]]:
+        """Punti entro ``max_km``, come coppie (distanza, id) ordinate per distanza."""
+        if not self._points:
+            return []
+        lat_span = max_km / KM_PER_DEGREE_LAT
+        cos_lat = max(math.cos(math.radians(min(89.0, abs(lat) + lat_span))), 1e-6)
+        lon_span = min(180.0, max_km / (KM_PER_DEGREE_LAT * cos_lat))
+
+        min_row, min_col = self._cell(lat - lat_span, lon - lon_span)
+        max_row, max_col = self._cell(lat + lat_span, lon + lon_span)
+        columns_per_turn = round(360 / self.cell_degrees)
+        if max_col - min_col + 1 >= columns_per_turn:
+            min_col, max_col = -columns_per_turn // 2, columns_per_turn // 2 - 1
+
+        found = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                # Le celle oltre l'antimeridiano corrispondono a longitudini traslate di 360°
+                wrapped = (col + columns_per_turn // 2) % columns_per_turn - columns_per_turn // 2
+                bucket = self._cells.get((row, wrapped))
+                if not bucket:
+                    continue
+                for item_id, (plat, plon) in bucket.items():
+                    distance = haversine_km(lat, lon, plat, plon)
+                    if distance <= max_km:
+                        found.append((distance, item_id))
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def nearest(self, lat: float, lon: float, max_km: float) -> Optional[Tuple[float, Hashable]]:
+        """Punto più vicino entro ``max_km`` (distanza, id), o None."""
+        found = self.within(lat, lon, max_km)
+        return found[0] if found else None
+
+
+class ReverseGeocoder:
+    """Risolve coordinate in nomi di luogo senza rete, quando possibile.
+
+    Indicizza le località salvate dall'utente, i risultati di reverse
+    geocoding già ottenuti dall'API per posizioni vicine e i luoghi del
+    gazetteer offline. Chi chiama l'API registra il risultato con
+    ``remember`` così che gli aggiornamenti di posizione successivi, quasi
+    identici, non generino nuove richieste.
+    """
+
+    def __init__(self, gazetteer: Gazetteer = None):
+        self._gazetteer = gazetteer
+        self._place_index: Optional[GridSpatialIndex] = None
+        self._place_revision = 0
+        self._saved_index = GridSpatialIndex()
+        self._saved: Dict[str, Dict[str, Any]] = {}
+        self._result_index = GridSpatialIndex()
+        self._results: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_result_id = 0
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Località salvate
+    # ------------------------------------------------------------------
+
+    def set_saved_locations(self, locations: Iterable[Dict[str, Any]]):
+        """Sostituisce le località salvate indicizzate."""
+        with self._lock:
+            self._saved_index.clear()
+            self._saved.clear()
+            for location in locations:
+                self.add_saved_location(location)
+
+    def add_saved_location(self, location: Dict[str, Any]):
+        if location.get("lat") is None or location.get("lon") is None:
+            return
+        with self._lock:
+            self._saved[location["id"]] = location
+            self._saved_index.add(location["id"], float(location["lat"]), float(location["lon"]))
+
+    def remove_saved_location(self, location_id: str):
+        with self._lock:
+            self._saved.pop(location_id, None)
+            self._saved_index.remove(location_id)
+
+    def saved_location_at(self, lat: float, lon: float,
+                          max_km: float = SAVED_LOCATION_RADIUS_KM) -> Optional[Dict[str, Any]]:
+        """La località salvata in cui si trova l'utente, se entro ``max_km``."""
+        with self._lock:
+            hit = self._saved_index.nearest(lat, lon, max_km)
+            return self._saved.get(hit[1]) if hit else None
+
+    # ------------------------------------------------------------------
+    # Gazetteer
+    # ------------------------------------------------------------------
+
+    def _get_place_index(self) -> GridSpatialIndex:
+        with self._lock:
+            if self._gazetteer is None:
+                self._gazetteer = Gazetteer.load_default()
+            # Un reload del gazetteer cambia gli ID dei luoghi: l'indice va ricostruito
+            if self._place_index is None or self._place_revision != self._gazetteer.revision:
+                index = GridSpatialIndex()
+                for place_id in range(len(self._gazetteer)):
+                    index.add(place_id, *self._gazetteer.get_coordinates(place_id))
+                self._place_index = index
+                self._place_revision = self._gazetteer.revision
+            return self._place_index
+
+    def nearest_place(self, lat: float, lon: float,
+                      max_km: float = REVERSE_PLACE_RADIUS_KM) -> Optional[Dict[str, Any]]:
+        """Luogo del gazetteer più vicino entro ``max_km``."""
+        hit = self._get_place_index().nearest(lat, lon, max_km)
+        if hit is None:
+            return None
+        place = self._gazetteer.get_place(hit[1])
+        place["distance_km"] = hit[0]
+        return place
+
+    # ------------------------------------------------------------------
+    # Risultati dell'API
+    # ------------------------------------------------------------------
+
+    def remember(self, lat: float, lon: float, place: Dict[str, Any]):
+        """Registra il risultato dell'API per la posizione interrogata."""
+        with self._lock:
+            result_id = self._next_result_id
+            self._next_result_id += 1
+            self._results[result_id] = dict(place)
+            self._result_index.add(result_id, lat, lon)
+            while len(self._results) > MAX_REMEMBERED_RESULTS:
+                oldest, _ = self._results.popitem(last=False)
+                self._result_index.remove(oldest)
+
+    def _remembered(self, lat: float, lon: float, max_km: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            hit = self._result_index.nearest(lat, lon, max_km)
+            if hit is None:
+                return None
+            self._results.move_to_end(hit[1])
+            return dict(self._results[hit[1]])
+
+    # ------------------------------------------------------------------
+    # Risoluzione
+    # ------------------------------------------------------------------
+
+    def resolve(self, lat: float, lon: float, reuse_km: float = REVERSE_GEOCODE_REUSE_KM) -> Optional[Dict[str, Any]]:
+        """Luogo per le coordinate senza chiamate di rete, o None se serve l'API.
+
+        Il risultato ha le chiavi di ``/geo/1.0/reverse`` (name, state,
+        country, lat, lon) più ``source``: ``cache`` o ``gazetteer``. Le
+        località salvate non forniscono il nome (è un'etichetta dell'utente):
+        si interrogano con ``saved_location_at``.
+        """
+        remembered = self._remembered(lat, lon, reuse_km)
+        if remembered is not None:
+            remembered["source"] = "cache"
+            return remembered
+
+        try:
+            place = self.nearest_place(lat, lon)
+        except Exception as e:
+            logger.warning(f"Gazetteer non disponibile per il reverse geocoding: {e}")
+            place = None
+        if place is not None:
+            place["source"] = "gazetteer"
+            return place
+        return None
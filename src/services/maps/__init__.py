@@ -5,5 +5,7 @@ Provides interactive weather map functionality.
 
 from .interactive_maps_service import InteractiveMapService
 from .map_data_service import MapDataService
+from .tile_cache import TileCache
+from .tile_scheduler import TileScheduler
 
-__all__ = ['InteractiveMapService', 'MapDataService']
+__all__ = ['InteractiveMapService', 'MapDataService', 'TileCache', 'TileScheduler']
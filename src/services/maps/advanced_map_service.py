@@ -6,12 +6,14 @@ Handles multiple map providers, layers, and animations.
 import logging
 import webbrowser
 import asyncio
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from dataclasses import dataclass
 from enum import Enum
 
 import flet as ft
 
+from services.maps.animation_frames import AnimationFramePipeline, AnimationFrame, FramePlayer, RADAR
+
 # Map provider configurations
 class MapProvider(Enum):
     WINDY = "windy"
@@ -149,6 +151,8 @@ class AdvancedMapService:
         # Animation state
         self.animation_active = False
         self.animation_timer = None
+        self.frame_pipeline: Optional[AnimationFramePipeline] = None
+        self.frame_player = FramePlayer()
         
     def get_available_layers(self, provider: MapProvider) -> List[WeatherLayer]:
         """Get available layers for a specific provider"""
@@ -255,40 +259,57 @@ class AdvancedMapService:
         """Check if provider supports forecast data"""
         return self.provider_configs.get(provider, {}).get("supports_forecast", False)
     
-    async def start_animation_cycle(self, lat: float, lon: float, duration_hours: int = 24):
-        """Start animated weather cycle (for demo purposes)"""
+    async def start_animation_cycle(self, lat: float, lon: float, duration_hours: int = 24,
+                                    on_frame: Optional[Callable[[AnimationFrame], None]] = None,
+                                    zoom: Optional[int] = None, width: int = 768, height: int = 512) -> bool:
+        """
+        Start an animated radar loop around a location.
+        
+        With ``on_frame`` the frames are built in-app (tiles fetched
+        concurrently, composited and cached) and handed to the callback at a
+        steady frame rate until ``stop_animation_cycle``. Without it the
+        animated radar map is opened in the browser.
+        
+        Returns:
+            True if the animation started
+        """
         if self.animation_active:
-            return
+            return True
+        
+        if on_frame is None:
+            return self.open_map(lat, lon, MapConfig(
+                provider=MapProvider.RAINVIEWER,
+                layer=WeatherLayer.RADAR,
+                zoom=zoom or self.current_config.zoom,
+                animation=True
+            ))
         
         self.animation_active = True
         try:
-            # This is a simplified animation - in reality you'd cycle through time periods
-            providers = [MapProvider.WINDY, MapProvider.VENTUSKY, MapProvider.METEOBLUE]
-            layers = [WeatherLayer.TEMPERATURE, WeatherLayer.PRECIPITATION, WeatherLayer.WIND]
+            if self.frame_pipeline is None:
+                shared = self.page.session.get('map_data_service') if self.page and self.page.session else None
+                self.frame_pipeline = AnimationFramePipeline(shared)
+            frames = await self.frame_pipeline.build_frames(
+                lat, lon, zoom or self.current_config.zoom, width, height,
+                kind=RADAR, hours=duration_hours
+            )
+            if not frames or not self.animation_active:
+                self.animation_active = False
+                return False
             
-            for i in range(duration_hours):
-                if not self.animation_active:
-                    break
-                
-                # Cycle through different configurations
-                provider = providers[i % len(providers)]
-                layer = layers[i % len(layers)]
-                
-                config = MapConfig(
-                    provider=provider,
-                    layer=layer,
-                    animation=True
-                )
-                
-                self.open_map(lat, lon, config)
-                await asyncio.sleep(2)  # Wait 2 seconds between changes
-                
-        finally:
+            self.logger.info(f"Playing radar animation with {len(frames)} frames")
+            task = self.frame_player.start(frames, on_frame)
+            task.add_done_callback(lambda _: setattr(self, "animation_active", False))
+            return True
+        except Exception as e:
+            self.logger.error(f"Error starting radar animation: {e}")
             self.animation_active = False
+            return False
     
     def stop_animation_cycle(self):
         """Stop the animation cycle"""
         self.animation_active = False
+        self.frame_player.stop()
         if self.animation_timer:
             self.animation_timer.cancel()
             self.animation_timer = None
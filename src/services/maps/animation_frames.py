@@ -0,0 +1,296 @@
+"""
+Animation Frames for MeteoApp.
+Builds radar and satellite animations from time-stepped map tiles.
+"""
+
+import asyncio
+import base64
+import io
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.maps.map_data_service import MapDataService
+from services.maps.tile_scheduler import lat_lon_to_tile
+from utils.config import (
+    MAP_TILE_SIZE,
+    MAP_TILE_CONCURRENCY,
+    RAINVIEWER_API_URL,
+    MAP_ANIMATION_FPS,
+    MAP_ANIMATION_MAX_FRAMES,
+    MAP_ANIMATION_MAX_SIZE,
+    MAP_ANIMATION_MAX_ZOOM,
+    MAP_ANIMATION_CACHE_FRAMES,
+    MAP_ANIMATION_INDEX_TTL
+)
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+RADAR = "radar"
+SATELLITE = "satellite"
+RADAR_NOWCAST = "radar_nowcast"  # tile cache layer of the forecast radar frames (short TTL)
+
+# Tile styles of the RainViewer public API: {size}/{z}/{x}/{y}/{color}/{options}.png
+TILE_STYLES = {
+    RADAR: "2/1_1",      # universal blue palette, smoothed, snow shown
+    SATELLITE: "0/0_0"   # infrared, raw
+}
+
+
+@dataclass
+class AnimationFrame:
+    """One composited frame of an animation."""
+    timestamp: int  # Unix time of the data
+    image: bytes    # PNG
+    width: int
+    height: int
+    tiles_missing: int = 0
+
+    def to_base64(self) -> str:
+        """Image as base64, for ``ft.Image(src_base64=...)``"""
+        return base64.b64encode(self.image).decode("ascii")
+
+
+class AnimationFramePipeline:
+    """
+    Pipeline that turns a region and a time range into animation frames.
+
+    The list of available timestamps comes from the RainViewer public API.
+    For each timestamp the tiles covering the region are fetched through
+    ``MapDataService`` (so they share its session and its tile cache),
+    all frames at once with at most ``MAP_TILE_CONCURRENCY`` requests in
+    flight. Each frame is then composited into a single PNG of the
+    requested size. Frames are kept in an LRU of
+    ``MAP_ANIMATION_CACHE_FRAMES`` entries; since the size of a frame is
+    capped at ``MAP_ANIMATION_MAX_SIZE``, the memory used is bounded by
+    frame count times resolution.
+    """
+
+    def __init__(self, map_data_service: Optional[MapDataService] = None,
+                 max_frames: int = MAP_ANIMATION_MAX_FRAMES,
+                 max_concurrent: int = MAP_TILE_CONCURRENCY,
+                 cache_frames: int = MAP_ANIMATION_CACHE_FRAMES):
+        self.map_data_service = map_data_service or MapDataService()
+        self.max_frames = max_frames
+        self.max_concurrent = max_concurrent
+        self.cache_frames = cache_frames
+        self._frames: "OrderedDict[Tuple, AnimationFrame]" = OrderedDict()
+        self._index: Optional[Dict] = None
+        self._index_time = 0.0
+        self._nowcast_paths: set = set()
+
+    async def get_timestamps(self, kind: str = RADAR, hours: Optional[float] = None) -> List[Tuple[int, str]]:
+        """
+        Available frames of a kind, oldest first.
+
+        Args:
+            kind: RADAR or SATELLITE
+            hours: Keep only the frames of the last ``hours`` hours
+
+        Returns:
+            (timestamp, tile path prefix) pairs
+        """
+        if self._index is None or time.monotonic() - self._index_time > MAP_ANIMATION_INDEX_TTL:
+            index = await self.map_data_service.get_json(RAINVIEWER_API_URL)
+            if index:
+                self._index, self._index_time = index, time.monotonic()
+                self._nowcast_paths = {entry.get("path") for entry in index.get("radar", {}).get("nowcast", [])}
+        if not self._index:
+            return []
+
+        if kind == RADAR:
+            radar = self._index.get("radar", {})
+            entries = radar.get("past", []) + radar.get("nowcast", [])
+        else:
+            entries = self._index.get("satellite", {}).get("infrared", [])
+
+        frames = sorted((entry["time"], entry["path"]) for entry in entries
+                        if "time" in entry and "path" in entry)
+        if hours is not None:
+            oldest = time.time() - hours * 3600
+            frames = [frame for frame in frames if frame[0] >= oldest]
+        return frames[-self.max_frames:]
+
+    def _tile_layer(self, kind: str, timestamp: int, path: str) -> str:
+        """
+        Tile cache layer of a frame.
+
+        The tile path is part of it, since RainViewer can publish a new path
+        for the same timestamp. Nowcast frames are forecasts and get their
+        own layer, so they expire with the short ``radar_nowcast`` TTL.
+        """
+        if kind == RADAR and path in self._nowcast_paths:
+            kind = RADAR_NOWCAST
+        return f"{kind}@{timestamp}-{path.strip('/').replace('/', '_')}"
+
+    @staticmethod
+    def _frame_tiles(lat: float, lon: float, zoom: int, width: int,
+                     height: int) -> List[Tuple[int, int, int, int]]:
+        """Tiles of a frame as (x, y, left, top): tile and where it goes in the image."""
+        n = 2 ** zoom
+        center_x, center_y = lat_lon_to_tile(lat, lon, zoom)
+        left = center_x * MAP_TILE_SIZE - width / 2
+        top = center_y * MAP_TILE_SIZE - height / 2
+
+        tiles = []
+        for tile_x in range(math.floor(left / MAP_TILE_SIZE), math.floor((left + width - 1) / MAP_TILE_SIZE) + 1):
+            for tile_y in range(math.floor(top / MAP_TILE_SIZE), math.floor((top + height - 1) / MAP_TILE_SIZE) + 1):
+                if 0 <= tile_y < n:
+                    tiles.append((tile_x % n, tile_y,
+                                  round(tile_x * MAP_TILE_SIZE - left), round(tile_y * MAP_TILE_SIZE - top)))
+        return tiles
+
+    async def build_frames(self, lat: float, lon: float, zoom: int, width: int, height: int,
+                           kind: str = RADAR, hours: Optional[float] = None) -> List[AnimationFrame]:
+        """
+        Fetch and composite the frames of an animation centered on a point.
+
+        Args:
+            lat, lon: Center of the region
+            zoom: Zoom level of the tiles
+            width, height: Size of each frame in pixels (the longest side is
+                capped at ``MAP_ANIMATION_MAX_SIZE``)
+            kind: RADAR or SATELLITE
+            hours: Time range, counted back from now
+
+        Returns:
+            Frames oldest first (empty if no data is available)
+        """
+        if not PIL_AVAILABLE:
+            logging.warning("Pillow is not installed: animation frames cannot be composited")
+            return []
+
+        scale = min(1.0, MAP_ANIMATION_MAX_SIZE / max(width, height, 1))
+        width, height = max(1, int(width * scale)), max(1, int(height * scale))
+        zoom = max(0, min(MAP_ANIMATION_MAX_ZOOM, int(zoom)))
+        timestamps = await self.get_timestamps(kind, hours)
+        if not timestamps:
+            return []
+
+        host = self._index.get("host", "https://tilecache.rainviewer.com")
+        style = TILE_STYLES.get(kind, TILE_STYLES[RADAR])
+        tiles = self._frame_tiles(lat, lon, zoom, width, height)
+        # The frame is identified by the pixel it is centered on, not the exact coordinates
+        center_x, center_y = lat_lon_to_tile(lat, lon, zoom)
+        region = (round(center_x * MAP_TILE_SIZE), round(center_y * MAP_TILE_SIZE), zoom, width, height)
+
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def fetch(timestamp: int, path: str, x: int, y: int) -> Optional[bytes]:
+            url = f"{host}{path}/{MAP_TILE_SIZE}/{zoom}/{x}/{y}/{style}.png"
+            async with semaphore:
+                return await self.map_data_service.get_tile((self._tile_layer(kind, timestamp, path), zoom, x, y), url)
+
+        async def build(timestamp: int, path: str) -> Optional[AnimationFrame]:
+            key = (kind, timestamp, path) + region
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                return frame
+            images = await asyncio.gather(*(fetch(timestamp, path, x, y) for x, y, _, _ in tiles))
+            frame = await asyncio.to_thread(self._composite, timestamp, tiles, images, width, height)
+            if frame is not None:
+                self._remember(key, frame)
+            return frame
+
+        frames = await asyncio.gather(*(build(timestamp, path) for timestamp, path in timestamps))
+        return [frame for frame in frames if frame is not None]
+
+    @staticmethod
+    def _composite(timestamp: int, tiles: List[Tuple[int, int, int, int]], images: List[Optional[bytes]],
+                   width: int, height: int) -> Optional[AnimationFrame]:
+        canvas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        missing = 0
+        for (_, _, left, top), data in zip(tiles, images):
+            if not data:
+                missing += 1
+                continue
+            try:
+                tile = Image.open(io.BytesIO(data)).convert("RGBA")
+            except Exception as e:
+                logging.warning(f"Invalid tile in frame {timestamp}: {e}")
+                missing += 1
+                continue
+            canvas.alpha_composite(tile, dest=(max(0, left), max(0, top)),
+                                   source=(max(0, -left), max(0, -top)))
+        if missing == len(tiles):
+            return None
+
+        buffer = io.BytesIO()
+        canvas.save(buffer, format="PNG", optimize=False)
+        return AnimationFrame(timestamp, buffer.getvalue(), width, height, missing)
+
+    def _remember(self, key: Tuple, frame: AnimationFrame) -> None:
+        self._frames[key] = frame
+        self._frames.move_to_end(key)
+        while len(self._frames) > self.cache_frames:
+            self._frames.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        """Drop the composited frames (tiles stay in the tile cache)."""
+        self._frames.clear()
+        self._index = None
+
+
+class FramePlayer:
+    """
+    Plays frames at a steady rate.
+
+    The deadline of each frame is computed from the start of playback, not
+    from the end of the previous frame, so slow ``on_frame`` callbacks do
+    not make the animation drift: when playback falls behind, frames are
+    skipped instead of delayed.
+    """
+
+    def __init__(self, fps: float = MAP_ANIMATION_FPS):
+        self.fps = fps
+        self._task: Optional[asyncio.Task] = None
+        self.frames_shown = 0
+        self.frames_skipped = 0
+
+    @property
+    def is_playing(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, frames: List[AnimationFrame],
+              on_frame: Callable[[AnimationFrame], Optional[Awaitable[None]]],
+              loop: bool = True) -> asyncio.Task:
+        """Start playback in the background (stops the current one)."""
+        self.stop()
+        self._task = asyncio.ensure_future(self.play(frames, on_frame, loop))
+        return self._task
+
+    async def play(self, frames: List[AnimationFrame],
+                   on_frame: Callable[[AnimationFrame], Optional[Awaitable[None]]],
+                   loop: bool = True) -> None:
+        """Show the frames, once or in a loop until ``stop``."""
+        if not frames:
+            return
+        interval = 1.0 / self.fps
+        started = time.monotonic()
+        tick = 0
+        while loop or tick < len(frames):
+            result = on_frame(frames[tick % len(frames)])
+            if asyncio.iscoroutine(result):
+                await result
+            self.frames_shown += 1
+
+            tick += 1
+            late = time.monotonic() - (started + tick * interval)
+            if late > interval:
+                skipped = int(late // interval)
+                tick += skipped
+                self.frames_skipped += skipped
+            await asyncio.sleep(max(0.0, started + tick * interval - time.monotonic()))
+
+    def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
@@ -4,10 +4,15 @@ Handles interactive weather map functionality with layers and real-time data.
 """
 
 import flet as ft
+import os
 import webbrowser
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import json
+from dotenv import load_dotenv
+
+from services.maps.map_data_service import MapDataService
+from services.maps.tile_compositor import TileCompositor
 
 
 class MapLayer:
@@ -23,14 +28,21 @@ class MapLayer:
         self.enabled = enabled
         self.opacity = 0.8
         self.animation_speed = 1.0
+    
+    @property
+    def tile_layer(self) -> str:
+        """OWM tile layer name (last part of the base URL, e.g. "clouds_new")."""
+        return self.base_url.rstrip('/').rsplit('/', 1)[-1]
 
 
 class InteractiveMapService:
     """Service for managing interactive weather maps with multiple layers."""
     
-    def __init__(self, page: ft.Page = None, state_manager=None):
+    def __init__(self, page: ft.Page = None, state_manager=None,
+                 map_data_service: Optional[MapDataService] = None):
         self.page = page
         self.state_manager = state_manager
+        self._map_data_service = map_data_service
         self.current_location = None
         self.zoom_level = 10
         self.available_layers = self._initialize_layers()
@@ -38,6 +50,7 @@ class InteractiveMapService:
         self.animation_enabled = True
         self.auto_refresh = True
         self.refresh_interval = 10  # minutes
+        self._compositor: Optional[TileCompositor] = None
         
     def _initialize_layers(self) -> Dict[str, MapLayer]:
         """Initialize available weather map layers."""
@@ -103,6 +116,41 @@ class InteractiveMapService:
         if layer_id in self.available_layers:
             self.available_layers[layer_id].opacity = max(0.0, min(1.0, opacity))
     
+    @property
+    def map_data_service(self) -> MapDataService:
+        """Map data service of the session (shared HTTP session and tile cache)."""
+        if self._map_data_service is None:
+            if self.page and self.page.session:
+                self._map_data_service = self.page.session.get('map_data_service')
+            if self._map_data_service is None:
+                load_dotenv()
+                self._map_data_service = MapDataService(api_key=os.getenv("API_KEY"))
+        return self._map_data_service
+    
+    @property
+    def compositor(self) -> TileCompositor:
+        """In-process compositor for the active layers (created on first use)."""
+        if self._compositor is None:
+            self._compositor = TileCompositor(self.map_data_service)
+        return self._compositor
+    
+    def get_composite_layers(self) -> List[Tuple[str, float]]:
+        """Enabled active layers as (tile layer, opacity), in drawing order."""
+        return [
+            (layer.tile_layer, layer.opacity)
+            for layer in self.active_layers
+            if layer.enabled and layer.opacity > 0
+        ]
+    
+    async def render_tile(self, zoom: int, x: int, y: int, base: bool = True) -> Optional[bytes]:
+        """
+        Render a map tile with the active layers blended over the base map (PNG).
+        
+        Meant for a native tile view; the current map dialogs still embed the
+        provider's web map, so nothing in the app calls this yet.
+        """
+        return await self.compositor.compose(zoom, x, y, self.get_composite_layers(), base=base)
+    
     def set_location(self, lat: float, lon: float):
         """Set the current map location."""
         self.current_location = (lat, lon)
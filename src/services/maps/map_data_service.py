@@ -4,46 +4,154 @@ Handles weather map data fetching and processing.
 """
 
 import asyncio
+import time
+import logging
 import aiohttp
-from typing import Dict, List, Optional
-from datetime import datetime
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from services.maps.tile_cache import TileCache, TileKey
+from utils.config import (
+    MAP_MAX_CONNECTIONS,
+    MAP_MAX_CONNECTIONS_PER_HOST,
+    MAP_REQUEST_TIMEOUT,
+    MAP_USER_AGENT,
+    MAP_WEATHER_CACHE_DURATION,
+    MAP_WEATHER_CACHE_MAX
+)
 
 
 class MapDataService:
-    """Service for fetching and processing weather map data."""
+    """
+    Service for fetching and processing weather map data.
+
+    All requests go through one long-lived ``aiohttp.ClientSession`` with a
+    bounded connection pool, so panning the map reuses connections instead
+    of opening one per tile. Tiles are cached by ``TileCache`` (memory and
+    disk), and concurrent requests for the same tile share a single fetch.
+    """
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, tile_cache: Optional[TileCache] = None):
         self.api_key = api_key or "demo_key"  # Replace with actual API key
         self.base_urls = {
             'openweather': 'https://api.openweathermap.org/data/2.5',
             'tiles': 'https://tile.openweathermap.org/map'
         }
-        self.cache = {}
-        self.cache_duration = 300  # 5 minutes
+        self.tile_cache = tile_cache if tile_cache is not None else TileCache()
+        self.cache: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+        self.cache_duration = MAP_WEATHER_CACHE_DURATION
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending_tiles: Dict[TileKey, asyncio.Future] = {}
+        self._tile_waiters: Dict[TileKey, int] = {}
+    
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=MAP_MAX_CONNECTIONS,
+                limit_per_host=MAP_MAX_CONNECTIONS_PER_HOST
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=MAP_REQUEST_TIMEOUT),
+                headers={"User-Agent": MAP_USER_AGENT}
+            )
+            self._session_loop = loop
+        return self._session
+    
+    async def close(self):
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
     
     async def get_weather_tiles(self, layer: str, zoom: int, x: int, y: int) -> Optional[bytes]:
         """Get weather map tiles for a specific layer."""
         url = f"{self.base_urls['tiles']}/{layer}/{zoom}/{x}/{y}.png"
-        params = {'appid': self.api_key}
+        return await self.get_tile((layer, zoom, x, y), url, {'appid': self.api_key})
+    
+    async def get_tile(self, key: TileKey, url: str, params: Optional[Dict] = None) -> Optional[bytes]:
+        """
+        Get a tile from the cache, or from ``url`` through the shared session.
+        
+        Args:
+            key: (layer, zoom, x, y) under which the tile is cached
+            url: Address of the tile image
+            params: Query parameters of the request
+        """
+        tile = await asyncio.to_thread(self.tile_cache.get, key)
+        if tile is not None:
+            return tile
+        
+        # A tile already being fetched is awaited, not requested again
+        pending = self._pending_tiles.get(key)
+        if pending is None or pending.get_loop() is not asyncio.get_running_loop():
+            pending = asyncio.ensure_future(self._fetch_tile(key, url, params))
+            self._pending_tiles[key] = pending
+            self._tile_waiters[key] = 0
+            pending.add_done_callback(lambda _: self._forget_pending(key, pending))
         
+        self._tile_waiters[key] += 1
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        return await response.read()
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            # The request is aborted only when nobody else is waiting for it
+            if self._tile_waiters.get(key) == 1 and not pending.done():
+                pending.cancel()
+            raise
+        finally:
+            if key in self._tile_waiters:
+                self._tile_waiters[key] -= 1
+    
+    def _forget_pending(self, key: TileKey, future: asyncio.Future):
+        if self._pending_tiles.get(key) is future:
+            del self._pending_tiles[key]
+            self._tile_waiters.pop(key, None)
+    
+    async def _fetch_tile(self, key: TileKey, url: str, params: Optional[Dict] = None) -> Optional[bytes]:
+        try:
+            session = await self.get_session()
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    tile = await response.read()
+                    await asyncio.to_thread(self.tile_cache.put, key, tile)
+                    return tile
+                logging.warning(f"Tile {key} returned HTTP {response.status}")
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            print(f"Error fetching tile: {e}")
+            logging.error(f"Error fetching tile: {e}")
         
+        # Better an old tile than an empty one
+        return await asyncio.to_thread(self.tile_cache.get, key, True)
+    
+    async def get_json(self, url: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """Get a JSON document through the shared session (None on errors)."""
+        try:
+            session = await self.get_session()
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    return await response.json()
+                logging.warning(f"{url} returned HTTP {response.status}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Error fetching {url}: {e}")
         return None
     
     async def get_current_weather_data(self, lat: float, lon: float) -> Optional[Dict]:
         """Get current weather data for map overlay."""
-        cache_key = f"weather_{lat}_{lon}"
+        cache_key = f"weather_{lat:.3f}_{lon:.3f}"
         
         # Check cache first
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if (datetime.now() - timestamp).seconds < self.cache_duration:
+        entry = self.cache.get(cache_key)
+        if entry is not None:
+            cached_data, timestamp = entry
+            if time.monotonic() - timestamp < self.cache_duration:
+                self.cache.move_to_end(cache_key)
                 return cached_data
         
         url = f"{self.base_urls['openweather']}/weather"
@@ -55,15 +163,18 @@ class MapDataService:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        # Cache the result
-                        self.cache[cache_key] = (data, datetime.now())
-                        return data
+            session = await self.get_session()
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    # Cache the result, evicting the least recently used points
+                    self.cache[cache_key] = (data, time.monotonic())
+                    self.cache.move_to_end(cache_key)
+                    while len(self.cache) > MAP_WEATHER_CACHE_MAX:
+                        self.cache.popitem(last=False)
+                    return data
         except Exception as e:
-            print(f"Error fetching weather data: {e}")
+            logging.error(f"Error fetching weather data: {e}")
         
         return None
     
@@ -105,8 +216,9 @@ class MapDataService:
         return configs.get(layer_type, {})
     
     def clear_cache(self):
-        """Clear the data cache."""
+        """Clear the data cache and the cached tiles."""
         self.cache.clear()
+        self.tile_cache.clear()
     
     def set_api_key(self, api_key: str):
         """Set the API key for weather data services."""
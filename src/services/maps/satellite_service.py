@@ -6,13 +6,15 @@ Gestisce i diversi provider di immagini satellitari e le loro funzionalità.
 import logging
 import webbrowser
 import asyncio
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 from datetime import datetime, timedelta
 
 import flet as ft
 
+from services.maps.animation_frames import AnimationFramePipeline, AnimationFrame, FramePlayer, SATELLITE
+
 
 class SatelliteProvider(Enum):
     """Provider di immagini satellitari"""
@@ -156,6 +158,10 @@ class SatelliteService:
             provider=SatelliteProvider.WINDY,
             layer=SatelliteLayer.VISIBLE
         )
+        
+        # Animazione nell'app (creata alla prima richiesta)
+        self.frame_pipeline: Optional[AnimationFramePipeline] = None
+        self.frame_player = FramePlayer()
     
     def get_available_layers(self, provider: SatelliteProvider) -> List[SatelliteLayer]:
         """Ottiene i layer disponibili per un provider specifico"""
@@ -284,8 +290,20 @@ class SatelliteService:
     
     async def create_satellite_animation(self, lat: float, lon: float, 
                                        provider: SatelliteProvider = SatelliteProvider.WINDY,
-                                       duration_hours: int = 12) -> bool:
-        """Crea un'animazione satellitare (aprendo URL in sequenza)"""
+                                       duration_hours: int = 12,
+                                       on_frame: Optional[Callable[[AnimationFrame], None]] = None,
+                                       zoom: Optional[int] = None,
+                                       width: int = 768, height: int = 512) -> bool:
+        """Crea un'animazione satellitare.
+        
+        Con ``on_frame`` i fotogrammi infrarossi della zona vengono scaricati
+        in parallelo, composti e riprodotti a frequenza costante dalla
+        memoria (fino a ``stop_satellite_animation``); altrimenti si apre la
+        vista animata del provider nel browser.
+        """
+        if on_frame is not None:
+            return await self._play_satellite_frames(lat, lon, duration_hours, on_frame, zoom, width, height)
+        
         if not self.supports_animation(provider):
             self.logger.warning(f"Provider {provider} does not support animation")
             return False
@@ -304,6 +322,32 @@ class SatelliteService:
             self.logger.error(f"Error creating satellite animation: {e}")
             return False
     
+    async def _play_satellite_frames(self, lat: float, lon: float, duration_hours: int,
+                                     on_frame: Callable[[AnimationFrame], None], zoom: Optional[int],
+                                     width: int, height: int) -> bool:
+        """Costruisce i fotogrammi satellitari e ne avvia la riproduzione."""
+        try:
+            if self.frame_pipeline is None:
+                shared = self.page.session.get('map_data_service') if self.page and self.page.session else None
+                self.frame_pipeline = AnimationFramePipeline(shared)
+            frames = await self.frame_pipeline.build_frames(
+                lat, lon, zoom or self.current_config.zoom_level, width, height,
+                kind=SATELLITE, hours=duration_hours
+            )
+            if not frames:
+                self.logger.warning("No satellite frames available for the animation")
+                return False
+            
+            self.frame_player.start(frames, on_frame)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error creating satellite animation: {e}")
+            return False
+    
+    def stop_satellite_animation(self):
+        """Ferma la riproduzione dell'animazione satellitare"""
+        self.frame_player.stop()
+    
     def get_best_provider_for_location(self, lat: float, lon: float) -> SatelliteProvider:
         """Suggerisce il miglior provider basato sulla posizione"""
         # Logica semplice - può essere estesa con regioni specifiche
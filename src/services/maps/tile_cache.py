@@ -0,0 +1,174 @@
+"""
+Tile Cache for MeteoApp.
+Two-tier (memory and disk) cache for weather map tiles.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from utils.config import MAP_TILE_MEMORY_BYTES, MAP_TILE_DEFAULT_TTL, MAP_TILE_TTL
+
+TileKey = Tuple[str, int, int, int]  # (layer, zoom, x, y)
+
+
+class TileCache:
+    """
+    Cache for map tiles with a memory tier and a disk tier.
+
+    The memory tier is an LRU bounded by the total size of the tile images,
+    not by their count. The disk tier stores each tile under
+    ``storage/cache/tiles/{layer}/{z}/{x}/{y}.png`` and uses the file
+    modification time as the fetch time. Both tiers expire tiles after the
+    time-to-live of their layer (``MAP_TILE_TTL``).
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = MAP_TILE_MEMORY_BYTES,
+                 ttl: Optional[Dict[str, float]] = None):
+        self._cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = dict(MAP_TILE_TTL if ttl is None else ttl)
+        self._memory: "OrderedDict[TileKey, Tuple[bytes, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def cache_dir(self) -> Path:
+        if self._cache_dir is None:
+            from services.data.local_storage_service import LocalStorageService
+            self._cache_dir = LocalStorageService().get_cache_path("tiles")
+        return self._cache_dir
+
+    @property
+    def memory_bytes(self) -> int:
+        """Size of the tiles currently held in memory"""
+        return self._memory_bytes
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get_ttl(self, layer: str) -> float:
+        """Seconds a tile of the layer stays valid ("radar@1700000000" uses the "radar" entry)"""
+        return self.ttl.get(layer.split("@", 1)[0], MAP_TILE_DEFAULT_TTL)
+
+    def tile_path(self, key: TileKey) -> Path:
+        layer, zoom, x, y = key
+        return self.cache_dir / layer / str(zoom) / str(x) / f"{y}.png"
+
+    def get(self, key: TileKey, allow_stale: bool = False) -> Optional[bytes]:
+        """
+        Get a tile from memory or disk.
+
+        Args:
+            key: (layer, zoom, x, y)
+            allow_stale: Return expired tiles too (e.g. when the network fails)
+
+        Returns:
+            The tile image, or None if not cached (or expired)
+        """
+        now = time.time()
+        ttl = self.get_ttl(key[0])
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                data, fetched = entry
+                if allow_stale or now - fetched < ttl:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return data
+
+        path = self.tile_path(key)
+        try:
+            fetched = path.stat().st_mtime
+            if not allow_stale and now - fetched >= ttl:
+                self.misses += 1
+                return None
+            data = path.read_bytes()
+        except OSError:
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        self._remember(key, data, fetched)
+        return data
+
+    def put(self, key: TileKey, data: bytes) -> None:
+        """Store a freshly fetched tile in both tiers"""
+        if not data:
+            return
+        self._remember(key, data, time.time())
+        path = self.tile_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so a concurrent reader never sees half a tile
+            temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logging.error(f"Error writing tile {key} to disk: {e}")
+
+    def _remember(self, key: TileKey, data: bytes, fetched: float) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous[0])
+            self._memory[key] = (data, fetched)
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_bytes:
+                _, (evicted, _) = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def clear_memory(self) -> None:
+        """Drop the memory tier only"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def clear(self) -> None:
+        """Drop all cached tiles, in memory and on disk"""
+        self.clear_memory()
+        for path in self.cache_dir.rglob("*.png"):
+            try:
+                path.unlink()
+            except OSError as e:
+                logging.error(f"Error removing cached tile {path}: {e}")
+
+    def purge_expired(self) -> int:
+        """
+        Delete expired tiles from disk, and the directories left empty
+        (each animation frame has a layer directory of its own).
+
+        Returns:
+            Number of tiles removed
+        """
+        removed = 0
+        now = time.time()
+        if not self.cache_dir.exists():
+            return 0
+        for layer_dir in self.cache_dir.iterdir():
+            if not layer_dir.is_dir():
+                continue
+            ttl = self.get_ttl(layer_dir.name)
+            for path in layer_dir.rglob("*.png"):
+                try:
+                    if now - path.stat().st_mtime >= ttl:
+                        path.unlink()
+                        removed += 1
+                except OSError:
+                    continue
+            # Deepest directories first, so that a parent is empty once its children are gone
+            for directory in sorted((p for p in layer_dir.rglob("*") if p.is_dir()), reverse=True) + [layer_dir]:
+                try:
+                    directory.rmdir()
+                except OSError:
+                    continue  # not empty
+        return removed
@@ -0,0 +1,167 @@
+"""
+Tile Compositor for MeteoApp.
+Blends weather map layers over a base map tile.
+"""
+
+import asyncio
+import io
+import logging
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+from services.maps.map_data_service import MapDataService
+from services.maps.tile_cache import TileKey
+from utils.config import (
+    MAP_TILE_SIZE,
+    MAP_BASE_TILE_URL,
+    MAP_DECODED_TILE_CACHE,
+    MAP_COMPOSITE_CACHE_SIZE
+)
+
+try:
+    import numpy as np
+    from PIL import Image
+    COMPOSITING_AVAILABLE = True
+except ImportError:
+    COMPOSITING_AVAILABLE = False
+
+BASE_LAYER = "base"
+LayerSpec = Tuple[str, float]  # (OWM tile layer, opacity)
+
+
+class TileCompositor:
+    """
+    Compositor that renders a map tile with the enabled weather layers.
+
+    Each layer is alpha-blended over the result so far with the "over"
+    operator, scaled by its opacity, using vectorized NumPy math on the
+    whole tile. Decoded tiles are kept as ``uint8`` arrays and finished
+    composites as PNG, keyed by tile, layer order and opacities. Toggling
+    a layer or changing an opacity therefore only redoes the blending of
+    tiles already in memory, and going back to a previous combination is
+    a cache hit. Entries expire with the shortest time-to-live of their
+    layers, so composites never outlive the weather data they show.
+    """
+
+    def __init__(self, map_data_service: Optional[MapDataService] = None,
+                 decoded_cache_size: int = MAP_DECODED_TILE_CACHE,
+                 composite_cache_size: int = MAP_COMPOSITE_CACHE_SIZE):
+        self.map_data_service = map_data_service or MapDataService()
+        self.decoded_cache_size = decoded_cache_size
+        self.composite_cache_size = composite_cache_size
+        self._decoded: "OrderedDict[TileKey, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._composites: "OrderedDict[Tuple, Tuple[bytes, float]]" = OrderedDict()
+
+    @staticmethod
+    def composite_key(zoom: int, x: int, y: int, layers: Sequence[LayerSpec], base: bool) -> Tuple:
+        """Cache key of a composite: tile, base map, layers in order with their opacity"""
+        return (zoom, x, y, base, tuple((layer, round(opacity, 2)) for layer, opacity in layers if opacity > 0))
+
+    def _ttl(self, layers: Sequence[str]) -> float:
+        tile_cache = self.map_data_service.tile_cache
+        return min(tile_cache.get_ttl(layer) for layer in layers)
+
+    async def compose(self, zoom: int, x: int, y: int, layers: Sequence[LayerSpec],
+                      base: bool = True) -> Optional[bytes]:
+        """
+        Render one tile with the given layers.
+
+        Args:
+            zoom, x, y: Tile coordinates
+            layers: (layer, opacity) pairs, bottom layer first
+            base: Draw the layers over the street map
+
+        Returns:
+            PNG image, or None if nothing could be rendered
+        """
+        if not COMPOSITING_AVAILABLE:
+            logging.warning("NumPy and Pillow are required for tile compositing")
+            return None
+
+        key = self.composite_key(zoom, x, y, layers, base)
+        names = ([BASE_LAYER] if base else []) + [layer for layer, _ in key[4]]
+        if not names:
+            return None
+        ttl = self._ttl(names)
+        entry = self._composites.get(key)
+        if entry is not None and time.monotonic() - entry[1] < ttl:
+            self._composites.move_to_end(key)
+            return entry[0]
+
+        arrays = await asyncio.gather(*(self._get_array((name, zoom, x, y)) for name in names))
+        opacities = ([1.0] if base else []) + [opacity for _, opacity in key[4]]
+        image = await asyncio.to_thread(self._blend, list(zip(arrays, opacities)))
+        if image is None:
+            return None
+
+        self._composites[key] = (image, time.monotonic())
+        self._composites.move_to_end(key)
+        while len(self._composites) > self.composite_cache_size:
+            self._composites.popitem(last=False)
+        return image
+
+    async def _get_array(self, key: TileKey) -> Optional["np.ndarray"]:
+        """Decoded RGBA pixels of a tile, from memory or through the tile cache."""
+        entry = self._decoded.get(key)
+        if entry is not None and time.monotonic() - entry[1] < self._ttl([key[0]]):
+            self._decoded.move_to_end(key)
+            return entry[0]
+
+        layer, zoom, x, y = key
+        if layer == BASE_LAYER:
+            data = await self.map_data_service.get_tile(key, MAP_BASE_TILE_URL.format(z=zoom, x=x, y=y))
+        else:
+            data = await self.map_data_service.get_weather_tiles(layer, zoom, x, y)
+        if not data:
+            return None
+
+        try:
+            array = await asyncio.to_thread(self._decode, data)
+        except Exception as e:
+            logging.warning(f"Invalid tile {key}: {e}")
+            return None
+        self._decoded[key] = (array, time.monotonic())
+        while len(self._decoded) > self.decoded_cache_size:
+            self._decoded.popitem(last=False)
+        return array
+
+    @staticmethod
+    def _decode(data: bytes) -> "np.ndarray":
+        image = Image.open(io.BytesIO(data)).convert("RGBA")
+        if image.size != (MAP_TILE_SIZE, MAP_TILE_SIZE):
+            image = image.resize((MAP_TILE_SIZE, MAP_TILE_SIZE))
+        array = np.asarray(image, dtype=np.uint8)
+        array.setflags(write=False)
+        return array
+
+    @staticmethod
+    def _blend(layers: List[Tuple[Optional["np.ndarray"], float]]) -> Optional[bytes]:
+        """Blend (pixels, opacity) pairs bottom-up with the "over" operator."""
+        # Premultiplied color and alpha of the result, as float32 in 0..1
+        color = np.zeros((MAP_TILE_SIZE, MAP_TILE_SIZE, 3), dtype=np.float32)
+        alpha = np.zeros((MAP_TILE_SIZE, MAP_TILE_SIZE, 1), dtype=np.float32)
+        drawn = False
+        for array, opacity in layers:
+            if array is None or opacity <= 0:
+                continue
+            layer_alpha = array[..., 3:4].astype(np.float32) * (opacity / 255.0)
+            layer_color = array[..., :3].astype(np.float32) * (1.0 / 255.0)
+            color = layer_color * layer_alpha + color * (1.0 - layer_alpha)
+            alpha = layer_alpha + alpha * (1.0 - layer_alpha)
+            drawn = True
+        if not drawn:
+            return None
+
+        # Back to straight alpha for the PNG
+        straight = np.divide(color, alpha, out=np.zeros_like(color), where=alpha > 0)
+        pixels = np.concatenate((straight, alpha), axis=2)
+        pixels = np.clip(pixels * 255.0 + 0.5, 0, 255).astype(np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels, "RGBA").save(buffer, format="PNG", compress_level=1)
+        return buffer.getvalue()
+
+    def clear_cache(self) -> None:
+        """Drop decoded tiles and composites (the tile cache is untouched)."""
+        self._decoded.clear()
+        self._composites.clear()
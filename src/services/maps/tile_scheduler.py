@@ -0,0 +1,244 @@
+"""
+Tile Scheduler for MeteoApp.
+Fetches the map tiles of the current viewport, center first.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from services.maps.map_data_service import MapDataService
+from services.maps.tile_cache import TileKey
+from utils.config import (
+    MAP_TILE_SIZE,
+    MAP_MIN_ZOOM,
+    MAP_MAX_ZOOM,
+    MAP_TILE_CONCURRENCY,
+    MAP_TILE_BORDER
+)
+
+VISIBLE_PRIORITY = 0
+PREFETCH_PRIORITY = 1
+MAX_MERCATOR_LAT = 85.05112878
+
+
+@dataclass(frozen=True)
+class Viewport:
+    """Area of the map on screen."""
+    lat: float
+    lon: float
+    zoom: int
+    width: int   # pixels
+    height: int  # pixels
+
+
+def lat_lon_to_tile(lat: float, lon: float, zoom: int) -> Tuple[float, float]:
+    """Fractional Web Mercator tile coordinates of a point."""
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, lat))
+    n = 2 ** zoom
+    x = (lon + 180.0) / 360.0 * n
+    lat_rad = math.radians(lat)
+    y = (1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n
+    return x, y
+
+
+def visible_tiles(viewport: Viewport, border: int = MAP_TILE_BORDER) -> List[Tuple[int, int]]:
+    """
+    Tiles covering the viewport plus ``border`` rings around it.
+
+    Returns:
+        (x, y) tiles ordered by distance from the center of the viewport
+    """
+    n = 2 ** viewport.zoom
+    center_x, center_y = lat_lon_to_tile(viewport.lat, viewport.lon, viewport.zoom)
+    half_w = viewport.width / MAP_TILE_SIZE / 2
+    half_h = viewport.height / MAP_TILE_SIZE / 2
+
+    min_x = math.floor(center_x - half_w) - border
+    max_x = math.floor(center_x + half_w) + border
+    min_y = max(0, math.floor(center_y - half_h) - border)
+    max_y = min(n - 1, math.floor(center_y + half_h) + border)
+    if max_x - min_x + 1 > n:
+        # The viewport is wider than the world: every column once
+        min_x, max_x = 0, n - 1
+
+    tiles = {}
+    for x in range(min_x, max_x + 1):
+        for y in range(min_y, max_y + 1):
+            distance = (x + 0.5 - center_x) ** 2 + (y + 0.5 - center_y) ** 2
+            wrapped = (x % n, y)  # longitudes wrap around the antimeridian
+            if wrapped not in tiles or distance < tiles[wrapped]:
+                tiles[wrapped] = distance
+    return sorted(tiles, key=tiles.get)
+
+
+class TileScheduler:
+    """
+    Scheduler that keeps the tiles of the current viewport loaded.
+
+    ``set_viewport`` computes the visible tiles plus a border ring for each
+    layer and queues them center-out. A bounded pool of workers fetches
+    them through ``MapDataService`` (so cached tiles cost nothing), and
+    each tile is handed to ``on_tile`` as it arrives. When the viewport
+    changes, queued and in-flight tiles that are no longer wanted are
+    dropped or cancelled. When the queue is empty the tiles of the
+    adjacent zoom levels are prefetched at a lower priority.
+
+    No view uses it yet: the app's map dialogs embed the provider's web
+    map. It is exported for a native tile view, which should pass the
+    session's ``map_data_service``.
+    """
+
+    def __init__(self, map_data_service: MapDataService,
+                 on_tile: Optional[Callable[[TileKey, bytes], None]] = None,
+                 max_concurrent: int = MAP_TILE_CONCURRENCY, border: int = MAP_TILE_BORDER,
+                 prefetch_zooms: bool = True):
+        self.map_data_service = map_data_service
+        self.on_tile = on_tile
+        self.max_concurrent = max_concurrent
+        self.border = border
+        self.prefetch_zooms = prefetch_zooms
+
+        self.viewport: Optional[Viewport] = None
+        self.layers: List[str] = []
+        self._wanted: Dict[TileKey, int] = {}  # tile -> priority
+        self._queue: List[Tuple[int, int, TileKey]] = []
+        self._counter = itertools.count()
+        self._in_flight: Dict[TileKey, asyncio.Task] = {}
+        self._workers: List[asyncio.Task] = []
+        self._has_work: Optional[asyncio.Event] = None
+        self._prefetched = False
+        self._stopping = False
+
+    @property
+    def pending_count(self) -> int:
+        """Tiles queued or being fetched"""
+        return len(self._queue) + len(self._in_flight)
+
+    async def set_viewport(self, layers: Iterable[str], lat: float, lon: float, zoom: int,
+                           width: int, height: int) -> None:
+        """
+        Show a new area (or new layers) and reschedule the tile fetches.
+
+        Args:
+            layers: Tile layers to load (e.g. "precipitation_new")
+            lat, lon: Center of the map
+            zoom: Zoom level
+            width, height: Size of the map on screen, in pixels
+        """
+        zoom = max(MAP_MIN_ZOOM, min(MAP_MAX_ZOOM, int(zoom)))
+        self.viewport = Viewport(lat, lon, zoom, int(width), int(height))
+        self.layers = list(layers)
+        self._prefetched = False
+        self._stopping = False
+
+        tiles = visible_tiles(self.viewport, self.border)
+        self._wanted = {}
+        self._queue = []
+        # Interleave the layers so the center is complete for all of them first
+        for x, y in tiles:
+            for layer in self.layers:
+                self._enqueue((layer, zoom, x, y), VISIBLE_PRIORITY)
+
+        # Tiles that scrolled out of view are no longer worth their connection
+        for key, task in list(self._in_flight.items()):
+            if key not in self._wanted:
+                task.cancel()
+
+        self._ensure_workers()
+        self._has_work.set()
+
+    def _enqueue(self, key: TileKey, priority: int) -> None:
+        if key in self._wanted:
+            return
+        self._wanted[key] = priority
+        if key not in self._in_flight:
+            heapq.heappush(self._queue, (priority, next(self._counter), key))
+
+    def _queue_prefetch(self) -> bool:
+        """Queue the adjacent zoom levels of the viewport, once per viewport."""
+        if self._prefetched or not self.prefetch_zooms or self.viewport is None:
+            return False
+        self._prefetched = True
+        queued = False
+        for zoom in (self.viewport.zoom + 1, self.viewport.zoom - 1):
+            if not MAP_MIN_ZOOM <= zoom <= MAP_MAX_ZOOM:
+                continue
+            viewport = Viewport(self.viewport.lat, self.viewport.lon, zoom,
+                                self.viewport.width, self.viewport.height)
+            for x, y in visible_tiles(viewport, border=0):
+                for layer in self.layers:
+                    key = (layer, zoom, x, y)
+                    if key not in self._wanted:
+                        self._enqueue(key, PREFETCH_PRIORITY)
+                        queued = True
+        return queued
+
+    def _ensure_workers(self) -> None:
+        if self._has_work is None:
+            self._has_work = asyncio.Event()
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.max_concurrent:
+            self._workers.append(asyncio.ensure_future(self._worker()))
+
+    async def _worker(self) -> None:
+        while True:
+            if not self._queue:
+                if not self._in_flight and self._queue_prefetch():
+                    self._has_work.set()
+                    continue
+                self._has_work.clear()
+                await self._has_work.wait()
+                continue
+
+            _, _, key = heapq.heappop(self._queue)
+            if key not in self._wanted or key in self._in_flight:
+                continue  # out of view since it was queued, or already running
+
+            task = asyncio.ensure_future(self.map_data_service.get_weather_tiles(*key))
+            self._in_flight[key] = task
+            try:
+                tile = await task
+            except asyncio.CancelledError:
+                if self._stopping:
+                    raise
+                continue  # the tile scrolled out of view
+            except Exception as e:
+                logging.error(f"Error fetching tile {key}: {e}")
+                continue
+            finally:
+                if self._in_flight.get(key) is task:
+                    del self._in_flight[key]
+
+            if tile is not None and key in self._wanted:
+                self._deliver(key, tile)
+
+    def _deliver(self, key: TileKey, tile: bytes) -> None:
+        if self.on_tile is None:
+            return
+        try:
+            result = self.on_tile(key, tile)
+            if asyncio.iscoroutine(result):
+                asyncio.ensure_future(result)
+        except Exception as e:
+            logging.error(f"Error delivering tile {key}: {e}")
+
+    async def stop(self) -> None:
+        """Cancel all fetches and stop the workers."""
+        self._stopping = True
+        self._wanted.clear()
+        self._queue.clear()
+        tasks = list(self._in_flight.values()) + self._workers
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._in_flight.clear()
+        self._workers = []
+
+    def wanted_tiles(self, priority: Optional[int] = None) -> Set[TileKey]:
+        """Tiles scheduled for the current viewport (optionally of one priority)"""
+        return {key for key, value in self._wanted.items() if priority is None or value == priority}
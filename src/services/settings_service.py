@@ -6,24 +6,39 @@ Handles loading and saving user preferences (theme, language, units, etc.)
 import json
 import os
 import logging
+import tempfile
+import threading
 import time
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+from utils.config import SETTINGS_SAVE_DELAY, SETTINGS_SAVE_MAX_DELAY
+
 logger = logging.getLogger(__name__)
 
 class SettingsService:
     """Service for managing persistent user settings."""
     
-    def __init__(self, app_name: str = "MeteoApp"):
+    def __init__(self, app_name: str = "MeteoApp", save_delay: float = SETTINGS_SAVE_DELAY,
+                 max_save_delay: float = SETTINGS_SAVE_MAX_DELAY):
         """Initialize the settings service.
         
         Args:
             app_name: Name of the application for settings folder
+            save_delay: Quiet period (seconds) before a pending save is written
+            max_save_delay: Upper bound (seconds) a pending save can be postponed
         """
         self.app_name = app_name
         self.settings_file = self._get_settings_file_path()
         self._settings: Dict[str, Any] = {}
+        
+        # Write-behind state: bursts of auto-saves are coalesced into one write
+        self._save_delay = save_delay
+        self._max_save_delay = max_save_delay
+        self._lock = threading.RLock()
+        self._save_timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self._first_pending_at: Optional[float] = None
         self._default_settings = {
             'theme_mode': 'light',
             'language': 'it',
@@ -82,25 +97,114 @@ class SettingsService:
         
         return self._settings
     
+    def _write_atomic(self, file_path: Path, data: Dict[str, Any]) -> None:
+        """Write JSON data so that readers see either the old or the new file.
+        
+        The payload goes to a temporary file in the same directory, is fsynced
+        and then renamed over the destination.
+        """
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=str(file_path.parent), prefix=f".{file_path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        
+        # Persist the rename itself (not supported on Windows)
+        if os.name == 'posix':
+            try:
+                dir_fd = os.open(str(file_path.parent), os.O_RDONLY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+            except OSError:
+                pass
+    
     def save_settings(self) -> bool:
-        """Save current settings to file.
+        """Save current settings to file immediately.
+        
+        Any pending debounced save is cancelled, since this write covers it.
         
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            # Ensure directory exists
-            self.settings_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._cancel_pending_save()
+            snapshot = self._settings.copy()
+            try:
+                self._write_atomic(self.settings_file, snapshot)
+                logger.info(f"Settings saved to {self.settings_file}")
+                return True
+                
+            except Exception as e:
+                # Keep the changes pending so that a later flush can retry
+                self._dirty = True
+                logger.error(f"Error saving settings: {e}")
+                return False
+    
+    def schedule_save(self) -> None:
+        """Schedule a debounced save.
+        
+        Repeated calls within ``save_delay`` seconds are coalesced into a
+        single write; a burst can postpone the write by at most
+        ``max_save_delay`` seconds.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not self._dirty:
+                self._dirty = True
+                self._first_pending_at = now
             
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self._settings, f, indent=2, ensure_ascii=False)
+            if self._save_timer is not None:
+                self._save_timer.cancel()
             
-            logger.info(f"Settings saved to {self.settings_file}")
-            return True
+            elapsed = now - (self._first_pending_at or now)
+            delay = max(0.0, min(self._save_delay, self._max_save_delay - elapsed))
             
-        except Exception as e:
-            logger.error(f"Error saving settings: {e}")
-            return False
+            self._save_timer = threading.Timer(delay, self._flush_from_timer)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def _flush_from_timer(self) -> None:
+        """Timer callback for the write-behind queue."""
+        with self._lock:
+            self._save_timer = None
+            if self._dirty:
+                self.save_settings()
+    
+    def _cancel_pending_save(self) -> None:
+        """Drop any scheduled save (caller must hold the lock)."""
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
+        self._dirty = False
+        self._first_pending_at = None
+    
+    def has_pending_save(self) -> bool:
+        """Return True if changes are waiting to be written."""
+        return self._dirty
+    
+    def flush(self) -> bool:
+        """Write pending changes now, if any.
+        
+        Returns:
+            bool: True if nothing was pending or the write succeeded
+        """
+        with self._lock:
+            if not self._dirty:
+                return True
+            return self.save_settings()
     
     def get_setting(self, key: str, default: Any = None) -> Any:
         """Get a specific setting value.
@@ -120,12 +224,13 @@ class SettingsService:
         Args:
             key: Setting key
             value: Setting value
-            auto_save: Whether to automatically save to file
+            auto_save: Whether to schedule a (debounced) save to file
         """
-        self._settings[key] = value
-        
-        if auto_save:
-            self.save_settings()
+        with self._lock:
+            self._settings[key] = value
+            
+            if auto_save:
+                self.schedule_save()
         
         logger.debug(f"Setting updated: {key} = {value}")
     
@@ -134,12 +239,13 @@ class SettingsService:
         
         Args:
             updates: Dictionary of setting updates
-            auto_save: Whether to automatically save to file
+            auto_save: Whether to schedule a (debounced) save to file
         """
-        self._settings.update(updates)
-        
-        if auto_save:
-            self.save_settings()
+        with self._lock:
+            self._settings.update(updates)
+            
+            if auto_save:
+                self.schedule_save()
         
         logger.debug(f"Settings updated: {list(updates.keys())}")
     
@@ -149,12 +255,14 @@ class SettingsService:
         Returns:
             Dictionary of all settings
         """
-        return self._settings.copy()
+        with self._lock:
+            return self._settings.copy()
     
     def reset_to_defaults(self) -> None:
         """Reset all settings to default values."""
-        self._settings = self._default_settings.copy()
-        self.save_settings()
+        with self._lock:
+            self._settings = self._default_settings.copy()
+            self.save_settings()
         logger.info("Settings reset to defaults")
     
     def export_settings(self, file_path: str) -> bool:
@@ -167,8 +275,7 @@ class SettingsService:
             bool: True if successful, False otherwise
         """
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(self._settings, f, indent=2, ensure_ascii=False)
+            self._write_atomic(Path(file_path), self.get_all_settings())
             
             logger.info(f"Settings exported to {file_path}")
             return True
@@ -196,8 +303,9 @@ class SettingsService:
                 if key in self._default_settings:
                     valid_settings[key] = value
             
-            self._settings.update(valid_settings)
-            self.save_settings()
+            with self._lock:
+                self._settings.update(valid_settings)
+                self.save_settings()
             
             logger.info(f"Settings imported from {file_path}")
             return True
@@ -215,8 +323,7 @@ class SettingsService:
         try:
             backup_path = self.settings_file.parent / f"settings_backup_{int(time.time())}.json"
             
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                json.dump(self._settings, f, indent=2, ensure_ascii=False)
+            self._write_atomic(backup_path, self.get_all_settings())
             
             logger.info(f"Settings backed up to {backup_path}")
             return str(backup_path)
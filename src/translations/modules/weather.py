@@ -443,6 +443,11 @@ WEATHER_TRANSLATIONS = {
             "es": "alertas activas", "pt": "alertas ativos", "ru": "предупреждений активно", "zh": "警报活跃",
             "ja": "警報アクティブ", "ko": "경보 활성", "ar": "تنبيهات نشطة", "hi": "चेतावनी सक्रिय", "id": "peringatan aktif"
         },
+        "alerts_last_week": {
+            "en": "{count} alerts in the last 7 days", "it": "{count} allerte negli ultimi 7 giorni", "fr": "{count} alertes ces 7 derniers jours", "de": "{count} Warnungen in den letzten 7 Tagen",
+            "es": "{count} alertas en los últimos 7 días", "pt": "{count} alertas nos últimos 7 dias", "ru": "Предупреждений за последние 7 дней: {count}", "zh": "过去7天内有{count}条警报",
+            "ja": "過去7日間の警報: {count}件", "ko": "최근 7일간 경보 {count}건", "ar": "{count} تنبيهات في آخر 7 أيام", "hi": "पिछले 7 दिनों में {count} चेतावनी", "id": "{count} peringatan dalam 7 hari terakhir"
+        },
         "check_details_info": {
             "en": "Check details for more information", "it": "Controlla i dettagli per maggiori informazioni", "fr": "Vérifiez les détails pour plus d'informations", "de": "Details für weitere Informationen prüfen",
             "es": "Revisa los detalles para más información", "pt": "Verifique os detalhes para mais informações", "ru": "Проверьте детали для получения дополнительной информации", "zh": "查看详情获取更多信息",
@@ -491,6 +496,16 @@ WEATHER_TRANSLATIONS = {
     },
     
     "alert_messages": {
+        "alert_summary_location": {
+            "en": "{count} alerts for {location}", "it": "{count} allerte per {location}", "fr": "{count} alertes pour {location}", "de": "{count} Warnungen für {location}",
+            "es": "{count} alertas para {location}", "pt": "{count} alertas para {location}", "ru": "{count} предупреждений для {location}", "zh": "{location} 有 {count} 条警报",
+            "ja": "{location} の警報 {count} 件", "ko": "{location}에 대한 경보 {count}개", "ar": "{count} تنبيهات لـ {location}", "hi": "{location} के लिए {count} चेतावनियाँ", "id": "{count} peringatan untuk {location}"
+        },
+        "alert_summary": {
+            "en": "{count} new weather alerts", "it": "{count} nuove allerte meteo", "fr": "{count} nouvelles alertes météo", "de": "{count} neue Wetterwarnungen",
+            "es": "{count} nuevas alertas meteorológicas", "pt": "{count} novos alertas meteorológicos", "ru": "{count} новых погодных предупреждений", "zh": "{count} 条新天气警报",
+            "ja": "新しい気象警報 {count} 件", "ko": "새 기상 경보 {count}개", "ar": "{count} تنبيهات طقس جديدة", "hi": "{count} नई मौसम चेतावनियाँ", "id": "{count} peringatan cuaca baru"
+        },
         "alert_temperature_high_title": {
             "en": "High Temperature Alert", "it": "Allerta Temperatura Elevata", "fr": "Alerte Température Élevée", "de": "Hohe Temperatur Warnung",
             "es": "Alerta Temperatura Alta", "pt": "Alerta Temperatura Alta", "ru": "Предупреждение о высокой температуре", "zh": "高温警报",
@@ -1064,6 +1079,36 @@ WEATHER_TRANSLATIONS = {
             "en": "📤 Export Data", "it": "📤 Esporta Dati", "fr": "📤 Exporter Données", "de": "📤 Daten Exportieren",
             "es": "📤 Exportar Datos", "pt": "📤 Exportar Dados", "ru": "📤 Экспорт Данных", "zh": "📤 导出数据",
             "ja": "📤 データをエクスポート", "ko": "📤 데이터 내보내기", "ar": "📤 تصدير البيانات", "hi": "📤 डेटा निर्यात करें", "id": "📤 Ekspor Data"
+        },
+        "export_in_progress": {
+            "en": "Exporting...", "it": "Esportazione in corso...", "fr": "Export en cours...", "de": "Export läuft...",
+            "es": "Exportando...", "pt": "Exportando...", "ru": "Экспорт...", "zh": "正在导出...",
+            "ja": "エクスポート中...", "ko": "내보내는 중...", "ar": "جارٍ التصدير...", "hi": "निर्यात हो रहा है...", "id": "Mengekspor..."
+        },
+        "export_completed": {
+            "en": "Export completed", "it": "Esportazione completata", "fr": "Export terminé", "de": "Export abgeschlossen",
+            "es": "Exportación completada", "pt": "Exportação concluída", "ru": "Экспорт завершён", "zh": "导出完成",
+            "ja": "エクスポート完了", "ko": "내보내기 완료", "ar": "اكتمل التصدير", "hi": "निर्यात पूरा हुआ", "id": "Ekspor selesai"
+        },
+        "export_failed": {
+            "en": "Export failed", "it": "Esportazione non riuscita", "fr": "Échec de l'export", "de": "Export fehlgeschlagen",
+            "es": "Error en la exportación", "pt": "Falha na exportação", "ru": "Ошибка экспорта", "zh": "导出失败",
+            "ja": "エクスポート失敗", "ko": "내보내기 실패", "ar": "فشل التصدير", "hi": "निर्यात विफल", "id": "Ekspor gagal"
+        },
+        "export_cancelled": {
+            "en": "Export cancelled", "it": "Esportazione annullata", "fr": "Export annulé", "de": "Export abgebrochen",
+            "es": "Exportación cancelada", "pt": "Exportação cancelada", "ru": "Экспорт отменён", "zh": "导出已取消",
+            "ja": "エクスポートを中止しました", "ko": "내보내기 취소됨", "ar": "تم إلغاء التصدير", "hi": "निर्यात रद्द किया गया", "id": "Ekspor dibatalkan"
+        },
+        "cancel_export": {
+            "en": "Cancel", "it": "Annulla", "fr": "Annuler", "de": "Abbrechen",
+            "es": "Cancelar", "pt": "Cancelar", "ru": "Отмена", "zh": "取消",
+            "ja": "キャンセル", "ko": "취소", "ar": "إلغاء", "hi": "रद्द करें", "id": "Batal"
+        },
+        "rows": {
+            "en": "rows", "it": "righe", "fr": "lignes", "de": "Zeilen",
+            "es": "filas", "pt": "linhas", "ru": "строк", "zh": "行",
+            "ja": "行", "ko": "행", "ar": "صفوف", "hi": "पंक्तियाँ", "id": "baris"
         }
     },
 
@@ -1301,6 +1346,21 @@ WEATHER_TRANSLATIONS = {
             "es": "Hora de Notificación:", "pt": "Hora da Notificação:", "ru": "Время Уведомления:", "zh": "通知时间：",
             "ja": "通知時間：", "ko": "알림 시간：", "ar": "وقت الإشعار：", "hi": "नोटिफिकेशन का समय：", "id": "Waktu Notifikasi："
         },
+        "quiet_hours": {
+            "en": "Quiet hours (extreme alerts only)", "it": "Ore di silenzio (solo allerte estreme)", "fr": "Heures calmes (alertes extrêmes uniquement)", "de": "Ruhezeiten (nur extreme Warnungen)",
+            "es": "Horas de silencio (solo alertas extremas)", "pt": "Horário silencioso (apenas alertas extremos)", "ru": "Тихие часы (только экстремальные предупреждения)", "zh": "免打扰时段（仅极端警报）",
+            "ja": "おやすみ時間（極端な警報のみ）", "ko": "방해 금지 시간 (극한 경보만)", "ar": "ساعات الهدوء (التنبيهات القصوى فقط)", "hi": "शांत समय (केवल चरम चेतावनियाँ)", "id": "Jam tenang (hanya peringatan ekstrem)"
+        },
+        "quiet_from": {
+            "en": "From", "it": "Dalle", "fr": "De", "de": "Von",
+            "es": "Desde", "pt": "Das", "ru": "С", "zh": "从",
+            "ja": "開始", "ko": "시작", "ar": "من", "hi": "से", "id": "Dari"
+        },
+        "quiet_to": {
+            "en": "To", "it": "Alle", "fr": "À", "de": "Bis",
+            "es": "Hasta", "pt": "Às", "ru": "До", "zh": "到",
+            "ja": "終了", "ko": "종료", "ar": "إلى", "hi": "तक", "id": "Sampai"
+        },
         "save_settings": {
             "en": "Save Settings", "it": "Salva Impostazioni", "fr": "Enregistrer Paramètres", "de": "Einstellungen Speichern",
             "es": "Guardar Configuración", "pt": "Salvar Configurações", "ru": "Сохранить Настройки", "zh": "保存设置",
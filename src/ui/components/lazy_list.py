@@ -0,0 +1,112 @@
+"""
+Lazy List View per MeteoApp.
+Lista che costruisce solo gli elementi visibili e carica gli altri durante lo scroll.
+"""
+
+import math
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+import flet as ft
+
+from utils.config import LIST_BUFFER_ITEMS, LIST_LOAD_MORE_EXTENT, LIST_PAGE_SIZE, LIST_SCROLL_INTERVAL
+
+
+class LazyListView(ft.ListView):
+    """
+    ListView che crea i controlli dei propri elementi a pagine.
+
+    All'inizio vengono costruiti solo gli elementi che riempiono l'area
+    visibile più un piccolo margine; quando lo scroll si avvicina alla fine
+    della lista viene aggiunta la pagina successiva. I controlli già
+    costruiti sono riciclati tra un aggiornamento e l'altro in base alla
+    chiave dell'elemento, che deve quindi comprendere tutto ciò che ne
+    cambia l'aspetto (tema, lingua, valori mostrati).
+    """
+
+    def __init__(self,
+                 item_builder: Callable[[Any], Optional[ft.Control]],
+                 key: Callable[[Any], Hashable] = id,
+                 page_size: int = LIST_PAGE_SIZE,
+                 item_size: Optional[float] = None,
+                 viewport: Optional[float] = None,
+                 load_threshold: float = LIST_LOAD_MORE_EXTENT,
+                 **kwargs):
+        """
+        Inizializza la lista.
+
+        Args:
+            item_builder: Crea il controllo di un elemento (None per saltarlo)
+            key: Chiave di riciclo di un elemento
+            page_size: Elementi aggiunti ad ogni caricamento
+            item_size: Dimensione stimata di un elemento nel verso dello scroll (pixel)
+            viewport: Dimensione stimata dell'area visibile (pixel)
+            load_threshold: Distanza dalla fine (pixel) a cui caricare la pagina successiva
+        """
+        kwargs.setdefault("on_scroll_interval", LIST_SCROLL_INTERVAL)
+        super().__init__(**kwargs)
+        self.item_builder = item_builder
+        self.item_key = key
+        self.page_size = page_size
+        self.item_size = item_size
+        self.viewport = viewport
+        self.load_threshold = load_threshold
+        self.on_scroll = self._handle_scroll
+        self._items: List[Any] = []
+        self._shown = 0  # elementi già passati all'item_builder
+        self._recycled: Dict[Hashable, ft.Control] = {}
+
+    @property
+    def items(self) -> List[Any]:
+        """Elementi della lista, compresi quelli non ancora costruiti."""
+        return self._items
+
+    @property
+    def has_more(self) -> bool:
+        """Se restano elementi da costruire."""
+        return self._shown < len(self._items)
+
+    def _initial_count(self) -> int:
+        """Elementi da costruire subito: l'area visibile più il margine."""
+        if self.item_size and self.viewport:
+            return max(1, math.ceil(self.viewport / self.item_size)) + LIST_BUFFER_ITEMS
+        return self.page_size
+
+    def set_items(self, items: Iterable[Any]):
+        """
+        Sostituisce gli elementi della lista.
+
+        Restano costruiti almeno quanti elementi erano visibili prima, così
+        un aggiornamento non riporta indietro lo scroll; i controlli degli
+        elementi con la stessa chiave vengono riutilizzati.
+        """
+        self._items = list(items)
+        previous, self._recycled = self._recycled, {}
+        count = max(self._initial_count(), self._shown)
+        self._shown = 0
+        self.controls = self._build(count, previous)
+
+    def _build(self, count: int, previous: Dict[Hashable, ft.Control]) -> List[ft.Control]:
+        controls = []
+        for item in self._items[self._shown:self._shown + count]:
+            item_key = self.item_key(item)
+            control = previous.get(item_key)
+            if control is None:
+                control = self.item_builder(item)
+            if control is not None:
+                self._recycled[item_key] = control
+                controls.append(control)
+        self._shown = min(self._shown + count, len(self._items))
+        return controls
+
+    def load_more(self) -> bool:
+        """Costruisce la pagina successiva; False se la lista è completa."""
+        if not self.has_more:
+            return False
+        self.controls.extend(self._build(self.page_size, {}))
+        return True
+
+    def _handle_scroll(self, e: ft.OnScrollEvent):
+        if e.max_scroll_extent is None or e.pixels is None:
+            return
+        if e.max_scroll_extent - e.pixels <= self.load_threshold and self.load_more():
+            self.update()
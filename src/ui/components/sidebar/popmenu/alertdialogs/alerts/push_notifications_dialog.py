@@ -27,8 +27,14 @@ class PushNotificationsDialog:
             "hourly_updates": False,
             "temperature_changes": True,
             "rain_probability": True,
-            "notification_time": "08:00"
+            "notification_time": "08:00",
+            "quiet_hours": False,
+            "quiet_start": "22:00",
+            "quiet_end": "07:00"
         }
+        self.settings_service = page.session.get('settings_service') if page else None
+        if self.settings_service:
+            self.notification_settings.update(self.settings_service.get_setting('notification_settings', {}) or {})
         
         # Register for theme and language updates if state_manager is available
         if self.state_manager:
@@ -154,6 +160,8 @@ class PushNotificationsDialog:
                 )
             ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
             
+            self.create_quiet_hours_settings(),
+            
             ft.Container(height=20),
             
             # Action buttons
@@ -243,7 +251,38 @@ class PushNotificationsDialog:
             )
         ], spacing=5)
     
-    def update_setting(self, setting_key: str, value: bool):
+    def create_quiet_hours_settings(self):
+        """Create quiet hours checkbox and time range."""
+        hours = [f"{hour:02d}:00" for hour in range(24)]
+        
+        def time_dropdown(setting_key: str):
+            return ft.Dropdown(
+                width=100,
+                options=[ft.dropdown.Option(hour) for hour in hours],
+                value=self.notification_settings[setting_key],
+                on_change=lambda e: self.update_setting(setting_key, e.control.value),
+                bgcolor=self.colors["surface"],
+                color=self.colors["text"],
+                text_size=14
+            )
+        
+        return ft.Column([
+            ft.Checkbox(
+                label=self._get_translation('quiet_hours'), 
+                value=self.notification_settings["quiet_hours"],
+                on_change=lambda e: self.update_setting("quiet_hours", e.control.value),
+                active_color=self.colors["accent"],
+                label_style=ft.TextStyle(size=14)
+            ),
+            ft.Row([
+                ft.Text(self._get_translation('quiet_from'), color=self.colors["text"], size=14),
+                time_dropdown("quiet_start"),
+                ft.Text(self._get_translation('quiet_to'), color=self.colors["text"], size=14),
+                time_dropdown("quiet_end")
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
+        ], spacing=5)
+    
+    def update_setting(self, setting_key: str, value):
         """Update a notification setting."""
         self.notification_settings[setting_key] = value
     
@@ -253,10 +292,13 @@ class PushNotificationsDialog:
     
     def save_settings(self):
         """Save notification settings."""
+        if self.settings_service:
+            # Read by WeatherAlertsService when delivering alert notifications
+            self.settings_service.set_setting('notification_settings', dict(self.notification_settings))
+        
         if self.page:
-            # TODO: Implement actual settings save to state manager or preferences
             active_count = sum(1 for key, value in self.notification_settings.items() 
-                             if key != "notification_time" and value)
+                             if key != "quiet_hours" and value is True)
             
             message = self._get_translation('settings_saved').format(
                 count=active_count, 
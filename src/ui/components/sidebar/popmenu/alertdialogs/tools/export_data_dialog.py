@@ -1,5 +1,8 @@
+import logging
+import os
 import flet as ft
 from core.state_manager import StateManager
+from services.data.export_job_service import ExportJobService, EXPORT_JOB_EVENT
 from translations import translation_manager
 
 
@@ -19,11 +22,41 @@ class ExportDataDialog:
         self.state_manager.register_observer("language_event", self.update_ui)
         self.state_manager.register_observer("theme_event", self.update_ui)
         
+        # Background export jobs (shared across dialog instances via session)
+        self.job_state_manager = self._get_session_value('state_manager') or self.state_manager
+        self.job_service = self._get_job_service()
+        self.current_job_id = None
+        self.job_state_manager.register_observer(EXPORT_JOB_EVENT, self._handle_export_job_event)
+        
         # Dialog components
         self.dialog = None
         self.period_radio = None
         self.data_checkboxes = {}
         self.format_dropdown = None
+        self.progress_bar = None
+        self.progress_text = None
+        self.cancel_button = None
+        self.export_button = None
+    
+    def _get_session_value(self, key: str):
+        """Read a value from the page session, if available."""
+        try:
+            if self.page and self.page.session:
+                return self.page.session.get(key)
+        except Exception:
+            pass
+        return None
+    
+    def _get_job_service(self) -> ExportJobService:
+        """Return the page-wide export job service, creating it on first use."""
+        service = self._get_session_value('export_job_service')
+        if service is None:
+            service = ExportJobService(page=self.page, state_manager=self.job_state_manager)
+            try:
+                self.page.session.set('export_job_service', service)
+            except Exception:
+                pass
+        return service
     
     def update_theme_colors(self):
         """Update theme colors based on current theme."""
@@ -85,10 +118,8 @@ class ExportDataDialog:
         self.format_dropdown = ft.Dropdown(
             width=200,
             options=[
-                ft.dropdown.Option("csv", "CSV"),
-                ft.dropdown.Option("excel", "Excel (.xlsx)"),
-                ft.dropdown.Option("json", "JSON"),
-                ft.dropdown.Option("pdf", "PDF Report"),
+                ft.dropdown.Option(fmt["value"], fmt["name"])
+                for fmt in self.job_service.export_service.get_available_formats()
             ],
             value="csv",
             bgcolor=self.colors["surface"],
@@ -96,6 +127,18 @@ class ExportDataDialog:
             border_color=self.colors["border"]
         )
         
+        self.export_button = ft.TextButton(
+            icon=ft.Icons.SAVE, text=texts['export'], on_click=self.export_data,
+            style=ft.ButtonStyle(bgcolor="#4CAF50", color=ft.Colors.WHITE,
+                               shape=ft.RoundedRectangleBorder(radius=8))
+        )
+        self.cancel_button = ft.TextButton(
+            icon=ft.Icons.STOP, text=texts['cancel_export'], on_click=self.cancel_export,
+            visible=False,
+            style=ft.ButtonStyle(bgcolor="#F44336", color=ft.Colors.WHITE,
+                               shape=ft.RoundedRectangleBorder(radius=8))
+        )
+        
         # Main content
         content = ft.Container(
             content=ft.Column([
@@ -124,6 +167,9 @@ class ExportDataDialog:
                        color=self.colors["text"], size=16),
                 self.format_dropdown,
                 
+                # Export progress (visible while a job runs)
+                self._create_progress_section(texts),
+                
             ], spacing=10, scroll=ft.ScrollMode.AUTO),
             width=400, height=500, padding=20, bgcolor=self.colors["bg"]
         )
@@ -136,11 +182,8 @@ class ExportDataDialog:
             ], spacing=10),
             content=content,
             actions=[
-                ft.TextButton(
-                    icon=ft.Icons.SAVE, text=texts['export'], on_click=self.export_data,
-                    style=ft.ButtonStyle(bgcolor="#4CAF50", color=ft.Colors.WHITE,
-                                       shape=ft.RoundedRectangleBorder(radius=8))
-                ),
+                self.cancel_button,
+                self.export_button,
                 ft.FilledButton(
                     icon=ft.Icons.CLOSE, text=texts['close'], on_click=self.close_dialog,
                     style=ft.ButtonStyle(bgcolor=self.colors["accent"], color=ft.Colors.WHITE,
@@ -153,6 +196,19 @@ class ExportDataDialog:
             inset_padding=ft.padding.all(20)
         )
     
+    def _create_progress_section(self, texts):
+        """Create the progress bar and status text for background exports."""
+        self.progress_bar = ft.ProgressBar(value=None, color=self.colors["accent"],
+                                           bgcolor=self.colors["border"], visible=False)
+        self.progress_text = ft.Text("", size=12, color=self.colors["text_secondary"], visible=False)
+        
+        # Restore progress of a job still running from a previous opening
+        job = self.job_service.get_job(self.current_job_id) if self.current_job_id else None
+        if job and job["status"] in ("queued", "running"):
+            self._apply_job_event(job, texts)
+        
+        return ft.Column([self.progress_bar, self.progress_text], spacing=5)
+    
     def get_translation(self, key: str) -> str:
         """Get translation for a key using the new modular translation system."""
         return translation_manager.get_translation("weather", key, self.language)
@@ -176,22 +232,82 @@ class ExportDataDialog:
             "wind": self.get_translation("export_data_dialog.wind"),
             "pressure": self.get_translation("export_data_dialog.pressure"),
             "export": self.get_translation("export_data_dialog.export_button"),
+            "export_in_progress": self.get_translation("export_data_dialog.export_in_progress"),
+            "export_completed": self.get_translation("export_data_dialog.export_completed"),
+            "export_failed": self.get_translation("export_data_dialog.export_failed"),
+            "export_cancelled": self.get_translation("export_data_dialog.export_cancelled"),
+            "cancel_export": self.get_translation("export_data_dialog.cancel_export"),
+            "rows": self.get_translation("export_data_dialog.rows"),
             "close": self.get_translation("dialog_buttons.close")
         }
     
     def export_data(self, e=None):
-        """Export the selected data."""
-        # Simulate export process (in real app would actually export the data)
+        """Queue the selected export on the background job runner."""
+        period = self.period_radio.value if self.period_radio else "week"
+        data_types = [key for key, checkbox in self.data_checkboxes.items() if checkbox.value]
+        export_format = self.format_dropdown.value if self.format_dropdown else "csv"
+        
+        self.current_job_id = self.job_service.submit(
+            export_format, period=period, data_types=data_types or None
+        )
+        self._apply_job_event(self.job_service.get_job(self.current_job_id))
+    
+    def cancel_export(self, e=None):
+        """Cancel the export currently shown in the dialog."""
+        if self.current_job_id is not None:
+            self.job_service.cancel(self.current_job_id)
+    
+    def _handle_export_job_event(self, event):
+        """Observer for export job progress events (runs on the page loop)."""
+        if not event or event.get("job_id") != self.current_job_id:
+            return
+        self._apply_job_event(event)
+        
+        status = event.get("status")
+        if status in ("completed", "failed", "cancelled"):
+            self._show_job_result(event)
+    
+    def _apply_job_event(self, event, texts=None):
+        """Reflect a job event in the progress controls."""
+        if not event or not self.progress_bar:
+            return
+        texts = texts or self.get_texts()
+        running = event.get("status") in ("queued", "running")
+        
+        self.progress_bar.visible = running
+        self.progress_bar.value = event.get("progress")
+        self.progress_text.visible = running
+        self.progress_text.value = f"{texts['export_in_progress']} {event.get('rows', 0)} {texts['rows']}" if running else ""
+        if self.cancel_button:
+            self.cancel_button.visible = running
+        if self.export_button:
+            self.export_button.disabled = running
+        
+        try:
+            if self.dialog and self.dialog.open:
+                self.page.update()
+        except Exception as ex:
+            logging.debug(f"Export dialog not ready for progress update: {ex}")
+    
+    def _show_job_result(self, event):
+        """Show a snackbar with the outcome of an export job."""
+        texts = self.get_texts()
+        status = event.get("status")
+        if status == "completed":
+            result = event.get("result") or {}
+            message = f"{texts['export_completed']}: {os.path.basename(result.get('filepath', ''))} ({result.get('rows', 0)} {texts['rows']})"
+            color = "#4CAF50"
+        elif status == "cancelled":
+            message = texts['export_cancelled']
+            color = "#FF9800"
+        else:
+            message = f"{texts['export_failed']}: {event.get('error', '')}"
+            color = "#F44336"
+        
         if self.page:
-            self.page.snack_bar = ft.SnackBar(
-                content=ft.Text("Esportazione dati completata!"),
-                bgcolor="#4CAF50"
-            )
+            self.page.snack_bar = ft.SnackBar(content=ft.Text(message), bgcolor=color)
             self.page.snack_bar.open = True
             self.page.update()
-        
-        # Close dialog after export
-        self.close_dialog()
     
     def close_dialog(self, e=None):
         """Close the dialog using page.close()."""
@@ -217,3 +333,5 @@ class ExportDataDialog:
         if self.state_manager:
             self.state_manager.unregister_observer("language_event", self.update_ui)
             self.state_manager.unregister_observer("theme_event", self.update_ui)
+        if self.job_state_manager:
+            self.job_state_manager.unregister_observer(EXPORT_JOB_EVENT, self._handle_export_job_event)
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 
+import asyncio
 import flet as ft
-from typing import List, Callable
+from typing import List, Callable, Optional, Tuple
 from services.location.geocoding_service import LocationCandidate
+from services.location.candidate_ranking import CandidateRanker, TemperaturePreviewService
+from utils.config import UNIT_SYSTEMS, PREVIEW_CANDIDATES
 from utils.responsive_utils import ResponsiveTextFactory
 import logging
 
@@ -13,11 +16,16 @@ class LocationDisambiguationDialog:
     """Dialog per la disambiguazione quando ci sono più località con lo stesso nome."""
     
     def __init__(self, page: ft.Page, candidates: List[LocationCandidate], 
-                 on_selection: Callable[[LocationCandidate], None]):
+                 on_selection: Callable[[LocationCandidate], None], query: str = ""):
         self.page = page
         self.candidates = candidates
         self.on_selection = on_selection
+        self.query = query
         self.dialog = None
+        session = page.session if page else None
+        self.ranker = (session.get('candidate_ranker') if session else None) or CandidateRanker()
+        self.preview_service = (session.get('temperature_preview_service') if session else None) or TemperaturePreviewService()
+        self._preview_texts = []
         
         # Get theme colors
         self.is_dark = page.theme_mode == ft.ThemeMode.DARK
@@ -38,13 +46,52 @@ class LocationDisambiguationDialog:
                 "hover": "#F0F0F0", "selected": "#2196F320"
             }
     
+    def _get_session_state(self, key: str):
+        """Valore dello stato condiviso dell'app, se disponibile."""
+        try:
+            state_manager = self.page.session.get("state_manager") if self.page else None
+            return state_manager.get_state(key) if state_manager else None
+        except Exception:
+            return None
+    
+    def _get_origin(self) -> Optional[Tuple[float, float]]:
+        lat, lon = self._get_session_state("current_lat"), self._get_session_state("current_lon")
+        return (lat, lon) if lat is not None and lon is not None else None
+    
     def show(self):
         """Mostra il dialog di disambiguazione."""
         if not self.candidates:
             return
         
+        self.page.run_task(self._show_ranked)
+    
+    async def _show_ranked(self):
+        """Ordina i candidati in locale, apre il dialog e carica le anteprime meteo."""
+        # La query "città, regione, paese" fornisce i qualificatori per il ranking
+        qualifiers = [part.strip() for part in self.query.split(",")[1:]]
+        state = qualifiers[0] if len(qualifiers) > 1 else ""
+        country = qualifiers[-1] if qualifiers else ""
+        try:
+            self.candidates = await asyncio.to_thread(
+                self.ranker.rank, self.candidates, state, country, self._get_origin()
+            )
+        except Exception as ex:
+            logger.error(f"Errore nel ranking dei candidati: {ex}")
+        
         self.dialog = self._create_dialog()
         self.page.open(self.dialog)
+        
+        unit = self._get_session_state("unit") or "metric"
+        symbol = UNIT_SYSTEMS.get(unit, UNIT_SYSTEMS["metric"])["temperature"]
+        previews = await self.preview_service.get_previews(self.candidates, unit)
+        if not self.dialog.open:
+            return
+        for text, preview in zip(self._preview_texts, previews):
+            text.value = f"🌡️ {preview['temp']}{symbol}" if preview else ""
+        try:
+            self.dialog.update()
+        except Exception as ex:
+            logger.debug(f"Anteprime non mostrate: {ex}")
     
     def _create_dialog(self):
         """Crea il dialog di disambiguazione."""
@@ -125,32 +172,48 @@ class LocationDisambiguationDialog:
         # Informazioni principali
         main_info = ft.Column([
             ResponsiveTextFactory.create_adaptive_text(
+                page=self.page,
                 text=candidate.name,
                 text_type="body_primary",
                 color=self.colors["text"],
                 weight=ft.FontWeight.BOLD
             ),
             ResponsiveTextFactory.create_adaptive_text(
+                page=self.page,
                 text=f"{flag_emoji} {candidate.country}" + 
                      (f", {candidate.state}" if candidate.state else ""),
                 text_type="label_small",
                 color=self.colors["text_secondary"]
             ),
             ResponsiveTextFactory.create_adaptive_text(
+                page=self.page,
                 text=f"📍 {candidate.lat:.4f}, {candidate.lon:.4f}",
                 text_type="label_small",
                 color=self.colors["text_secondary"]
             ),
         ], spacing=2, expand=True)
         
+        # Anteprima meteo: caricata dopo l'apertura solo per i primi candidati
+        preview_text = ResponsiveTextFactory.create_adaptive_text(
+            page=self.page,
+            text="…" if index < PREVIEW_CANDIDATES else "",
+            text_type="label_small",
+            color=self.colors["text"]
+        )
+        if index < PREVIEW_CANDIDATES:
+            self._preview_texts.append(preview_text)
+        
         # Informazioni aggiuntive
         additional_info = ft.Column([
+            preview_text,
             ResponsiveTextFactory.create_adaptive_text(
+                page=self.page,
                 text=f"👥 {candidate.population:,} ab." if candidate.population > 0 else "👥 N/A",
                 text_type="label_small",
                 color=self.colors["text_secondary"]
             ),
             ResponsiveTextFactory.create_adaptive_text(
+                page=self.page,
                 text=f"🎯 {candidate.relevance_score:.1f}%" if candidate.relevance_score > 0 else "",
                 text_type="label_small",
                 color=self.colors["accent"]
@@ -163,6 +226,7 @@ class LocationDisambiguationDialog:
                 # Numero opzione
                 ft.Container(
                     content=ResponsiveTextFactory.create_adaptive_text(
+                        page=self.page,
                         text=str(index + 1),
                         text_type="label_small",
                         color=self.colors["accent"],
@@ -218,6 +282,7 @@ class LocationDisambiguationDialog:
     def _select_candidate(self, candidate: LocationCandidate):
         """Gestisci selezione di un candidato."""
         self._close_dialog()
+        self.ranker.record_selection(candidate)
         if self.on_selection:
             self.on_selection(candidate)
     
@@ -3,10 +3,10 @@ from core.state_manager import StateManager
 from services.location.location_manager_service import LocationManagerService
 from services.location.geocoding_service import GeocodingService
 from translations import translation_manager
-from utils.responsive_utils import ResponsiveTextFactory
+from ui.components.lazy_list import LazyListView
+from utils.responsive_utils import ResponsiveHelper, ResponsiveTextFactory
 import logging
 import requests
-import os
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
@@ -18,6 +18,7 @@ class UIConstants:
     DIALOG_MIN_WIDTH: int = 600
     DIALOG_MAX_WIDTH: int = 800
     LOCATIONS_LIST_HEIGHT: int = 280
+    LOCATION_CARD_HEIGHT: int = 90
     SEARCH_RESULTS_MAX_HEIGHT: int = 350
     SEARCH_RESULTS_ITEM_HEIGHT: int = 70
     MAX_SEARCH_RESULTS: int = 10
@@ -54,8 +55,11 @@ class LocationManagerDialog:
         # Core dependencies
         self.page = page
         self.state_manager = state_manager if state_manager else StateManager(page)
-        self.location_service = LocationManagerService()
-        self.geocoding_service = GeocodingService()
+        shared_service = page.session.get('location_manager_service') if page and page.session else None
+        self.location_service = shared_service or LocationManagerService()
+        self.geocoding_service = GeocodingService(
+            geocoder=page.session.get('geocoder') if page and page.session else None
+        )
         self.update_weather_callback = update_weather_callback
         
         # UI constants
@@ -113,6 +117,7 @@ class LocationManagerDialog:
         # Dialog components
         self.dialog = None
         self.locations_list = None
+        self._card_style = None
         
         # Search components  
         self.city_field = None
@@ -288,7 +293,7 @@ class LocationManagerDialog:
                     # Enhanced saved locations section
                     self._create_saved_locations_section(texts),
                     
-                    # Locations list (now without fixed height)
+                    # Locations list (scrolls on its own, built page by page)
                     self.create_locations_list(),
                     
                     # Bottom spacing
@@ -540,32 +545,34 @@ class LocationManagerDialog:
         )
     
     def create_locations_list(self):
-        """Create enhanced locations list with natural scrolling (no fixed height)."""
-        locations_column = ft.Column([], spacing=6)  # Removed scroll from here
-        
-        # Get locations with enhanced error handling
+        """Create the saved locations list; cards are built while scrolling and recycled on refresh."""
+        # Get locations in display order, maintained incrementally by the service
         try:
-            all_locations = self.location_service.get_all_locations()
-            logger.info(f"Loading {len(all_locations)} locations for display")
+            sorted_locations = self.location_service.get_sorted_locations()
+            logger.info(f"Loading {len(sorted_locations)} locations for display")
         except Exception as e:
             logger.error(f"Error loading locations: {e}")
-            all_locations = []
+            sorted_locations = []
         
-        if not all_locations:
+        if not sorted_locations:
             # Enhanced empty state with better visual design
-            locations_column.controls.append(self._create_empty_state())
+            content = self._create_empty_state()
         else:
-            # Sort locations with enhanced logic
-            sorted_locations = self._sort_locations(all_locations)
-            
-            # Create location cards with enhanced design
-            for location in sorted_locations:
-                location_card = self._create_location_card(location)
-                locations_column.controls.append(location_card)
+            if self.locations_list is None:
+                self.locations_list = LazyListView(
+                    item_builder=self._create_location_card,
+                    key=self._location_card_key,
+                    item_size=self.ui_constants.LOCATION_CARD_HEIGHT,
+                    viewport=self.ui_constants.LOCATIONS_LIST_HEIGHT,
+                    spacing=6,
+                    height=self.ui_constants.LOCATIONS_LIST_HEIGHT
+                )
+            self._card_style = (self.theme, self.language, ResponsiveHelper.get_device_type_smart(self.page))
+            self.locations_list.set_items(sorted_locations)
+            content = self.locations_list
         
         return ft.Container(
-            content=locations_column,
-            # Removed fixed height for natural scrolling
+            content=content,
             padding=12,
             border=ft.border.all(
                 1, 
@@ -575,6 +582,12 @@ class LocationManagerDialog:
             bgcolor=ft.Colors.with_opacity(0.03, self.colors.text)
         )
     
+    def _location_card_key(self, location):
+        """Recycling key of a location card: everything that changes how it looks."""
+        return (location.get("id"), location.get("name"), location.get("lat"), location.get("lon"),
+                location.get("country"), location.get("state"), location.get("favorite", False),
+                location.get("last_selected", False), self._card_style)
+    
     def _create_empty_state(self):
         """Create enhanced empty state with better visual hierarchy."""
         return ft.Container(
@@ -609,17 +622,6 @@ class LocationManagerDialog:
             alignment=ft.alignment.center
         )
     
-    def _sort_locations(self, locations):
-        """Sort locations with enhanced logic for better UX."""
-        return sorted(
-            locations, 
-            key=lambda x: (
-                not x.get('last_selected', False),  # Current location first
-                not x.get('favorite', False),       # Then favorites
-                x.get('name', '').lower()           # Then alphabetical
-            )
-        )
-    
     def _create_location_card(self, location):
         """Create enhanced location card optimized for Samsung A55 5G mobile layout."""
         # Location information with better formatting
@@ -977,15 +979,10 @@ class LocationManagerDialog:
             self.page.update()
     
     def _geocode_sync(self, city: str, state: str = None, country: str = None):
-        """Synchronous geocoding using requests."""
+        """Synchronous geocoding through the shared geocoder (cache, offline gazetteer, API)."""
         try:
             from services.location.geocoding_service import LocationCandidate
             
-            # Get API key
-            api_key = os.getenv("API_KEY")
-            if not api_key:
-                raise Exception("OpenWeatherMap API key not found in environment variables")
-            
             # Build query
             query_parts = [city.strip()]
             if state and state.strip():
@@ -996,19 +993,8 @@ class LocationManagerDialog:
             query = ",".join(query_parts)
             logger.info(f"Geocoding query: {query}")
             
-            # Make API call
-            url = "http://api.openweathermap.org/geo/1.0/direct"
-            params = {
-                "q": query,
-                "limit": 5,
-                "appid": api_key
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            logger.info(f"API returned {len(data)} results")
+            data = self.geocoding_service.get_geocoder().forward(query, limit=5, raise_errors=True)
+            logger.info(f"Geocoder returned {len(data)} results")
             
             # Parse response
             candidates = []
@@ -1030,7 +1016,8 @@ class LocationManagerDialog:
                         country_code=country_code,
                         state=state,
                         lat=lat,
-                        lon=lon
+                        lon=lon,
+                        population=int(item.get("population", 0) or 0)
                     )
                     candidates.append(candidate)
                 except Exception as e:
@@ -1294,9 +1281,6 @@ class LocationManagerDialog:
             if result:
                 logger.info(f"Location added successfully: {candidate.full_name}")
                 
-                # Reload locations
-                self.location_service.load_locations()
-                
                 # Clear search with smooth animation
                 self.clear_search()
                 
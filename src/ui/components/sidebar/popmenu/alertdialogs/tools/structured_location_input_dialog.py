@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 
+import asyncio
 import flet as ft
-from typing import Callable
+from typing import Callable, Optional, Tuple
 from services.location.geocoding_service import LocationCandidate
+from services.location.candidate_ranking import CandidateRanker, TemperaturePreviewService
 from translations import translation_manager
+from utils.config import UNIT_SYSTEMS, PREVIEW_CANDIDATES
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,6 +20,10 @@ class StructuredLocationInputDialog:
         self.on_location_selected = on_location_selected
         self.on_close_callback = on_close_callback
         self.dialog = None
+        session = page.session if page else None
+        self.ranker = (session.get('candidate_ranker') if session else None) or CandidateRanker()
+        self.preview_service = (session.get('temperature_preview_service') if session else None) or TemperaturePreviewService()
+        self.geocoder = session.get('geocoder') if session else None
         
         # Input fields
         self.city_field = None
@@ -24,6 +31,8 @@ class StructuredLocationInputDialog:
         self.country_field = None
         self.search_button = None
         self.results_container = None
+        self._search_seq = 0
+        self._preview_texts = []
         
         # Get theme colors
         self.is_dark = page.theme_mode == ft.ThemeMode.DARK
@@ -56,6 +65,19 @@ class StructuredLocationInputDialog:
             pass
         return translation_manager.get_translation("weather", key, language)
     
+    def _get_session_state(self, key: str):
+        """Valore dello stato condiviso dell'app, se disponibile."""
+        try:
+            state_manager = self.page.session.get("state_manager") if self.page else None
+            return state_manager.get_state(key) if state_manager else None
+        except Exception:
+            return None
+    
+    def _get_origin(self) -> Optional[Tuple[float, float]]:
+        """Posizione corrente, usata per preferire i candidati vicini."""
+        lat, lon = self._get_session_state("current_lat"), self._get_session_state("current_lon")
+        return (lat, lon) if lat is not None and lon is not None else None
+    
     def show(self):
         """Mostra il dialog di input strutturato."""
         self.dialog = self._create_dialog()
@@ -243,13 +265,14 @@ class StructuredLocationInputDialog:
         self.page.update()
         
         # Usa la vera API per la ricerca
-        self.page.run_task(self._search_with_api, city, state, country)
+        self._search_seq += 1
+        self.page.run_task(self._search_with_api, city, state, country, self._search_seq)
     
-    async def _search_with_api(self, city: str, state: str, country: str):
-        """Ricerca asincrona con API."""
+    async def _search_with_api(self, city: str, state: str, country: str, seq: int = 0):
+        """Ricerca asincrona con API, poi ranking locale e anteprime meteo."""
         try:
             from services.location.geocoding_service import GeocodingService
-            geocoding_service = GeocodingService()
+            geocoding_service = GeocodingService(geocoder=self.geocoder)
             
             # Crea query strutturata  
             query_parts = [city]
@@ -261,9 +284,17 @@ class StructuredLocationInputDialog:
             
             # Effettua la ricerca
             results = await geocoding_service.search_by_structured_input(city, state, country)
+            if seq and seq != self._search_seq:
+                return  # superata da una ricerca più recente
+            
+            # Ordina i candidati in locale (popolazione, distanza, regione/paese, scelte passate)
+            results = await asyncio.to_thread(
+                self.ranker.rank, results, state, country, self._get_origin()
+            )
             
             # Aggiorna l'UI nel thread principale
             self.results_container.controls.clear()
+            self._preview_texts = []
             
             if not results:
                 # Nessun risultato
@@ -291,7 +322,12 @@ class StructuredLocationInputDialog:
             self.page.update()
             logger.info(f"Ricerca completata: {len(results) if results else 0} risultati per '{query}'")
             
+            if results:
+                await self._load_previews(results, seq)
+            
         except Exception as ex:
+            if seq and seq != self._search_seq:
+                return
             logger.error(f"Errore nella ricerca API: {ex}")
             self.results_container.controls.clear()
             error_msg = ft.Container(
@@ -309,11 +345,25 @@ class StructuredLocationInputDialog:
             self.results_container.controls.append(error_msg)
             self.page.update()
     
-
+    async def _load_previews(self, results: list, seq: int):
+        """Completa le card dei primi candidati con la temperatura attuale."""
+        unit = self._get_session_state("unit") or "metric"
+        symbol = UNIT_SYSTEMS.get(unit, UNIT_SYSTEMS["metric"])["temperature"]
+        previews = await self.preview_service.get_previews(results, unit)
+        if seq != self._search_seq or not self.dialog or not self.dialog.open:
+            return
+        
+        for text, preview in zip(self._preview_texts, previews):
+            text.value = f"🌡️ {preview['temp']}{symbol}" if preview else ""
+        try:
+            self.results_container.update()
+        except Exception as ex:
+            logger.debug(f"Anteprime non mostrate: {ex}")
     
     def _display_results(self, results: list):
         """Mostra i risultati della ricerca."""
         self.results_container.controls.clear()
+        self._preview_texts = []
         
         if not results:
             # Nessun risultato
@@ -355,6 +405,14 @@ class StructuredLocationInputDialog:
                    color=self.colors["text_secondary"], size=10)
         ], spacing=2, expand=True)
         
+        # Anteprima meteo: caricata in seguito solo per i primi candidati
+        preview_text = ft.Text(
+            "…" if index <= PREVIEW_CANDIDATES else "",
+            color=self.colors["text_secondary"], size=12
+        )
+        if index <= PREVIEW_CANDIDATES:
+            self._preview_texts.append(preview_text)
+        
         # Card container - più compatta per migliorare lo scroll
         card = ft.Container(
             content=ft.Row([
@@ -372,6 +430,8 @@ class StructuredLocationInputDialog:
                 # Info
                 main_info,
                 
+                preview_text,
+                
                 # Pulsante selezione
                 ft.IconButton(
                     icon=ft.Icons.CHECK_CIRCLE,
@@ -405,6 +465,7 @@ class StructuredLocationInputDialog:
     def _select_location(self, candidate: LocationCandidate):
         """Gestisci selezione di una località."""
         self._close_dialog(call_callback=False)  # Non chiamare il callback di chiusura
+        self.ranker.record_selection(candidate)
         if self.on_location_selected:
             self.on_location_selected(candidate)
     
@@ -1,8 +1,12 @@
-import asyncio
 import flet as ft
 from services.alerts.weather_alerts_service import AlertSeverity, AlertType
 from translations import translation_manager  # New modular translation system
-from utils.responsive_utils import ResponsiveTextFactory
+from ui.components.lazy_list import LazyListView
+from utils.responsive_utils import ResponsiveHelper, ResponsiveTextFactory
+
+ALERT_CARD_HEIGHT = 90  # approximate height of an alert card, spacing included
+COMPACT_ALERT_ITEM_HEIGHT = 110
+ALERTS_LIST_MAX_HEIGHT = 400  # taller alert lists scroll
 
 class WeatherAlertDialog:
     """Dialog semplificato per la gestione delle allerte meteo."""
@@ -13,6 +17,11 @@ class WeatherAlertDialog:
         self.language = language
         self.dialog = None
         
+        # Alert lists are kept across refreshes so their cards are recycled
+        self._alerts_list = None
+        self._compact_alerts_list = None
+        self._card_style = None
+        
         # Get weather alerts service from session
         self.weather_alerts_service = self.page.session.get('weather_alerts_service') if self.page else None
         
@@ -178,10 +187,7 @@ class WeatherAlertDialog:
         if not self.weather_alerts_service:
             return ft.Container()
         
-        active_alerts = self.weather_alerts_service.get_active_alerts()
-        severity_counts = {severity: 0 for severity in AlertSeverity}
-        for alert in active_alerts:
-            severity_counts[alert.severity] += 1
+        severity_counts = self.weather_alerts_service.get_alert_statistics()['active']
         
         severity_info = [
             (AlertSeverity.LOW, self.get_translation("severity_low"), self.colors["success"]),
@@ -256,7 +262,9 @@ class WeatherAlertDialog:
                 ], spacing=8, horizontal_alignment=ft.CrossAxisAlignment.CENTER), padding=20
             )
         
-        alert_cards = [self.create_alert_card(alert) for alert in active_alerts]
+        if self._alerts_list is None:
+            self._alerts_list = self._create_lazy_list(self.create_alert_card, ALERT_CARD_HEIGHT, spacing=8,
+                                                       padding=ft.padding.symmetric(vertical=5))
         
         return ft.Column([
             ft.Row([
@@ -270,16 +278,26 @@ class WeatherAlertDialog:
                 ft.TextButton(text=self.get_translation("acknowledge_all"), icon=ft.Icons.DONE_ALL,
                              on_click=self.acknowledge_all_alerts, style=ft.ButtonStyle(color=self.colors["accent"])) if active_alerts else ft.Container()
             ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-            # Lista degli alert con ListView espandibile
-            ft.ListView(
-                controls=alert_cards,
-                spacing=8,
-                padding=ft.padding.symmetric(vertical=5),
-                expand=True,
-                auto_scroll=False
-            )
+            # Lista degli alert: solo le card visibili vengono costruite, le altre durante lo scroll
+            self._fill_lazy_list(self._alerts_list, active_alerts, ALERT_CARD_HEIGHT)
         ], spacing=8)
 
+    def _create_lazy_list(self, item_builder, item_size, **kwargs):
+        """Create a list that builds alert cards page by page and recycles them on refresh."""
+        return LazyListView(item_builder=item_builder, key=self._alert_item_key, item_size=item_size,
+                            viewport=ALERTS_LIST_MAX_HEIGHT, auto_scroll=False, **kwargs)
+
+    def _fill_lazy_list(self, alerts_list, alerts, item_size):
+        """Show the alerts in the list, sized to its content up to ALERTS_LIST_MAX_HEIGHT."""
+        self._card_style = (self.colors["bg"], self.language, ResponsiveHelper.get_device_type_smart(self.page))
+        alerts_list.set_items(alerts)
+        alerts_list.height = min(len(alerts) * item_size, ALERTS_LIST_MAX_HEIGHT)
+        return alerts_list
+
+    def _alert_item_key(self, alert):
+        """Recycling key of an alert card: everything that changes how it looks."""
+        return (alert.id, alert.title, alert.message, alert.severity, alert.value, alert.unit, self._card_style)
+
     def create_alert_card(self, alert):
         """Create individual alert card."""
         severity_colors = {
@@ -445,7 +463,8 @@ class WeatherAlertDialog:
                 return
             
             alerts = await self.weather_alerts_service.check_real_weather_conditions(
-                weather_view.current_weather_data, main_app.api_service
+                weather_view.current_weather_data, main_app.api_service,
+                location=main_app.get_alert_location(weather_view.current_weather_data)
             )
             
             if len(alerts) == 0:
@@ -501,8 +520,9 @@ class WeatherAlertDialog:
                 text_align=ft.TextAlign.CENTER
             )
         
-        active_alerts = self.weather_alerts_service.get_active_alerts()
-        total_alerts = len(active_alerts)
+        statistics = self.weather_alerts_service.get_alert_statistics()
+        total_alerts = sum(statistics['active'].values())
+        recent_text = self.get_translation("alerts_last_week").replace("{count}", str(statistics['recent_total']))
         
         if total_alerts == 0:
             return ft.Container(
@@ -515,7 +535,14 @@ class WeatherAlertDialog:
                         color=self.colors["success"],
                         text_align=ft.TextAlign.CENTER,
                         weight=ft.FontWeight.W_500
-                    )
+                    ),
+                    ResponsiveTextFactory.create_adaptive_text(
+                        page=self.page,
+                        text=recent_text,
+                        text_type="label_small",
+                        color=self.colors["text_secondary"],
+                        text_align=ft.TextAlign.CENTER
+                    ) if statistics['recent_total'] else ft.Container()
                 ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
                 padding=ft.padding.all(20),
                 border_radius=12,
@@ -540,6 +567,13 @@ class WeatherAlertDialog:
                     text_type="label_small",
                     color=self.colors["text_secondary"],
                     text_align=ft.TextAlign.CENTER
+                ),
+                ResponsiveTextFactory.create_adaptive_text(
+                    page=self.page,
+                    text=recent_text,
+                    text_type="label_small",
+                    color=self.colors["text_secondary"],
+                    text_align=ft.TextAlign.CENTER
                 )
             ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=6),
             padding=ft.padding.all(16),
@@ -560,98 +594,89 @@ class WeatherAlertDialog:
         # Ordina le allerte per severità
         sorted_alerts = sorted(active_alerts, key=lambda x: x.severity.value, reverse=True)
         
-        alert_items = []
-        for alert in sorted_alerts:
-            # Mappa dei colori per severità
-            severity_colors = {
-                AlertSeverity.LOW: self.colors["success"], 
-                AlertSeverity.MODERATE: self.colors["warning"],
-                AlertSeverity.HIGH: self.colors["error"], 
-                AlertSeverity.EXTREME: "#9C27B0"
-            }
-            
-            # Icone per tipo di alert usando Flet Icons
-            alert_icons = {
-                AlertType.STORM: ft.Icons.THUNDERSTORM,
-                AlertType.RAIN_HEAVY: ft.Icons.WATER_DROP,
-                AlertType.SNOW_HEAVY: ft.Icons.AC_UNIT,
-                AlertType.WIND_STRONG: ft.Icons.AIR,
-                AlertType.TEMPERATURE_HIGH: ft.Icons.WB_SUNNY,
-                AlertType.TEMPERATURE_LOW: ft.Icons.AC_UNIT,
-                AlertType.FOG: ft.Icons.CLOUD,
-                AlertType.UV_HIGH: ft.Icons.WB_SUNNY,
-                AlertType.AIR_QUALITY_POOR: ft.Icons.MASKS,
-                AlertType.HUMIDITY_HIGH: ft.Icons.WATER_DROP,
-                AlertType.PRESSURE_LOW: ft.Icons.COMPRESS
-            }
-            
-            color = severity_colors.get(alert.severity, self.colors["warning"])
-            icon = alert_icons.get(alert.alert_type, ft.Icons.WARNING)
-            
-            # Traduzione del tipo di severità
-            severity_key = f"alert_severity_{alert.severity.name.lower()}"
-            severity_text = self.get_translation(severity_key)
-            
-            alert_items.append(
-                ft.Container(
-                    content=ft.Column([
-                        # Header con icona e severità
+        # Solo le allerte visibili vengono costruite, le altre durante lo scroll
+        if self._compact_alerts_list is None:
+            self._compact_alerts_list = self._create_lazy_list(self._create_compact_alert_item,
+                                                               COMPACT_ALERT_ITEM_HEIGHT, spacing=8,
+                                                               padding=ft.padding.symmetric(vertical=4))
+        return self._fill_lazy_list(self._compact_alerts_list, sorted_alerts, COMPACT_ALERT_ITEM_HEIGHT)
+
+    def _create_compact_alert_item(self, alert):
+        """Create the compact card of one alert."""
+        # Mappa dei colori per severità
+        severity_colors = {
+            AlertSeverity.LOW: self.colors["success"], 
+            AlertSeverity.MODERATE: self.colors["warning"],
+            AlertSeverity.HIGH: self.colors["error"], 
+            AlertSeverity.EXTREME: "#9C27B0"
+        }
+        
+        # Icone per tipo di alert usando Flet Icons
+        alert_icons = {
+            AlertType.STORM: ft.Icons.THUNDERSTORM,
+            AlertType.RAIN_HEAVY: ft.Icons.WATER_DROP,
+            AlertType.SNOW_HEAVY: ft.Icons.AC_UNIT,
+            AlertType.WIND_STRONG: ft.Icons.AIR,
+            AlertType.TEMPERATURE_HIGH: ft.Icons.WB_SUNNY,
+            AlertType.TEMPERATURE_LOW: ft.Icons.AC_UNIT,
+            AlertType.FOG: ft.Icons.CLOUD,
+            AlertType.UV_HIGH: ft.Icons.WB_SUNNY,
+            AlertType.AIR_QUALITY_POOR: ft.Icons.MASKS,
+            AlertType.HUMIDITY_HIGH: ft.Icons.WATER_DROP,
+            AlertType.PRESSURE_LOW: ft.Icons.COMPRESS
+        }
+        
+        color = severity_colors.get(alert.severity, self.colors["warning"])
+        icon = alert_icons.get(alert.alert_type, ft.Icons.WARNING)
+        
+        # Traduzione del tipo di severità
+        severity_key = f"alert_severity_{alert.severity.name.lower()}"
+        severity_text = self.get_translation(severity_key)
+        
+        return ft.Container(
+            content=ft.Column([
+                # Header con icona e severità
+                ft.Row([
+                    ft.Icon(icon, size=20, color=color),
+                    ft.Column([
+                        ResponsiveTextFactory.create_adaptive_text(
+                            page=self.page,
+                            text=alert.title,
+                            text_type="body_primary",
+                            color=self.colors["text"],
+                            weight=ft.FontWeight.W_600
+                        ),
                         ft.Row([
-                            ft.Icon(icon, size=20, color=color),
-                            ft.Column([
-                                ResponsiveTextFactory.create_adaptive_text(
-                                    page=self.page,
-                                    text=alert.title,
-                                    text_type="body_primary",
-                                    color=self.colors["text"],
-                                    weight=ft.FontWeight.W_600
-                                ),
-                                ft.Row([
-                                    ft.Icon(ft.Icons.KEYBOARD_ARROW_UP, size=12, color=color),
-                                    ResponsiveTextFactory.create_adaptive_text(
-                                        page=self.page,
-                                        text=severity_text,
-                                        text_type="label_small",
-                                        color=color,
-                                        weight=ft.FontWeight.W_500
-                                    )
-                                ], spacing=2)
-                            ], spacing=2, expand=True),
-                            ft.Container(width=4, height=40, bgcolor=color, border_radius=2)
-                        ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                        
-                        # Messaggio dell'alert
-                        ft.Container(
-                            content=ResponsiveTextFactory.create_adaptive_text(
+                            ft.Icon(ft.Icons.KEYBOARD_ARROW_UP, size=12, color=color),
+                            ResponsiveTextFactory.create_adaptive_text(
                                 page=self.page,
-                                text=alert.message[:80] + "..." if len(alert.message) > 80 else alert.message,
+                                text=severity_text,
                                 text_type="label_small",
-                                color=self.colors["text_secondary"],
-                                text_align=ft.TextAlign.LEFT
-                            ),
-                            padding=ft.padding.only(left=28)
-                        )
-                    ], spacing=4),
-                    padding=ft.padding.all(12),
-                    bgcolor=ft.Colors.with_opacity(0.03, color),
-                    border=ft.border.all(1, ft.Colors.with_opacity(0.2, color)),
-                    border_radius=10,
-                    margin=ft.margin.only(bottom=6)
+                                color=color,
+                                weight=ft.FontWeight.W_500
+                            )
+                        ], spacing=2)
+                    ], spacing=2, expand=True),
+                    ft.Container(width=4, height=40, bgcolor=color, border_radius=2)
+                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                
+                # Messaggio dell'alert
+                ft.Container(
+                    content=ResponsiveTextFactory.create_adaptive_text(
+                        page=self.page,
+                        text=alert.message[:80] + "..." if len(alert.message) > 80 else alert.message,
+                        text_type="label_small",
+                        color=self.colors["text_secondary"],
+                        text_align=ft.TextAlign.LEFT
+                    ),
+                    padding=ft.padding.only(left=28)
                 )
-            )
-        
-        # Calcola l'altezza dinamica basata sul numero di allerte
-        alert_count = len(alert_items)
-        if alert_count == 0:
-            return ft.Container()
-        
-        # Usa ListView senza container fisso - si adatta al contenuto
-        return ft.ListView(
-            controls=alert_items,
-            spacing=8,
-            padding=ft.padding.symmetric(vertical=4),
-            expand=True,
-            auto_scroll=False
+            ], spacing=4),
+            padding=ft.padding.all(12),
+            bgcolor=ft.Colors.with_opacity(0.03, color),
+            border=ft.border.all(1, ft.Colors.with_opacity(0.2, color)),
+            border_radius=10,
+            margin=ft.margin.only(bottom=6)
         )
 
     def acknowledge_alert(self, alert_id: str):
@@ -660,7 +685,7 @@ class WeatherAlertDialog:
             success = self.weather_alerts_service.acknowledge_alert(alert_id)
             if success:
                 self.show_snackbar(self.get_translation("alert_acknowledged"), self.colors["success"])
-                asyncio.create_task(self.refresh_alerts(None))
+                self.page.run_task(self.refresh_alerts, None)
 
     async def acknowledge_all_alerts(self, e):
         """Acknowledge all active alerts."""
@@ -679,6 +704,8 @@ class WeatherAlertDialog:
             status_key = "alert_type_enabled" if enabled else "alert_type_disabled"
             self.show_snackbar(f"{alert_type.value} - " + self.get_translation(status_key),
                              self.colors["success"] if enabled else self.colors["warning"])
+            # The service re-evaluated the alerts of this type: show them right away
+            self.page.run_task(self.refresh_alerts, None)
 
     def show_dialog(self):
         """Show the weather alerts dialog."""
@@ -1,9 +1,15 @@
+import asyncio
 import logging
+import time
 import flet as ft
 import os
 from typing import Callable, Optional, List
 
 from services.ui.theme_handler import ThemeHandler
+from services.location.autocomplete_service import AutocompleteService, CitySuggestion
+from utils.config import AUTOCOMPLETE_DEBOUNCE, AUTOCOMPLETE_LIMIT
+
+AUTOCOMPLETE_BUDGET_MS = 10  # oltre questa soglia il calcolo dei suggerimenti viene segnalato
 
 class SearchBar:
 
@@ -20,6 +26,12 @@ class SearchBar:
         self.suffix_widget = suffix_widget
         self.focused = False
         self.search_field = None
+        self.suggestions_column = None
+        self.suggestions_container = None
+        self._autocomplete = None
+        self._geocoder = None
+        self._suggest_seq = 0
+        self._suggest_future = None
 
     def update_text_sizes(self, get_size_func: Callable, language: str):
         pass  # Non serve più, la gestione è locale
@@ -27,6 +39,8 @@ class SearchBar:
     def build(self, popmenu_widget=None, filter_widget=None, clear_icon_size=None) -> ft.Container:
         
         def on_submit(e):
+            self._cancel_suggestions()
+            self._hide_suggestions()
             value = e.control.value.strip()
             logging.info(f"DEBUG: SearchBar on_submit called with value: '{value}'")
             if value:
@@ -44,6 +58,8 @@ class SearchBar:
         def clear_text(e):
             self.search_field.value = ""
             self.search_field.update()
+            self._cancel_suggestions()
+            self._hide_suggestions()
 
         clear_btn = ft.IconButton(
             icon=ft.Icons.CLOSE,
@@ -63,6 +79,7 @@ class SearchBar:
             content_padding=ft.padding.symmetric(horizontal=10, vertical=12),
             border=ft.InputBorder.NONE,
             on_submit=on_submit,
+            on_change=lambda e: self._schedule_suggestions(e.control.value or ""),
             expand=True,
         )
 
@@ -111,8 +128,143 @@ class SearchBar:
         container.on_focus = lambda e: on_focus_handler(e, container_instance)
         container.on_blur = lambda e: on_blur_handler(e, container_instance)
 
+        # Suggestion list shown while typing: the owner places it right under the
+        # returned container (see SidebarManager.build)
+        self.suggestions_column = ft.Column([], spacing=0, tight=True)
+        self.suggestions_container = ft.Container(
+            content=self.suggestions_column,
+            bgcolor=bg_color,
+            border=ft.border.all(1, border_color),
+            border_radius=16,
+            shadow=ft.BoxShadow(blur_radius=12, color="#00000026"),
+            padding=ft.padding.symmetric(vertical=4),
+            visible=False,
+        )
+
         return container
 
+    # ------------------------------------------------------------------
+    # Autocomplete
+    # ------------------------------------------------------------------
+
+    def _schedule_suggestions(self, value: str):
+        """Restart the debounce window; the previous lookup, if any, is cancelled."""
+        self._suggest_seq += 1
+        self._cancel_suggestions(bump=False)
+        if not self.page:
+            return
+        try:
+            self._suggest_future = self.page.run_task(self._update_suggestions, self._suggest_seq, value)
+        except Exception as e:
+            logging.debug(f"Autocomplete not scheduled: {e}")
+
+    def _cancel_suggestions(self, bump: bool = True):
+        if bump:
+            self._suggest_seq += 1
+        future = self._suggest_future
+        self._suggest_future = None
+        if future is not None and hasattr(future, "cancel"):
+            future.cancel()
+
+    def _get_origin(self):
+        """Current position, used to rank nearby cities first."""
+        try:
+            state_manager = self.page.session.get("state_manager") if self.page else None
+            if state_manager:
+                lat, lon = state_manager.get_state("current_lat"), state_manager.get_state("current_lon")
+                if lat is not None and lon is not None:
+                    return lat, lon
+        except Exception:
+            pass
+        return None
+
+    def _load_autocomplete(self) -> AutocompleteService:
+        service = self.page.session.get('autocomplete_service') if self.page else None
+        if service is None:
+            service = AutocompleteService()
+        service.warm_up()
+        return service
+
+    async def _update_suggestions(self, seq: int, value: str):
+        try:
+            await asyncio.sleep(AUTOCOMPLETE_DEBOUNCE)
+            if seq != self._suggest_seq:
+                return
+
+            if self._autocomplete is None:
+                # The first call loads the gazetteer and its indexes: keep it off the event loop
+                self._autocomplete = await asyncio.to_thread(self._load_autocomplete)
+                if seq != self._suggest_seq:
+                    return
+
+            started = time.perf_counter()
+            suggestions = self._autocomplete.suggest(value, self._get_origin(), AUTOCOMPLETE_LIMIT)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms > AUTOCOMPLETE_BUDGET_MS:
+                logging.warning(f"Autocomplete for '{value}' took {elapsed_ms:.1f} ms")
+
+            if not suggestions and len(value.strip()) >= 3:
+                suggestions = await self._remote_suggestions(value)
+                if seq != self._suggest_seq:
+                    return
+            self._show_suggestions(suggestions)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logging.error(f"Autocomplete error: {e}")
+
+    async def _remote_suggestions(self, value: str) -> List[CitySuggestion]:
+        """Ask the geocoding API for names the local index does not know."""
+        if self._geocoder is None:
+            self._geocoder = self.page.session.get('geocoder') if self.page else None
+            if self._geocoder is None:
+                from services.location.geocoder import Geocoder
+                self._geocoder = await asyncio.to_thread(lambda: Geocoder(autocomplete=self._autocomplete))
+        # Partial names typed so far are not worth remembering as misses
+        places = await self._geocoder.forward_async(value, AUTOCOMPLETE_LIMIT, cache_misses=False)
+        self._autocomplete.remember(places)
+        return self._autocomplete.suggest(value, self._get_origin(), AUTOCOMPLETE_LIMIT)
+
+    def _show_suggestions(self, suggestions: List[CitySuggestion]):
+        if self.suggestions_column is None:
+            return
+        text_color = self.theme_handler.get_text_color() if self.theme_handler else "#000000"
+        self.suggestions_column.controls = [
+            ft.Container(
+                content=ft.Row([
+                    ft.Icon(ft.Icons.LOCATION_CITY, size=16, color=text_color),
+                    ft.Text(suggestion.label, size=13, color=text_color, expand=True,
+                            max_lines=1, overflow=ft.TextOverflow.ELLIPSIS),
+                ], spacing=8),
+                padding=ft.padding.symmetric(horizontal=14, vertical=8),
+                ink=True,
+                on_click=lambda e, s=suggestion: self._select_suggestion(s),
+            )
+            for suggestion in suggestions
+        ]
+        self.suggestions_container.visible = bool(suggestions)
+        try:
+            self.suggestions_container.update()
+        except (AssertionError, AttributeError):
+            pass
+
+    def _hide_suggestions(self):
+        if self.suggestions_container is not None and self.suggestions_container.visible:
+            self._show_suggestions([])
+
+    def _select_suggestion(self, suggestion: CitySuggestion):
+        self._cancel_suggestions()
+        self._hide_suggestions()
+        if self.search_field is not None:
+            self.search_field.value = suggestion.name
+            self.search_field.update()
+        logging.info(f"Autocomplete suggestion selected: {suggestion.query}")
+        if self.on_city_selected:
+            if self.page:
+                self.page.run_task(self.on_city_selected, suggestion.query)
+            else:
+                self.on_city_selected(suggestion.query)
+
     def update_cities(self, new_cities: List[str]):
         self.cities = new_cities
 
@@ -125,6 +277,7 @@ class SearchBar:
         if hasattr(self, 'search_field') and self.search_field:
             self.search_field.value = ""
             self.search_field.update()
+        self._hide_suggestions()
 
     def cleanup(self):
-        pass
+        self._cancel_suggestions()
@@ -187,6 +187,8 @@ class SidebarManager(ft.Container):
                     logger.error("No weather update callback available")
                     return False
 
+            if self.search_bar:
+                self.search_bar.cleanup()
             self.search_bar = SearchBar(
                 page=self.page,
                 cities=self.cities,
@@ -269,6 +271,8 @@ class SidebarManager(ft.Container):
                     logger.error("No weather update callback available")
                     return False
 
+            if self.search_bar:
+                self.search_bar.cleanup()
             self.search_bar = SearchBar(
                 page=self.page,
                 cities=self.cities,
@@ -401,17 +405,20 @@ class SidebarManager(ft.Container):
                     content=self.pop_menu,
                     margin=ft.margin.only(right=8),  # Spazio tra PopMenu e SearchBar
                 ),
-                # SearchBar allargata a destra
+                # SearchBar allargata a destra, con i suggerimenti subito sotto
                 ft.Container(
-                    content=self.search_bar.build(
-                        popmenu_widget=None,  # Non più necessario
-                        clear_icon_size=25,
-                    ),
+                    content=ft.Column([
+                        self.search_bar.build(
+                            popmenu_widget=None,  # Non più necessario
+                            clear_icon_size=25,
+                        ),
+                        self.search_bar.suggestions_container,
+                    ], spacing=6, tight=True, horizontal_alignment=ft.CrossAxisAlignment.STRETCH),
                     expand=True,  # Prende tutto lo spazio rimanente
                 ),
             ], 
             alignment=ft.MainAxisAlignment.START,
-            vertical_alignment=ft.CrossAxisAlignment.CENTER,
+            vertical_alignment=ft.CrossAxisAlignment.START,
             spacing=0),
             padding=ft.padding.all(15),
             margin=ft.margin.only(bottom=10)
@@ -1,7 +1,7 @@
 import flet as ft
-import math
 import logging
 from services.api.api_service import ApiService
+from services.data.chart_series import ChartSeriesCache
 from services.ui.translation_service import TranslationService
 from utils.config import LIGHT_THEME, DARK_THEME, DEFAULT_LANGUAGE
 
@@ -19,7 +19,8 @@ class AirPollutionChartDisplay(ft.Container):
         self._lat = lat
         self._lon = lon
         
-        self._api_service = ApiService()
+        self._api_service = ApiService(page=self.page)
+        self._series_cache = (page.session.get('chart_series_cache') if page and page.session else None) or ChartSeriesCache()
         self._state_manager = None
         self._current_language = DEFAULT_LANGUAGE
         self._current_text_color = LIGHT_THEME.get("TEXT", ft.Colors.BLACK)
@@ -113,42 +114,14 @@ class AirPollutionChartDisplay(ft.Container):
                 )
             ], spacing=0, expand=True)
 
-        components_data = {
-            "co": float(self._pollution_data.get("co", 0.0)),
-            "no": float(self._pollution_data.get("no", 0.0)),
-            "no2": float(self._pollution_data.get("no2", 0.0)),
-            "o3": float(self._pollution_data.get("o3", 0.0)),
-            "so2": float(self._pollution_data.get("so2", 0.0)),
-            "pm2_5": float(self._pollution_data.get("pm2_5", 0.0)),
-            "pm10": float(self._pollution_data.get("pm10", 0.0)),
-            "nh3": float(self._pollution_data.get("nh3", 0.0)),
-        }
-
-        all_metrics = list(components_data.values())
-        max_val = max(all_metrics) if all_metrics else 0.0
-        
-        raw_dynamic_max_y = 0.0
-        if max_val == 0.0:
-            raw_dynamic_max_y = 50.0
-        else:
-            buffered_max_percentage = max_val * 1.2
-            buffered_max_fixed = max_val + 10.0
-            raw_dynamic_max_y = max(buffered_max_percentage, buffered_max_fixed, 20.0)
-
-        if raw_dynamic_max_y <= 0:
-            final_max_y = 50.0
-        elif raw_dynamic_max_y <= 50:
-            final_max_y = math.ceil(raw_dynamic_max_y / 10) * 10
-        elif raw_dynamic_max_y <= 200:
-            final_max_y = math.ceil(raw_dynamic_max_y / 20) * 20
-        else:
-            final_max_y = math.ceil(raw_dynamic_max_y / 50) * 50
-        final_max_y = max(final_max_y, 10.0)
+        # Values and Y scale precomputed once per measurement
+        series = self._series_cache.pollution(self._pollution_data)
+        final_max_y = series.max_y
 
         unit_text = TranslationService.translate_from_dict("air_pollution_chart_items", "micrograms_per_cubic_meter_short", self._current_language)
 
         bar_groups = []
-        component_keys = ["co", "no", "no2", "o3", "so2", "pm2_5", "pm10", "nh3"]
+        component_keys = series.keys
         # Colori moderni e vivaci per le barre, con gradiente e opacità
         component_colors = [
             ft.Colors.with_opacity(0.85, "#FF5252"),  # CO - Rosso vivace
@@ -162,8 +135,7 @@ class AirPollutionChartDisplay(ft.Container):
         ]
 
         # Creo le barre con tooltips tradotti
-        for i, key in enumerate(component_keys):
-            value = components_data[key]
+        for i, (key, value) in enumerate(zip(component_keys, series.values)):
             # Ottieni il nome tradotto dell'inquinante
             pollutant_name = TranslationService.translate_from_dict(
                 "air_pollution_chart_items", f"{key}_name", self._current_language
@@ -5,10 +5,11 @@ Shows precipitation forecast and probability over time.
 
 import flet as ft
 import asyncio
-from typing import Dict, List, Any
+from typing import Dict, Any
 import logging
 
 from services.api.api_service import ApiService
+from services.data.chart_series import ChartSeriesCache, PrecipitationSeries, chart_point_budget
 from translations import translation_manager
 from services.ui.translation_service import TranslationService  # For unit symbols
 from services.ui.theme_handler import ThemeHandler
@@ -28,11 +29,12 @@ class PrecipitationChartDisplay(ft.Container):
         super().__init__(**kwargs)
         self.page = page
         self.theme_handler = theme_handler or ThemeHandler(self.page)
-        self._api_service = ApiService()
+        self._api_service = ApiService(page=self.page)
+        self._series_cache = (page.session.get('chart_series_cache') if page and page.session else None) or ChartSeriesCache()
         self._current_language = language
         self._current_unit_system = unit
         self._current_text_color = self.theme_handler.get_text_color()
-        self._precipitation_data = []
+        self._series: PrecipitationSeries = None  # precomputed, shared through ChartSeriesCache
         self._forecast_data = {}
         self._updating = False  # Flag to prevent concurrent updates
         self._cached_header = None  # Cache for header to prevent unnecessary rebuilds
@@ -131,7 +133,7 @@ class PrecipitationChartDisplay(ft.Container):
     def _reset_to_safe_state(self):
         """Resets the component to a safe state in case of errors."""
         try:
-            self._precipitation_data = []
+            self._series = None
             self.content = ft.Container(
                 content=ResponsiveTextFactory.create_adaptive_text(
                     page=self.page,
@@ -163,16 +165,13 @@ class PrecipitationChartDisplay(ft.Container):
 
     def build(self):
         """Constructs the UI for the precipitation forecast display."""
-        if not self._precipitation_data:
+        if not self._series:
             return ft.Column([
                 self._build_header(),
                 self._build_loading_content()
             ])
         
-        # Check if we have any significant precipitation
-        significant_precipitation = any(data.get('precipitation', 0) > 0.1 for data in self._precipitation_data)
-        
-        if not significant_precipitation:
+        if not self._visible_series().has_significant:
             # Build a "no significant precipitation" display
             return ft.Column([
                 self._build_header(),
@@ -270,7 +269,8 @@ class PrecipitationChartDisplay(ft.Container):
         text_color = self.theme_handler.get_text_color()
         accent_color = ft.Colors.BLUE_500 if not is_dark else ft.Colors.BLUE_400
         
-        if not self._precipitation_data:
+        series = self._visible_series()
+        if not series:
             return self._build_no_data_content()
 
         # Prepare for building the forecast display
@@ -309,26 +309,24 @@ class PrecipitationChartDisplay(ft.Container):
         data_rows = []
         
         # Logic for smart precipitation display
-        significant_data = [d for d in self._precipitation_data if d.get('precipitation', 0) > 0.1]
-        
-        if significant_data:
+        if series.significant:
             # If we have significant precipitation, show up to 8 entries
-            visible_data = significant_data[:8]
+            visible_indexes = series.significant[:8]
         else:
             # If no significant precipitation in next 24h, show next 6 time slots anyway
             # but with clear indication that precipitation is minimal/none
-            visible_data = self._precipitation_data[:6] if self._precipitation_data else []
+            visible_indexes = range(min(6, len(series)))
         
         # Create rows for the table
-        for data in visible_data:
+        for index in visible_indexes:
             # Format time
-            timestamp = data.get('time', 0)
+            timestamp = series.times[index]
             time_str = ""
             if timestamp:
                 dt = datetime.datetime.fromtimestamp(timestamp)
                 time_str = dt.strftime("%H:%M")
             
-            precip = data.get('precipitation', 0)
+            precip = series.precipitation[index]
             intensity = self._get_precipitation_intensity(precip)
             
             # Create row with time and precipitation data
@@ -419,13 +417,14 @@ class PrecipitationChartDisplay(ft.Container):
 
     def _build_precipitation_summary(self) -> ft.Control:
         """Build a compact and modern summary of precipitation statistics."""
-        if not self._precipitation_data:
+        series = self._visible_series()
+        if not series:
             return ft.Container()
         
-        # Calculate statistics
-        total_precipitation = sum(data.get('precipitation', 0) for data in self._precipitation_data)
-        max_intensity = max(data.get('precipitation', 0) for data in self._precipitation_data)
-        hours_with_rain = sum(1 for data in self._precipitation_data if data.get('precipitation', 0) > 0.1)
+        # Statistics are precomputed with the series (over the whole shown range)
+        total_precipitation = series.total
+        max_intensity = series.peak
+        hours_with_rain = series.rainy_steps
         
         text_color = self.theme_handler.get_text_color()
         
@@ -635,7 +634,7 @@ class PrecipitationChartDisplay(ft.Container):
         """
         try:
             self._forecast_data = forecast_data
-            self._precipitation_data = self._extract_precipitation_data(forecast_data)
+            self._series = self._extract_precipitation_data(forecast_data)
             
             # Rebuild content
             self.content = self.build()
@@ -654,7 +653,7 @@ class PrecipitationChartDisplay(ft.Container):
         except Exception as e:
             logging.error(f"PrecipitationChartDisplay: Error updating data: {e}")
             # Show no data content on error
-            self._precipitation_data = []
+            self._series = None
             self.content = self.build()
             try:
                 if self.page and hasattr(self, 'parent') and self.parent is not None:
@@ -664,98 +663,38 @@ class PrecipitationChartDisplay(ft.Container):
             except Exception as e:
                 logging.error(f"PrecipitationChart: Error recovery - Unexpected error during update: {e}")
 
-    def _extract_precipitation_data(self, forecast_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _extract_precipitation_data(self, forecast_data: Dict[str, Any]) -> PrecipitationSeries:
         """
-        Extract precipitation data from forecast data.
+        Get the precipitation series of the forecast.
+        
+        The series and its statistics are computed once per forecast and unit
+        and shared through ChartSeriesCache, so rebuilds (theme, language)
+        and new chart instances reuse them.
         
         Args:
             forecast_data: Raw forecast data
             
         Returns:
-            List of precipitation data points
+            Precomputed precipitation series (empty if the data has no forecast list)
         """
-        precipitation_data = []
+        if not forecast_data or 'list' not in forecast_data:
+            logging.warning("PrecipitationChart: No 'list' key found in forecast_data")
+            return PrecipitationSeries.from_forecast({})
         
-        try:            
-            # Debug logging
-            logging.info(f"PrecipitationChart: Extracting data from forecast_data with keys: {list(forecast_data.keys()) if forecast_data else 'None'}")
-            
-            # OpenWeatherMap 5-day forecast structure: forecast_data['list'] contains hourly data
-            if 'list' in forecast_data:
-                logging.info(f"PrecipitationChart: Found {len(forecast_data['list'])} forecast items")
-                
-                for i, item in enumerate(forecast_data['list'][:24]):  # Next 24 hours
-                    precipitation = 0
-                    probability = 0
-                    
-                    # Get precipitation amount (rain or snow)
-                    if 'rain' in item:
-                        if '3h' in item['rain']:  # OpenWeatherMap uses 3h intervals
-                            precipitation = item['rain']['3h']
-                        elif '1h' in item['rain']:
-                            precipitation = item['rain']['1h']
-                    
-                    if 'snow' in item:
-                        if '3h' in item['snow']:
-                            precipitation += item['snow']['3h']  # Add snow to precipitation
-                        elif '1h' in item['snow']:
-                            precipitation += item['snow']['1h']
-                    
-                    # Get precipitation probability (if available)
-                    if 'pop' in item:
-                        probability = item['pop'] * 100  # Convert to percentage
-                    else:
-                        # Estimate probability based on weather conditions
-                        weather_main = item.get('weather', [{}])[0].get('main', '').lower()
-                        if 'rain' in weather_main or 'drizzle' in weather_main:
-                            probability = 80
-                        elif 'snow' in weather_main:
-                            probability = 90
-                        elif 'cloud' in weather_main:
-                            probability = 30
-                        else:
-                            probability = 10
-                    
-                    # Get time
-                    timestamp = item.get('dt', 0)
-                    
-                    precipitation_data.append({
-                        'time': timestamp,
-                        'precipitation': precipitation,
-                        'probability': probability
-                    })
-                    
-                    # Debug first few entries
-                    if i < 3:
-                        logging.info(f"PrecipitationChart: Entry {i}: precip={precipitation}mm, prob={probability}%, time={timestamp}")
-            else:
-                logging.warning("PrecipitationChart: No 'list' key found in forecast_data")
-                
+        try:
+            series = self._series_cache.precipitation(forecast_data, self._current_unit_system)
         except Exception as e:
             logging.error(f"PrecipitationChartDisplay: Error extracting precipitation data: {e}")
-            
-            # Use realistic fallback data instead of always showing precipitation
-            import time
-            current_time = int(time.time())
-            precipitation_data = []
-            
-            # Create more realistic data - mostly no precipitation
-            for i in range(8):  # 8 hours of fallback data
-                # Only occasional light precipitation
-                precip = 0.0
-                if i == 3:  # Light rain at hour 3
-                    precip = 1.2
-                elif i == 6:  # Moderate rain at hour 6
-                    precip = 3.5
-                    
-                precipitation_data.append({
-                    'time': current_time + (i * 3600),
-                    'precipitation': precip,
-                    'probability': 15 if precip == 0 else (60 if precip < 2 else 85)
-                })
-        
-        logging.info(f"PrecipitationChart: Extracted {len(precipitation_data)} data points")
-        return precipitation_data
+            return PrecipitationSeries.from_forecast({})
+        
+        logging.debug(f"PrecipitationChart: {len(series)} data points, total {series.total:.1f} mm")
+        return series
+
+    def _visible_series(self) -> PrecipitationSeries:
+        """The series reduced to the points the chart width can display."""
+        if not self._series:
+            return self._series
+        return self._series.level_of_detail(chart_point_budget(self.page))
 
     def will_unmount(self):
         """Cleanup method called when component is removed."""
@@ -836,12 +775,11 @@ class PrecipitationChartDisplay(ft.Container):
 
     def _get_precipitation_type_from_data(self) -> str:
         """Determine precipitation type from forecast data."""
-        if not self._precipitation_data:
+        if not self._series:
             return TranslationService.translate_from_dict("precipitation_chart_items", "rain", self._current_language) or "Rain"
         
-        # Check if we have snow in the data
-        has_snow = any(data.get('snow', 0) > 0 for data in self._precipitation_data if isinstance(data, dict))
-        has_rain = any(data.get('rain', 0) > 0 for data in self._precipitation_data if isinstance(data, dict))
+        has_snow = self._series.has_snow
+        has_rain = self._series.has_rain
         
         if has_snow and has_rain:
             return translation_manager.get_translation("charts", "precipitation_chart_items", "mixed", self._current_language) or "Mixed"
@@ -852,21 +790,8 @@ class PrecipitationChartDisplay(ft.Container):
 
     def _find_peak_precipitation_time(self) -> str:
         """Find when peak precipitation is expected."""
-        if not self._precipitation_data:
+        if not self._series or not self._series.peak_time:
             return ""
         
-        max_precip = 0
-        peak_time = ""
-        
-        for data in self._precipitation_data:
-            precip = data.get('precipitation', 0)
-            if precip > max_precip:
-                max_precip = precip
-                # Format time - assuming we have timestamp
-                timestamp = data.get('time', 0)
-                if timestamp:
-                    import datetime
-                    dt = datetime.datetime.fromtimestamp(timestamp)
-                    peak_time = dt.strftime("%H:%M")
-        
-        return peak_time
+        import datetime
+        return datetime.datetime.fromtimestamp(self._series.peak_time).strftime("%H:%M")
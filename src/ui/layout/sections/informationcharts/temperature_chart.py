@@ -1,10 +1,10 @@
 import traceback
 import flet as ft
 from typing import List, Optional
-import math
 from translations import translation_manager
 from services.ui.translation_service import TranslationService  # For unit symbols
 from services.ui.theme_handler import ThemeHandler
+from services.data.chart_series import TemperatureSeries, chart_point_budget
 from utils.responsive_utils import ResponsiveTextFactory
 import logging
 
@@ -22,12 +22,12 @@ class TemperatureChartDisplay(ft.Container):
                  language: str = None,
                  unit: str = None,
                  theme_handler: ThemeHandler = None, 
+                 series: Optional[TemperatureSeries] = None,
                  **kwargs):
         super().__init__(**kwargs)
         self.page = page
-        self.days = days if days is not None else []
-        self.temp_min = temp_min if temp_min is not None else []
-        self.temp_max = temp_max if temp_max is not None else []
+        # Precomputed series (see ChartSeriesCache); built from the lists if not given
+        self._set_series(series or TemperatureSeries.from_lists(days or [], temp_min or [], temp_max or []))
 
         # ThemeHandler centralizzato
         self.theme_handler = theme_handler or ThemeHandler(self.page)
@@ -48,6 +48,16 @@ class TemperatureChartDisplay(ft.Container):
         # Build initial content
         self.content = self.build()
 
+    def _set_series(self, series: TemperatureSeries):
+        self.series = series
+        self.days = list(series.days)
+        self.temp_min = list(series.temp_min)
+        self.temp_max = list(series.temp_max)
+
+    def _visible_series(self) -> TemperatureSeries:
+        """The series reduced to the points the chart width can display."""
+        return self.series.level_of_detail(chart_point_budget(self.page))
+
     def update_theme(self, event_data=None):
         """
         Update only the theme-related properties of this component.
@@ -178,17 +188,21 @@ class TemperatureChartDisplay(ft.Container):
     
     def _build_chart(self):
         """Builds the temperature chart - simple version."""
+        series = self._visible_series()
         data_points_min = []
         data_points_max = []
         unit_symbol = TranslationService.get_unit_symbol("temperature", self.current_unit_system)
         max_color = "#ef4444"
         min_color = "#3b82f6"
-        for i, day_label_key in enumerate(self.days):
-            day_display_name = translation_manager.get_translation("charts", "temperature_chart_items", day_label_key, self.current_language)
+        day_display_names = [
+            translation_manager.get_translation("charts", "temperature_chart_items", day_label_key, self.current_language)
+            for day_label_key in series.days
+        ]
+        for i, day_display_name in enumerate(day_display_names):
             data_points_min.append(
                 ft.LineChartDataPoint(
-                    i, self.temp_min[i],
-                    tooltip=f"{day_display_name}: {self.temp_min[i]}{unit_symbol}",
+                    i, series.temp_min[i],
+                    tooltip=f"{day_display_name}: {series.temp_min[i]}{unit_symbol}",
                     tooltip_style=ft.TextStyle(
                         size=12,
                         color=ft.Colors.WHITE,
@@ -198,8 +212,8 @@ class TemperatureChartDisplay(ft.Container):
             )
             data_points_max.append(
                 ft.LineChartDataPoint(
-                    i, self.temp_max[i],
-                    tooltip=f"{day_display_name}: {self.temp_max[i]}{unit_symbol}",
+                    i, series.temp_max[i],
+                    tooltip=f"{day_display_name}: {series.temp_max[i]}{unit_symbol}",
                     tooltip_style=ft.TextStyle(
                         size=12,
                         color=ft.Colors.WHITE,
@@ -222,8 +236,10 @@ class TemperatureChartDisplay(ft.Container):
             stroke_cap_round=True,
         )
         x_labels = []
-        for i, day_label_key in enumerate(self.days):
-            day_display_name = translation_manager.get_translation("charts", "temperature_chart_items", day_label_key, self.current_language)
+        label_every = max(1, len(day_display_names) // 7)  # at most ~7 labels on long series
+        for i, day_display_name in enumerate(day_display_names):
+            if i % label_every:
+                continue
             if day_display_name and isinstance(day_display_name, str):
                 day_display_name = day_display_name[0].upper() + day_display_name[1:] if len(day_display_name) > 1 else day_display_name.upper()
             x_labels.append(
@@ -238,20 +254,10 @@ class TemperatureChartDisplay(ft.Container):
                     )
                 )
             )
-        all_temps = self.temp_min + self.temp_max
-        step = 5
-        if not all_temps:
-            min_y_val = 0
-            max_y_val = 10
-        else:
-            data_min_val = min(all_temps)
-            data_max_val = max(all_temps)
-            min_y_val = math.floor((data_min_val - step) / step) * step
-            max_y_val = math.ceil((data_max_val + step) / step) * step
-            if max_y_val <= min_y_val:
-                max_y_val = min_y_val + step * 2
-            if max_y_val == min_y_val:
-                max_y_val += step
+        # Y scale precomputed with the series
+        step = series.y_step
+        min_y_val = series.y_min
+        max_y_val = series.y_max
         chart_control = ft.LineChart(
             interactive=False,
             data_series=[line_min, line_max],
@@ -262,7 +268,7 @@ class TemperatureChartDisplay(ft.Container):
                 width=1
             ),
             vertical_grid_lines=ft.ChartGridLines(
-                interval=1,
+                interval=label_every,
                 color=ft.Colors.with_opacity(0.08, self.current_text_color),
                 width=1
             ),
@@ -379,11 +385,10 @@ class TemperatureChartDisplay(ft.Container):
             padding=20
         )
 
-    def update_data(self, days: List[str], temp_min: List[int], temp_max: List[int]):
+    def update_data(self, days: List[str] = None, temp_min: List[int] = None, temp_max: List[int] = None,
+                    series: Optional[TemperatureSeries] = None):
         """Updates chart data and refreshes display."""
-        self.days = days if days is not None else []
-        self.temp_min = temp_min if temp_min is not None else []
-        self.temp_max = temp_max if temp_max is not None else []
+        self._set_series(series or TemperatureSeries.from_lists(days or [], temp_min or [], temp_max or []))
         
         if self.page and self.visible:
             try:
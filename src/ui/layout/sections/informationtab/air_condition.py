@@ -24,7 +24,7 @@ class AirConditionInfo(ft.Container, ResponsiveComponentMixin):
         super().__init__(**kwargs)
         self.page = page
         self.theme_handler = theme_handler if theme_handler else ThemeHandler(self.page)
-        self._api_service = ApiService()
+        self._api_service = ApiService(page=self.page)
         self._state_manager = page.session.get('state_manager') if page and hasattr(page, 'session') else None
         self._current_language = language or os.getenv("DEFAULT_LANGUAGE")
         self._current_unit_system = unit or os.getenv("DEFAULT_UNIT_SYSTEM")
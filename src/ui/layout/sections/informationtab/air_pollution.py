@@ -25,7 +25,7 @@ class AirPollutionDisplay(ft.Container):
         self._lat = lat
         self._lon = lon
 
-        self._api_service = ApiService()
+        self._api_service = ApiService(page=self.page)
         self._state_manager = None
         self._current_language = os.getenv("DEFAULT_LANGUAGE")
         self._current_text_color = self.theme_handler.get_text_color()
@@ -8,7 +8,12 @@ import traceback
 
 from services.ui.theme_handler import ThemeHandler
 from translations import translation_manager  # New modular translation system
-from utils.responsive_utils import ResponsiveTextFactory
+from ui.components.lazy_list import LazyListView
+from utils.responsive_utils import ResponsiveHelper, ResponsiveTextFactory
+
+HOUR_ITEM_WIDTH = 65
+HOUR_ITEM_HEIGHT = 110
+HOUR_ITEM_SPACING = 10
 
 class HourlyForecastDisplay(ft.Container):
     """
@@ -24,8 +29,10 @@ class HourlyForecastDisplay(ft.Container):
         super().__init__(**kwargs)
         self._city = city
         self.page = page
-        self._api_service = ApiService()
+        self._api_service = ApiService(page=self.page)
         self._hourly_data_list = []
+        self._hourly_list = None  # kept across rebuilds so hour cards are recycled
+        self._item_style = None  # theme, text color and device type the hour cards were built for
         self._language = language
         self._unit_system = unit
 
@@ -140,257 +147,22 @@ class HourlyForecastDisplay(ft.Container):
             padding=ft.padding.only(left=20, top=16, bottom=12)  # Reduced padding
         )
 
-        forecast_item_controls = []
-        
-        # Show optimal hours to fill width without overwhelming (16 hours)
-        for index, item_data in enumerate(self._hourly_data_list[:16]):  # Show 16 hours for optimal coverage
-            try:
-                # Format time to show only hour (like "12", "15", "18", etc.)
-                hour = datetime.strptime(item_data["dt_txt"], "%Y-%m-%d %H:%M:%S").strftime("%H")
-                icon_code = item_data["weather"][0]["icon"]
-                temp_value = round(item_data["main"]["temp"])
-                
-                # Extract only essential weather data for compact display
-                rain_probability = round(item_data.get("pop", 0) * 100)  # Probability of precipitation in %
-                
-                # Determine icon color and style based on weather condition
-                is_day = icon_code.endswith('d')
-                is_sunny = icon_code.startswith('01')  # Clear sky
-                is_cloudy = icon_code.startswith(('02', '03', '04'))  # Clouds
-                is_rain = icon_code.startswith(('09', '10'))  # Rain
-                is_storm = icon_code.startswith('11')  # Thunderstorm
-                is_snow = icon_code.startswith('13')  # Snow
-                
-                # Create beautiful weather icons with better proportions (more compact)
-                if is_sunny and is_day:
-                    weather_icon = ft.Container(
-                        width=28,  # Reduced for more compact display
-                        height=28,
-                        border_radius=14,
-                        bgcolor=ft.Colors.AMBER_400,
-                        shadow=ft.BoxShadow(
-                            spread_radius=1,
-                            blur_radius=4,  # Reduced shadow
-                            color=ft.Colors.with_opacity(0.25, ft.Colors.AMBER_300),
-                            offset=ft.Offset(0, 1),
-                        ),
-                        content=ft.Icon(
-                            ft.Icons.WB_SUNNY,
-                            color=ft.Colors.WHITE,
-                            size=16,  # Smaller icon
-                        ),
-                        alignment=ft.alignment.center,
-                    )
-                elif is_rain:
-                    weather_icon = ft.Container(
-                        width=28,
-                        height=28,
-                        border_radius=14,
-                        bgcolor=ft.Colors.BLUE_500,
-                        shadow=ft.BoxShadow(
-                            spread_radius=1,
-                            blur_radius=4,
-                            color=ft.Colors.with_opacity(0.25, ft.Colors.BLUE_300),
-                            offset=ft.Offset(0, 1),
-                        ),
-                        content=ft.Icon(
-                            ft.Icons.WATER_DROP,
-                            color=ft.Colors.WHITE,
-                            size=16,
-                        ),
-                        alignment=ft.alignment.center,
-                    )
-                elif is_storm:
-                    weather_icon = ft.Container(
-                        width=28,
-                        height=28,
-                        border_radius=14,
-                        bgcolor=ft.Colors.PURPLE_600,
-                        shadow=ft.BoxShadow(
-                            spread_radius=1,
-                            blur_radius=4,
-                            color=ft.Colors.with_opacity(0.25, ft.Colors.PURPLE_400),
-                            offset=ft.Offset(0, 1),
-                        ),
-                        content=ft.Icon(
-                            ft.Icons.FLASH_ON,
-                            color=ft.Colors.WHITE,
-                            size=16,
-                        ),
-                        alignment=ft.alignment.center,
-                    )
-                elif is_snow:
-                    weather_icon = ft.Container(
-                        width=28,
-                        height=28,
-                        border_radius=14,
-                        bgcolor=ft.Colors.LIGHT_BLUE_300,
-                        shadow=ft.BoxShadow(
-                            spread_radius=1,
-                            blur_radius=4,
-                            color=ft.Colors.with_opacity(0.25, ft.Colors.LIGHT_BLUE_200),
-                            offset=ft.Offset(0, 1),
-                        ),
-                        content=ft.Icon(
-                            ft.Icons.AC_UNIT,
-                            color=ft.Colors.BLUE_800,
-                            size=16,
-                        ),
-                        alignment=ft.alignment.center,
-                    )
-                elif is_cloudy:
-                    weather_icon = ft.Container(
-                        width=28,
-                        height=28,
-                        border_radius=14,
-                        bgcolor=ft.Colors.GREY_500 if is_day else ft.Colors.BLUE_GREY_700,
-                        shadow=ft.BoxShadow(
-                            spread_radius=1,
-                            blur_radius=4,
-                            color=ft.Colors.with_opacity(0.2, ft.Colors.GREY_400 if is_day else ft.Colors.BLUE_GREY_500),
-                            offset=ft.Offset(0, 1),
-                        ),
-                        content=ft.Icon(
-                            ft.Icons.CLOUD,
-                            color=ft.Colors.WHITE,
-                            size=16,
-                        ),
-                        alignment=ft.alignment.center,
-                    )
-                else:  # Night or other conditions
-                    weather_icon = ft.Container(
-                        width=28,
-                        height=28,
-                        border_radius=14,
-                        bgcolor=ft.Colors.INDIGO_600 if not is_day else ft.Colors.ORANGE_300,
-                        shadow=ft.BoxShadow(
-                            spread_radius=1,
-                            blur_radius=4,
-                            color=ft.Colors.with_opacity(0.25, ft.Colors.INDIGO_300 if not is_day else ft.Colors.ORANGE_200),
-                            offset=ft.Offset(0, 1),
-                        ),
-                        content=ft.Icon(
-                            ft.Icons.NIGHTLIGHT_ROUND if not is_day else ft.Icons.WB_SUNNY,
-                            color=ft.Colors.WHITE,
-                            size=16,
-                        ),
-                        alignment=ft.alignment.center,
-                    )
-                
-                # Professional hour display with better typography
-                time_text = ResponsiveTextFactory.create_adaptive_text(
-                    page=self.page,
-                    text=hour,
-                    text_type="title_card",
-                    color=ft.Colors.with_opacity(0.7, self._text_color),
-                    weight="w500",
-                    text_align=ft.TextAlign.CENTER,
-                    font_family="system-ui"
-                )
-                
-                # Professional temperature display with emphasis
-                temp_text = ResponsiveTextFactory.create_adaptive_text(
-                    page=self.page,
-                    text=f"{temp_value}°",
-                    text_type="body_primary",
-                    weight="w600",
-                    color=self._text_color,
-                    text_align=ft.TextAlign.CENTER,
-                    font_family="system-ui"
-                )
-                
-                # Additional weather info display (simplified)
-                # Only show rain probability if significant (> 20%)
-                rain_info = None
-                if rain_probability > 20:
-                    rain_info = ft.Container(
-                        content=ResponsiveTextFactory.create_adaptive_text(
-                            page=self.page,
-                            text=f"{rain_probability}%",
-                            text_type="label",
-                            color=ft.Colors.BLUE_400,
-                            weight="w500",
-                            text_align=ft.TextAlign.CENTER
-                        ),
-                        height=12,
-                        alignment=ft.alignment.center,
-                    )
-
-                # Compact layout with optimized spacing
-                controls_list = [
-                    ft.Container(
-                        content=time_text,
-                        height=16,
-                        alignment=ft.alignment.center,
-                    ),
-                    ft.Container(height=3),  # Reduced spacer
-                    ft.Container(
-                        content=weather_icon,
-                        height=32,  # Reduced from 36
-                        alignment=ft.alignment.center,
-                    ),
-                    ft.Container(height=3),  # Reduced spacer
-                    ft.Container(
-                        content=temp_text,
-                        height=18,  # Reduced from 20
-                        alignment=ft.alignment.center,
-                    ),
-                ]
-                
-                # Add rain info only if significant
-                if rain_info:
-                    controls_list.extend([
-                        ft.Container(height=2),
-                        rain_info
-                    ])
-                
-                item_column = ft.Column(
-                    controls=controls_list,
-                    alignment=ft.MainAxisAlignment.CENTER,
-                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                    spacing=0,  # Use container heights instead
-                )
-                
-                # Optimized compact container to fit more hours without scrolling
-                is_dark = False
-                if self.page and hasattr(self.page, 'theme_mode') and self.page.theme_mode is not None:
-                    is_dark = self.page.theme_mode == ft.ThemeMode.DARK
-                
-                # Determine if this is current hour for special styling
-                current_hour = datetime.now().strftime("%H")
-                is_current = hour == current_hour
-                
-                item_container = ft.Container(
-                    content=item_column,
-                    padding=ft.padding.symmetric(horizontal=6, vertical=12),  # Further reduced padding
-                    width=65,  # Reduced from 70 to fit more elements
-                    height=110,  # Keep same height
-                    alignment=ft.alignment.center,
-                    border_radius=16,
-                    bgcolor=ft.Colors.BLUE_50 if is_current and not is_dark else 
-                           ft.Colors.BLUE_GREY_900 if is_current and is_dark else
-                           ft.Colors.with_opacity(0.03, ft.Colors.WHITE if not is_dark else ft.Colors.BLACK),
-                    border=ft.border.all(
-                        1.5 if is_current else 1, 
-                        ft.Colors.BLUE_200 if is_current and not is_dark else
-                        ft.Colors.BLUE_400 if is_current and is_dark else
-                        ft.Colors.with_opacity(0.08, ft.Colors.GREY_400 if not is_dark else ft.Colors.GREY_600)
-                    ),
-                    animate=ft.Animation(200, ft.AnimationCurve.EASE_OUT),
-                )
-                forecast_item_controls.append(item_container)
-                
-            except Exception as e:
-                logging.error(f"Error processing hourly item: {item_data}, Error: {e}")
+        if self._hourly_list is None:
+            self._hourly_list = LazyListView(
+                item_builder=self._create_hour_item,
+                key=self._hour_item_key,
+                item_size=HOUR_ITEM_WIDTH + HOUR_ITEM_SPACING,
+                viewport=self.page.width if self.page and self.page.width else None,
+                horizontal=True,
+                spacing=HOUR_ITEM_SPACING,
+                height=HOUR_ITEM_HEIGHT,
+            )
+        # Only the hours that fit on screen are built; the others follow while scrolling
+        self._item_style = (is_dark, self._text_color, ResponsiveHelper.get_device_type_smart(self.page))
+        self._hourly_list.set_items(self._hourly_data_list)
 
-        # Optimized horizontal layout to fill full width without scrolling
         hourly_row = ft.Container(
-            content=ft.Row(
-                controls=forecast_item_controls,
-                alignment=ft.MainAxisAlignment.START,
-                spacing=10,  # Further reduced spacing to fit more elements
-                scroll=ft.ScrollMode.AUTO,  # Keep as backup for smaller screens
-            ),
+            content=self._hourly_list,
             padding=ft.padding.symmetric(horizontal=16, vertical=12),
         )
 
@@ -410,6 +182,258 @@ class HourlyForecastDisplay(ft.Container):
             ),
         )
     
+    def _is_current_hour(self, item_data) -> bool:
+        hour = datetime.strptime(item_data["dt_txt"], "%Y-%m-%d %H:%M:%S").strftime("%H")
+        return hour == datetime.now().strftime("%H")
+
+    def _hour_item_key(self, item_data):
+        """Recycling key of an hourly item: everything that changes how it looks."""
+        try:
+            return (item_data["dt_txt"], round(item_data["main"]["temp"]), item_data["weather"][0]["icon"],
+                    round(item_data.get("pop", 0) * 100), self._is_current_hour(item_data), self._item_style)
+        except (KeyError, IndexError, TypeError, ValueError):
+            return id(item_data)
+
+    def _create_hour_item(self, item_data):
+        """Builds the card of one hour, or None if the item is malformed."""
+        try:
+            # Format time to show only hour (like "12", "15", "18", etc.)
+            hour = datetime.strptime(item_data["dt_txt"], "%Y-%m-%d %H:%M:%S").strftime("%H")
+            icon_code = item_data["weather"][0]["icon"]
+            temp_value = round(item_data["main"]["temp"])
+            
+            # Extract only essential weather data for compact display
+            rain_probability = round(item_data.get("pop", 0) * 100)  # Probability of precipitation in %
+            
+            # Determine icon color and style based on weather condition
+            is_day = icon_code.endswith('d')
+            is_sunny = icon_code.startswith('01')  # Clear sky
+            is_cloudy = icon_code.startswith(('02', '03', '04'))  # Clouds
+            is_rain = icon_code.startswith(('09', '10'))  # Rain
+            is_storm = icon_code.startswith('11')  # Thunderstorm
+            is_snow = icon_code.startswith('13')  # Snow
+            
+            # Create beautiful weather icons with better proportions (more compact)
+            if is_sunny and is_day:
+                weather_icon = ft.Container(
+                    width=28,  # Reduced for more compact display
+                    height=28,
+                    border_radius=14,
+                    bgcolor=ft.Colors.AMBER_400,
+                    shadow=ft.BoxShadow(
+                        spread_radius=1,
+                        blur_radius=4,  # Reduced shadow
+                        color=ft.Colors.with_opacity(0.25, ft.Colors.AMBER_300),
+                        offset=ft.Offset(0, 1),
+                    ),
+                    content=ft.Icon(
+                        ft.Icons.WB_SUNNY,
+                        color=ft.Colors.WHITE,
+                        size=16,  # Smaller icon
+                    ),
+                    alignment=ft.alignment.center,
+                )
+            elif is_rain:
+                weather_icon = ft.Container(
+                    width=28,
+                    height=28,
+                    border_radius=14,
+                    bgcolor=ft.Colors.BLUE_500,
+                    shadow=ft.BoxShadow(
+                        spread_radius=1,
+                        blur_radius=4,
+                        color=ft.Colors.with_opacity(0.25, ft.Colors.BLUE_300),
+                        offset=ft.Offset(0, 1),
+                    ),
+                    content=ft.Icon(
+                        ft.Icons.WATER_DROP,
+                        color=ft.Colors.WHITE,
+                        size=16,
+                    ),
+                    alignment=ft.alignment.center,
+                )
+            elif is_storm:
+                weather_icon = ft.Container(
+                    width=28,
+                    height=28,
+                    border_radius=14,
+                    bgcolor=ft.Colors.PURPLE_600,
+                    shadow=ft.BoxShadow(
+                        spread_radius=1,
+                        blur_radius=4,
+                        color=ft.Colors.with_opacity(0.25, ft.Colors.PURPLE_400),
+                        offset=ft.Offset(0, 1),
+                    ),
+                    content=ft.Icon(
+                        ft.Icons.FLASH_ON,
+                        color=ft.Colors.WHITE,
+                        size=16,
+                    ),
+                    alignment=ft.alignment.center,
+                )
+            elif is_snow:
+                weather_icon = ft.Container(
+                    width=28,
+                    height=28,
+                    border_radius=14,
+                    bgcolor=ft.Colors.LIGHT_BLUE_300,
+                    shadow=ft.BoxShadow(
+                        spread_radius=1,
+                        blur_radius=4,
+                        color=ft.Colors.with_opacity(0.25, ft.Colors.LIGHT_BLUE_200),
+                        offset=ft.Offset(0, 1),
+                    ),
+                    content=ft.Icon(
+                        ft.Icons.AC_UNIT,
+                        color=ft.Colors.BLUE_800,
+                        size=16,
+                    ),
+                    alignment=ft.alignment.center,
+                )
+            elif is_cloudy:
+                weather_icon = ft.Container(
+                    width=28,
+                    height=28,
+                    border_radius=14,
+                    bgcolor=ft.Colors.GREY_500 if is_day else ft.Colors.BLUE_GREY_700,
+                    shadow=ft.BoxShadow(
+                        spread_radius=1,
+                        blur_radius=4,
+                        color=ft.Colors.with_opacity(0.2, ft.Colors.GREY_400 if is_day else ft.Colors.BLUE_GREY_500),
+                        offset=ft.Offset(0, 1),
+                    ),
+                    content=ft.Icon(
+                        ft.Icons.CLOUD,
+                        color=ft.Colors.WHITE,
+                        size=16,
+                    ),
+                    alignment=ft.alignment.center,
+                )
+            else:  # Night or other conditions
+                weather_icon = ft.Container(
+                    width=28,
+                    height=28,
+                    border_radius=14,
+                    bgcolor=ft.Colors.INDIGO_600 if not is_day else ft.Colors.ORANGE_300,
+                    shadow=ft.BoxShadow(
+                        spread_radius=1,
+                        blur_radius=4,
+                        color=ft.Colors.with_opacity(0.25, ft.Colors.INDIGO_300 if not is_day else ft.Colors.ORANGE_200),
+                        offset=ft.Offset(0, 1),
+                    ),
+                    content=ft.Icon(
+                        ft.Icons.NIGHTLIGHT_ROUND if not is_day else ft.Icons.WB_SUNNY,
+                        color=ft.Colors.WHITE,
+                        size=16,
+                    ),
+                    alignment=ft.alignment.center,
+                )
+            
+            # Professional hour display with better typography
+            time_text = ResponsiveTextFactory.create_adaptive_text(
+                page=self.page,
+                text=hour,
+                text_type="title_card",
+                color=ft.Colors.with_opacity(0.7, self._text_color),
+                weight="w500",
+                text_align=ft.TextAlign.CENTER,
+                font_family="system-ui"
+            )
+            
+            # Professional temperature display with emphasis
+            temp_text = ResponsiveTextFactory.create_adaptive_text(
+                page=self.page,
+                text=f"{temp_value}°",
+                text_type="body_primary",
+                weight="w600",
+                color=self._text_color,
+                text_align=ft.TextAlign.CENTER,
+                font_family="system-ui"
+            )
+            
+            # Additional weather info display (simplified)
+            # Only show rain probability if significant (> 20%)
+            rain_info = None
+            if rain_probability > 20:
+                rain_info = ft.Container(
+                    content=ResponsiveTextFactory.create_adaptive_text(
+                        page=self.page,
+                        text=f"{rain_probability}%",
+                        text_type="label",
+                        color=ft.Colors.BLUE_400,
+                        weight="w500",
+                        text_align=ft.TextAlign.CENTER
+                    ),
+                    height=12,
+                    alignment=ft.alignment.center,
+                )
+
+            # Compact layout with optimized spacing
+            controls_list = [
+                ft.Container(
+                    content=time_text,
+                    height=16,
+                    alignment=ft.alignment.center,
+                ),
+                ft.Container(height=3),  # Reduced spacer
+                ft.Container(
+                    content=weather_icon,
+                    height=32,  # Reduced from 36
+                    alignment=ft.alignment.center,
+                ),
+                ft.Container(height=3),  # Reduced spacer
+                ft.Container(
+                    content=temp_text,
+                    height=18,  # Reduced from 20
+                    alignment=ft.alignment.center,
+                ),
+            ]
+            
+            # Add rain info only if significant
+            if rain_info:
+                controls_list.extend([
+                    ft.Container(height=2),
+                    rain_info
+                ])
+            
+            item_column = ft.Column(
+                controls=controls_list,
+                alignment=ft.MainAxisAlignment.CENTER,
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                spacing=0,  # Use container heights instead
+            )
+            
+            # Optimized compact container to fit more hours without scrolling
+            is_dark = False
+            if self.page and hasattr(self.page, 'theme_mode') and self.page.theme_mode is not None:
+                is_dark = self.page.theme_mode == ft.ThemeMode.DARK
+            
+            # Determine if this is current hour for special styling
+            is_current = self._is_current_hour(item_data)
+            
+            item_container = ft.Container(
+                content=item_column,
+                padding=ft.padding.symmetric(horizontal=6, vertical=12),  # Further reduced padding
+                width=HOUR_ITEM_WIDTH,
+                height=HOUR_ITEM_HEIGHT,
+                alignment=ft.alignment.center,
+                border_radius=16,
+                bgcolor=ft.Colors.BLUE_50 if is_current and not is_dark else 
+                       ft.Colors.BLUE_GREY_900 if is_current and is_dark else
+                       ft.Colors.with_opacity(0.03, ft.Colors.WHITE if not is_dark else ft.Colors.BLACK),
+                border=ft.border.all(
+                    1.5 if is_current else 1, 
+                    ft.Colors.BLUE_200 if is_current and not is_dark else
+                    ft.Colors.BLUE_400 if is_current and is_dark else
+                    ft.Colors.with_opacity(0.08, ft.Colors.GREY_400 if not is_dark else ft.Colors.GREY_600)
+                ),
+                animate=ft.Animation(200, ft.AnimationCurve.EASE_OUT),
+            )
+            return item_container
+        except Exception as e:
+            logging.error(f"Error processing hourly item: {item_data}, Error: {e}")
+            return None
+
     async def update_city(self, new_city: str):
         """Allows updating the city and refreshing the forecast."""
         if self._city != new_city:
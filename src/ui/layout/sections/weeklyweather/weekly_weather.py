@@ -20,7 +20,7 @@ class WeeklyForecastDisplay(ft.Container):
         super().__init__()
         self.page = page
         self._city = city
-        self._api_service = ApiService()
+        self._api_service = ApiService(page=self.page)
         self._state_manager = None
         self._current_language = os.getenv("DEFAULT_LANGUAGE")
         self._current_unit_system = os.getenv("DEFAULT_UNIT_SYSTEM")
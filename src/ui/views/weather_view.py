@@ -11,6 +11,7 @@ from ui.themes.themes import LIGHT_THEME, DARK_THEME
 from services.api.api_service import ApiService, load_dotenv
 from services.ui.translation_service import TranslationService # Import TranslationService
 from services.ui.theme_handler import ThemeHandler
+from services.data.chart_series import ChartSeriesCache
 from utils.responsive_utils import ResponsiveTextFactory
 
 from ui.components.cards.weather_card import WeatherCard
@@ -32,6 +33,7 @@ class WeatherView:
         self.page = page
         self.api_service = api_service
         self.state_manager = self.page.session.get('state_manager')
+        self.chart_series_cache = self.page.session.get('chart_series_cache') or ChartSeriesCache()
         self.weather_data = None
         self.current_weather_data = None  # For weather alerts service
         self.city_info = None
@@ -220,7 +222,7 @@ class WeatherView:
                 # If using city search, use the original city name to get translated data
                 original_city = state_manager.get_state('city') or self.current_city
                 
-                # Clear city_info to force fresh location data
+                # Clear city_info; it is refilled from the geocoding cache, not the network
                 self.city_info = None
                 
                 self.page.run_task(self.update_by_city, original_city, language, unit)
@@ -498,8 +500,8 @@ class WeatherView:
 
     async def _update_temperature_chart(self) -> None:
         """Frontend: Updates temperature chart UI using TemperatureChartDisplay."""
-        forecast_data = self.api_service.get_daily_forecast_data(self.weather_data)
-        days = self.api_service.get_upcoming_days()
+        unit = self.state_manager.get_state('unit') or os.getenv("DEFAULT_UNIT_SYSTEM")
+        series = self.chart_series_cache.temperature(self.weather_data or {}, unit)
         weather_card = WeatherCard(self.page)
         # Cleanup previous instance if exists
         if hasattr(self, 'temperature_chart_instance') and self.temperature_chart_instance:
@@ -509,11 +511,9 @@ class WeatherView:
                 pass
         self.temperature_chart_instance = TemperatureChartDisplay(
             page=self.page,
-            days=days,
-            temp_min=forecast_data["temp_min"],
-            temp_max=forecast_data["temp_max"],
+            series=series,
             language=self.state_manager.get_state('language') or os.getenv("DEFAULT_LANGUAGE"),
-            unit=self.state_manager.get_state('unit') or os.getenv("DEFAULT_UNIT_SYSTEM"),
+            unit=unit,
             theme_handler=self.theme_handler
         )
         try:
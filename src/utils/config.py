@@ -8,11 +8,104 @@ API_WEATHER_ENDPOINT = "/data/2.5/forecast"
 API_GEO_ENDPOINT = "/geo/1.0/direct"
 API_REVERSE_GEO_ENDPOINT = "/geo/1.0/reverse"
 API_AIR_POLLUTION_ENDPOINT= "/data/2.5/air_pollution"
+API_CURRENT_WEATHER_ENDPOINT = "/data/2.5/weather"
 
 # Geolocation settings
 GEO_ACCURACY = "high"  # "high" or "low"
 GEO_DISTANCE_FILTER = 500  # meters
-GEO_UPDATE_INTERVAL = 5  # seconds
+GEO_REFRESH_MIN_INTERVAL = 30  # seconds between two weather refreshes triggered by movement
+GEO_DATA_MAX_AGE = 1800  # seconds after which a shorter move is enough to refresh
+GEO_HYSTERESIS_RATIO = 0.5  # fraction of GEO_DISTANCE_FILTER that counts once the data is old
+REVERSE_GEOCODE_REUSE_KM = 0.5  # positions closer than this to a resolved one reuse its place name
+SAVED_LOCATION_RADIUS_KM = 1.0  # within this distance the user is considered at a saved location
+REVERSE_PLACE_RADIUS_KM = 5.0  # offline gazetteer places closer than this answer reverse lookups
+
+# Geocoding cache (place coordinates practically never change)
+GEOCODE_CACHE_TTL_DAYS = 180  # forward and reverse results
+GEOCODE_NEGATIVE_TTL_DAYS = 1  # queries the API found nothing for
+GEOCODE_TIMEOUT = 10  # seconds for geocoding HTTP requests
+
+# Offline gazetteer (complete dataset downloaded on first run, see build_gazetteer)
+GAZETTEER_DOWNLOAD_URL = "https://download.geonames.org/export/dump/cities15000.zip"
+GAZETTEER_ADMIN1_URL = "https://download.geonames.org/export/dump/admin1CodesASCII.txt"
+GAZETTEER_DOWNLOAD_TIMEOUT = 60  # seconds for each dataset download
+
+# City search autocomplete
+AUTOCOMPLETE_DEBOUNCE = 0.15  # seconds of typing pause before suggestions are computed
+AUTOCOMPLETE_LIMIT = 6  # suggestions shown under the search bar
+AUTOCOMPLETE_MIN_CHARS = 2  # shorter queries show no suggestions
+
+# Location disambiguation
+PREVIEW_CANDIDATES = 3  # top ranked candidates that get a current temperature preview
+PREVIEW_TTL = 600  # seconds a temperature preview is reused
+PREVIEW_TIMEOUT = 5  # seconds for each preview request
+
+# Weather map tiles
+MAP_MAX_CONNECTIONS = 8  # open connections in the shared map HTTP session
+MAP_MAX_CONNECTIONS_PER_HOST = 6
+MAP_REQUEST_TIMEOUT = 10  # seconds for a tile or map data request
+MAP_USER_AGENT = "MeteoOGGI/1.0 (Flet weather app)"  # tile servers such as OpenStreetMap refuse anonymous clients
+MAP_TILE_MEMORY_BYTES = 32 * 1024 * 1024  # in-memory tile cache budget
+MAP_TILE_DEFAULT_TTL = 900  # seconds, for layers not listed below
+MAP_TILE_TTL = {  # seconds a cached tile stays valid, per layer
+    "precipitation_new": 600,
+    "clouds_new": 600,
+    "wind_new": 1800,
+    "temp_new": 1800,
+    "pressure_new": 3600,
+    "base": 7 * 86400,  # street map under the weather layers
+    "radar": 86400,  # animation frames: a past timestamp never changes
+    "radar_nowcast": 600,  # forecast frames, replaced as new radar data comes in
+    "satellite": 86400
+}
+MAP_TILE_SIZE = 256  # pixels per tile side
+MAP_MIN_ZOOM = 0
+MAP_MAX_ZOOM = 18
+MAP_TILE_CONCURRENCY = 6  # tiles fetched at the same time by the viewport scheduler
+MAP_TILE_BORDER = 1  # rings of tiles fetched around the visible ones
+MAP_BASE_TILE_URL = "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+MAP_DECODED_TILE_CACHE = 128  # decoded tiles (256 KB each) kept for compositing
+MAP_COMPOSITE_CACHE_SIZE = 256  # composited tiles kept in memory
+RAINVIEWER_API_URL = "https://api.rainviewer.com/public/weather-maps.json"
+MAP_ANIMATION_FPS = 4  # frames per second during playback
+MAP_ANIMATION_MAX_FRAMES = 24  # frames in one animation
+MAP_ANIMATION_MAX_SIZE = 1024  # pixels, longest side of a frame
+MAP_ANIMATION_MAX_ZOOM = 10
+MAP_ANIMATION_CACHE_FRAMES = 96  # composited frames kept in memory
+MAP_ANIMATION_INDEX_TTL = 300  # seconds the list of available frames is reused
+MAP_WEATHER_CACHE_DURATION = 300  # seconds current weather for a map point is reused
+MAP_WEATHER_CACHE_MAX = 256  # map points kept in the current weather cache
+
+# Background alert monitor (saved locations)
+ALERT_MONITOR_INTERVAL = 1800  # seconds to go through all saved locations once
+ALERT_MONITOR_START_DELAY = 60  # seconds after startup before the first check
+ALERT_MONITOR_API_BUDGET = 12  # forecast requests per hour the monitor may make
+ALERT_MONITOR_FORECAST_MAX_AGE = 10800  # seconds a stored forecast is good enough to evaluate
+ALERT_WINDOW_BUCKET = 10800  # seconds: alerts of one type and place starting in the same bucket are one alert
+ALERT_HISTORY_SIZE = 500  # raised alerts remembered for statistics
+ALERT_NOTIFY_WINDOW = 2.0  # seconds new alerts are collected before one notification is shown
+ALERT_NOTIFY_MIN_INTERVAL = 30.0  # minimum seconds between two in-app alert notifications
+ALERT_LOCATION_RADIUS_KM = 10.0  # a forecast this close to a saved location shares its alerts
+
+# Observation store (local archive of every forecast fetch)
+OBSERVATION_RETENTION_DAYS = 400  # days of history kept; older daily partitions are dropped
+OBSERVATION_RUNS_KEEP_DAYS = 2  # days past steps keep all their forecast runs before only the latest is kept
+OBSERVATION_COMPACT_INTERVAL = 21600  # seconds between two compactions of the observation store
+
+# Charts
+CHART_SERIES_CACHE_SIZE = 32  # precomputed chart series kept in memory (per forecast and unit)
+CHART_PIXELS_PER_POINT = 4  # horizontal pixels per plotted point when downsampling long series
+CHART_MIN_POINTS = 24  # never downsample a chart below this many points
+
+# Long lists (hourly forecast, saved locations, alerts)
+LIST_PAGE_SIZE = 20  # items built each time a list is scrolled close to its end
+LIST_BUFFER_ITEMS = 4  # items built beyond the ones that fit in the visible area
+LIST_LOAD_MORE_EXTENT = 300  # pixels from the end of a list at which the next page is built
+LIST_SCROLL_INTERVAL = 100  # milliseconds between two scroll events sent by a list
+
+# Settings persistence
+SETTINGS_SAVE_DELAY = 0.5  # seconds of quiet before a pending save is written
+SETTINGS_SAVE_MAX_DELAY = 3.0  # seconds a burst of changes can postpone a save
 
 # UI settings
 UI_REFRESH_RATE = 5  # seconds